@@ -0,0 +1,254 @@
+"""
+Throughput of the Redis job queue with many concurrent workers.
+
+Compares the leased queue in ``src.app.core.redis_operations.JobQueue``
+(``leased``) with the previous list implementation (``legacy``: BLPOP, a
+separate LPUSH to a processing list, LREM on completion). For each worker
+count it enqueues ``--jobs`` jobs, drains them with that many concurrent
+workers and reports drain throughput and claim / complete latency
+percentiles. ``--backlog`` keeps that many jobs leased while measuring,
+which is what makes LREM on the processing list slow.
+
+With ``--fail_rate`` workers fail that fraction of claims and, with
+``--abandon_rate``, walk away from jobs without completing them; the run
+then also checks that every job ends up completed or dead-lettered once
+expired leases are reclaimed.
+
+Needs a Redis server (6.2+, for BLMOVE); every run uses its own key prefix
+and deletes its keys afterwards.
+
+Example:
+    python -m benchmarks.job_queue_benchmark --redis_url redis://localhost:6379/15 \\
+        --workers 1 8 64 256 --jobs 20000 --output benchmarks/results/job_queue.json
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import logging
+import argparse
+import platform
+from typing import Any, Dict, List, Optional
+
+from redis.asyncio import Redis
+
+from src.app.core.redis_operations import JobQueue
+
+RESULTS_VERSION = 1
+
+
+class LegacyJobQueue:
+    """The list queue JobQueue replaced, for comparison."""
+
+    def __init__(self, redis_client: Redis, queue_key: str):
+        self.redis = redis_client
+        self.queue_key = queue_key
+        self.processing_key = f"{queue_key}:processing"
+
+    async def enqueue_job(self, job_id: str, priority: bool = False) -> int:
+        return await self.redis.rpush(self.queue_key, job_id)
+
+    async def dequeue_job(self, timeout: int = 0) -> Optional[str]:
+        result = await self.redis.blpop(self.queue_key, timeout=timeout)
+        if not result:
+            return None
+        _, job_id = result
+        await self.redis.lpush(self.processing_key, job_id)
+        return job_id
+
+    async def complete_job(self, job_id: str) -> bool:
+        return bool(await self.redis.lrem(self.processing_key, 1, job_id))
+
+    async def fail_job(self, job_id: str, error: str = "") -> Optional[str]:
+        await self.redis.lrem(self.processing_key, 1, job_id)
+        await self.redis.rpush(self.queue_key, job_id)
+        return "requeued"
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _make_queue(implementation: str, redis_client: Redis, queue_key: str, lease_seconds: int,
+                max_attempts: int) -> Any:
+    if implementation == "legacy":
+        return LegacyJobQueue(redis_client, queue_key)
+    return JobQueue(redis_client, lease_seconds=lease_seconds, max_attempts=max_attempts,
+                    reclaim_interval=max(lease_seconds / 2, 0.1), queue_key=queue_key)
+
+
+async def _worker(queue: Any, stop: asyncio.Event, counters: Dict[str, int], claim_ms: List[float],
+                  complete_ms: List[float], work_ms: float, fail_rate: float, abandon_rate: float) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        if isinstance(queue, JobQueue):
+            # Expiring leases, so abandoned jobs are reclaimed (dequeue_job's never expire)
+            lease = await queue.claim_job(timeout=1)
+            job_id = lease.job_id if lease else None
+        else:
+            job_id = await queue.dequeue_job(timeout=1)
+        if job_id is None:
+            continue
+        claim_ms.append((time.perf_counter() - start) * 1000)
+        counters["claims"] += 1
+        if work_ms:
+            await asyncio.sleep(work_ms / 1000)
+
+        roll = random.random()
+        if roll < abandon_rate:
+            # Simulated crash: the lease is left to expire
+            counters["abandoned"] += 1
+            continue
+        start = time.perf_counter()
+        if roll < abandon_rate + fail_rate:
+            if await queue.fail_job(job_id, error="benchmark failure") == "dead_letter":
+                counters["dead_letter"] += 1
+        else:
+            await queue.complete_job(job_id)
+            counters["completed"] += 1
+        complete_ms.append((time.perf_counter() - start) * 1000)
+
+
+async def run_case(redis_url: str, implementation: str, workers: int, jobs: int, backlog: int,
+                   work_ms: float, fail_rate: float, abandon_rate: float, lease_seconds: int,
+                   max_attempts: int, deadline: float) -> Dict[str, Any]:
+    queue_key = f"benchmark:job_queue:{uuid.uuid4().hex}"
+    redis_client = Redis.from_url(redis_url, decode_responses=True, max_connections=workers + 16)
+    queue = _make_queue(implementation, redis_client, queue_key, lease_seconds, max_attempts)
+    try:
+        # Jobs held by other (slow) workers during the measurement; their
+        # leases outlast the run so they are never reclaimed into it
+        holder = _make_queue(implementation, redis_client, queue_key, int(deadline) * 10, max_attempts)
+        for _ in range(backlog):
+            await holder.enqueue_job(f"held-{uuid.uuid4().hex}")
+        for _ in range(backlog):
+            await holder.dequeue_job()
+
+        job_ids = [f"job-{i}" for i in range(jobs)]
+        start = time.perf_counter()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.rpush(queue_key, job_id)
+            await pipe.execute()
+        enqueue_seconds = time.perf_counter() - start
+
+        counters = {"claims": 0, "completed": 0, "dead_letter": 0, "abandoned": 0}
+        claim_ms: List[float] = []
+        complete_ms: List[float] = []
+        stop = asyncio.Event()
+        tasks = [
+            asyncio.create_task(_worker(queue, stop, counters, claim_ms, complete_ms,
+                                        work_ms, fail_rate, abandon_rate))
+            for _ in range(workers)
+        ]
+
+        async def dead_letters() -> int:
+            # Includes jobs dead-lettered by reclaim when their last lease expired
+            if isinstance(queue, JobQueue):
+                return await queue.get_dead_letter_length()
+            return counters["dead_letter"]
+
+        start = time.perf_counter()
+        # Legacy retries never end, and abandoned jobs are never recovered by it
+        while counters["completed"] + await dead_letters() < jobs:
+            if time.perf_counter() - start > deadline:
+                break
+            await asyncio.sleep(0.05)
+        drain_seconds = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*tasks)
+
+        counters["dead_letter"] = await dead_letters()
+        finished = counters["completed"] + counters["dead_letter"]
+        return {
+            "implementation": implementation,
+            "workers": workers,
+            "jobs": jobs,
+            "backlog": backlog,
+            "enqueue_per_second": jobs / enqueue_seconds if enqueue_seconds else 0.0,
+            "drain_seconds": drain_seconds,
+            "jobs_per_second": finished / drain_seconds if drain_seconds else 0.0,
+            "all_accounted_for": finished == jobs,
+            "claim_ms_p50": _percentile(claim_ms, 0.5),
+            "claim_ms_p99": _percentile(claim_ms, 0.99),
+            "complete_ms_p50": _percentile(complete_ms, 0.5),
+            "complete_ms_p99": _percentile(complete_ms, 0.99),
+            **counters,
+        }
+    finally:
+        keys = [key async for key in redis_client.scan_iter(match=f"{queue_key}*")]
+        if keys:
+            await redis_client.delete(*keys)
+        await redis_client.close()
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'impl':<8} {'workers':>7} {'backlog':>7} {'jobs/s':>9} {'claim p50/p99 ms':>17} "
+          f"{'complete p50/p99 ms':>20} {'done':>7} {'dead':>6}  ok")
+    for r in results:
+        print(f"{r['implementation']:<8} {r['workers']:>7} {r['backlog']:>7} {r['jobs_per_second']:>9.0f} "
+              f"{r['claim_ms_p50']:>8.2f}/{r['claim_ms_p99']:<8.2f} "
+              f"{r['complete_ms_p50']:>10.2f}/{r['complete_ms_p99']:<9.2f} "
+              f"{r['completed']:>7} {r['dead_letter']:>6}  {'yes' if r['all_accounted_for'] else 'NO'}")
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    for implementation in args.implementations:
+        for workers in args.workers:
+            result = await run_case(
+                args.redis_url, implementation, workers, args.jobs, args.backlog, args.work_ms,
+                args.fail_rate, args.abandon_rate, args.lease_seconds, args.max_attempts, args.deadline
+            )
+            results.append(result)
+            print_results([result])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the Redis job queue with concurrent workers')
+    parser.add_argument('--redis_url', type=str, default=os.getenv('REDIS_URL', 'redis://localhost:6379/15'))
+    parser.add_argument('--implementations', type=str, nargs='+', default=['legacy', 'leased'],
+                        choices=['legacy', 'leased'])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 64, 256],
+                        help='Concurrent worker counts to measure')
+    parser.add_argument('--jobs', type=int, default=10000, help='Jobs drained per case')
+    parser.add_argument('--backlog', type=int, default=1000, help='Jobs kept leased during the measurement')
+    parser.add_argument('--work_ms', type=float, default=0.0, help='Simulated processing time per job')
+    parser.add_argument('--fail_rate', type=float, default=0.0, help='Fraction of claims that fail')
+    parser.add_argument('--abandon_rate', type=float, default=0.0,
+                        help='Fraction of claims abandoned without completing (simulated crashes)')
+    parser.add_argument('--lease_seconds', type=int, default=2, help='Lease duration for the leased queue')
+    parser.add_argument('--max_attempts', type=int, default=3, help='Claims per job before dead-lettering')
+    parser.add_argument('--deadline', type=float, default=120.0, help='Maximum seconds to drain one case')
+    parser.add_argument('--output', type=str, default=None, help='Results JSON path')
+    args = parser.parse_args()
+
+    # JobQueue logs every claim and completion at INFO
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(run(args))
+
+    if args.output:
+        report = {
+            'version': RESULTS_VERSION,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+            'results': results,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+Benchmark the orchestration overhead of the video generation pipeline.
+
+Each case runs ``EnhancedVideoGenerator.process_multiple_topics`` (or
+``generate_video_pipeline`` for a single topic) against ``ReplayModel`` and
+``TestsrcRenderer`` in a fresh subprocess, so peak RSS, thread counts and
+module-level singletons are measured per case. For every case it reports:
+
+- wall time and scenes rendered
+- per-stage busy time, active window and pairwise stage overlap
+- peak RSS of the pipeline process and of its children (ffmpeg)
+- peak and final thread counts
+- file-system operations under the case's output directory, by operation
+
+Results are written as JSON together with the git commit, so runs of
+different versions can be compared with ``--compare``.
+
+Example:
+    python -m benchmarks.pipeline_benchmark --topics 1 4 --scenes 2 8 \\
+        --scheduler staged dag --llm_latency 0.2 --output benchmarks/results/current.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import itertools
+import subprocess
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+RESULTS_VERSION = 1
+
+# Audit events counted as file-system operations (see the ``sys.audit`` event table)
+FS_AUDIT_EVENTS = {
+    'open': 'open',
+    'os.listdir': 'listdir',
+    'os.scandir': 'scandir',
+    'os.mkdir': 'mkdir',
+    'os.remove': 'remove',
+    'os.rmdir': 'rmdir',
+    'os.rename': 'rename',
+    'os.replace': 'rename',
+    'os.link': 'link',
+    'os.symlink': 'link',
+    'os.truncate': 'truncate',
+    'shutil.copyfile': 'copy',
+    'shutil.move': 'rename',
+    'shutil.rmtree': 'rmtree',
+}
+
+
+class FileSystemOpCounter:
+    """Count file-system operations on paths under a root directory.
+
+    Operations are taken from Python audit events, plus ``os.stat`` (which
+    ``os.path.exists``, ``isfile``, ``isdir`` and ``getsize`` go through and
+    which raises no audit event). Audit hooks cannot be removed, so this is
+    only installed in the per-case subprocess. Operations done by child
+    processes such as ffmpeg are not counted.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.counts: Counter = Counter()
+        self.enabled = False
+
+    def _under_root(self, path: Any) -> bool:
+        if isinstance(path, bytes):
+            path = os.fsdecode(path)
+        elif hasattr(path, '__fspath__'):
+            path = os.fspath(path)
+        if not isinstance(path, str):
+            return False
+        path = os.path.abspath(path)
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def _audit(self, event: str, args: tuple) -> None:
+        op = FS_AUDIT_EVENTS.get(event)
+        if op is not None and self.enabled and args and self._under_root(args[0]):
+            self.counts[op] += 1
+
+    def install(self) -> None:
+        sys.addaudithook(self._audit)
+        original_stat = os.stat
+
+        def counting_stat(path, *args, **kwargs):
+            if self.enabled and self._under_root(path):
+                self.counts['stat'] += 1
+            return original_stat(path, *args, **kwargs)
+
+        os.stat = counting_stat
+        self.enabled = True
+
+    def snapshot(self) -> Dict[str, int]:
+        counts = dict(self.counts)
+        counts['total'] = sum(self.counts.values())
+        return counts
+
+
+class ThreadSampler:
+    """Sample the process thread count in the background."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def count() -> int:
+        """OS threads of this process, excluding the sampler."""
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('Threads:'):
+                        return int(line.split()[1]) - 1
+        except OSError:
+            pass
+        return threading.active_count() - 1
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.count())
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        self._stop.set()
+        self._thread.join()
+        return {'peak': self.peak, 'final': self.count()}
+
+
+def _peak_rss_mb(who: int) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _union(intervals: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    merged: List[List[float]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def _intersection_length(a: List[Tuple[float, float]], b: List[Tuple[float, float]]) -> float:
+    total, i, j = 0.0, 0, 0
+    while i < len(a) and j < len(b):
+        total += max(0.0, min(a[i][1], b[j][1]) - max(a[i][0], b[j][0]))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return total
+
+
+def summarize_stages(intervals: List[Tuple[str, float, float]], wall_time: float) -> Dict[str, Any]:
+    """Busy time, active window and call count per stage, and busy-time overlap between stages."""
+    by_stage: Dict[str, List[Tuple[float, float]]] = {}
+    for stage, start, end in intervals:
+        by_stage.setdefault(stage, []).append((start, end))
+
+    unions = {stage: _union(spans) for stage, spans in by_stage.items()}
+    stages = {
+        stage: {
+            'calls': len(spans),
+            'busy_time': sum(end - start for start, end in unions[stage]),
+            'work_time': sum(end - start for start, end in spans),
+            'window': (min(s for s, _ in spans), max(e for _, e in spans)),
+        }
+        for stage, spans in by_stage.items()
+    }
+    overlap = {
+        f"{a}|{b}": _intersection_length(unions[a], unions[b])
+        for a, b in itertools.combinations(sorted(unions), 2)
+    }
+    total_work = sum(stage['work_time'] for stage in stages.values())
+    return {
+        'stages': stages,
+        'overlap': overlap,
+        'average_concurrency': total_work / wall_time if wall_time > 0 else 0.0,
+    }
+
+
+async def _run_pipeline(case: Dict[str, Any], output_dir: str, recordings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from generate_video import EnhancedVideoGenerator, VideoGenerationConfig
+    from benchmarks.stubs import REPLAY_MODEL_NAME, BenchmarkComponentFactory, ReplayModel, StageTimeline
+
+    timeline = StageTimeline()
+    model = ReplayModel(
+        recordings=recordings,
+        latency=case['llm_latency'],
+        jitter=case['llm_jitter'],
+        scene_count=case['scenes'],
+        timeline=timeline
+    )
+    factory = BenchmarkComponentFactory(
+        model,
+        clip_duration=case['clip_duration'],
+        clip_audio=case['clip_audio'],
+        timeline=timeline
+    )
+    config = VideoGenerationConfig(
+        planner_model=REPLAY_MODEL_NAME,
+        output_dir=output_dir,
+        use_langfuse=False,
+        max_scene_concurrency=case['max_scene_concurrency'],
+        max_topic_concurrency=case['max_topic_concurrency'],
+        max_concurrent_renders=case['max_concurrent_renders'],
+        max_llm_concurrency=case['max_llm_concurrency'],
+        pipeline_scheduler=case['scheduler'],
+        validate_code=case['validate_code'],
+        llm_cache="none"
+    )
+    topics = [
+        {'theorem': f"Benchmark topic {i}", 'description': f"Synthetic benchmark topic number {i}"}
+        for i in range(1, case['topics'] + 1)
+    ]
+
+    fs_counter = FileSystemOpCounter(output_dir)
+    threads = ThreadSampler()
+    generator = EnhancedVideoGenerator(config, component_factory=factory)
+
+    fs_counter.install()
+    threads.start()
+    start = timeline.origin = time.perf_counter()
+    if len(topics) == 1:
+        await generator.generate_video_pipeline(topics[0]['theorem'], topics[0]['description'])
+    else:
+        await generator.process_multiple_topics(topics)
+    wall_time = time.perf_counter() - start
+    fs_counter.enabled = False
+    thread_counts = threads.stop()
+
+    rendered = sum(
+        1 for _, _, files in os.walk(output_dir) for name in files if name == 'succ_rendered.txt'
+    )
+    combined = sum(
+        1 for _, _, files in os.walk(output_dir) for name in files if name.endswith('_combined.mp4')
+    )
+    return {
+        'wall_time': wall_time,
+        'scenes_expected': case['topics'] * case['scenes'],
+        'scenes_rendered': rendered,
+        'topics_combined': combined,
+        'llm_calls': dict(model.calls),
+        **summarize_stages(timeline.intervals(), wall_time),
+        'scheduler_stats': generator.pipeline_stats,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+        'children_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        'threads': thread_counts,
+        'fs_ops': fs_counter.snapshot(),
+    }
+
+
+def run_case_in_process(case: Dict[str, Any], recordings_path: Optional[str], keep_outputs: bool) -> Dict[str, Any]:
+    """Run one case in the current process (the per-case subprocess entry point)."""
+    from benchmarks.stubs import ReplayModel
+
+    recordings = ReplayModel.load_recordings(recordings_path) if recordings_path else []
+    output_dir = tempfile.mkdtemp(prefix="pipeline_benchmark_")
+    try:
+        metrics = asyncio.run(_run_pipeline(case, output_dir, recordings))
+    finally:
+        if not keep_outputs:
+            shutil.rmtree(output_dir, ignore_errors=True)
+    return {'case': case, 'metrics': metrics}
+
+
+def run_case(case: Dict[str, Any], args) -> Dict[str, Any]:
+    """Run one case in a fresh subprocess and return its result."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        result_path = f.name
+    cmd = [sys.executable, '-m', 'benchmarks.pipeline_benchmark', '--run_case', json.dumps(case),
+           '--case_output', result_path]
+    if args.recordings:
+        cmd += ['--recordings', os.path.abspath(args.recordings)]
+    if args.keep_outputs:
+        cmd.append('--keep_outputs')
+
+    try:
+        completed = subprocess.run(
+            cmd, cwd=project_root, timeout=args.case_timeout,
+            stdout=None if args.verbose else subprocess.DEVNULL,
+            stderr=None if args.verbose else subprocess.PIPE, text=True
+        )
+        if completed.returncode != 0:
+            return {'case': case, 'error': (completed.stderr or '')[-2000:] or f"exit code {completed.returncode}"}
+        with open(result_path) as f:
+            return json.load(f)
+    except subprocess.TimeoutExpired:
+        return {'case': case, 'error': f"timed out after {args.case_timeout}s"}
+    finally:
+        os.unlink(result_path)
+
+
+def _git_commit(project_root: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _case_id(case: Dict[str, Any]) -> str:
+    return f"{case['scheduler']}/topics={case['topics']}/scenes={case['scenes']}/run={case['repeat']}"
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print wall time, peak RSS and file-system operation deltas against a baseline run."""
+    base_by_id = {_case_id(r['case']): r for r in baseline.get('results', []) if 'metrics' in r}
+    print(f"\nComparison with {baseline.get('commit')}:")
+    for result in current['results']:
+        base = base_by_id.get(_case_id(result['case']))
+        if base is None or 'metrics' not in result:
+            continue
+        deltas = []
+        for label, get in (
+            ('wall', lambda m: m['wall_time']),
+            ('rss', lambda m: m['peak_rss_mb']),
+            ('fs_ops', lambda m: m['fs_ops']['total']),
+        ):
+            old, new = get(base['metrics']), get(result['metrics'])
+            change = (new - old) / old * 100 if old else 0.0
+            deltas.append(f"{label} {old:.2f} -> {new:.2f} ({change:+.1f}%)")
+        print(f"  {_case_id(result['case'])}: " + ", ".join(deltas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark pipeline orchestration with a replay LLM and testsrc renderer')
+    parser.add_argument('--topics', type=int, nargs='+', default=[1, 4], help='Topic counts to run')
+    parser.add_argument('--scenes', type=int, nargs='+', default=[2, 8], help='Scene counts per topic to run')
+    parser.add_argument('--scheduler', type=str, nargs='+', default=['staged', 'dag'],
+                        choices=['staged', 'dag'], help='Pipeline schedulers to run')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per case')
+    parser.add_argument('--llm_latency', type=float, default=0.1, help='Replay LLM latency per call in seconds')
+    parser.add_argument('--llm_jitter', type=float, default=0.0, help='Maximum extra replay latency per call in seconds')
+    parser.add_argument('--recordings', type=str, default=None, help='JSONL file of recorded LLM responses')
+    parser.add_argument('--clip_duration', type=float, default=1.0, help='Length of each fake scene clip in seconds')
+    parser.add_argument('--no_clip_audio', action='store_true', help='Write fake scene clips without audio')
+    parser.add_argument('--max_scene_concurrency', type=int, default=5, help='Scene concurrency')
+    parser.add_argument('--max_topic_concurrency', type=int, default=1, help='Topic concurrency')
+    parser.add_argument('--max_concurrent_renders', type=int, default=4, help='Render concurrency')
+    parser.add_argument('--max_llm_concurrency', type=int, default=4, help='LLM concurrency (dag scheduler)')
+    parser.add_argument('--skip_validation', action='store_true', help='Skip scene code validation before rendering')
+    parser.add_argument('--case_timeout', type=float, default=900, help='Timeout per case in seconds')
+    parser.add_argument('--output', type=str, default=None, help='Results JSON path')
+    parser.add_argument('--compare', type=str, default=None, help='Earlier results JSON to compare against')
+    parser.add_argument('--keep_outputs', action='store_true', help='Keep each case output directory')
+    parser.add_argument('--verbose', action='store_true', help='Show pipeline output')
+    parser.add_argument('--run_case', type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--case_output', type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        result = run_case_in_process(json.loads(args.run_case), args.recordings, args.keep_outputs)
+        with open(args.case_output, 'w') as f:
+            json.dump(result, f)
+        return
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    commit = _git_commit(project_root)
+    cases = [
+        {
+            'scheduler': scheduler,
+            'topics': topics,
+            'scenes': scenes,
+            'repeat': repeat,
+            'llm_latency': args.llm_latency,
+            'llm_jitter': args.llm_jitter,
+            'clip_duration': args.clip_duration,
+            'clip_audio': not args.no_clip_audio,
+            'max_scene_concurrency': args.max_scene_concurrency,
+            'max_topic_concurrency': args.max_topic_concurrency,
+            'max_concurrent_renders': args.max_concurrent_renders,
+            'max_llm_concurrency': args.max_llm_concurrency,
+            'validate_code': not args.skip_validation,
+        }
+        for scheduler, topics, scenes, repeat in itertools.product(
+            args.scheduler, args.topics, args.scenes, range(1, args.repeat + 1)
+        )
+    ]
+
+    results = []
+    for index, case in enumerate(cases, start=1):
+        print(f"[{index}/{len(cases)}] {_case_id(case)}", flush=True)
+        result = run_case(case, args)
+        results.append(result)
+        if 'error' in result:
+            print(f"  failed: {result['error']}")
+            continue
+        metrics = result['metrics']
+        print(f"  wall {metrics['wall_time']:.2f}s, rendered {metrics['scenes_rendered']}/{metrics['scenes_expected']}, "
+              f"concurrency {metrics['average_concurrency']:.2f}, peak RSS {metrics['peak_rss_mb']:.0f} MB, "
+              f"threads {metrics['threads']['peak']}, fs ops {metrics['fs_ops']['total']}")
+
+    report = {
+        'version': RESULTS_VERSION,
+        'commit': commit,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    output_path = args.output or os.path.join(
+        project_root, 'benchmarks', 'results', f"pipeline_{commit or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Compare the payload codecs in ``src.app.core.serialization``.
+
+For each payload and codec it reports encode and decode time per value and
+the encoded size, relative to ``legacy`` (``json.dumps(value, default=str)``
+/ ``json.loads``, what the cache and job storage used before). The built-in
+payloads have the shape of the values the API stores: job records
+(``JobDB``) as a whole and as Redis hash fields, job list responses, file
+metadata (``FileMetadataDB``) and batch metadata. Captured production
+payloads can be added with ``--payloads``, a JSONL file of
+``{"name": ..., "value": ...}`` records.
+
+Example:
+    python -m benchmarks.serialization_benchmark --payloads payloads.jsonl \\
+        --output benchmarks/results/serialization.json
+"""
+
+import os
+import json
+import time
+import uuid
+import argparse
+import platform
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.app.core import serialization
+
+RESULTS_VERSION = 1
+
+
+class _Status(str, Enum):
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+
+
+class _Priority(str, Enum):
+    NORMAL = "normal"
+    HIGH = "high"
+
+
+def _job(index: int, now: datetime) -> Dict[str, Any]:
+    """A job record with the fields of ``JobDB.model_dump()``."""
+    return {
+        "id": uuid.UUID(int=index + 1),
+        "user_id": uuid.UUID(int=10_000 + index % 7),
+        "job_type": "video_generation",
+        "priority": _Priority.HIGH if index % 5 == 0 else _Priority.NORMAL,
+        "configuration": {
+            "topic": f"Pythagorean theorem, variation {index}",
+            "context": "Explain the theorem with a geometric proof and two worked examples. " * 3,
+            "model": "bedrock/anthropic.claude-3-sonnet",
+            "quality": "medium",
+            "use_rag": index % 2 == 0,
+            "max_scene_concurrency": 5,
+            "scenes": [{"number": n, "title": f"Scene {n}", "duration": 12.5 + n} for n in range(1, 6)],
+        },
+        "status": _Status.PROCESSING,
+        "progress_percentage": 42.5,
+        "current_stage": "rendering",
+        "stages_completed": ["outline", "planning", "code_generation"],
+        "estimated_completion": now + timedelta(minutes=4),
+        "processing_time_seconds": 183.25,
+        "error_info": None,
+        "metrics": {"llm_calls": 37, "render_attempts": 6, "tokens": {"input": 48213, "output": 9120}},
+        "created_at": now - timedelta(minutes=3),
+        "updated_at": now,
+        "started_at": now - timedelta(minutes=3),
+        "completed_at": None,
+        "batch_id": uuid.UUID(int=99),
+        "parent_job_id": None,
+        "is_deleted": False,
+        "deleted_at": None,
+    }
+
+
+def _file_metadata(index: int, now: datetime) -> Dict[str, Any]:
+    """File metadata with the fields of ``FileMetadataDB.model_dump()``."""
+    return {
+        "id": uuid.UUID(int=50_000 + index),
+        "user_id": uuid.UUID(int=10_000),
+        "job_id": uuid.UUID(int=index + 1),
+        "file_type": "video",
+        "original_filename": f"pythagorean_theorem_{index}.mp4",
+        "stored_filename": f"{uuid.UUID(int=index)}.mp4",
+        "s3_bucket": "t2m-videos-production",
+        "s3_key": f"users/{uuid.UUID(int=10_000)}/jobs/{uuid.UUID(int=index + 1)}/combined.mp4",
+        "s3_version_id": "3HL4kqtJlcpXroDTDmJ+rmSpXd3dIbrHY",
+        "file_size": 48_213_991,
+        "content_type": "video/mp4",
+        "checksum": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+        "metadata": {"duration": 182.4, "resolution": "1920x1080", "fps": 30, "codec": "h264",
+                     "thumbnails": {size: f"thumbnails/{index}_{size}.jpg" for size in ("small", "medium", "large")}},
+        "description": None,
+        "tags": ["math", "geometry", "generated"],
+        "created_at": now,
+        "updated_at": now,
+        "last_accessed_at": now,
+        "is_deleted": False,
+        "deleted_at": None,
+    }
+
+
+def build_payloads() -> Dict[str, Any]:
+    """Representative payloads keyed by name."""
+    now = datetime(2025, 1, 15, 12, 30, 45, 123456)
+    job = _job(1, now)
+    return {
+        "job_record": job,
+        # JobStorage encodes each non-string field of the hash separately
+        "job_hash_fields": {k: v for k, v in job.items() if not isinstance(v, str)},
+        "job_list_response": {
+            "jobs": [_job(i, now) for i in range(50)],
+            "pagination": {"page": 1, "items_per_page": 50, "total_count": 1234, "has_next": True},
+        },
+        "file_metadata": _file_metadata(1, now),
+        "batch_metadata": {
+            "batch_id": str(uuid.UUID(int=99)),
+            "user_id": str(uuid.UUID(int=10_000)),
+            "total_jobs": 100,
+            "created_jobs": 98,
+            "failed_jobs": 2,
+            "batch_priority": "normal",
+            "created_at": now.isoformat(),
+            "job_ids": [str(uuid.UUID(int=i)) for i in range(98)],
+        },
+    }
+
+
+def load_payloads(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {record.get("name", f"payload_{i}"): record["value"] for i, record in enumerate(records)}
+
+
+def _time_per_call(func: Callable[[], Any], min_time: float) -> float:
+    """Best-of-five seconds per call, with enough calls per round to last min_time."""
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 5:
+            break
+        calls *= 2
+    best = elapsed / calls
+    for _ in range(4):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def _codec_functions(name: str) -> Tuple[Callable[[Any], Any], Callable[[Any], Any]]:
+    if name == "legacy":
+        return (lambda value: json.dumps(value, default=str)), json.loads
+    return (lambda value: serialization.dumps(value, codec=name)), serialization.loads
+
+
+def _encode_payload(name: str, payload: Any, encode: Callable[[Any], Any]) -> Any:
+    if name == "job_hash_fields":
+        return {k: encode(v) for k, v in payload.items()}
+    return encode(payload)
+
+
+def _decode_payload(name: str, encoded: Any, decode: Callable[[Any], Any]) -> Any:
+    if name == "job_hash_fields":
+        return {k: decode(v) for k, v in encoded.items()}
+    return decode(encoded)
+
+
+def _size(encoded: Any) -> int:
+    if isinstance(encoded, dict):
+        return sum(_size(v) for v in encoded.values())
+    return len(encoded.encode("utf-8") if isinstance(encoded, str) else encoded)
+
+
+def benchmark(payloads: Dict[str, Any], codecs: List[str], min_time: float) -> List[Dict[str, Any]]:
+    results = []
+    for payload_name, payload in payloads.items():
+        for codec in codecs:
+            encode, decode = _codec_functions(codec)
+            encoded = _encode_payload(payload_name, payload, encode)
+            results.append({
+                "payload": payload_name,
+                "codec": codec,
+                "encode_us": _time_per_call(lambda: _encode_payload(payload_name, payload, encode), min_time) * 1e6,
+                "decode_us": _time_per_call(lambda: _decode_payload(payload_name, encoded, decode), min_time) * 1e6,
+                "size_bytes": _size(encoded),
+            })
+    return results
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    baseline = {r["payload"]: r for r in results if r["codec"] == "legacy"}
+    print(f"{'payload':<20} {'codec':<8} {'encode us':>10} {'decode us':>10} {'bytes':>8}  vs legacy (enc/dec/size)")
+    for r in results:
+        base = baseline.get(r["payload"])
+        relative = ""
+        if base and r["codec"] != "legacy":
+            relative = (f"  {base['encode_us'] / r['encode_us']:.1f}x / {base['decode_us'] / r['decode_us']:.1f}x / "
+                        f"{r['size_bytes'] / base['size_bytes'] * 100:.0f}%")
+        print(f"{r['payload']:<20} {r['codec']:<8} {r['encode_us']:>10.2f} {r['decode_us']:>10.2f} "
+              f"{r['size_bytes']:>8}{relative}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare payload serialization codecs')
+    parser.add_argument('--codecs', type=str, nargs='+', default=None,
+                        help='Codecs to compare (default: legacy and every installed codec)')
+    parser.add_argument('--payloads', type=str, default=None, help='JSONL file of {"name", "value"} payloads to add')
+    parser.add_argument('--only_payloads_file', action='store_true', help='Skip the built-in payloads')
+    parser.add_argument('--min_time', type=float, default=0.2, help='Seconds measured per payload, codec and direction')
+    parser.add_argument('--output', type=str, default=None, help='Results JSON path')
+    args = parser.parse_args()
+
+    codecs = args.codecs
+    if codecs is None:
+        codecs = ["legacy"]
+        for name in ("json", "orjson", "msgpack"):
+            try:
+                serialization.get_codec(name)
+                codecs.append(name)
+            except ImportError as e:
+                print(f"Skipping {name}: {e}")
+
+    payloads = {} if args.only_payloads_file else build_payloads()
+    if args.payloads:
+        payloads.update(load_payloads(args.payloads))
+
+    results = benchmark(payloads, codecs, args.min_time)
+    print_results(results)
+
+    if args.output:
+        report = {
+            'version': RESULTS_VERSION,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
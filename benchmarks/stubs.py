@@ -0,0 +1,256 @@
+"""
+Deterministic stand-ins for the model and the renderer.
+
+``ReplayModel`` serves recorded responses (or synthesized ones that satisfy
+the planner and code generator parsers) after a configurable latency, and
+``TestsrcRenderer`` replaces the manim process with an ffmpeg ``testsrc``
+clip written where manim would have written the scene video. Everything
+else in ``EnhancedVideoGenerator`` runs unchanged, so a benchmark measures
+the orchestration around the model and render calls.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import subprocess
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from mllm_tools.response_cache import make_cache_key
+from src.core.video_renderer import OptimizedVideoRenderer
+
+from generate_video import ComponentFactory
+
+REPLAY_MODEL_NAME = "replay/benchmark"
+
+# Stage recorded for each generation name; anything else counts as "helper"
+GENERATION_STAGES = {
+    'scene_outline': 'outline',
+    'scene_vision_storyboard': 'plan',
+    'scene_technical_implementation': 'plan',
+    'scene_animation_narration': 'plan',
+    'code_generation': 'code',
+    'code_fix_error': 'code',
+}
+
+
+class StageTimeline:
+    """Thread-safe record of (stage, start, end) intervals."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self._intervals: List[Tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, start: float, end: float) -> None:
+        with self._lock:
+            self._intervals.append((stage, start - self.origin, end - self.origin))
+
+    def intervals(self) -> List[Tuple[str, float, float]]:
+        with self._lock:
+            return list(self._intervals)
+
+
+def _messages_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(message.get('content', '')) for message in messages if message.get('type') == 'text')
+
+
+def _scene_number(metadata: Dict[str, Any]) -> int:
+    for tag in metadata.get('tags') or []:
+        if isinstance(tag, str) and tag.startswith('scene') and tag[5:].isdigit():
+            return int(tag[5:])
+    return 1
+
+
+class ReplayModel:
+    """Model wrapper that replays recorded responses with simulated latency.
+
+    A response is looked up by the call's exact cache key first, then by its
+    generation name (picking among several recordings by a hash of the
+    prompt), and is otherwise synthesized. Latency jitter is derived from
+    the prompt, so a rerun sees the same delay for the same call regardless
+    of scheduling order.
+    """
+
+    def __init__(self, model_name: str = REPLAY_MODEL_NAME, recordings: Optional[List[Dict[str, Any]]] = None,
+                 latency: float = 0.0, jitter: float = 0.0, scene_count: int = 3,
+                 timeline: Optional[StageTimeline] = None):
+        """
+        Args:
+            model_name: Name reported to the pipeline and used in cache keys
+            recordings: Records with "response" and either "key" or "generation_name"
+            latency: Base delay per call in seconds
+            jitter: Maximum extra delay per call in seconds
+            scene_count: Number of scenes in synthesized outlines
+            timeline: Where call intervals are recorded by stage
+        """
+        self.model_name = model_name
+        self.temperature = 0.0
+        self.latency = latency
+        self.jitter = jitter
+        self.scene_count = scene_count
+        self.timeline = timeline
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+        self._by_key: Dict[str, str] = {}
+        self._by_name: Dict[str, List[str]] = defaultdict(list)
+        for record in recordings or []:
+            if record.get('key'):
+                self._by_key[record['key']] = record['response']
+            if record.get('generation_name'):
+                self._by_name[record['generation_name']].append(record['response'])
+
+    @staticmethod
+    def load_recordings(path: str) -> List[Dict[str, Any]]:
+        """Load recordings from a JSONL file."""
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _respond(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> Tuple[str, float]:
+        metadata = metadata or {}
+        name = metadata.get('generation_name', 'unknown')
+        prompt_hash = int(hashlib.sha256(_messages_text(messages).encode('utf-8')).hexdigest(), 16)
+        with self._lock:
+            self.calls[name] += 1
+
+        delay = self.latency + self.jitter * random.Random(prompt_hash).random()
+
+        key = make_cache_key(self.model_name, self.temperature, messages)
+        if key in self._by_key:
+            return self._by_key[key], delay
+        recorded = self._by_name.get(name)
+        if recorded:
+            return recorded[prompt_hash % len(recorded)], delay
+        return self._synthesize(name, metadata), delay
+
+    def _synthesize(self, name: str, metadata: Dict[str, Any]) -> str:
+        if name == 'scene_outline':
+            scenes = "\n".join(
+                f"<SCENE_{i}>\nScene Title: Benchmark scene {i}\nScene Purpose: Timing\n</SCENE_{i}>"
+                for i in range(1, self.scene_count + 1)
+            )
+            return f"<SCENE_OUTLINE>\n{scenes}\n</SCENE_OUTLINE>"
+
+        if name.startswith('code_') or name.startswith('visual_self_reflection') or 'visual_fix' in name:
+            scene = _scene_number(metadata)
+            tags = metadata.get('tags') or ['benchmark']
+            return (
+                "```python\n"
+                "from manim import *\n\n"
+                f"# {tags[0]}\n"
+                f"class BenchmarkScene{scene}(Scene):\n"
+                "    def construct(self):\n"
+                "        circle = Circle()\n"
+                "        self.play(Create(circle))\n"
+                "        self.wait(1)\n"
+                "```"
+            )
+
+        tag = f"{name.upper()}_PLAN" if name.startswith('scene_') else name.upper()
+        return f"<{tag}>\nBenchmark {name} for scene {_scene_number(metadata)}\n</{tag}>"
+
+    def _record(self, name: Optional[str], start: float) -> None:
+        if self.timeline is not None:
+            self.timeline.record(GENERATION_STAGES.get(name, 'helper'), start, time.perf_counter())
+
+    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        start = time.perf_counter()
+        response, delay = self._respond(messages, metadata)
+        time.sleep(delay)
+        self._record((metadata or {}).get('generation_name'), start)
+        return response
+
+    async def acall(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        start = time.perf_counter()
+        response, delay = self._respond(messages, metadata)
+        await asyncio.sleep(delay)
+        self._record((metadata or {}).get('generation_name'), start)
+        return response
+
+
+class TestsrcRenderer(OptimizedVideoRenderer):
+    """Renderer that writes a tiny ffmpeg ``testsrc`` clip instead of running manim."""
+
+    def __init__(self, *args, clip_duration: float = 1.0, clip_size: str = "160x90",
+                 clip_audio: bool = True, timeline: Optional[StageTimeline] = None, **kwargs):
+        """
+        Args:
+            clip_duration: Length of each scene clip in seconds
+            clip_size: Frame size of each clip (WxH)
+            clip_audio: Add a sine audio track, as voiceover scenes have
+            timeline: Where render and combine intervals are recorded
+        """
+        super().__init__(*args, **kwargs)
+        self.clip_duration = clip_duration
+        self.clip_size = clip_size
+        self.clip_audio = clip_audio
+        self.timeline = timeline
+
+    def _execute_render(self, cmd: List[str], file_path: str, media_dir: str,
+                        quality: str) -> subprocess.CompletedProcess:
+        start = time.perf_counter()
+        preset = self.quality_presets.get(quality, self.quality_presets['medium'])
+        scene_name = os.path.splitext(os.path.basename(file_path))[0]
+        output_dir = os.path.join(media_dir, "videos", scene_name, f"{preset['resolution']}{preset['fps']}")
+        os.makedirs(output_dir, exist_ok=True)
+
+        ffmpeg_cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', f"testsrc=size={self.clip_size}:rate={preset['fps']}:duration={self.clip_duration}"
+        ]
+        if self.clip_audio:
+            ffmpeg_cmd += ['-f', 'lavfi', '-i', f"sine=frequency=440:duration={self.clip_duration}",
+                           '-c:a', 'aac', '-shortest']
+        ffmpeg_cmd += ['-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+                       os.path.join(output_dir, f"{scene_name}.mp4")]
+
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        if self.timeline is not None:
+            self.timeline.record('render', start, time.perf_counter())
+        return result
+
+    async def combine_videos_optimized(self, topic: str, **kwargs) -> str:
+        start = time.perf_counter()
+        try:
+            return await super().combine_videos_optimized(topic, **kwargs)
+        finally:
+            if self.timeline is not None:
+                self.timeline.record('combine', start, time.perf_counter())
+
+
+class BenchmarkComponentFactory(ComponentFactory):
+    """Component factory that builds the pipeline around the stub model and renderer."""
+
+    def __init__(self, model: ReplayModel, clip_duration: float = 1.0, clip_size: str = "160x90",
+                 clip_audio: bool = True, timeline: Optional[StageTimeline] = None):
+        self.model = model
+        self.clip_duration = clip_duration
+        self.clip_size = clip_size
+        self.clip_audio = clip_audio
+        self.timeline = timeline
+
+    def create_response_cache(self, config):
+        return None
+
+    def create_model(self, model_name: str, config) -> ReplayModel:
+        return self.model
+
+    def create_renderer(self, config) -> TestsrcRenderer:
+        return TestsrcRenderer(
+            output_dir=config.output_dir,
+            print_response=config.verbose,
+            use_visual_fix_code=config.use_visual_fix_code,
+            max_concurrent_renders=config.max_concurrent_renders,
+            enable_caching=config.enable_caching,
+            default_quality=config.default_quality,
+            validate_code=config.validate_code,
+            clip_duration=self.clip_duration,
+            clip_size=self.clip_size,
+            clip_audio=self.clip_audio,
+            timeline=self.timeline
+        )
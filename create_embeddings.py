@@ -357,7 +357,8 @@ def create_vector_store_with_progress():
             manim_docs_path=Config.MANIM_DOCS_PATH,
             embedding_model=Config.EMBEDDING_MODEL,
             session_id="embedding_creation",
-            use_langfuse=False
+            use_langfuse=False,
+            refresh_index=True  # Only new or changed chunks are embedded on re-runs
         )
         
         print("✅ Vector store initialized successfully!")
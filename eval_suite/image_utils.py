@@ -1,14 +1,21 @@
 import os
+import sys
 import tempfile
 
-import numpy as np
-from PIL import Image, ImageOps
-from moviepy import VideoFileClip
-
 from eval_suite.prompts_raw import _image_eval
 from eval_suite.utils import extract_json, convert_score_fields, calculate_geometric_mean
 from mllm_tools.utils import _prepare_text_image_inputs
-from src.core.parse_video import image_with_most_non_black_space
+from src.utils.frame_sampler import FULL_MODE, get_frame_sampler
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
 
 def extract_key_frames(video_path, output_dir, num_chunks):
     """Extract key frames from a video by dividing it into chunks and selecting representative frames.
@@ -24,38 +31,25 @@ def extract_key_frames(video_path, output_dir, num_chunks):
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    # Extract all frames from the video
-    clip = VideoFileClip(video_path)
-    frames = list(clip.iter_frames(fps=1))  # one frame every second
+    # Stream one frame per second; only the current chunk's best frame is kept in memory
+    sampler = get_frame_sampler()
+    stats = {}
+    key_frames = []
+    for chunk_index, frame in sampler.iter_best_per_chunk(video_path, num_chunks, fps=1, mode=FULL_MODE, stats=stats):
+        output_path = os.path.join(output_dir, f"key_frame_{chunk_index+1}.jpg")
+        frame.to_pil().save(output_path)
+        key_frames.append(output_path)
+        print(f"Key frame {chunk_index+1}/{num_chunks} at {frame.timestamp:.0f}s "
+              f"({stats['frames_decoded']}/{stats['total_frames']} frames scanned)")
     
-    total_frames = len(frames)
-    if total_frames == 0:
+    if not key_frames:
         print("No frames extracted from the video.")
         return []
     
-    # Determine the number of frames per chunk
-    frames_per_chunk = total_frames // num_chunks
-    num_chunks = min(num_chunks, (total_frames + frames_per_chunk - 1) // frames_per_chunk)
-    
-    key_frames = []
-    
-    # Process each chunk of frames
-    for i in range(num_chunks):
-        start_idx = i * frames_per_chunk
-        end_idx = min((i + 1) * frames_per_chunk, total_frames)
-        chunk_frames = frames[start_idx:end_idx]
-        
-        if chunk_frames:
-            # Save the frame with most non-black space
-            output_path = os.path.join(output_dir, f"key_frame_{i+1}.jpg")
-            result = image_with_most_non_black_space(chunk_frames, output_path)
-        else:
-            print(f"No frames in chunk {i+1}. Skipping.")
-            result = None
-        
-        if result is not None:
-            key_frames.append(output_path)
-    clip.close()
+    peak_rss = _peak_rss_mb()
+    print(f"Extracted {len(key_frames)} key frames; peak frame memory "
+          f"{stats['peak_frame_bytes'] / 2**20:.1f} MB"
+          + (f", peak process RSS {peak_rss:.0f} MB" if peak_rss is not None else ""))
     
     return key_frames
 
@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class ConcurrencyLimitedModel:
+    """
+    Wrap a model so that at most a fixed number of calls are in flight.
+
+    Several wrappers can share one semaphore to bound model calls across
+    every evaluation worker, independently of the worker pool size.
+    """
+
+    def __init__(self, model, semaphore: threading.Semaphore):
+        self.model = model
+        self.semaphore = semaphore
+
+    def __call__(self, *args, **kwargs):
+        with self.semaphore:
+            return self.model(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class EvaluationCheckpoint:
+    """
+    Append-only JSONL log of evaluation results that doubles as a checkpoint.
+
+    Each finished evaluation component (text, video or image of one theorem)
+    and each finished theorem is written as one line and flushed to disk
+    immediately, so an interrupted sweep can be resumed from the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Tuple[Dict[Tuple[str, str], Dict], Dict[str, Dict]]:
+        """
+        Read the records written by previous runs.
+
+        Returns:
+            Tuple of (component records keyed by (theorem, component),
+            theorem records keyed by theorem). A truncated last line from an
+            interrupted write is ignored and cut from the file, so the next
+            append starts on a line of its own.
+        """
+        components, theorems = {}, {}
+        if not os.path.exists(self.path):
+            return components, theorems
+
+        complete_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                complete_bytes += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("kind") == "component":
+                    components[(record["theorem"], record["component"])] = record
+                elif record.get("kind") == "theorem":
+                    theorems[record["theorem"]] = record
+
+        if complete_bytes < os.path.getsize(self.path):
+            with self._lock, open(self.path, 'r+b') as f:
+                f.truncate(complete_bytes)
+        return components, theorems
+
+    def append(self, record: Dict) -> None:
+        """Append one record and flush it to disk."""
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class EvaluationRunner:
+    """
+    Run evaluations for many theorems on a bounded worker pool.
+
+    Every (theorem, component) pair is an independent task, so text, video
+    and image evaluations of one theorem run alongside those of others.
+    Results stream to a JSONL checkpoint as they finish; on resume, finished
+    theorems are skipped and finished components are reused when they were
+    produced with the same configuration.
+    """
+
+    def __init__(self,
+                 evaluate_component: Callable[[str, str], Optional[Dict]],
+                 merge_components: Callable[[str, Dict[str, Optional[Dict]]], Optional[Dict]],
+                 checkpoint: EvaluationCheckpoint,
+                 max_workers: int = 4,
+                 resume: bool = True,
+                 component_config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            evaluate_component (Callable): Called as evaluate_component(theorem, component),
+                returns the component result or None.
+            merge_components (Callable): Called as merge_components(theorem, {component: result}),
+                returns the theorem result or None.
+            checkpoint (EvaluationCheckpoint): Where results are streamed and resumed from.
+            max_workers (int): Number of evaluation tasks run concurrently.
+            resume (bool): Reuse results already present in the checkpoint.
+            component_config (Dict, optional): Configuration recorded per component (e.g. model
+                name); checkpointed components are only reused if it matches.
+        """
+        self.evaluate_component = evaluate_component
+        self.merge_components = merge_components
+        self.checkpoint = checkpoint
+        self.max_workers = max(1, max_workers)
+        self.resume = resume
+        self.component_config = component_config or {}
+
+    def run(self, theorems: Dict[str, Tuple[str, List[str]]],
+            on_result: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+        """
+        Evaluate all theorems.
+
+        Args:
+            theorems (Dict[str, Tuple[str, List[str]]]): Maps a unique theorem key (its path)
+                to (result name, components to evaluate).
+            on_result (Callable, optional): Called with (name, result) for each theorem
+                finished in this run.
+
+        Returns:
+            Dict[str, Dict]: Results by name, including theorems finished by earlier runs.
+        """
+        done_components, done_theorems = self.checkpoint.load() if self.resume else ({}, {})
+
+        results = {}
+        pending: Dict[str, Dict[str, Optional[Dict]]] = {}
+        tasks = []
+        for theorem, (name, components) in theorems.items():
+            finished = done_theorems.get(theorem)
+            if finished is not None and set(finished.get("components", [])) == set(components):
+                if finished.get("result") is not None:
+                    results[name] = finished["result"]
+                continue
+
+            pending[theorem] = {}
+            for component in components:
+                record = done_components.get((theorem, component))
+                if record is not None and record.get("config") == self.component_config.get(component):
+                    pending[theorem][component] = record["result"]
+                else:
+                    tasks.append((theorem, component))
+
+        skipped = len(theorems) - len(pending)
+        if skipped:
+            print(f"Resuming: {skipped} theorem(s) already evaluated in {self.checkpoint.path}")
+
+        # Theorems whose components were all recovered from the checkpoint
+        for theorem in list(pending):
+            if all(c in pending[theorem] for c in theorems[theorem][1]):
+                self._finish(theorem, theorems, pending, results, on_result)
+
+        if not tasks:
+            return results
+
+        start_time = time.time()
+        print(f"Evaluating {len(tasks)} task(s) across {len(pending)} theorem(s) with {self.max_workers} worker(s)")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.evaluate_component, theorem, component): (theorem, component)
+                for theorem, component in tasks
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                theorem, component = futures[future]
+                name = theorems[theorem][0]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Not checkpointed as done, so a resumed run retries it
+                    print(f"Error evaluating {component} for {name}: {e}")
+                    self.checkpoint.append({
+                        "kind": "error", "theorem": theorem, "name": name,
+                        "component": component, "error": str(e)
+                    })
+                    pending.pop(theorem, None)
+                    continue
+
+                print(f"[{completed}/{len(tasks)}] {name}: {component} evaluation done ({time.time() - start_time:.1f}s elapsed)")
+                self.checkpoint.append({
+                    "kind": "component", "theorem": theorem, "name": name,
+                    "component": component, "config": self.component_config.get(component),
+                    "result": result
+                })
+                if theorem not in pending:
+                    continue
+                pending[theorem][component] = result
+                if all(c in pending[theorem] for c in theorems[theorem][1]):
+                    self._finish(theorem, theorems, pending, results, on_result)
+
+        return results
+
+    def _finish(self, theorem, theorems, pending, results, on_result) -> None:
+        name, components = theorems[theorem]
+        result = self.merge_components(theorem, pending.pop(theorem))
+        self.checkpoint.append({
+            "kind": "theorem", "theorem": theorem, "name": name,
+            "components": components, "result": result
+        })
+        if result is not None:
+            results[name] = result
+            if on_result is not None:
+                on_result(name, result)
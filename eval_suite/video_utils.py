@@ -1,9 +1,17 @@
 import os
-import cv2
+import shutil
+import hashlib
 import tempfile
+import threading
+import subprocess
 
 from dotenv import load_dotenv
 
+try:
+    import cv2
+except ImportError:  # only needed when ffmpeg is not installed
+    cv2 = None
+
 from mllm_tools.utils import _prepare_text_video_inputs
 from eval_suite.prompts_raw import _video_eval_new
 from eval_suite.utils import extract_json, convert_score_fields
@@ -11,22 +19,237 @@ from eval_suite.utils import extract_json, convert_score_fields
 load_dotenv()
 
 
-def reduce_video_framerate(input_path, target_fps=1, output_path=None):
+# Gemini tiles video frames at up to 768x768, so larger frames only cost upload and processing time
+DEFAULT_MAX_DIMENSION = 768
+
+REDUCED_VIDEO_CACHE_VERSION = 1
+
+# Size budget of the reduced video cache (EVAL_VIDEO_CACHE_MAX_BYTES overrides it)
+DEFAULT_REDUCED_VIDEO_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+_REDUCED_VIDEO_EXTENSIONS = ('.mp4', '.avi')
+
+_source_hashes = {}
+
+
+def _fit_within(width, height, max_dimension):
+    """Scale (width, height) down to fit a max_dimension square, keeping even sizes."""
+    if not max_dimension or max(width, height) <= max_dimension:
+        return width, height
+    scale = max_dimension / max(width, height)
+    return max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+
+
+def _file_hash(path):
+    """SHA-256 of a file's content, memoized per (path, size, mtime)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _source_hashes:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _source_hashes[key] = digest.hexdigest()
+    return _source_hashes[key]
+
+
+def get_reduced_video_cache_dir():
+    """Directory holding reduced videos (EVAL_VIDEO_CACHE_DIR, or under the system temp dir)."""
+    return os.getenv('EVAL_VIDEO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'eval_reduced_videos'))
+
+
+def get_reduced_video_cache_max_bytes():
+    """Size budget of the reduced video cache in bytes (EVAL_VIDEO_CACHE_MAX_BYTES)."""
+    return int(os.getenv('EVAL_VIDEO_CACHE_MAX_BYTES', DEFAULT_REDUCED_VIDEO_CACHE_MAX_BYTES))
+
+
+def _reduced_video_cache_key(input_path, target_fps, max_dimension):
+    return f"{_file_hash(input_path)}_fps{target_fps}_max{max_dimension or 0}_v{REDUCED_VIDEO_CACHE_VERSION}"
+
+
+def _prune_reduced_video_cache(cache_dir, max_bytes, keep):
+    """
+    Delete the least recently used reduced videos until the cache fits max_bytes.
+    
+    Recency is the file's modification time, which cache hits refresh. The
+    entry at ``keep`` is never deleted, and neither are the temporary files
+    of reductions still in progress.
+    
+    Returns:
+        int: Number of files deleted
+    """
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(_REDUCED_VIDEO_EXTENSIONS) or '.tmp.' in entry.name:
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+    
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    keep = os.path.abspath(keep)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if os.path.abspath(path) == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    if removed:
+        print(f"Evicted {removed} reduced videos from {cache_dir}")
+    return removed
+
+
+def _reduce_video_framerate_ffmpeg(ffmpeg_path, input_path, target_fps, output_path, max_dimension=None):
+    """
+    Reduce the frame rate and resolution of a video with a single ffmpeg invocation.
+    
+    The fps filter drops frames and the scale filter downsizes during decoding,
+    so no frame is decoded or encoded twice.
+    
+    Args:
+        ffmpeg_path (str): Path to the ffmpeg binary
+        input_path (str): Path to the input video
+        target_fps (int): Target frames per second
+        output_path (str): Path to save the processed video
+        max_dimension (int, optional): Longest side of the output frames
+    
+    Returns:
+        str: Path to the processed video
+    
+    Raises:
+        RuntimeError: If ffmpeg fails
+    """
+    filters = [f"fps={target_fps}"]
+    if max_dimension:
+        fit = f"min(1\\,{max_dimension}/max(iw\\,ih))"
+        filters.append(f"scale=trunc(iw*{fit}/2)*2:trunc(ih*{fit}/2)*2:flags=area")
+    
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp.mp4"
+    cmd = [
+        ffmpeg_path, '-hide_banner', '-nostdin', '-v', 'error', '-y',
+        '-i', input_path,
+        '-an', '-vf', ','.join(filters),
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-pix_fmt', 'yuv420p',
+        '-movflags', '+faststart',
+        tmp_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise RuntimeError(f"ffmpeg frame rate reduction failed for {input_path}: {result.stderr[-500:]}")
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def reduce_video_framerate(input_path, target_fps=1, output_path=None, max_dimension=DEFAULT_MAX_DIMENSION,
+                           use_cache=True):
     """
-    Reduces the frame rate of a video by only keeping frames at the target interval.
+    Reduces the frame rate of a video and downsizes it to what the evaluation model consumes.
+    
+    Uses one ffmpeg invocation when ffmpeg is installed and falls back to an
+    OpenCV decode/encode loop otherwise. Reduced videos are cached by
+    (source content hash, fps, size), so evaluating the same video again,
+    e.g. with a different model, reuses the earlier output. The cache lives in
+    EVAL_VIDEO_CACHE_DIR and the least recently used videos are deleted once
+    it outgrows EVAL_VIDEO_CACHE_MAX_BYTES (2 GB by default).
     
     Args:
         input_path (str): Path to the input video
         target_fps (int): Target frames per second (default: 1)
-        output_path (str, optional): Path to save the processed video. If None, uses a temporary file.
+        output_path (str, optional): Path to save the processed video. If None, the cached
+            file (or a temporary file when caching is off) is returned.
+        max_dimension (int, optional): Longest side of the output frames; None keeps the resolution
+        use_cache (bool): Whether to read and populate the reduced video cache
     
     Returns:
         str: Path to the processed video
         
     Raises:
         ValueError: If input video cannot be opened or has invalid FPS
-        RuntimeError: If video writer initialization fails or output video creation fails
+        RuntimeError: If the reduction fails
     """
+    ffmpeg_path = shutil.which('ffmpeg')
+    
+    def _reduce(path):
+        if ffmpeg_path is not None:
+            return _reduce_video_framerate_ffmpeg(ffmpeg_path, input_path, target_fps, path, max_dimension)
+        return _reduce_video_framerate_cv2(input_path, target_fps, path, max_dimension)
+    
+    if not use_cache:
+        if output_path is None:
+            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_output:
+                output_path = temp_output.name
+        return _reduce(output_path)
+    
+    cache_key = _reduced_video_cache_key(input_path, target_fps, max_dimension)
+    cache_dir = get_reduced_video_cache_dir()
+    cached = next(
+        (os.path.join(cache_dir, f"{cache_key}{ext}") for ext in _REDUCED_VIDEO_EXTENSIONS
+         if os.path.exists(os.path.join(cache_dir, f"{cache_key}{ext}"))),
+        None
+    )
+    if cached is not None:
+        print(f"Reusing reduced video from cache: {cached}")
+        try:
+            os.utime(cached)  # mark as recently used
+        except FileNotFoundError:
+            cached = None
+    if cached is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        cached = _reduce(os.path.join(cache_dir, f"{cache_key}.mp4"))
+        _prune_reduced_video_cache(cache_dir, get_reduced_video_cache_max_bytes(), keep=cached)
+    
+    if output_path is None:
+        return cached
+    
+    # The cv2 fallback may switch the container to .avi
+    if os.path.splitext(cached)[1] != os.path.splitext(output_path)[1]:
+        output_path = os.path.splitext(output_path)[0] + os.path.splitext(cached)[1]
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    shutil.copyfile(cached, output_path)
+    return output_path
+
+
+def is_cached_reduced_video(path):
+    """Whether path points into the reduced video cache (and must not be deleted by callers)."""
+    cache_dir = os.path.abspath(get_reduced_video_cache_dir())
+    return os.path.commonpath([cache_dir, os.path.abspath(path)]) == cache_dir
+
+
+def _reduce_video_framerate_cv2(input_path, target_fps, output_path, max_dimension=None):
+    """
+    Reduce the frame rate with OpenCV by only keeping frames at the target interval.
+    
+    Fallback for systems without an ffmpeg binary.
+    
+    Args:
+        input_path (str): Path to the input video
+        target_fps (int): Target frames per second
+        output_path (str): Path to save the processed video
+        max_dimension (int, optional): Longest side of the output frames
+    
+    Returns:
+        str: Path to the processed video
+        
+    Raises:
+        ValueError: If input video cannot be opened or has invalid FPS
+        RuntimeError: If OpenCV is not installed, video writer initialization fails or
+            output video creation fails
+    """
+    if cv2 is None:
+        raise RuntimeError("Reducing the video frame rate needs ffmpeg or OpenCV (opencv-python)")
+    
     cap = cv2.VideoCapture(input_path)
     if not cap.isOpened():
         raise ValueError(f"Could not open input video: {input_path}")
@@ -35,16 +258,11 @@ def reduce_video_framerate(input_path, target_fps=1, output_path=None):
     if original_fps <= 0:
         raise ValueError(f"Invalid FPS ({original_fps}) detected in input video")
         
-    frame_interval = int(original_fps / target_fps)
+    frame_interval = max(1, int(original_fps / target_fps))
     
     # Get video properties
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    
-    # Use provided output path or create temporary file
-    if output_path is None:
-        temp_output = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
-        output_path = temp_output.name
+    source_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    width, height = _fit_within(*source_size, max_dimension)
     
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -87,6 +305,8 @@ def reduce_video_framerate(input_path, target_fps=1, output_path=None):
             
         # Only write frames at the specified interval
         if frame_count % frame_interval == 0:
+            if (width, height) != source_size:
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
             out.write(frame)
             frames_written += 1
         frame_count += 1
@@ -163,5 +383,6 @@ def evaluate_video_chunk_new(model, video_path, transcript="No transcript provid
                     raise
     finally:
         # Clean up the temporary processed video if we created one
-        if target_fps is not None and save_processed_video is None and os.path.exists(processed_video_path):
+        if (target_fps is not None and save_processed_video is None and os.path.exists(processed_video_path)
+                and not is_cached_reduced_video(processed_video_path)):
             os.unlink(processed_video_path)
\ No newline at end of file
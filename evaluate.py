@@ -2,6 +2,7 @@ import os
 import json
 import argparse
 import tempfile
+import threading
 from typing import Dict, List, Union
 from datetime import datetime
 
@@ -10,16 +11,25 @@ from moviepy import VideoFileClip
 
 from mllm_tools.litellm import LiteLLMWrapper
 from mllm_tools.gemini import GeminiWrapper
+from mllm_tools.response_cache import CachedModel, create_response_cache
 from eval_suite.utils import calculate_geometric_mean
 from eval_suite.text_utils import parse_srt_to_text, fix_transcript, evaluate_text
 from eval_suite.video_utils import evaluate_video_chunk_new
 from eval_suite.image_utils import evaluate_sampled_images
+from eval_suite.runner import ConcurrencyLimitedModel, EvaluationCheckpoint, EvaluationRunner
 
 load_dotenv()
 
 with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "utils", "allowed_models.json")) as f:
     ALLOWED_MODELS = json.load(f)["allowed_models"]
 
+EXT_MAP = {
+    'text': ('.txt', '.srt'),
+    'video': ('.mp4', '.mkv')
+}
+
+EVAL_COMPONENTS = ('text', 'video', 'image')
+
 
 def combine_results(output_folder: str, combined_file: str, results: Dict[str, Dict]) -> None:
     """
@@ -242,6 +252,92 @@ def merge_dicts(dict1: dict, dict2: dict) -> dict:
     return merged
 
 
+def find_theorem_files(theorem_dir: str) -> tuple:
+    """
+    Locate the transcript and video files of a theorem directory.
+
+    Args:
+        theorem_dir (str): Path to the theorem directory.
+
+    Returns:
+        tuple: (transcript_path, video_path, topic_name). The transcript path is None if no
+            transcript exists (.srt preferred over .txt); the video path is None unless there
+            is exactly one video file.
+    """
+    all_files = os.listdir(theorem_dir)
+
+    # Look for transcript files, prioritizing .srt over .txt if both exist
+    transcript_file_candidates = [f for f in all_files if f.endswith(EXT_MAP['text']) and not f.endswith('_scene_outline.txt')]
+    srt_files = [f for f in transcript_file_candidates if f.endswith('.srt')]
+    txt_files = [f for f in transcript_file_candidates if f.endswith('.txt')]
+
+    transcript_path = None
+    if srt_files:
+        transcript_path = os.path.join(theorem_dir, srt_files[0])
+    elif txt_files:
+        transcript_path = os.path.join(theorem_dir, txt_files[0])
+
+    video_file_candidates = [f for f in all_files if f.endswith(EXT_MAP['video'])]
+    video_path = os.path.join(theorem_dir, video_file_candidates[0]) if len(video_file_candidates) == 1 else None
+
+    topic_name = process_topic_name(os.path.basename(theorem_dir))
+    return transcript_path, video_path, topic_name
+
+
+def evaluate_theorem_component(models, component: str, theorem_dir: str, retry_limit: int,
+                               target_fps: int = None, output_folder: str = None) -> Union[Dict, None]:
+    """
+    Run one evaluation type ('text', 'video' or 'image') for a theorem directory.
+
+    Args:
+        models: Dictionary of models for different evaluation types.
+        component (str): Evaluation type to run.
+        theorem_dir (str): Path to the theorem directory.
+        retry_limit (int): Number of retry attempts.
+        target_fps (int, optional): Target frames per second for video processing.
+        output_folder (str, optional): Directory to store output files.
+
+    Returns:
+        Dict or None: Evaluation results, or None if the required file is missing.
+    """
+    transcript_path, video_path, topic_name = find_theorem_files(theorem_dir)
+
+    if component == "text":
+        if transcript_path is None:
+            print(f"Warning: No suitable transcript file found in {theorem_dir}")
+            return None
+        return evaluate_text_file(models['text'], transcript_path, retry_limit)
+    assert video_path is not None, f"Expected 1 video file for {theorem_dir}"
+    if component == "video":
+        return evaluate_video_file(models['video'], video_path, transcript_path, topic_name, target_fps, output_folder)
+    if component == "image":
+        return evaluate_sampled_images(models['image'], video_path, topic_name, num_chunks=10, output_folder=output_folder)
+    raise ValueError(f"Unknown evaluation type {component!r}")
+
+
+def merge_theorem_results(eval_type: str, component_results: Dict[str, Union[Dict, None]]) -> Union[Dict, None]:
+    """
+    Combine per-type evaluation results into the result of one theorem.
+
+    Args:
+        eval_type (str): Requested evaluation type ('text', 'video', 'image' or 'all').
+        component_results (Dict[str, Union[Dict, None]]): Results keyed by evaluation type.
+
+    Returns:
+        Dict or None: The theorem result; for 'all' the merged results with an overall score.
+    """
+    if eval_type != "all":
+        return component_results.get(eval_type)
+
+    result = {}
+    for component in EVAL_COMPONENTS:
+        if component_results.get(component):
+            result = merge_dicts(result, component_results[component])
+    if result:
+        result["evaluation"]["overall_score"] = calculate_overall_score(result)
+    return result
+
+
 def process_theorem(models, file_path: str, eval_type: str, retry_limit: int,
                     target_fps: int = None, use_parent_folder_as_topic: bool = False,
                     output_folder: str = None) -> tuple[str, dict]:
@@ -260,26 +356,21 @@ def process_theorem(models, file_path: str, eval_type: str, retry_limit: int,
     Returns:
         tuple[str, dict]: Tuple of file name and evaluation results.
     """
-    ext_map = {
-        'text': ('.txt', '.srt'),
-        'video': ('.mp4', '.mkv')
-    }
-
     # Handle single file evaluation
     if os.path.isfile(file_path):
         file_ext = os.path.splitext(file_path)[1].lower()
         file_name = os.path.basename(file_path)
 
-        if eval_type == "text" and file_ext in ext_map['text']:
+        if eval_type == "text" and file_ext in EXT_MAP['text']:
             return file_name, evaluate_text_file(models['text'], file_path, retry_limit)
-        elif eval_type == "video" and file_ext in ext_map['video']:
+        elif eval_type == "video" and file_ext in EXT_MAP['video']:
             if use_parent_folder_as_topic:
                 topic_name = os.path.basename(os.path.dirname(file_path))
             else:
                 topic_name = None
             topic_name = process_topic_name(topic_name)
             return file_name, evaluate_video_file(models['video'], file_path, None, topic_name, target_fps, output_folder)
-        elif eval_type == "image" and file_ext in ext_map['video']:
+        elif eval_type == "image" and file_ext in EXT_MAP['video']:
             if use_parent_folder_as_topic:
                 topic_name = os.path.basename(os.path.dirname(file_path))
             else:
@@ -293,57 +384,84 @@ def process_theorem(models, file_path: str, eval_type: str, retry_limit: int,
 
     # Handle directory evaluation
     theorem_dir = file_path
-    all_files = os.listdir(theorem_dir)
+    _, video_path, _ = find_theorem_files(theorem_dir)
+    if not video_path:
+        print(f"Skipping {theorem_dir}: No video file found")
+        return None, None
 
-    # Look for transcript files, prioritizing .srt over .txt if both exist
-    transcript_file_candidates = [f for f in all_files if f.endswith(ext_map['text']) and not f.endswith('_scene_outline.txt')]
-    srt_files = [f for f in transcript_file_candidates if f.endswith('.srt')]
-    txt_files = [f for f in transcript_file_candidates if f.endswith('.txt')]
+    components = EVAL_COMPONENTS if eval_type == "all" else (eval_type,)
+    component_results = {
+        component: evaluate_theorem_component(models, component, theorem_dir, retry_limit, target_fps, output_folder)
+        for component in components
+    }
 
-    transcript_path = None
-    if srt_files:
-        transcript_path = os.path.join(theorem_dir, srt_files[0])
-    elif txt_files:
-        transcript_path = os.path.join(theorem_dir, txt_files[0])
+    file_name = os.path.basename(theorem_dir)
+    return file_name, merge_theorem_results(eval_type, component_results)
 
-    video_file_candidates = [f for f in all_files if f.endswith(ext_map['video'])]
-    video_path = os.path.join(theorem_dir, video_file_candidates[0]) if len(video_file_candidates) == 1 else None
 
-    topic_name = os.path.basename(theorem_dir)
-    topic_name = process_topic_name(topic_name)
+def prepare_work_folder(output_folder: str, name: str) -> str:
+    """
+    Create a private work folder for one evaluation task.
 
-    if not video_path:
-        print(f"Skipping {theorem_dir}: No video file found")
-        return None, None
+    Video evaluation writes chunk files under fixed names, so concurrent tasks
+    each get their own moviepy_temp and processed_videos directories.
 
-    text_result = video_result = image_result = None
-    if eval_type == "text" or eval_type == "all":
-        if transcript_path is None:
-            print(f"Warning: No suitable transcript file found in {theorem_dir}")
-        else:
-            text_result = evaluate_text_file(models['text'], transcript_path, retry_limit)
-    if eval_type == "video" or eval_type == "all":
-        assert video_path is not None, f"Expected 1 video file, got {len(video_file_candidates)} for {theorem_dir}"
-        video_result = evaluate_video_file(models['video'], video_path, transcript_path, topic_name, target_fps, output_folder)
-    if eval_type == "image" or eval_type == "all":
-        assert video_path is not None, f"Expected 1 video file, got {len(video_file_candidates)} for {theorem_dir}"
-        image_result = evaluate_sampled_images(models['image'], video_path, topic_name, num_chunks=10, output_folder=output_folder)
-    
-    if eval_type == "all":
-        result = {}
-        if text_result:
-            result = merge_dicts(result, text_result)
-        if video_result:
-            result = merge_dicts(result, video_result)
-        if image_result:
-            result = merge_dicts(result, image_result)
-        if result:
-            result["evaluation"]["overall_score"] = calculate_overall_score(result)
-    else:
-        result = text_result if eval_type == "text" else video_result if eval_type == "video" else image_result if eval_type == "image" else None
+    Args:
+        output_folder (str): Directory to store the evaluation files.
+        name (str): Unique task name.
 
-    file_name = os.path.basename(theorem_dir)
-    return file_name, result
+    Returns:
+        str: Path to the work folder.
+    """
+    work_folder = os.path.join(output_folder, "work", name)
+    os.makedirs(os.path.join(work_folder, "moviepy_temp"), exist_ok=True)
+    os.makedirs(os.path.join(work_folder, "processed_videos"), exist_ok=True)
+    return work_folder
+
+
+def run_bulk_evaluation(models, theorem_dirs: List[str], args, on_result=None) -> Dict[str, Dict]:
+    """
+    Evaluate theorem directories in parallel with checkpointing.
+
+    Args:
+        models: Dictionary of models for different evaluation types.
+        theorem_dirs (List[str]): Theorem directories to evaluate.
+        args: Parsed command line arguments.
+        on_result (Callable, optional): Called with (file_name, result) as each theorem finishes.
+
+    Returns:
+        Dict[str, Dict]: Results by theorem name, including those from earlier interrupted runs.
+    """
+    components = list(EVAL_COMPONENTS) if args.eval_type == "all" else [args.eval_type]
+    sweep_root = args.file_path if os.path.isdir(args.file_path) else os.path.dirname(args.file_path)
+
+    theorems = {}
+    for theorem_dir in theorem_dirs:
+        if find_theorem_files(theorem_dir)[1] is None:
+            print(f"Skipping {theorem_dir}: No video file found")
+            continue
+        theorems[os.path.abspath(theorem_dir)] = (os.path.basename(theorem_dir), components)
+
+    def evaluate_component(theorem_dir: str, component: str):
+        task_name = os.path.relpath(theorem_dir, os.path.abspath(sweep_root)).replace(os.sep, "__")
+        work_folder = prepare_work_folder(args.output_folder, f"{task_name}_{component}")
+        return evaluate_theorem_component(
+            models, component, theorem_dir, args.retry_limit, args.target_fps, work_folder
+        )
+
+    runner = EvaluationRunner(
+        evaluate_component=evaluate_component,
+        merge_components=lambda _, component_results: merge_theorem_results(args.eval_type, component_results),
+        checkpoint=EvaluationCheckpoint(args.results_jsonl or os.path.join(args.output_folder, "evaluation_results.jsonl")),
+        max_workers=args.max_workers,
+        resume=not args.no_resume,
+        component_config={
+            'text': args.model_text,
+            'video': [args.model_video, args.target_fps],
+            'image': args.model_image,
+        }
+    )
+    return runner.run(theorems, on_result=on_result)
 
 
 def main():
@@ -377,6 +495,16 @@ def main():
     parser.add_argument('--target_fps', type=int, help='Target FPS for video processing. If not set, original video FPS will be used', required=False)
     parser.add_argument('--use_parent_folder_as_topic', action='store_true', help='Use parent folder name as topic name for single file evaluation', default=True)
     parser.add_argument('--max_workers', type=int, default=4, help='Maximum number of concurrent workers for parallel processing')
+    parser.add_argument('--max_model_calls', type=int, default=None,
+                       help='Maximum number of model calls in flight across all workers (default: --max_workers)')
+    parser.add_argument('--results_jsonl', type=str, default=None,
+                       help='JSONL file results are streamed to and resumed from (default: <output_folder>/evaluation_results.jsonl)')
+    parser.add_argument('--no_resume', action='store_true', default=False,
+                       help='Re-evaluate theorems already recorded in the results JSONL')
+    parser.add_argument('--llm_cache', type=str, choices=['none', 'memory', 'sqlite', 'redis'], default='none',
+                       help='Cache model responses so repeated evaluation sweeps skip identical calls')
+    parser.add_argument('--llm_cache_path', type=str, default=None,
+                       help='SQLite database for the LLM cache (default: <output_folder>/.llm_cache.sqlite3)')
 
     args = parser.parse_args()
 
@@ -400,6 +528,19 @@ def main():
         'image': image_model
     }
 
+    # Bound model calls separately from the worker pool; cache hits below do not take a slot
+    model_call_limit = threading.BoundedSemaphore(args.max_model_calls or args.max_workers)
+    models = {name: ConcurrencyLimitedModel(model, model_call_limit) for name, model in models.items()}
+
+    if args.llm_cache != 'none':
+        # Evaluation models run at temperature 0, so every call is deterministic
+        llm_cache = create_response_cache(
+            backend=args.llm_cache,
+            path=args.llm_cache_path or os.path.join(args.output_folder, ".llm_cache.sqlite3"),
+            deterministic_only=True
+        )
+        models = {name: CachedModel(model, llm_cache) for name, model in models.items()}
+
     theorem_dirs = []
     if args.bulk_evaluate:
         assert os.path.isdir(args.file_path), "File path must be a folder for --bulk_evaluate"
@@ -424,22 +565,11 @@ def main():
 
     results = {}
     if theorem_dirs:
-        for theorem_dir in theorem_dirs:
-            file_name, result = process_theorem(
-                models,
-                theorem_dir,
-                args.eval_type,
-                args.retry_limit,
-                args.target_fps,
-                args.use_parent_folder_as_topic,
-                args.output_folder
-            )
-
-            if result is not None:
-                results[file_name] = result
-
-                if not args.combine:
-                    save_individual_result(args.output_folder, file_name, result)
+        def on_result(file_name, result):
+            if not args.combine:
+                save_individual_result(args.output_folder, file_name, result)
+
+        results = run_bulk_evaluation(models, theorem_dirs, args, on_result=on_result)
     else:
         file_name, result = process_theorem(
             models, 
@@ -18,6 +18,7 @@ import asyncio
 import uuid
 import time
 import shutil
+import socket
 from typing import Union, List, Dict, Optional, Protocol
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
@@ -46,9 +47,14 @@ try:
 except ImportError:
     BedrockWrapper = None
 
+from mllm_tools.response_cache import CachedModel, cache_bypass_warning, create_response_cache
+
 from src.core.video_planner import EnhancedVideoPlanner
 from src.core.code_generator import CodeGenerator  # Use existing CodeGenerator
 from src.core.video_renderer import VideoRenderer  # Use existing VideoRenderer
+from src.core.pipeline_scheduler import PipelineScheduler
+from src.core.topic_manifest import get_topic_manifest, topic_file_prefix
+from src.core.topic_queue import create_topic_queue, is_drained
 from src.utils.utils import extract_xml
 from src.config.config import Config
 
@@ -96,6 +102,23 @@ class VideoGenerationConfig:
     use_gpu_acceleration: bool = False
     preview_mode: bool = False
     max_concurrent_renders: int = 4
+    render_backend: str = "subprocess"
+    worker_max_renders: int = 20
+    incremental_render: bool = False
+    validate_code: bool = True
+    validation_dry_run: bool = False
+    tts_worker: bool = False
+    
+    # Pipeline scheduling
+    pipeline_scheduler: str = "staged"
+    max_llm_concurrency: int = 4
+    
+    # LLM response cache
+    llm_cache: str = "none"
+    llm_cache_path: Optional[str] = None
+    llm_cache_ttl_hours: float = 168
+    llm_cache_max_mb: int = 1024
+    llm_cache_deterministic: bool = True
 
 # Protocols for dependency injection (Interface Segregation Principle)
 class ModelProvider(Protocol):
@@ -112,8 +135,11 @@ class PlannerInterface(Protocol):
 class CodeGeneratorInterface(Protocol):
     """Interface for code generators."""
     def generate_manim_code(self, **kwargs) -> tuple: ...
+    async def agenerate_manim_code(self, **kwargs) -> tuple: ...
     def fix_code_errors(self, **kwargs) -> tuple: ...
+    async def afix_code_errors(self, **kwargs) -> tuple: ...
     def visual_self_reflection(self, **kwargs) -> tuple: ...
+    async def avisual_self_reflection(self, **kwargs) -> tuple: ...
 
 class RendererInterface(Protocol):
     """Interface for video renderers."""
@@ -124,8 +150,35 @@ class RendererInterface(Protocol):
 class ComponentFactory:
     """Factory for creating video generation components."""
     
+    _response_caches: Dict[tuple, object] = {}
+    
+    @staticmethod
+    def create_response_cache(config: VideoGenerationConfig):
+        """Create (or reuse) the LLM response cache shared by all models of a config."""
+        if config.llm_cache == "none":
+            return None
+        cache_path = config.llm_cache_path or os.path.join(config.output_dir, ".llm_cache.sqlite3")
+        cache_id = (config.llm_cache, cache_path, config.llm_cache_ttl_hours,
+                    config.llm_cache_max_mb, config.llm_cache_deterministic)
+        if cache_id not in ComponentFactory._response_caches:
+            ComponentFactory._response_caches[cache_id] = create_response_cache(
+                backend=config.llm_cache,
+                path=cache_path,
+                ttl=config.llm_cache_ttl_hours * 3600 if config.llm_cache_ttl_hours > 0 else None,
+                max_bytes=config.llm_cache_max_mb * 1024 * 1024,
+                deterministic_only=config.llm_cache_deterministic
+            )
+        return ComponentFactory._response_caches[cache_id]
+    
     @staticmethod
     def create_model(model_name: str, config: VideoGenerationConfig) -> ModelProvider:
+        """Create AI model wrapper, wrapped with the response cache if enabled."""
+        model = ComponentFactory._create_model_wrapper(model_name, config)
+        cache = ComponentFactory.create_response_cache(config)
+        return CachedModel(model, cache) if cache is not None else model
+    
+    @staticmethod
+    def _create_model_wrapper(model_name: str, config: VideoGenerationConfig) -> ModelProvider:
         """Create AI model wrapper with explicit provider routing."""
         normalized = (model_name or "").strip()
         provider_prefix = normalized.split("/", 1)[0] if "/" in normalized else ""
@@ -245,7 +298,13 @@ class ComponentFactory:
         return VideoRenderer(  # Use existing VideoRenderer
             output_dir=config.output_dir,
             print_response=config.verbose,
-            use_visual_fix_code=config.use_visual_fix_code
+            use_visual_fix_code=config.use_visual_fix_code,
+            max_concurrent_renders=config.max_concurrent_renders,
+            render_backend=config.render_backend,
+            worker_max_renders=config.worker_max_renders,
+            incremental_render=config.incremental_render,
+            validate_code=config.validate_code,
+            validation_dry_run=config.validation_dry_run
         )
 
 # Enhanced VideoRenderer wrapper to add async methods
@@ -364,101 +423,63 @@ class SessionManager:
             f.write(session_id)
 
 class SceneAnalyzer:
-    """Analyzes and manages scene information."""
+    """Analyzes and manages scene information from the per-topic manifest."""
     
     def __init__(self, output_dir: str):
         self.output_dir = output_dir
     
     def load_implementation_plans(self, topic: str) -> Dict[int, Optional[str]]:
         """Load implementation plans for each scene."""
-        file_prefix = re.sub(r'[^a-z0-9_]+', '_', topic.lower())
-        scene_outline_path = os.path.join(self.output_dir, file_prefix, f"{file_prefix}_scene_outline.txt")
-        
-        if not os.path.exists(scene_outline_path):
+        state = get_topic_manifest(self.output_dir, topic_file_prefix(topic)).state()
+        if state.outline_path is None:
             return {}
         
-        with open(scene_outline_path, "r") as f:
-            scene_outline = f.read()
-        
-        scene_outline_content = extract_xml(scene_outline)
-        scene_count = len(re.findall(r'<SCENE_(\d+)>[^<]', scene_outline_content))
-        
         implementation_plans = {}
-        for i in range(1, scene_count + 1):
-            plan_path = os.path.join(
-                self.output_dir, file_prefix, f"scene{i}", 
-                f"{file_prefix}_scene{i}_implementation_plan.txt"
-            )
-            if os.path.exists(plan_path):
-                with open(plan_path, "r") as f:
-                    implementation_plans[i] = f.read()
+        for i in range(1, state.scene_count + 1):
+            record = state.scenes.get(i)
+            implementation_plans[i] = None
+            if record is not None and record.has_plan:
+                try:
+                    with open(record.plan_path, "r") as f:
+                        implementation_plans[i] = f.read()
+                except FileNotFoundError:
+                    pass
+            if implementation_plans[i] is not None:
                 print(f"📄 Found existing implementation plan for scene {i}")
             else:
-                implementation_plans[i] = None
                 print(f"❌ Missing implementation plan for scene {i}")
         
         return implementation_plans
     
     def analyze_scene_status(self, topic: str) -> Dict:
-        """Analyze status of all scenes for a topic."""
-        file_prefix = re.sub(r'[^a-z0-9_]+', '_', topic.lower())
-        
-        # Check scene outline
-        scene_outline_path = os.path.join(self.output_dir, file_prefix, f"{file_prefix}_scene_outline.txt")
-        has_scene_outline = os.path.exists(scene_outline_path)
+        """Analyze status of all scenes for a topic without touching anything but its manifest."""
+        state = get_topic_manifest(self.output_dir, topic_file_prefix(topic)).state()
         
-        num_scenes = 0
-        if has_scene_outline:
-            with open(scene_outline_path, "r") as f:
-                scene_outline = f.read()
-            scene_outline_content = extract_xml(scene_outline)
-            num_scenes = len(re.findall(r'<SCENE_(\d+)>[^<]', scene_outline_content))
-        
-        # Analyze each scene
         scene_status = []
-        implementation_plans = code_files = rendered_scenes = 0
-        
-        for i in range(1, num_scenes + 1):
-            scene_dir = os.path.join(self.output_dir, file_prefix, f"scene{i}")
-            
-            # Check implementation plan
-            plan_path = os.path.join(scene_dir, f"{file_prefix}_scene{i}_implementation_plan.txt")
-            has_plan = os.path.exists(plan_path)
-            if has_plan:
-                implementation_plans += 1
-            
-            # Check code files
-            code_dir = os.path.join(scene_dir, "code")
-            has_code = os.path.exists(code_dir) and any(f.endswith('.py') for f in os.listdir(code_dir))
-            if has_code:
-                code_files += 1
-            
-            # Check rendered videos
-            has_render = os.path.exists(os.path.join(scene_dir, "succ_rendered.txt"))
-            if has_render:
-                rendered_scenes += 1
-            
+        for i in range(1, state.scene_count + 1):
+            record = state.scenes.get(i)
             scene_status.append({
                 'scene_number': i,
-                'has_plan': has_plan,
-                'has_code': has_code,
-                'has_render': has_render
+                'has_plan': record is not None and record.has_plan,
+                'has_code': record is not None and record.has_code,
+                'has_render': record is not None and record.has_render
             })
         
-        # Check combined video
-        combined_video_path = os.path.join(self.output_dir, file_prefix, f"{file_prefix}_combined.mp4")
-        has_combined_video = os.path.exists(combined_video_path)
-        
         return {
             'topic': topic,
-            'has_scene_outline': has_scene_outline,
-            'total_scenes': num_scenes,
-            'implementation_plans': implementation_plans,
-            'code_files': code_files,
-            'rendered_scenes': rendered_scenes,
-            'has_combined_video': has_combined_video,
+            'has_scene_outline': state.outline_path is not None,
+            'total_scenes': state.scene_count,
+            'implementation_plans': sum(s['has_plan'] for s in scene_status),
+            'code_files': sum(s['has_code'] for s in scene_status),
+            'rendered_scenes': sum(s['has_render'] for s in scene_status),
+            'has_combined_video': state.combined_video_path is not None,
             'scene_status': scene_status
         }
+    
+    def is_scene_rendered(self, topic: str, scene_number: int) -> bool:
+        """Whether a scene has a recorded successful render."""
+        record = get_topic_manifest(self.output_dir, topic_file_prefix(topic)).state().scenes.get(scene_number)
+        return record is not None and record.has_render
 
 # Scene rendering wrapper for existing render_scene method
 class SceneRenderingService:
@@ -471,6 +492,76 @@ class SceneRenderingService:
         self.banned_reasonings = banned_reasonings
         self.config = config
     
+    async def generate_scene_code(self, topic: str, description: str, scene_outline: str,
+                                  scene_implementation: str, scene_number: int,
+                                  scene_trace_id: str, session_id: str) -> str:
+        """Generate Manim code for a scene without blocking the event loop."""
+        print(f"⚡ Generating code for scene {scene_number}")
+        code, _ = await self.code_generator.agenerate_manim_code(
+            topic=topic,
+            description=description,
+            scene_outline=scene_outline,
+            scene_implementation=scene_implementation,
+            scene_number=scene_number,
+            scene_trace_id=scene_trace_id,
+            session_id=session_id
+        )
+        return code
+    
+    async def render_generated_code(self, code: str, topic: str, description: str,
+                                    scene_outline: str, scene_implementation: str,
+                                    scene_number: int, file_prefix: str,
+                                    code_dir: str, media_dir: str,
+                                    scene_trace_id: str, session_id: str) -> tuple:
+        """Render already generated scene code with error handling and code fixes."""
+        
+        # Single attempt - renderer handles retries and fixes
+        current_version = 1
+        
+        print(f"🎞️ Rendering scene {scene_number} with intelligent error handling")
+        
+        try:
+            # Use existing render_scene method with enhanced error handling
+            loop = asyncio.get_event_loop()
+            result_code, error = await loop.run_in_executor(
+                None,
+                self.renderer.render_scene,
+                code,
+                file_prefix,
+                scene_number,
+                current_version,
+                code_dir,
+                media_dir,
+                False,  # use_visual_fix_code
+                None,   # visual_self_reflection_func
+                self.banned_reasonings,
+                scene_trace_id,
+                topic,
+                session_id,
+                self.code_generator,  # Pass code generator for intelligent error handling
+                scene_implementation,  # Pass implementation for context
+                description,  # Pass description for context
+                scene_outline  # Pass scene outline for context
+            )
+            
+            if error is None:
+                # Success - mark as rendered
+                scene_dir = os.path.join(self.config.output_dir, file_prefix, f"scene{scene_number}")
+                success_file = os.path.join(scene_dir, "succ_rendered.txt")
+                with open(success_file, 'w') as f:
+                    f.write(f"Successfully rendered with intelligent error handling")
+                
+                print(f"✅ Scene {scene_number} rendered successfully")
+                return result_code, None
+            else:
+                # Error occurred even with intelligent retry/fix attempts
+                print(f"❌ Scene {scene_number} failed after intelligent error handling: {error}")
+                return result_code, error
+            
+        except Exception as e:
+            print(f"❌ Exception during scene {scene_number} rendering: {e}")
+            return code, str(e)
+    
     async def render_scene_with_code_generation(self, topic: str, description: str,
                                               scene_outline: str, scene_implementation: str,
                                               scene_number: int, file_prefix: str,
@@ -482,63 +573,16 @@ class SceneRenderingService:
         
         try:
             # Step 1: Generate Manim code
-            print(f"⚡ Generating code for scene {scene_number}")
-            code, _ = self.code_generator.generate_manim_code(
-                topic=topic,
-                description=description,
-                scene_outline=scene_outline,
-                scene_implementation=scene_implementation,
-                scene_number=scene_number,
-                scene_trace_id=scene_trace_id,
-                session_id=session_id
+            code = await self.generate_scene_code(
+                topic, description, scene_outline, scene_implementation,
+                scene_number, scene_trace_id, session_id
             )
             
-            # Step 2: Render with intelligent error handling (single attempt - renderer handles retries and fixes)
-            current_version = 1
-            
-            print(f"🎞️ Rendering scene {scene_number} with intelligent error handling")
-            
-            try:
-                # Use existing render_scene method with enhanced error handling
-                loop = asyncio.get_event_loop()
-                result_code, error = await loop.run_in_executor(
-                    None,
-                    self.renderer.render_scene,
-                    code,
-                    file_prefix,
-                    scene_number,
-                    current_version,
-                    code_dir,
-                    media_dir,
-                    False,  # use_visual_fix_code
-                    None,   # visual_self_reflection_func
-                    self.banned_reasonings,
-                    scene_trace_id,
-                    topic,
-                    session_id,
-                    self.code_generator,  # Pass code generator for intelligent error handling
-                    scene_implementation,  # Pass implementation for context
-                    description,  # Pass description for context
-                    scene_outline  # Pass scene outline for context
-                )
-                
-                if error is None:
-                    # Success - mark as rendered
-                    scene_dir = os.path.join(self.config.output_dir, file_prefix, f"scene{scene_number}")
-                    success_file = os.path.join(scene_dir, "succ_rendered.txt")
-                    with open(success_file, 'w') as f:
-                        f.write(f"Successfully rendered with intelligent error handling")
-                    
-                    print(f"✅ Scene {scene_number} rendered successfully")
-                    return result_code, None
-                else:
-                    # Error occurred even with intelligent retry/fix attempts
-                    print(f"❌ Scene {scene_number} failed after intelligent error handling: {error}")
-                    return result_code, error
-                
-            except Exception as e:
-                print(f"❌ Exception during scene {scene_number} rendering: {e}")
-                return code, str(e)
+            # Step 2: Render with intelligent error handling
+            return await self.render_generated_code(
+                code, topic, description, scene_outline, scene_implementation,
+                scene_number, file_prefix, code_dir, media_dir, scene_trace_id, session_id
+            )
             
         except Exception as e:
             print(f"❌ Fatal error in scene {scene_number}: {e}")
@@ -548,7 +592,14 @@ class SceneRenderingService:
 class EnhancedVideoGenerator:
     """Enhanced video generator following SOLID principles."""
     
-    def __init__(self, config: VideoGenerationConfig):
+    def __init__(self, config: VideoGenerationConfig, component_factory: Optional[ComponentFactory] = None):
+        """
+        Args:
+            config: Pipeline configuration
+            component_factory: Factory for models, planner, code generator and renderer;
+                defaults to ComponentFactory (benchmarks substitute stub components here)
+        """
+        factory = component_factory or ComponentFactory
         self.config = config
         self.session_manager = SessionManager(config.output_dir)
         self.scene_analyzer = SceneAnalyzer(config.output_dir)
@@ -558,24 +609,24 @@ class EnhancedVideoGenerator:
         self.session_id = self.session_manager.load_or_create_session_id()
         
         # Create AI models
-        self.planner_model = ComponentFactory.create_model(config.planner_model, config)
-        self.scene_model = ComponentFactory.create_model(
+        self.planner_model = factory.create_model(config.planner_model, config)
+        self.scene_model = factory.create_model(
             config.scene_model or config.planner_model, config
         )
-        self.helper_model = ComponentFactory.create_model(
+        self.helper_model = factory.create_model(
             config.helper_model or config.planner_model, config
         )
         
         # Create components using dependency injection
-        self.planner = ComponentFactory.create_planner(
+        self.planner = factory.create_planner(
             self.planner_model, self.helper_model, config, self.session_id
         )
-        self.code_generator = ComponentFactory.create_code_generator(
+        self.code_generator = factory.create_code_generator(
             self.scene_model, self.helper_model, config, self.session_id
         )
         
         # Create renderer with async wrapper
-        base_renderer = ComponentFactory.create_renderer(config)
+        base_renderer = factory.create_renderer(config)
         self.renderer = AsyncVideoRendererWrapper(base_renderer, config)
         
         # Create scene rendering service
@@ -586,6 +637,9 @@ class EnhancedVideoGenerator:
         # Concurrency control
         self.scene_semaphore = asyncio.Semaphore(config.max_scene_concurrency)
         
+        # Per-topic stage statistics from the DAG scheduler
+        self.pipeline_stats: Dict[str, Dict] = {}
+        
         print(f"🚀 Enhanced VideoGenerator initialized with:")
         print(f"   Planner: {config.planner_model}")
         print(f"   Scene: {config.scene_model or config.planner_model}")
@@ -597,6 +651,10 @@ class EnhancedVideoGenerator:
             pass
         print(f"   Max Scene Concurrency: {config.max_scene_concurrency}")
         print(f"   Caching: {'✅' if config.enable_caching else '❌'}")
+        print(f"   LLM Cache: {config.llm_cache}{' (deterministic only)' if config.llm_cache_deterministic else ''}")
+        cache_warning = cache_bypass_warning([self.planner_model, self.scene_model, self.helper_model])
+        if cache_warning:
+            print(f"⚠️ {cache_warning}")
         print(f"   GPU Acceleration: {'✅' if config.use_gpu_acceleration else '❌'}")
 
     async def generate_scene_outline(self, topic: str, description: str) -> str:
@@ -614,6 +672,12 @@ class EnhancedVideoGenerator:
         
         file_prefix = re.sub(r'[^a-z0-9_]+', '_', topic.lower())
         
+        if self.config.pipeline_scheduler == "dag":
+            await self._generate_video_pipeline_dag(
+                topic, description, file_prefix, only_plan, specific_scenes
+            )
+            return
+        
         # Step 1: Load or generate scene outline
         scene_outline = await self._load_or_generate_outline(topic, description, file_prefix)
         
@@ -636,6 +700,102 @@ class EnhancedVideoGenerator:
         
         print(f"✅ Enhanced video pipeline completed for: {topic}")
 
+    async def _generate_video_pipeline_dag(self, topic: str, description: str, file_prefix: str,
+                                           only_plan: bool = False,
+                                           specific_scenes: List[int] = None) -> None:
+        """Stream every scene through plan → code → render as soon as its inputs exist.
+        
+        LLM stages (outline, plans, code) and renders draw on separate
+        concurrency limits, so renders of early scenes overlap with planning
+        and code generation of later ones.
+        """
+        scheduler = PipelineScheduler({
+            'llm': self.config.max_llm_concurrency,
+            'render': self.config.max_concurrent_renders
+        })
+        
+        scene_outline = await scheduler.run(
+            'outline', 'llm',
+            lambda: self._load_or_generate_outline(topic, description, file_prefix)
+        )
+        
+        topic_dir = os.path.join(self.config.output_dir, file_prefix)
+        os.makedirs(topic_dir, exist_ok=True)
+        
+        existing_plans = self.scene_analyzer.load_implementation_plans(topic)
+        scene_count = len(re.findall(r'<SCENE_(\d+)>[^<]', extract_xml(scene_outline)))
+        if scene_count == 0:
+            print(f"⚠️ Warning: No scenes found in scene outline for: {topic}")
+        
+        def plan_task(scene_num: int):
+            async def run(_deps):
+                plan = existing_plans.get(scene_num)
+                if plan:
+                    return plan
+                os.makedirs(os.path.join(topic_dir, f"scene{scene_num}"), exist_ok=True)
+                plan = await self.planner.generate_scene_implementation_for_scene(
+                    topic, description, scene_outline, scene_num, self.session_id
+                )
+                if not isinstance(plan, str) or not plan.strip():
+                    raise ValueError(f"Empty implementation plan for scene {scene_num}")
+                return plan
+            return run
+        
+        def code_task(scene_num: int):
+            async def run(deps):
+                scene_trace_id, _, _ = self._prepare_scene_render(scene_num, file_prefix)
+                return await self.scene_service.generate_scene_code(
+                    topic, description, scene_outline, deps[f"plan:{scene_num}"],
+                    scene_num, scene_trace_id, self.session_id
+                )
+            return run
+        
+        def render_task(scene_num: int):
+            async def run(deps):
+                scene_trace_id, code_dir, media_dir = self._prepare_scene_render(scene_num, file_prefix)
+                _, error = await self.scene_service.render_generated_code(
+                    deps[f"code:{scene_num}"], topic, description, scene_outline,
+                    deps[f"plan:{scene_num}"], scene_num, file_prefix,
+                    code_dir, media_dir, scene_trace_id, self.session_id
+                )
+                if error:
+                    raise RuntimeError(error)
+            return run
+        
+        for scene_num in range(1, scene_count + 1):
+            if specific_scenes is not None and scene_num not in specific_scenes:
+                continue
+            
+            has_plan = bool(existing_plans.get(scene_num))
+            scheduler.add_task(
+                f"plan:{scene_num}", 'plan', plan_task(scene_num),
+                resource=None if has_plan else 'llm'
+            )
+            
+            if only_plan or self.scene_analyzer.is_scene_rendered(topic, scene_num):
+                continue
+            
+            scheduler.add_task(
+                f"code:{scene_num}", 'code', code_task(scene_num),
+                depends_on=[f"plan:{scene_num}"], resource='llm'
+            )
+            scheduler.add_task(
+                f"render:{scene_num}", 'render', render_task(scene_num),
+                depends_on=[f"plan:{scene_num}", f"code:{scene_num}"], resource='render'
+            )
+        
+        results = await scheduler.execute()
+        for task_id, result in results.items():
+            if isinstance(result, Exception):
+                print(f"❌ {task_id} failed: {result}")
+        
+        if not only_plan:
+            await scheduler.run('combine', None, lambda: self._combine_videos_optimized(topic))
+        
+        scheduler.print_summary()
+        self.pipeline_stats[topic] = scheduler.get_stats()
+        print(f"✅ Enhanced video pipeline completed for: {topic}")
+
     async def _load_or_generate_outline(self, topic: str, description: str, file_prefix: str) -> str:
         """Load existing outline or generate new one."""
         scene_outline_path = os.path.join(self.config.output_dir, file_prefix, f"{file_prefix}_scene_outline.txt")
@@ -783,15 +943,15 @@ class EnhancedVideoGenerator:
                              file_prefix: str) -> List[tuple]:
         """Determine which scenes need processing."""
         scenes_to_process = []
+        state = get_topic_manifest(self.config.output_dir, file_prefix).state()
         
         for scene_num, implementation_plan in implementation_plans.items():
             if implementation_plan is None:
                 continue
-                
-            scene_dir = os.path.join(self.config.output_dir, file_prefix, f"scene{scene_num}")
             
             # Check if scene already successfully rendered
-            if not os.path.exists(os.path.join(scene_dir, "succ_rendered.txt")):
+            record = state.scenes.get(scene_num)
+            if record is None or not record.has_render:
                 scenes_to_process.append((scene_num, implementation_plan))
         
         return scenes_to_process
@@ -799,6 +959,24 @@ class EnhancedVideoGenerator:
     def _create_scene_render_task(self, topic: str, description: str, scene_outline: str,
                                       implementation_plan: str, scene_num: int, file_prefix: str):
         """Create render task for a scene."""
+        scene_trace_id, code_dir, media_dir = self._prepare_scene_render(scene_num, file_prefix)
+        
+        # Return coroutine that will be awaited later
+        return self.scene_service.render_scene_with_code_generation(
+            topic=topic,
+            description=description,
+            scene_outline=scene_outline,
+            scene_implementation=implementation_plan,
+            scene_number=scene_num,
+            file_prefix=file_prefix,
+            code_dir=code_dir,
+            media_dir=media_dir,
+            scene_trace_id=scene_trace_id,
+            session_id=self.session_id
+        )
+
+    def _prepare_scene_render(self, scene_num: int, file_prefix: str) -> tuple:
+        """Load or create the scene trace ID and create the scene's code and media directories."""
         
         # Generate or load scene trace ID
         scene_dir = os.path.join(self.config.output_dir, file_prefix, f"scene{scene_num}")
@@ -819,19 +997,7 @@ class EnhancedVideoGenerator:
         media_dir = os.path.join(self.config.output_dir, file_prefix, "media")
         os.makedirs(code_dir, exist_ok=True)
         
-        # Return coroutine that will be awaited later
-        return self.scene_service.render_scene_with_code_generation(
-            topic=topic,
-            description=description,
-            scene_outline=scene_outline,
-            scene_implementation=implementation_plan,
-            scene_number=scene_num,
-            file_prefix=file_prefix,
-            code_dir=code_dir,
-            media_dir=media_dir,
-            scene_trace_id=scene_trace_id,
-            session_id=self.session_id
-        )
+        return scene_trace_id, code_dir, media_dir
 
     async def _combine_videos_optimized(self, topic: str) -> None:
         """Combine videos with hardware acceleration."""
@@ -845,6 +1011,21 @@ class EnhancedVideoGenerator:
         except Exception as e:
             print(f"❌ Error combining videos: {e}")
 
+    def get_topic_stage(self, topic: str, only_plan: bool = False) -> str:
+        """First pipeline stage a topic still needs (outline, plan, render, combine), or 'done'."""
+        status = self.scene_analyzer.analyze_scene_status(topic)
+        if not status['has_scene_outline'] or status['total_scenes'] == 0:
+            return 'outline'
+        if status['implementation_plans'] < status['total_scenes']:
+            return 'plan'
+        if only_plan:
+            return 'done'
+        if status['rendered_scenes'] < status['total_scenes']:
+            return 'render'
+        if not status['has_combined_video']:
+            return 'combine'
+        return 'done'
+
     async def process_multiple_topics(self, topics_data: List[Dict], 
                                     only_plan: bool = False,
                                     specific_scenes: List[int] = None) -> None:
@@ -870,6 +1051,12 @@ class EnhancedVideoGenerator:
         tasks = [process_single_topic(topic_data) for topic_data in topics_data]
         await asyncio.gather(*tasks, return_exceptions=True)
 
+    def close(self) -> None:
+        """Release renderer resources (render threads and warm worker processes)."""
+        close = getattr(self.renderer.renderer, 'close', None)
+        if close is not None:
+            close()
+
     def get_status_summary(self, topics_data: List[Dict]) -> None:
         """Print comprehensive status summary."""
         print("\n📊 Comprehensive Status Summary")
@@ -975,12 +1162,49 @@ class VideoGeneratorCLI:
         parser.add_argument('--only_combine', action='store_true', help='Only combine videos')
         parser.add_argument('--check_status', action='store_true', help='Check status of all topics')
         
+        # Distributed execution
+        parser.add_argument('--enqueue', action='store_true',
+                          help='Add the topics from --theorems_path to the shared topic queue')
+        parser.add_argument('--worker', action='store_true',
+                          help='Process topics claimed from the shared topic queue (output_dir must be shared by all workers)')
+        parser.add_argument('--worker_wait', action='store_true',
+                          help='Keep polling for new topics instead of exiting once no topic is pending or leased')
+        parser.add_argument('--queue_status', action='store_true', help='Show the shared topic queue')
+        parser.add_argument('--topic_queue', choices=['sqlite', 'redis'], default='sqlite',
+                          help='Topic queue backend')
+        parser.add_argument('--topic_queue_path', type=str, default=None,
+                          help='SQLite database for the topic queue (default: <output_dir>/.topic_queue.sqlite3)')
+        parser.add_argument('--topic_queue_url', type=str, default=None,
+                          help='Redis URL for the topic queue (default: TOPIC_QUEUE_REDIS_URL or REDIS_URL)')
+        parser.add_argument('--lease_seconds', type=float, default=300,
+                          help='Seconds a claimed topic stays leased without a heartbeat')
+        parser.add_argument('--max_attempts', type=int, default=3, help='Attempts per topic before it is marked failed')
+        
         # Performance options
         parser.add_argument('--max_scene_concurrency', type=int, default=5, help='Max concurrent scenes')
         parser.add_argument('--max_topic_concurrency', type=int, default=1, help='Max concurrent topics')
         parser.add_argument('--max_concurrent_renders', type=int, default=4, help='Max concurrent renders')
+        parser.add_argument('--max_llm_concurrency', type=int, default=4,
+                          help='Max concurrent LLM stages when using the DAG scheduler')
+        parser.add_argument('--pipeline_scheduler', choices=['staged', 'dag'], default='staged',
+                          help='Run stages one after another, or stream each scene through plan/code/render')
+        parser.add_argument('--llm_cache', choices=['none', 'memory', 'sqlite', 'redis'], default='none',
+                          help='Cache LLM responses keyed on model, temperature, prompt and media')
+        parser.add_argument('--llm_cache_path', type=str, default=None,
+                          help='SQLite database for the LLM cache (default: <output_dir>/.llm_cache.sqlite3)')
+        parser.add_argument('--llm_cache_ttl_hours', type=float, default=168,
+                          help='Hours an LLM cache entry stays valid (0 = no expiry)')
+        parser.add_argument('--llm_cache_max_mb', type=int, default=1024, help='LLM cache size budget in MB')
+        parser.add_argument('--llm_cache_deterministic', action=argparse.BooleanOptionalAction, default=True,
+                          help='Only cache LLM calls made with temperature 0 (--no-llm_cache_deterministic '
+                               'also replays sampled responses; generate_video models run at temperature 0.7, '
+                               'so reruns only hit the cache with --no-llm_cache_deterministic)')
         parser.add_argument('--quality', choices=['preview', 'low', 'medium', 'high', 'production'],
                           default='medium', help='Render quality preset')
+        parser.add_argument('--render_backend', choices=['subprocess', 'worker_pool'],
+                          default='subprocess', help='Run manim per attempt or on warm worker processes')
+        parser.add_argument('--worker_max_renders', type=int, default=20,
+                          help='Renders before a warm render worker is recycled')
         
         # Feature flags
         parser.add_argument('--verbose', action='store_true', help='Verbose output')
@@ -991,6 +1215,14 @@ class VideoGeneratorCLI:
         parser.add_argument('--enable_caching', action='store_true', default=True, help='Enable caching')
         parser.add_argument('--use_gpu_acceleration', action='store_true', default=False, help='Use GPU acceleration')
         parser.add_argument('--preview_mode', action='store_true', help='Enable preview mode')
+        parser.add_argument('--incremental_render', action='store_true',
+                          help='Reuse unchanged animation segments when re-rendering fixed code')
+        parser.add_argument('--skip_validation', action='store_true',
+                          help='Skip static validation of scene code before rendering')
+        parser.add_argument('--validation_dry_run', action='store_true',
+                          help='Also dry-run construct() without rendering frames before each render')
+        parser.add_argument('--tts_worker', action='store_true',
+                          help='Load the Kokoro TTS model once in a worker process shared by all scene renders')
         
         # Paths
         parser.add_argument('--chroma_db_path', type=str, default=Config.CHROMA_DB_PATH, help='ChromaDB path')
@@ -1024,7 +1256,20 @@ class VideoGeneratorCLI:
             default_quality=args.quality,
             use_gpu_acceleration=args.use_gpu_acceleration,
             preview_mode=args.preview_mode,
-            max_concurrent_renders=args.max_concurrent_renders
+            max_concurrent_renders=args.max_concurrent_renders,
+            render_backend=args.render_backend,
+            worker_max_renders=args.worker_max_renders,
+            incremental_render=args.incremental_render,
+            validate_code=not args.skip_validation,
+            validation_dry_run=args.validation_dry_run,
+            tts_worker=args.tts_worker,
+            pipeline_scheduler=args.pipeline_scheduler,
+            max_llm_concurrency=args.max_llm_concurrency,
+            llm_cache=args.llm_cache,
+            llm_cache_path=args.llm_cache_path,
+            llm_cache_ttl_hours=args.llm_cache_ttl_hours,
+            llm_cache_max_mb=args.llm_cache_max_mb,
+            llm_cache_deterministic=args.llm_cache_deterministic
         )
 
 async def main():
@@ -1038,8 +1283,16 @@ async def main():
     # Initialize enhanced video generator
     video_generator = EnhancedVideoGenerator(config)
     
+    tts_worker = None
+    if config.tts_worker and not args.check_status:
+        from src.utils.tts_engine import start_tts_worker
+        print("🔊 Starting shared Kokoro TTS worker...")
+        tts_worker = start_tts_worker(Config.KOKORO_MODEL_PATH, Config.KOKORO_VOICES_PATH)
+    
     try:
-        if args.theorems_path:
+        if args.enqueue or args.worker or args.queue_status:
+            await handle_topic_queue(video_generator, args)
+        elif args.theorems_path:
             await handle_multiple_topics(video_generator, args)
         elif args.topic and args.context:
             await handle_single_topic(video_generator, args)
@@ -1050,6 +1303,15 @@ async def main():
     except Exception as e:
         print(f"❌ Fatal error: {e}")
         raise
+    finally:
+        video_generator.close()
+        if tts_worker is not None:
+            tts_worker.stop()
+        llm_cache = ComponentFactory.create_response_cache(config)
+        if llm_cache is not None:
+            stats = llm_cache.get_stats()
+            print(f"🧠 LLM cache ({stats['backend']}): {stats['hits']} hits, {stats['misses']} misses, "
+                  f"hit rate {stats['hit_rate']:.1%}, {stats['entries']} entries")
 
 async def handle_multiple_topics(video_generator: EnhancedVideoGenerator, args):
     """Handle processing of multiple topics."""
@@ -1073,6 +1335,168 @@ async def handle_multiple_topics(video_generator: EnhancedVideoGenerator, args):
             specific_scenes=args.scenes
         )
 
+async def handle_topic_queue(video_generator: EnhancedVideoGenerator, args):
+    """Enqueue topics, run a queue worker, or print the queue."""
+    topic_queue = create_topic_queue(
+        backend=args.topic_queue,
+        path=args.topic_queue_path or os.path.join(video_generator.config.output_dir, ".topic_queue.sqlite3"),
+        redis_url=args.topic_queue_url,
+        lease_seconds=args.lease_seconds,
+        max_attempts=args.max_attempts
+    )
+    
+    if args.enqueue:
+        if not args.theorems_path:
+            print("❌ --enqueue requires --theorems_path")
+            return
+        with open(args.theorems_path, "r") as f:
+            theorems = json.load(f)
+        if args.sample_size:
+            theorems = theorems[:args.sample_size]
+        added = topic_queue.enqueue(theorems)
+        print(f"📥 Enqueued {added} new topic(s), {len(theorems) - added} already queued")
+    
+    if args.worker:
+        await run_topic_worker(video_generator, topic_queue, only_plan=args.only_plan, wait=args.worker_wait)
+    
+    if args.queue_status or not args.worker:
+        stats = topic_queue.get_stats()
+        print(f"📋 Topic queue ({stats['backend']}): {stats['pending']} pending, {stats['leased']} leased, "
+              f"{stats['done']} done, {stats['failed']} failed")
+        if args.queue_status:
+            for job in topic_queue.list_jobs():
+                print(f"   {job['topic'][:50]:<52} {job['status']:<8} attempt {job['attempts']}/{job['max_attempts']}"
+                      f"  stage={job['stage'] or '-'}  owner={job['owner'] or '-'}"
+                      f"{'  error=' + job['last_error'][:60] if job['last_error'] else ''}")
+
+async def run_topic_worker(video_generator: EnhancedVideoGenerator, topic_queue, only_plan: bool = False,
+                           wait: bool = False, poll_interval: float = 10) -> None:
+    """Claim topics from the shared queue and run their pipelines until the queue is drained.
+    
+    The queue is drained once no topic is pending or leased; until then (or
+    forever with ``wait``) an idle slot polls every ``poll_interval`` seconds.
+    
+    Runs up to max_topic_concurrency topics at once. Each claimed topic is
+    kept leased by heartbeats that also publish its current stage; if the
+    lease is lost the pipeline is cancelled, since another worker owns the
+    topic. A topic that finishes with missing artifacts is failed and
+    retried later, resuming from what this attempt produced.
+    
+    Transient queue errors (a dropped Redis connection, SQLite "database is
+    locked") are retried with a backoff rather than ending the worker; a
+    topic whose heartbeats keep failing for ``lease_seconds`` is treated as
+    lost.
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    heartbeat_interval = max(1.0, topic_queue.lease_seconds / 3)
+    queue_errors = getattr(topic_queue, 'transient_errors', ())
+    processed = {'done': 0, 'failed': 0}
+    print(f"👷 Topic worker {worker_id} started "
+          f"({video_generator.config.max_topic_concurrency} concurrent topic(s))")
+    
+    def retry_delay(errors: int, cap: float) -> float:
+        return min(cap, 2.0 ** (errors - 1))
+    
+    async def finish_lease(lease, func, *args):
+        """Report a finished topic, retrying queue errors until the lease would have expired."""
+        started = time.monotonic()
+        errors = 0
+        while True:
+            try:
+                return await asyncio.to_thread(func, lease, *args)
+            except queue_errors as e:
+                errors += 1
+                if time.monotonic() - started >= topic_queue.lease_seconds:
+                    print(f"⚠️ Could not report {lease.topic} to the topic queue ({e}); "
+                          f"its lease will expire and the topic will be retried")
+                    return None
+                await asyncio.sleep(retry_delay(errors, heartbeat_interval))
+    
+    async def process_lease(lease) -> None:
+        print(f"🎯 Claimed topic: {lease.topic} (attempt {lease.attempts}/{lease.max_attempts})")
+        pipeline = asyncio.create_task(
+            video_generator.generate_video_pipeline(lease.topic, lease.description, only_plan=only_plan)
+        )
+        try:
+            # Heartbeat errors are retried with a backoff; the pipeline is only
+            # cancelled once the lease is reported lost or has surely expired
+            heartbeat_errors = 0
+            failing_since = None
+            timeout = heartbeat_interval
+            while True:
+                done, _ = await asyncio.wait({pipeline}, timeout=timeout)
+                if done:
+                    break
+                stage = await asyncio.to_thread(video_generator.get_topic_stage, lease.topic, only_plan)
+                try:
+                    alive = await asyncio.to_thread(topic_queue.heartbeat, lease, stage)
+                except queue_errors as e:
+                    heartbeat_errors += 1
+                    failing_since = failing_since or time.monotonic()
+                    if time.monotonic() - failing_since < topic_queue.lease_seconds:
+                        timeout = retry_delay(heartbeat_errors, heartbeat_interval)
+                        print(f"⚠️ Heartbeat for {lease.topic} failed ({e}), retrying in {timeout:.0f}s")
+                        continue
+                    alive = False
+                heartbeat_errors = 0
+                failing_since = None
+                timeout = heartbeat_interval
+                if not alive:
+                    print(f"⚠️ Lost lease on {lease.topic}, another worker owns it now")
+                    pipeline.cancel()
+                    await asyncio.gather(pipeline, return_exceptions=True)
+                    return
+            
+            try:
+                pipeline.result()
+                stage = await asyncio.to_thread(video_generator.get_topic_stage, lease.topic, only_plan)
+                error = None if stage == 'done' else f"pipeline finished with stage '{stage}' incomplete"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            
+            if error is None:
+                await finish_lease(lease, topic_queue.complete)
+                processed['done'] += 1
+                print(f"✅ Completed topic: {lease.topic}")
+            else:
+                status = await finish_lease(lease, topic_queue.fail, error)
+                processed['failed'] += 1
+                print(f"❌ Topic {lease.topic} failed ({error}); now {status}")
+        except asyncio.CancelledError:
+            # Shutting down: hand the topic back so another worker can resume it
+            pipeline.cancel()
+            await asyncio.gather(pipeline, return_exceptions=True)
+            try:
+                await asyncio.to_thread(topic_queue.release, lease)
+            except queue_errors:
+                pass  # the lease expires on its own
+            raise
+    
+    async def worker_slot() -> None:
+        errors = 0
+        while True:
+            try:
+                lease = await asyncio.to_thread(topic_queue.claim, worker_id)
+                drained = lease is None and not wait and await asyncio.to_thread(is_drained, topic_queue)
+            except queue_errors as e:
+                errors += 1
+                delay = retry_delay(errors, poll_interval)
+                print(f"⚠️ Topic queue unavailable ({e}), retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                continue
+            errors = 0
+            if lease is None:
+                # Failed topics wait out a backoff and leased ones may come back, so
+                # only stop once nothing is pending or leased
+                if drained:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            await process_lease(lease)
+    
+    await asyncio.gather(*[worker_slot() for _ in range(video_generator.config.max_topic_concurrency)])
+    print(f"👷 Topic worker {worker_id} finished: {processed['done']} completed, {processed['failed']} failed")
+
 async def handle_single_topic(video_generator: EnhancedVideoGenerator, args):
     """Handle processing of single topic."""
     if args.only_combine:
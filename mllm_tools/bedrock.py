@@ -345,6 +345,10 @@ class BedrockWrapper:
                 print(error_msg)
             raise Exception(error_msg) from e
 
+    async def acall(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None, **kwargs) -> Union[str, Dict[str, Any]]:
+        """Async counterpart of ``__call__`` used by the planner and code generator."""
+        return await self.acompletion(messages, metadata=metadata, **kwargs)
+
     def chat(self, messages: List[Dict[str, Any]], **kwargs) -> str:
         """Simple chat interface for text-only conversations."""
         result = self(messages, **kwargs)
@@ -0,0 +1,25 @@
+"""
+Error responses returned by model wrappers.
+
+Some wrappers report a failed completion as text instead of raising, so that
+callers retrying on bad output keep working. They return the text as a
+``ModelErrorResponse``: it is still a ``str`` for those callers, but anything
+that must not treat it as model output (such as the response cache) can
+tell the two apart without guessing from the wording.
+"""
+
+from typing import Any, Optional
+
+
+class ModelErrorResponse(str):
+    """Error message returned in place of a completion."""
+
+    def __new__(cls, message: str, error: Optional[BaseException] = None) -> "ModelErrorResponse":
+        response = super().__new__(cls, message)
+        response.error = error
+        return response
+
+
+def is_error_response(response: Any) -> bool:
+    """Whether a wrapper response is an error message rather than model output."""
+    return isinstance(response, ModelErrorResponse)
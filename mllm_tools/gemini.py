@@ -7,10 +7,13 @@ import mimetypes
 import google.generativeai as genai
 import tempfile
 import time
+import asyncio
 from urllib.parse import urlparse
 import requests
 from io import BytesIO
 
+from .errors import ModelErrorResponse
+
 class GeminiWrapper:
     """Wrapper for Gemini to support multiple models and logging"""
     
@@ -122,16 +125,15 @@ class GeminiWrapper:
         """
         return genai.upload_file(file_path, mime_type=mime_type)
 
-    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+    def _prepare_contents(self, messages: List[Dict[str, Any]]) -> List[Any]:
         """
-        Process messages and return completion
+        Convert messages to Gemini contents, uploading media files
         
         Args:
             messages: List of message dictionaries with 'type' and 'content' keys
-            metadata: Optional metadata to pass to Gemini completion
-        
+            
         Returns:
-            Generated text response
+            List of text strings and uploaded file objects
         """
         contents = []
         for msg in messages:
@@ -163,14 +165,51 @@ class GeminiWrapper:
                 contents.append(uploaded_file)
             else:
                 raise ValueError("Unsupported message type")
+        return contents
 
-        response = self.model.generate_content(contents, request_options={"timeout": 600})
+    def _response_text(self, response) -> str:
         try:
             return response.text
         except Exception as e:
             print(e)
             print(response.prompt_feedback)
-            return str(response.prompt_feedback)
+            return ModelErrorResponse(str(response.prompt_feedback), e)
+
+    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Process messages and return completion
+        
+        Args:
+            messages: List of message dictionaries with 'type' and 'content' keys
+            metadata: Optional metadata to pass to Gemini completion
+        
+        Returns:
+            Generated text response
+        """
+        contents = self._prepare_contents(messages)
+        response = self.model.generate_content(contents, request_options={"timeout": 600})
+        return self._response_text(response)
+
+    async def acall(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Async version of __call__ using the SDK's async client
+        
+        Media uploads are blocking and only happen for multimodal messages,
+        so they run in a worker thread; text-only prompts never leave the event loop.
+        
+        Args:
+            messages: List of message dictionaries with 'type' and 'content' keys
+            metadata: Optional metadata to pass to Gemini completion
+        
+        Returns:
+            Generated text response
+        """
+        if all(msg["type"] == "text" for msg in messages):
+            contents = self._prepare_contents(messages)
+        else:
+            contents = await asyncio.to_thread(self._prepare_contents, messages)
+        response = await self.model.generate_content_async(contents, request_options={"timeout": 600})
+        return self._response_text(response)
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -8,9 +8,11 @@ import base64
 from PIL import Image
 import mimetypes
 import litellm
-from litellm import completion, completion_cost
+from litellm import completion, acompletion, completion_cost
 from dotenv import load_dotenv
 
+from .errors import ModelErrorResponse
+
 load_dotenv()
 
 class GitHubModelsWrapper:
@@ -113,22 +115,16 @@ class GitHubModelsWrapper:
         clean_model_name = model_name.replace("github/", "")
         return any(vision_model in clean_model_name for vision_model in vision_models)
 
-    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+    def _format_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Process messages and return completion
+        Convert wrapper messages to LiteLLM format
         
         Args:
             messages: List of message dictionaries with 'type' and 'content' keys
-            metadata: Optional metadata to pass to litellm completion, e.g. for Langfuse tracking
         
         Returns:
-            Generated text response
+            List of chat messages for litellm completion
         """
-        if metadata is None:
-            metadata = {}
-        metadata["trace_name"] = f"github-models-completion-{self.model_name}"
-        
-        # Convert messages to LiteLLM format
         formatted_messages = []
         
         for msg in messages:
@@ -172,49 +168,88 @@ class GitHubModelsWrapper:
                 })
             else:
                 raise ValueError(f"Unsupported message type: {msg['type']}. GitHub models currently support 'text' and 'image' types.")
+        return formatted_messages
+
+    def _completion_params(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the keyword arguments shared by completion and acompletion"""
+        if metadata is None:
+            metadata = {}
+        metadata["trace_name"] = f"github-models-completion-{self.model_name}"
+        
+        params = {
+            "model": self.model_name,
+            "messages": self._format_messages(messages),
+            "metadata": metadata,
+            "max_retries": 3
+        }
+        # Check if it's an o-series model (like o1-preview, o1-mini)
+        if (re.match(r".*o1.*", self.model_name)):
+            # O-series models don't support temperature and have reasoning_effort
+            params["reasoning_effort"] = "medium"  # Options: "low", "medium", "high"
+        else:
+            params["temperature"] = self.temperature
+        return params
+
+    def _process_response(self, response) -> str:
+        """Track cost and extract the text content of a completion response"""
+        if self.print_cost:
+            try:
+                # Note: GitHub Models may not provide cost information
+                cost = completion_cost(completion_response=response)
+                if cost is not None:
+                    self.accumulated_cost += cost
+                    print(f"Cost: ${float(cost):.10f}")
+                    print(f"Accumulated Cost: ${self.accumulated_cost:.10f}")
+                else:
+                    print("Cost information not available for GitHub Models")
+            except Exception as e:
+                print(f"Could not calculate cost: {e}")
+            
+        content = response.choices[0].message.content
+        if content is None:
+            print(f"Got null response from GitHub model. Full response: {response}")
+            return ""
+        return content
+
+    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Process messages and return completion
+        
+        Args:
+            messages: List of message dictionaries with 'type' and 'content' keys
+            metadata: Optional metadata to pass to litellm completion, e.g. for Langfuse tracking
+        
+        Returns:
+            Generated text response
+        """
+        params = self._completion_params(messages, metadata)
+        try:
+            response = completion(**params)
+            return self._process_response(response)
+        
+        except Exception as e:
+            print(f"Error in GitHub model completion: {e}")
+            return ModelErrorResponse(str(e), e)
 
+    async def acall(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Async version of __call__ using litellm.acompletion
+        
+        Args:
+            messages: List of message dictionaries with 'type' and 'content' keys
+            metadata: Optional metadata to pass to litellm completion, e.g. for Langfuse tracking
+        
+        Returns:
+            Generated text response
+        """
+        params = self._completion_params(messages, metadata)
         try:
-            # Check if it's an o-series model (like o1-preview, o1-mini)
-            if (re.match(r".*o1.*", self.model_name)):
-                # O-series models don't support temperature and have reasoning_effort
-                response = completion(
-                    model=self.model_name,
-                    messages=formatted_messages,
-                    reasoning_effort="medium",  # Options: "low", "medium", "high"
-                    metadata=metadata,
-                    max_retries=3
-                )
-            else:
-                response = completion(
-                    model=self.model_name,
-                    messages=formatted_messages,
-                    temperature=self.temperature,
-                    metadata=metadata,
-                    max_retries=3
-                )
-                
-            if self.print_cost:
-                try:
-                    # Note: GitHub Models may not provide cost information
-                    cost = completion_cost(completion_response=response)
-                    if cost is not None:
-                        self.accumulated_cost += cost
-                        print(f"Cost: ${float(cost):.10f}")
-                        print(f"Accumulated Cost: ${self.accumulated_cost:.10f}")
-                    else:
-                        print("Cost information not available for GitHub Models")
-                except Exception as e:
-                    print(f"Could not calculate cost: {e}")
-                
-            content = response.choices[0].message.content
-            if content is None:
-                print(f"Got null response from GitHub model. Full response: {response}")
-                return ""
-            return content
+            response = await acompletion(**params)
+            return self._process_response(response)
         
         except Exception as e:
             print(f"Error in GitHub model completion: {e}")
-            return str(e)
+            return ModelErrorResponse(str(e), e)
 
 def create_github_model_wrapper(model_name: str = "github/gpt-4o", **kwargs) -> GitHubModelsWrapper:
     """
@@ -7,9 +7,11 @@ import base64
 from PIL import Image
 import mimetypes
 import litellm
-from litellm import completion, completion_cost
+from litellm import completion, acompletion, completion_cost
 from dotenv import load_dotenv
 
+from .errors import ModelErrorResponse
+
 load_dotenv()
 
 class LiteLLMWrapper:
@@ -80,22 +82,16 @@ class LiteLLMWrapper:
             raise ValueError(f"Unsupported file type: {file_path}")
         return mime_type
 
-    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+    def _format_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Process messages and return completion
+        Convert wrapper messages to LiteLLM format
         
         Args:
             messages: List of message dictionaries with 'type' and 'content' keys
-            metadata: Optional metadata to pass to litellm completion, e.g. for Langfuse tracking
         
         Returns:
-            Generated text response
+            List of chat messages for litellm completion
         """
-        if metadata is None:
-            print("No metadata provided, using empty metadata")
-            metadata = {}
-        metadata["trace_name"] = f"litellm-completion-{self.model_name}"
-        # Convert messages to LiteLLM format
         formatted_messages = []
         for msg in messages:
             if msg["type"] == "text":
@@ -150,44 +146,86 @@ class LiteLLMWrapper:
                         raise ValueError("For GPT, only text and image inferencing are supported")
                 else:
                     raise ValueError("Only support Gemini and Gpt for Multimodal capability now")
+        return formatted_messages
+
+    def _completion_params(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the keyword arguments shared by completion and acompletion"""
+        if metadata is None:
+            print("No metadata provided, using empty metadata")
+            metadata = {}
+        metadata["trace_name"] = f"litellm-completion-{self.model_name}"
+
+        params = {
+            "model": self.model_name,
+            "messages": self._format_messages(messages),
+            "metadata": metadata,
+            "max_retries": 99
+        }
+        # if it's openai o series model, set temperature to None and reasoning_effort to "medium"
+        if (re.match(r"^o\d+.*$", self.model_name) or re.match(r"^openai/o.*$", self.model_name)):
+            self.temperature = None
+            self.reasoning_effort = "medium"
+            params["reasoning_effort"] = self.reasoning_effort
+        params["temperature"] = self.temperature
+        return params
+
+    def _process_response(self, response) -> str:
+        """Track cost and extract the text content of a completion response"""
+        if self.print_cost:
+            # pass your response from completion to completion_cost
+            cost = completion_cost(completion_response=response)
+            formatted_string = f"Cost: ${float(cost):.10f}"
+            # print(formatted_string)
+            self.accumulated_cost += cost
+            print(f"Accumulated Cost: ${self.accumulated_cost:.10f}")
+            
+        content = response.choices[0].message.content
+        if content is None:
+            print(f"Got null response from model. Full response: {response}")
+        return content
+
+    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Process messages and return completion
+        
+        Args:
+            messages: List of message dictionaries with 'type' and 'content' keys
+            metadata: Optional metadata to pass to litellm completion, e.g. for Langfuse tracking
+        
+        Returns:
+            Generated text response
+        """
+        params = self._completion_params(messages, metadata)
+        try:
+            response = completion(**params)
+            return self._process_response(response)
+        
+        except Exception as e:
+            print(f"Error in model completion: {e}")
+            return ModelErrorResponse(str(e), e)
 
+    async def acall(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Async version of __call__ using litellm.acompletion
+        
+        LiteLLM keeps its async HTTP clients cached per provider, so concurrent
+        calls share pooled connections instead of occupying a thread each.
+        
+        Args:
+            messages: List of message dictionaries with 'type' and 'content' keys
+            metadata: Optional metadata to pass to litellm completion, e.g. for Langfuse tracking
+        
+        Returns:
+            Generated text response
+        """
+        params = self._completion_params(messages, metadata)
         try:
-            # if it's openai o series model, set temperature to None and reasoning_effort to "medium"
-            if (re.match(r"^o\d+.*$", self.model_name) or re.match(r"^openai/o.*$", self.model_name)):
-                self.temperature = None
-                self.reasoning_effort = "medium"
-                response = completion(
-                    model=self.model_name,
-                    messages=formatted_messages,
-                    temperature=self.temperature,
-                    reasoning_effort=self.reasoning_effort,
-                    metadata=metadata,
-                    max_retries=99
-                )
-            else:
-                response = completion(
-                    model=self.model_name,
-                    messages=formatted_messages,
-                    temperature=self.temperature,
-                    metadata=metadata,
-                    max_retries=99
-                )
-            if self.print_cost:
-                # pass your response from completion to completion_cost
-                cost = completion_cost(completion_response=response)
-                formatted_string = f"Cost: ${float(cost):.10f}"
-                # print(formatted_string)
-                self.accumulated_cost += cost
-                print(f"Accumulated Cost: ${self.accumulated_cost:.10f}")
-                
-            content = response.choices[0].message.content
-            if content is None:
-                print(f"Got null response from model. Full response: {response}")
-            return content
+            response = await acompletion(**params)
+            return self._process_response(response)
         
         except Exception as e:
             print(f"Error in model completion: {e}")
-            return str(e)
+            return ModelErrorResponse(str(e), e)
         
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -5,9 +5,11 @@ import io
 import base64
 from PIL import Image
 import mimetypes
-from litellm import completion, completion_cost
+from litellm import completion, acompletion, completion_cost
 from dotenv import load_dotenv
 
+from .errors import ModelErrorResponse
+
 load_dotenv()
 
 class OpenRouterWrapper:
@@ -99,22 +101,16 @@ class OpenRouterWrapper:
             raise ValueError(f"Unsupported file type: {file_path}")
         return mime_type
     
-    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+    def _format_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Process messages and return completion
+        Convert wrapper messages to LiteLLM format
         
         Args:
             messages: List of message dictionaries with 'type' and 'content' keys
-            metadata: Optional metadata to pass to completion
         
         Returns:
-            Generated text response
+            List of chat messages for completion
         """
-        if metadata is None:
-            metadata = {}
-        metadata["trace_name"] = f"openrouter-completion-{self.model_name}"
-        
-        # Convert messages to LiteLLM format
         formatted_messages = []
         for msg in messages:
             if msg["type"] == "text":
@@ -158,37 +154,82 @@ class OpenRouterWrapper:
                         "role": "user",
                         "content": [{"type": "text", "text": f"[{msg['type'].upper()}]: {msg['content']}"}]
                     })
-
+        return formatted_messages
+    
+    def _completion_params(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the keyword arguments shared by completion and acompletion"""
+        if metadata is None:
+            metadata = {}
+        metadata["trace_name"] = f"openrouter-completion-{self.model_name}"
+        
+        return {
+            "model": self.model_name,
+            "messages": self._format_messages(messages),
+            "temperature": self.temperature,
+            "metadata": metadata,
+            "max_retries": 99
+        }
+    
+    def _process_response(self, response) -> str:
+        """Track cost and extract the text content of a completion response"""
+        if self.print_cost:
+            # Calculate and print cost
+            cost = completion_cost(completion_response=response)
+            self.accumulated_cost += cost
+            print(f"Accumulated Cost: ${self.accumulated_cost:.10f}")
+        
+        content = response.choices[0].message.content
+        if content is None:
+            print(f"Got null response from model. Full response: {response}")
+            return ModelErrorResponse("Error: Received null response from model")
+        
+        # Check if the response contains error messages about unmapped models
+        if "This model isn't mapped yet" in content or "model isn't mapped" in content.lower():
+            error_msg = f"Error: Model {self.model_name} is not supported by LiteLLM. Please use a supported model."
+            print(error_msg)
+            return ModelErrorResponse(error_msg)
+        
+        return content
+    
+    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Process messages and return completion
+        
+        Args:
+            messages: List of message dictionaries with 'type' and 'content' keys
+            metadata: Optional metadata to pass to completion
+        
+        Returns:
+            Generated text response
+        """
+        params = self._completion_params(messages, metadata)
         try:
-            response = completion(
-                model=self.model_name,
-                messages=formatted_messages,
-                temperature=self.temperature,
-                metadata=metadata,
-                max_retries=99
-            )
-            if self.print_cost:
-                # Calculate and print cost
-                cost = completion_cost(completion_response=response)
-                self.accumulated_cost += cost
-                print(f"Accumulated Cost: ${self.accumulated_cost:.10f}")
-            
-            content = response.choices[0].message.content
-            if content is None:
-                print(f"Got null response from model. Full response: {response}")
-                return "Error: Received null response from model"
-            
-            # Check if the response contains error messages about unmapped models
-            if "This model isn't mapped yet" in content or "model isn't mapped" in content.lower():
-                error_msg = f"Error: Model {self.model_name} is not supported by LiteLLM. Please use a supported model."
-                print(error_msg)
-                return error_msg
-            
-            return content
+            response = completion(**params)
+            return self._process_response(response)
+        
+        except Exception as e:
+            print(f"Error in OpenRouter completion: {e}")
+            return ModelErrorResponse(f"Error: {str(e)}", e)
+    
+    async def acall(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Async version of __call__ using litellm.acompletion
+        
+        Args:
+            messages: List of message dictionaries with 'type' and 'content' keys
+            metadata: Optional metadata to pass to completion
+        
+        Returns:
+            Generated text response
+        """
+        params = self._completion_params(messages, metadata)
+        try:
+            response = await acompletion(**params)
+            return self._process_response(response)
         
         except Exception as e:
             print(f"Error in OpenRouter completion: {e}")
-            return f"Error: {str(e)}"
+            return ModelErrorResponse(f"Error: {str(e)}", e)
 
 
 class OpenRouterClient:
@@ -0,0 +1,483 @@
+"""
+Prompt/response cache for LLM calls.
+
+Responses are keyed on a canonical hash of the model name, the temperature
+and the messages, with attached media (PIL images and local image, audio or
+video files) hashed by content. Request metadata such as trace ids and tags
+is not part of the key, so reruns of a topic hit the cache.
+
+By default only deterministic (temperature 0) calls are cached: replaying a
+sampled response would silently turn every rerun into the first run's output.
+Error responses (see ``mllm_tools.errors``) are never cached.
+
+Three backends are available: ``memory`` (per process), ``sqlite`` (shared
+by every process on a machine) and ``redis`` (shared across machines). All
+of them honour a TTL and a byte budget with least-recently-used eviction.
+
+Example:
+    cache = create_response_cache("sqlite", path="output/.llm_cache.sqlite3")
+    model = CachedModel(LiteLLMWrapper(model_name="gpt-4o", temperature=0), cache)
+"""
+
+import io
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .errors import is_error_response
+
+CACHE_KEY_VERSION = 1
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _canonical_value(value: Any, is_media: bool = False) -> Any:
+    """Make a message value JSON-serializable, replacing media with content hashes."""
+    if isinstance(value, Image.Image):
+        buffered = io.BytesIO()
+        value.save(buffered, format="PNG")
+        return {"__media_sha256__": _hash_bytes(buffered.getvalue())}
+    if isinstance(value, (bytes, bytearray)):
+        return {"__media_sha256__": _hash_bytes(bytes(value))}
+    if isinstance(value, str):
+        if is_media and os.path.isfile(value):
+            return {"__media_sha256__": _hash_file(value)}
+        return value
+    if isinstance(value, dict):
+        media = value.get("type") in ("image", "audio", "video")
+        return {str(k): _canonical_value(v, is_media=media and k == "content") for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(v, is_media=is_media) for v in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return repr(value)
+
+
+def make_cache_key(model_name: str, temperature: Optional[float], messages: List[Dict[str, Any]]) -> str:
+    """Build the canonical cache key for a model call."""
+    material = json.dumps(
+        {
+            "version": CACHE_KEY_VERSION,
+            "model": model_name,
+            "temperature": temperature,
+            "messages": _canonical_value(messages),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def is_cacheable_response(response: Any) -> bool:
+    """Only non-empty text responses that the wrapper did not flag as errors are cached."""
+    return isinstance(response, str) and bool(response.strip()) and not is_error_response(response)
+
+
+class MemoryCacheBackend:
+    """In-process LRU backend."""
+
+    def __init__(self, max_bytes: int = 256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float], int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                self._total_bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        size = len(value.encode("utf-8"))
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[2]
+            self._entries[key] = (value, expires_at, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+            }
+
+
+class SQLiteCacheBackend:
+    """SQLite backend shared by all processes using the same database file."""
+
+    def __init__(self, path: str, max_bytes: int = 1024 ** 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_access ON llm_responses (last_access)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, size, created_at, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, size, now, now + ttl if ttl else None, now)
+            )
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+            )
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM llm_responses ORDER BY last_access ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows[:-1]:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_responses")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': entries,
+            'total_bytes': total,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+        }
+
+
+class RedisCacheBackend:
+    """Redis backend shared across machines.
+
+    Entries expire through Redis TTLs. The byte budget is enforced with a
+    sorted set of keys by last access and a running byte counter.
+    """
+
+    def __init__(self, url: str, max_bytes: int = 1024 ** 3, prefix: str = "llm_cache"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("The redis package is required for the redis LLM cache backend") from e
+
+        self.client = redis.Redis.from_url(url)
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.evictions = 0
+        self._lru_key = f"{prefix}:lru"
+        self._sizes_key = f"{prefix}:sizes"
+        self._total_key = f"{prefix}:total_bytes"
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self._entry_key(key))
+        if value is None:
+            return None
+        self.client.zadd(self._lru_key, {key: time.time()})
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        size = len(value.encode("utf-8"))
+        previous = self.client.hget(self._sizes_key, key)
+
+        pipe = self.client.pipeline()
+        if ttl:
+            pipe.set(self._entry_key(key), value, ex=max(1, int(ttl)))
+        else:
+            pipe.set(self._entry_key(key), value)
+        pipe.zadd(self._lru_key, {key: time.time()})
+        pipe.hset(self._sizes_key, key, size)
+        pipe.incrby(self._total_key, size - int(previous or 0))
+        total = pipe.execute()[-1]
+
+        if total > self.max_bytes:
+            self._evict(total)
+
+    def _evict(self, total: int) -> None:
+        while total > self.max_bytes:
+            oldest = self.client.zrange(self._lru_key, 0, 31)
+            if len(oldest) <= 1:
+                break
+            for raw_key in oldest[:-1]:
+                key = raw_key.decode("utf-8") if isinstance(raw_key, bytes) else raw_key
+                size = int(self.client.hget(self._sizes_key, key) or 0)
+                pipe = self.client.pipeline()
+                pipe.delete(self._entry_key(key))
+                pipe.zrem(self._lru_key, key)
+                pipe.hdel(self._sizes_key, key)
+                pipe.decrby(self._total_key, size)
+                total = pipe.execute()[-1]
+                self.evictions += 1
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self) -> None:
+        keys = [self._entry_key(k.decode("utf-8") if isinstance(k, bytes) else k)
+                for k in self.client.zrange(self._lru_key, 0, -1)]
+        if keys:
+            self.client.delete(*keys)
+        self.client.delete(self._lru_key, self._sizes_key, self._total_key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'redis',
+            'entries': self.client.zcard(self._lru_key),
+            'total_bytes': int(self.client.get(self._total_key) or 0),
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+        }
+
+
+class LLMResponseCache:
+    """Response cache front-end with deterministic mode, TTL and hit-rate stats."""
+
+    def __init__(self, backend: Any, ttl: Optional[float] = 7 * 24 * 3600,
+                 deterministic_only: bool = True):
+        """Initialize the cache.
+
+        Args:
+            backend: Storage backend (memory, sqlite or redis)
+            ttl: Seconds an entry stays valid, or None for no expiry
+            deterministic_only: Only cache calls made with temperature 0 (the default)
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.deterministic_only = deterministic_only
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'bypassed': 0, 'uncacheable': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def should_cache(self, temperature: Optional[float]) -> bool:
+        """In deterministic mode only temperature-0 calls are cached."""
+        return not self.deterministic_only or temperature == 0
+
+    def record_bypass(self) -> None:
+        self._count('bypassed')
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.backend.get(key)
+        self._count('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key: str, response: Any) -> None:
+        if not is_cacheable_response(response):
+            self._count('uncacheable')
+            return
+        self.backend.set(key, response, self.ttl)
+        self._count('stores')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate and backend statistics."""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['deterministic_only'] = self.deterministic_only
+        stats['ttl'] = self.ttl
+        stats.update(self.backend.get_stats())
+        return stats
+
+
+class CachedModel:
+    """Wraps a model wrapper so ``__call__`` and ``acall`` consult the response cache.
+
+    Any other attribute is forwarded to the wrapped model. Forwarding does
+    not make ``isinstance`` see through the wrapper; code that checks the
+    model's type should check ``wrapped`` (or use ``unwrap_model``).
+    """
+
+    def __init__(self, model: Any, cache: LLMResponseCache):
+        self.model = model
+        self.cache = cache
+
+    @property
+    def wrapped(self) -> Any:
+        """The model wrapper underneath any cache layers."""
+        return unwrap_model(self.model)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def _cache_key(self, messages: List[Dict[str, Any]]) -> Optional[str]:
+        temperature = getattr(self.model, "temperature", None)
+        if not self.cache.should_cache(temperature):
+            self.cache.record_bypass()
+            return None
+        model_name = getattr(self.model, "model_name", type(self.model).__name__)
+        return make_cache_key(model_name, temperature, messages)
+
+    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        key = self._cache_key(messages)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.model(messages, metadata=metadata, **kwargs)
+        if key is not None:
+            self.cache.set(key, response)
+        return response
+
+    async def acall(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        # Key building may hash media files and backends may hit disk or network
+        key = await asyncio.to_thread(self._cache_key, messages)
+        if key is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        if hasattr(self.model, "acall"):
+            response = await self.model.acall(messages, metadata=metadata, **kwargs)
+        else:
+            response = await asyncio.to_thread(self.model, messages, metadata=metadata, **kwargs)
+
+        if key is not None:
+            await asyncio.to_thread(self.cache.set, key, response)
+        return response
+
+
+def unwrap_model(model: Any) -> Any:
+    """Return the model wrapper inside ``model`` if it is a CachedModel, else ``model``."""
+    while isinstance(model, CachedModel):
+        model = model.model
+    return model
+
+
+def cache_bypass_warning(models: List[Any]) -> Optional[str]:
+    """Warn when a deterministic-only cache wraps models that never run at temperature 0.
+
+    Args:
+        models: Model wrappers, possibly wrapped in CachedModel
+
+    Returns:
+        A warning message, or None if some model's calls can be cached
+    """
+    cached = [model for model in models if isinstance(model, CachedModel)]
+    if not cached:
+        return None
+    if any(model.cache.should_cache(getattr(model.wrapped, "temperature", None)) for model in cached):
+        return None
+    temperatures = sorted({str(getattr(model.wrapped, "temperature", None)) for model in cached})
+    return (f"The LLM cache only stores temperature-0 calls, but every model runs at temperature "
+            f"{', '.join(temperatures)}, so nothing will be cached; pass --no-llm_cache_deterministic "
+            f"to replay sampled responses")
+
+
+def create_response_cache(backend: str = "memory", path: Optional[str] = None,
+                          redis_url: Optional[str] = None, ttl: Optional[float] = 7 * 24 * 3600,
+                          max_bytes: int = 1024 ** 3, deterministic_only: bool = True) -> LLMResponseCache:
+    """Create a response cache with the named backend.
+
+    Args:
+        backend: One of "memory", "sqlite" or "redis"
+        path: Database file for the sqlite backend
+        redis_url: Connection URL for the redis backend (defaults to LLM_CACHE_REDIS_URL or REDIS_URL)
+        ttl: Seconds an entry stays valid, or None for no expiry
+        max_bytes: Size budget before least-recently-used entries are evicted
+        deterministic_only: Only cache calls made with temperature 0; pass False to
+            also replay sampled (temperature > 0) responses
+    """
+    if backend == "memory":
+        store = MemoryCacheBackend(max_bytes=max_bytes)
+    elif backend == "sqlite":
+        store = SQLiteCacheBackend(path or os.path.join("output", ".llm_cache.sqlite3"), max_bytes=max_bytes)
+    elif backend == "redis":
+        url = redis_url or os.getenv("LLM_CACHE_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        store = RedisCacheBackend(url, max_bytes=max_bytes)
+    else:
+        raise ValueError(f"Unknown LLM cache backend: {backend}")
+    return LLMResponseCache(store, ttl=ttl, deterministic_only=deterministic_only)
@@ -3,6 +3,7 @@ from PIL import Image
 import google.generativeai as genai
 import tempfile
 import os
+import asyncio
 from .gemini import GeminiWrapper
 from .vertex_ai import VertexAIWrapper
 from .openrouter import OpenRouterWrapper
@@ -121,6 +122,25 @@ def _prepare_text_audio_inputs(texts: Union[str, List[str]], audios: Union[str,
         })
     return inputs
 
+async def acall_model(model: Any, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> Any:
+    """Call a model wrapper without blocking the event loop.
+
+    Uses the wrapper's native ``acall`` when it has one and falls back to
+    running the synchronous ``__call__`` in a worker thread otherwise.
+
+    Args:
+        model: Model wrapper (any callable taking messages and metadata)
+        messages: List of message dictionaries with 'type' and 'content' keys
+        metadata: Optional metadata passed through to the wrapper
+
+    Returns:
+        The wrapper's response
+    """
+    acall = getattr(model, "acall", None)
+    if acall is not None:
+        return await acall(messages, metadata=metadata)
+    return await asyncio.to_thread(model, messages, metadata=metadata)
+
 def _extract_code(text: str) -> str:
     """Helper to extract code block from model response, support Gemini style and OpenAI style"""
     try:
@@ -42,19 +42,8 @@ class VertexAIWrapper:
         vertexai.init(project=project_id, location=location)
         self.model = GenerativeModel(model_name)
         
-    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Process messages and return completion.
-        
-        Args:
-            messages: List of message dictionaries containing type and content
-            metadata: Optional metadata dictionary to pass to the model
-            
-        Returns:
-            Generated text response from the model
-            
-        Raises:
-            ValueError: If message type is not supported
-        """
+    def _build_parts(self, messages: List[Dict[str, Any]]) -> List[Part]:
+        """Convert messages to Vertex AI content parts."""
         parts = []
         
         for msg in messages:
@@ -74,13 +63,48 @@ class VertexAIWrapper:
                         msg["content"],
                         mime_type=mime_type
                     ))
-                    
+        return parts
+
+    @property
+    def _generation_config(self) -> Dict[str, Any]:
+        return {
+            "temperature": self.temperature,
+            "top_p": 0.95,
+        }
+        
+    def __call__(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Process messages and return completion.
+        
+        Args:
+            messages: List of message dictionaries containing type and content
+            metadata: Optional metadata dictionary to pass to the model
+            
+        Returns:
+            Generated text response from the model
+            
+        Raises:
+            ValueError: If message type is not supported
+        """
         response = self.model.generate_content(
-            parts,
-            generation_config={
-                "temperature": self.temperature,
-                "top_p": 0.95,
-            }
+            self._build_parts(messages),
+            generation_config=self._generation_config
+        )
+        
+        return response.text
+
+    async def acall(self, messages: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Async version of __call__ using the SDK's async client.
+        
+        Args:
+            messages: List of message dictionaries containing type and content
+            metadata: Optional metadata dictionary to pass to the model
+            
+        Returns:
+            Generated text response from the model
+        """
+        response = await self.model.generate_content_async(
+            self._build_parts(messages),
+            generation_config=self._generation_config
         )
         
-        return response.text
\ No newline at end of file
+        return response.text
@@ -3,21 +3,35 @@ Redis caching strategies and decorators for FastAPI endpoints.
 
 This module provides caching decorators, cache invalidation patterns,
 cache warming strategies, and monitoring for the video generation API.
+
+Reads go through a bounded in-process cache (L1) in front of Redis (L2).
+Every write and delete is published on a Redis channel so other instances
+drop their L1 copies, and L1 is only used while this instance is
+subscribed to that channel.
+
+Entries are registered under tags (user, job, endpoint) in Redis sorted
+sets, so invalidation deletes exactly the tagged keys in pipelined batches
+instead of walking the keyspace.
 """
 
 import asyncio
+import fnmatch
 import functools
 import hashlib
 import json
 import logging
+import time
+import uuid
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional, Union, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union, Tuple
 from contextlib import asynccontextmanager
 
 from fastapi import Request, Response
 from redis.asyncio import Redis
 
 from .redis import redis_manager, RedisKeyManager, safe_redis_operation
+from . import serialization
 from .config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -43,6 +57,94 @@ class CacheConfig:
     # Cache warming settings
     WARM_CACHE_BATCH_SIZE = 10
     WARM_CACHE_DELAY = 0.1  # seconds between batch operations
+    
+    # In-process (L1) cache settings
+    L1_MAX_ENTRIES = 10000
+    L1_MAX_TTL = 30  # seconds; bounds staleness if an invalidation is missed
+    INVALIDATION_CHANNEL = "cache:invalidations"
+    INVALIDATION_RETRY_DELAY = 5  # seconds before resubscribing after an error
+    
+    # Marks values stored with a stale-while-revalidate window
+    STALE_MARKER = "__fresh_until__"
+    
+    # Tag index settings
+    TAG_NAMESPACE = "tags"
+    TAG_REGISTRY_NAMESPACE = "tag_registry"
+    TAG_INDEX_TTL = VERY_LONG_TTL
+    INVALIDATION_BATCH_SIZE = 500
+    SCAN_COUNT = 1000
+
+
+class CacheTags:
+    """Tags cache entries are registered under for invalidation."""
+    
+    SYSTEM = "system"
+    ENDPOINT_PREFIX = "endpoint:"
+    
+    @staticmethod
+    def user(user_id: str) -> str:
+        return f"user:{user_id}"
+    
+    @staticmethod
+    def job(job_id: str) -> str:
+        return f"job:{job_id}"
+    
+    @staticmethod
+    def endpoint(path: str) -> str:
+        return f"{CacheTags.ENDPOINT_PREFIX}{path}"
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with per-entry expiry.
+    
+    An entry may keep a stale window after it expires, during which it is
+    still returned (flagged as stale) so a fresh value can be computed in
+    the background.
+    """
+    
+    def __init__(self, max_entries: int = CacheConfig.L1_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+    
+    def get(self, key: str) -> Tuple[Any, Optional[str]]:
+        """Return (value, state) with state "fresh", "stale", or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+        
+        value, fresh_until, stale_until = entry
+        now = time.monotonic()
+        if now >= stale_until:
+            del self._entries[key]
+            return None, None
+        
+        self._entries.move_to_end(key)
+        return value, "fresh" if now < fresh_until else "stale"
+    
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0) -> None:
+        """Store a value that is fresh for ttl seconds and stale for stale_ttl more."""
+        now = time.monotonic()
+        self._entries[key] = (value, now + ttl, now + ttl + stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+    
+    def delete_pattern(self, pattern: str) -> int:
+        """Delete entries matching a Redis-style glob pattern."""
+        keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class CacheKeyGenerator:
@@ -123,7 +225,7 @@ class CacheKeyGenerator:
 class CacheManager:
     """Advanced cache management with invalidation and warming strategies."""
     
-    def __init__(self):
+    def __init__(self, l1_max_entries: int = CacheConfig.L1_MAX_ENTRIES):
         self._cache_stats = {
             "hits": 0,
             "misses": 0,
@@ -131,6 +233,221 @@ class CacheManager:
             "deletes": 0,
             "invalidations": 0
         }
+        self._tier_stats = self._new_tier_stats()
+        self._prefix_stats: Dict[str, Dict[str, int]] = defaultdict(self._new_prefix_stats)
+        self._flight_stats = self._new_flight_stats()
+        
+        self.instance_id = uuid.uuid4().hex
+        self._local = LocalCache(l1_max_entries)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._listener_task: Optional[asyncio.Task] = None
+        self._subscribed = False
+        # Bumped on every L1 change made for a write, delete or invalidation
+        # (local or received), so a Redis read that raced with one is not
+        # copied into L1
+        self._invalidation_seq = 0
+        self._invalidation_stats = self._new_invalidation_stats()
+        self._tag_index_started = False
+        self._tag_index_since: Optional[float] = None
+        self._legacy_entries_expired = False
+    
+    @staticmethod
+    def _new_tier_stats() -> Dict[str, Dict[str, int]]:
+        return {"l1": {"hits": 0, "misses": 0}, "l2": {"hits": 0, "misses": 0}}
+    
+    @staticmethod
+    def _new_prefix_stats() -> Dict[str, int]:
+        return {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+    
+    @staticmethod
+    def _new_flight_stats() -> Dict[str, int]:
+        return {
+            "single_flight_waits": 0,
+            "stale_served": 0,
+            "background_refreshes": 0,
+            "invalidations_received": 0
+        }
+    
+    @staticmethod
+    def _new_invalidation_stats() -> Dict[str, Any]:
+        return {
+            "tag_invalidations": 0,
+            "scan_invalidations": 0,
+            "keys_invalidated": 0,
+            "max_fanout": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0
+        }
+    
+    def _record_invalidation(self, kind: str, deleted: int, started: float) -> None:
+        latency_ms = (time.perf_counter() - started) * 1000
+        stats = self._invalidation_stats
+        stats[f"{kind}_invalidations"] += 1
+        stats["keys_invalidated"] += deleted
+        stats["max_fanout"] = max(stats["max_fanout"], deleted)
+        stats["total_latency_ms"] += latency_ms
+        stats["max_latency_ms"] = max(stats["max_latency_ms"], latency_ms)
+    
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return RedisKeyManager.cache_key(CacheConfig.TAG_NAMESPACE, tag)
+    
+    @staticmethod
+    def _tag_registry_key(name: str) -> str:
+        return RedisKeyManager.cache_key(CacheConfig.TAG_REGISTRY_NAMESPACE, name)
+    
+    @staticmethod
+    def _default_tags(key: str) -> List[str]:
+        """Tags implied by the key itself (user and system keys from CacheKeyGenerator)."""
+        parts = key.split(":", 3)
+        if parts[0] != RedisKeyManager.CACHE_PREFIX or len(parts) < 3:
+            return []
+        if parts[1] == CacheConfig.USER_CACHE:
+            return [CacheTags.user(parts[2])]
+        if parts[1] == CacheConfig.SYSTEM_CACHE:
+            return [CacheTags.SYSTEM]
+        return []
+    
+    def _add_tags(self, pipe, key: str, tags: List[str], ttl: int) -> None:
+        """Queue commands registering key under tags; expired members are pruned on the way."""
+        now = time.time()
+        expires_at = now + ttl
+        for tag in set(tags):
+            tag_key = self._tag_key(tag)
+            pipe.zadd(tag_key, {key: expires_at})
+            pipe.zremrangebyscore(tag_key, "-inf", now)
+            pipe.expire(tag_key, max(CacheConfig.TAG_INDEX_TTL, ttl))
+            if tag.startswith(CacheTags.ENDPOINT_PREFIX):
+                # Endpoint tags are matched by substring, so keep a registry of them
+                registry_key = self._tag_registry_key("endpoints")
+                pipe.zadd(registry_key, {tag: expires_at})
+                pipe.expire(registry_key, max(CacheConfig.TAG_INDEX_TTL, ttl))
+        if not self._tag_index_started:
+            pipe.set(self._tag_registry_key("since"), now, nx=True)
+    
+    @staticmethod
+    def _key_prefix(key: str) -> str:
+        """Namespace of a key, e.g. "endpoint_cache" for "cache:endpoint_cache:..."."""
+        parts = key.split(":", 2)
+        if parts[0] == RedisKeyManager.CACHE_PREFIX and len(parts) > 1:
+            return parts[1]
+        return parts[0]
+    
+    def _count(self, tier: str, outcome: str, prefix: str) -> None:
+        self._tier_stats[tier][outcome] += 1
+        self._prefix_stats[prefix][f"{tier}_{outcome}"] += 1
+    
+    @staticmethod
+    def _l1_windows(fresh_left: float, total_left: float) -> Tuple[float, float]:
+        """L1 (ttl, stale_ttl) for an entry with the given seconds left in Redis."""
+        if fresh_left > CacheConfig.L1_MAX_TTL:
+            # Expire outright; the next read refetches a still-fresh value from Redis
+            return CacheConfig.L1_MAX_TTL, 0
+        fresh_left = max(fresh_left, 0)
+        return fresh_left, min(max(total_left - fresh_left, 0), CacheConfig.L1_MAX_TTL)
+    
+    def _ensure_listener(self) -> None:
+        """Start the invalidation subscriber once Redis is connected."""
+        if (self._listener_task is None or self._listener_task.done()) and redis_manager.is_connected:
+            self._listener_task = asyncio.create_task(self._listen_for_invalidations())
+    
+    async def _listen_for_invalidations(self) -> None:
+        """Drop L1 entries invalidated by other instances; L1 is off while unsubscribed."""
+        while True:
+            pubsub = None
+            try:
+                pubsub = redis_manager.redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(CacheConfig.INVALIDATION_CHANNEL)
+                self._invalidate_local(clear=True)
+                self._subscribed = True
+                async for message in pubsub.listen():
+                    self._apply_invalidation(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed, L1 cache disabled until resubscribed: {e}")
+            finally:
+                self._subscribed = False
+                self._invalidate_local(clear=True)
+                if pubsub is not None:
+                    try:
+                        await pubsub.reset()
+                    except Exception:
+                        pass
+            await asyncio.sleep(CacheConfig.INVALIDATION_RETRY_DELAY)
+    
+    def _invalidate_local(
+        self,
+        keys: Optional[List[str]] = None,
+        pattern: Optional[str] = None,
+        clear: bool = False
+    ) -> None:
+        """Drop L1 entries and bump the sequence so in-flight Redis reads are not cached."""
+        self._invalidation_seq += 1
+        if clear:
+            self._local.clear()
+        for key in keys or []:
+            self._local.delete(key)
+        if pattern:
+            self._local.delete_pattern(pattern)
+    
+    def _apply_invalidation(self, data: Any) -> None:
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get("origin") == self.instance_id:
+            # Applied locally when it was sent
+            return
+        
+        self._flight_stats["invalidations_received"] += 1
+        self._invalidate_local(message.get("keys"), message.get("pattern"), bool(message.get("clear")))
+    
+    def _invalidation_message(self, **fields) -> str:
+        return json.dumps({"origin": self.instance_id, **fields})
+    
+    async def _lookup(self, key: str) -> Tuple[Any, Optional[str]]:
+        """
+        Look a key up in L1, then Redis.
+        
+        Returns:
+            (value, state) with state "fresh", "stale", or None on a miss
+        """
+        prefix = self._key_prefix(key)
+        self._ensure_listener()
+        
+        if self._subscribed:
+            value, state = self._local.get(key)
+            if state is not None:
+                self._count("l1", "hits", prefix)
+                return value, state
+            self._count("l1", "misses", prefix)
+        
+        seq = self._invalidation_seq
+        redis_client = redis_manager.redis
+        raw, pttl = await redis_client.pipeline(transaction=False).get(key).pttl(key).execute()
+        
+        if raw is None:
+            self._count("l2", "misses", prefix)
+            return None, None
+        
+        try:
+            value = serialization.loads(raw)
+        except ValueError:
+            logger.warning(f"Failed to deserialize cached value for key: {key}")
+            self._count("l2", "misses", prefix)
+            return None, None
+        self._count("l2", "hits", prefix)
+        
+        total_left = pttl / 1000 if pttl and pttl > 0 else CacheConfig.L1_MAX_TTL
+        fresh_left = total_left
+        if isinstance(value, dict) and CacheConfig.STALE_MARKER in value:
+            fresh_left = value[CacheConfig.STALE_MARKER] - time.time()
+            value = value.get("value")
+        
+        if self._subscribed and seq == self._invalidation_seq:
+            self._local.set(key, value, *self._l1_windows(fresh_left, total_left))
+        return value, "fresh" if fresh_left > 0 else "stale"
     
     async def get(
         self,
@@ -141,15 +458,26 @@ class CacheManager:
         """
         Get value from cache with statistics tracking.
         
+        Values served from L1 are shared between callers and must not be
+        mutated.
+        
         Args:
             key: Cache key
             default: Default value if key doesn't exist
-            deserialize: Whether to deserialize JSON data
+            deserialize: Whether to deserialize the value (raw values bypass L1)
             
         Returns:
             Cached value or default
         """
         try:
+            if deserialize:
+                value, state = await self._lookup(key)
+                if state != "fresh":
+                    self._cache_stats["misses"] += 1
+                    return default
+                self._cache_stats["hits"] += 1
+                return value
+            
             redis_client = redis_manager.redis
             value = await redis_client.get(key)
             
@@ -158,14 +486,6 @@ class CacheManager:
                 return default
             
             self._cache_stats["hits"] += 1
-            
-            if deserialize:
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    logger.warning(f"Failed to deserialize cached value for key: {key}")
-                    return default
-            
             return value
             
         except Exception as e:
@@ -178,7 +498,9 @@ class CacheManager:
         key: str,
         value: Any,
         ttl: int = CacheConfig.DEFAULT_TTL,
-        serialize: bool = True
+        serialize: bool = True,
+        stale_ttl: int = 0,
+        tags: Optional[List[str]] = None
     ) -> bool:
         """
         Set value in cache with TTL.
@@ -187,7 +509,10 @@ class CacheManager:
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds
-            serialize: Whether to serialize value as JSON
+            serialize: Whether to serialize value (with the default codec)
+            stale_ttl: Seconds after ttl during which get_or_set still serves the
+                value while refreshing it
+            tags: Tags to register the key under (see CacheTags)
             
         Returns:
             True if successful
@@ -195,22 +520,124 @@ class CacheManager:
         try:
             redis_client = redis_manager.redis
             
+            payload = value
             if serialize:
-                value = json.dumps(value, default=str)
+                if stale_ttl:
+                    payload = {CacheConfig.STALE_MARKER: time.time() + ttl, "value": value}
+                payload = serialization.dumps(payload)
             
-            result = await redis_client.setex(key, ttl, value)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.setex(key, ttl + stale_ttl, payload)
+            pipe.publish(CacheConfig.INVALIDATION_CHANNEL, self._invalidation_message(keys=[key]))
+            all_tags = list(tags or []) + self._default_tags(key)
+            if all_tags:
+                self._add_tags(pipe, key, all_tags, ttl + stale_ttl)
+            result = (await pipe.execute())[0]
             self._cache_stats["sets"] += 1
+            if all_tags:
+                self._tag_index_started = True
+            
+            self._invalidate_local([key])
+            if serialize and self._subscribed:
+                # Cache what other instances would decode, not the caller's object
+                decoded = serialization.loads(payload)
+                if stale_ttl:
+                    decoded = decoded["value"]
+                self._local.set(key, decoded, *self._l1_windows(ttl, ttl + stale_ttl))
             return result
             
         except Exception as e:
             logger.error(f"Cache set failed for key {key}: {e}")
             return False
     
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = CacheConfig.DEFAULT_TTL,
+        stale_ttl: int = 0,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """
+        Get a value, computing and caching it with loader on a miss.
+        
+        Concurrent misses for the same key in this process share a single
+        loader call. With stale_ttl, an expired value is still returned for
+        up to stale_ttl seconds while one background task refreshes it.
+        None results are not cached.
+        
+        Args:
+            key: Cache key
+            loader: Coroutine function computing the value
+            ttl: Time to live in seconds
+            stale_ttl: Seconds an expired value may still be served
+            tags: Tags to register the key under (see CacheTags)
+            
+        Returns:
+            Cached or freshly computed value
+        """
+        try:
+            value, state = await self._lookup(key)
+        except Exception as e:
+            logger.error(f"Cache get failed for key {key}: {e}")
+            value, state = None, None
+        
+        if state == "fresh":
+            self._cache_stats["hits"] += 1
+            return value
+        
+        if state == "stale":
+            self._cache_stats["hits"] += 1
+            self._flight_stats["stale_served"] += 1
+            if key not in self._inflight:
+                self._flight_stats["background_refreshes"] += 1
+                self._start_flight(key, loader, ttl, stale_ttl, tags)
+            return value
+        
+        self._cache_stats["misses"] += 1
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self._flight_stats["single_flight_waits"] += 1
+        else:
+            flight = self._start_flight(key, loader, ttl, stale_ttl, tags)
+        # Shielded so a cancelled caller does not cancel the load for the others waiting on it
+        return await asyncio.shield(flight)
+    
+    def _start_flight(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        tags: Optional[List[str]]
+    ) -> asyncio.Task:
+        async def load() -> Any:
+            try:
+                value = await loader()
+                if value is not None:
+                    await self.set(key, value, ttl, stale_ttl=stale_ttl, tags=tags)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+        
+        def log_failure(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Cache load failed for key {key}: {task.exception()}")
+        
+        task = asyncio.create_task(load())
+        task.add_done_callback(log_failure)
+        self._inflight[key] = task
+        return task
+    
     async def delete(self, key: str) -> bool:
         """Delete key from cache."""
         try:
             redis_client = redis_manager.redis
-            result = await redis_client.delete(key)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.publish(CacheConfig.INVALIDATION_CHANNEL, self._invalidation_message(keys=[key]))
+            result = (await pipe.execute())[0]
+            self._invalidate_local([key])
             self._cache_stats["deletes"] += 1
             return bool(result)
             
@@ -222,39 +649,145 @@ class CacheManager:
         """
         Delete all keys matching pattern.
         
+        Walks the keyspace with SCAN and deletes in batches, so Redis is never
+        blocked the way KEYS blocks it, but the cost still grows with the
+        whole keyspace. Prefer invalidate_tags for entries written with tags.
+        The invalidation is published once the keys are gone from Redis, so
+        other instances cannot refill their L1 from the deleted values.
+        
         Args:
             pattern: Redis key pattern (supports wildcards)
             
         Returns:
             Number of keys deleted
         """
+        started = time.perf_counter()
         try:
             redis_client = redis_manager.redis
-            keys = await redis_client.keys(pattern)
+            deleted = 0
+            batch = []
+            async for key in redis_client.scan_iter(match=pattern, count=CacheConfig.SCAN_COUNT):
+                batch.append(key)
+                if len(batch) >= CacheConfig.INVALIDATION_BATCH_SIZE:
+                    deleted += await redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await redis_client.unlink(*batch)
             
-            if not keys:
-                return 0
+            self._invalidate_local(pattern=pattern)
+            await redis_client.publish(
+                CacheConfig.INVALIDATION_CHANNEL, self._invalidation_message(pattern=pattern)
+            )
             
-            deleted = await redis_client.delete(*keys)
             self._cache_stats["deletes"] += deleted
+            self._record_invalidation("scan", deleted, started)
             return deleted
             
         except Exception as e:
             logger.error(f"Cache pattern delete failed for pattern {pattern}: {e}")
             return 0
     
+    async def invalidate_tags(self, tags: List[str]) -> int:
+        """
+        Delete every entry registered under any of the tags.
+        
+        Args:
+            tags: Tags to invalidate (see CacheTags)
+            
+        Returns:
+            Number of keys deleted
+        """
+        started = time.perf_counter()
+        try:
+            redis_client = redis_manager.redis
+            deleted = 0
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                while True:
+                    keys = await redis_client.zrange(tag_key, 0, CacheConfig.INVALIDATION_BATCH_SIZE - 1)
+                    if not keys:
+                        break
+                    # The pipeline runs in order: invalidation is published after the UNLINK
+                    pipe = redis_client.pipeline(transaction=False)
+                    pipe.unlink(*keys)
+                    pipe.zrem(tag_key, *keys)
+                    pipe.publish(CacheConfig.INVALIDATION_CHANNEL, self._invalidation_message(keys=keys))
+                    deleted += (await pipe.execute())[0]
+                    self._invalidate_local(keys)
+            
+            self._cache_stats["deletes"] += deleted
+            self._record_invalidation("tag", deleted, started)
+            return deleted
+            
+        except Exception as e:
+            logger.error(f"Cache tag invalidation failed for tags {tags}: {e}")
+            return 0
+    
+    async def _legacy_entries_possible(self) -> bool:
+        """Whether untagged entries written before the tag index existed may still be alive."""
+        if self._legacy_entries_expired:
+            return False
+        try:
+            since = await redis_manager.redis.get(self._tag_registry_key("since"))
+        except Exception:
+            return True
+        if since is None:
+            return True
+        self._tag_index_since = float(since)
+        if time.time() - self._tag_index_since > CacheConfig.TAG_INDEX_TTL:
+            self._legacy_entries_expired = True
+            return False
+        return True
+    
+    async def invalidate_legacy_patterns(self, patterns: List[str]) -> int:
+        """
+        SCAN-delete cache keys written before tagging, until those have all expired.
+        
+        Until TAG_INDEX_TTL (a day) has passed since the first tagged write
+        (and indefinitely if nothing has been written with tags yet), every
+        user or endpoint invalidation therefore still walks the whole keyspace
+        once per pattern, on top of the tag lookup. get_stats reports whether
+        these scans are still active ("legacy_scans_active") and when they
+        stop ("legacy_scans_until").
+        """
+        if not await self._legacy_entries_possible():
+            return 0
+        deleted = 0
+        for pattern in patterns:
+            deleted += await self.delete_pattern(pattern)
+        return deleted
+    
+    async def endpoint_tags_matching(self, substrings: List[str]) -> List[str]:
+        """Registered endpoint tags whose path contains any of the substrings."""
+        try:
+            redis_client = redis_manager.redis
+            registry_key = self._tag_registry_key("endpoints")
+            await redis_client.zremrangebyscore(registry_key, "-inf", time.time())
+            registered = await redis_client.zrange(registry_key, 0, -1)
+        except Exception as e:
+            logger.error(f"Failed to read endpoint tag registry: {e}")
+            return []
+        return [
+            tag for tag in registered
+            if any(sub in tag[len(CacheTags.ENDPOINT_PREFIX):] for sub in substrings)
+        ]
+    
     async def invalidate_user_cache(self, user_id: str) -> int:
         """Invalidate all cache entries for a specific user."""
-        pattern = RedisKeyManager.cache_key(CacheConfig.USER_CACHE, f"{user_id}:*")
-        deleted = await self.delete_pattern(pattern)
+        deleted = await self.invalidate_tags([CacheTags.user(user_id)])
+        deleted += await self.invalidate_legacy_patterns([
+            RedisKeyManager.cache_key(CacheConfig.USER_CACHE, f"{user_id}:*")
+        ])
         self._cache_stats["invalidations"] += 1
         logger.info(f"Invalidated {deleted} cache entries for user {user_id}")
         return deleted
     
     async def invalidate_endpoint_cache(self, path_pattern: str) -> int:
         """Invalidate cache entries for specific endpoint patterns."""
-        pattern = RedisKeyManager.cache_key(CacheConfig.ENDPOINT_CACHE, f"*{path_pattern}*")
-        deleted = await self.delete_pattern(pattern)
+        deleted = await self.invalidate_tags(await self.endpoint_tags_matching([path_pattern]))
+        deleted += await self.invalidate_legacy_patterns([
+            RedisKeyManager.cache_key(CacheConfig.ENDPOINT_CACHE, f"*{path_pattern}*")
+        ])
         self._cache_stats["invalidations"] += 1
         logger.info(f"Invalidated {deleted} cache entries for pattern {path_pattern}")
         return deleted
@@ -312,10 +845,39 @@ class CacheManager:
             else 0
         )
         
+        invalidation_calls = (
+            self._invalidation_stats["tag_invalidations"] + self._invalidation_stats["scan_invalidations"]
+        )
+        
+        def tier_hit_rate(hits: int, misses: int) -> float:
+            return round(hits / (hits + misses) * 100, 2) if hits + misses > 0 else 0
+        
         return {
             **self._cache_stats,
             "total_operations": total_operations,
             "hit_rate": round(hit_rate * 100, 2),
+            "tiers": {
+                tier: {**counts, "hit_rate": tier_hit_rate(counts["hits"], counts["misses"])}
+                for tier, counts in self._tier_stats.items()
+            },
+            "prefixes": {prefix: dict(counts) for prefix, counts in self._prefix_stats.items()},
+            **self._flight_stats,
+            "invalidation": {
+                **self._invalidation_stats,
+                "avg_fanout": round(
+                    self._invalidation_stats["keys_invalidated"] / invalidation_calls, 2
+                ) if invalidation_calls else 0,
+                "avg_latency_ms": round(
+                    self._invalidation_stats["total_latency_ms"] / invalidation_calls, 2
+                ) if invalidation_calls else 0
+            },
+            # Invalidations also SCAN for untagged legacy keys until a day after the first tagged write
+            "legacy_scans_active": not self._legacy_entries_expired,
+            "legacy_scans_until": datetime.utcfromtimestamp(
+                self._tag_index_since + CacheConfig.TAG_INDEX_TTL
+            ).isoformat() if self._tag_index_since is not None else None,
+            "l1_enabled": self._subscribed,
+            "l1_entries": len(self._local),
             "timestamp": datetime.utcnow().isoformat()
         }
     
@@ -328,6 +890,10 @@ class CacheManager:
             "deletes": 0,
             "invalidations": 0
         }
+        self._tier_stats = self._new_tier_stats()
+        self._prefix_stats = defaultdict(self._new_prefix_stats)
+        self._flight_stats = self._new_flight_stats()
+        self._invalidation_stats = self._new_invalidation_stats()
 
 
 # Global cache manager instance
@@ -339,7 +905,8 @@ def cache_response(
     key_generator: Optional[Callable] = None,
     user_specific: bool = False,
     skip_cache_header: str = "X-Skip-Cache",
-    vary_on: List[str] = None
+    vary_on: List[str] = None,
+    stale_ttl: int = 0
 ):
     """
     Decorator for caching FastAPI endpoint responses.
@@ -350,6 +917,7 @@ def cache_response(
         user_specific: Whether to include user ID in cache key
         skip_cache_header: Header name to skip cache
         vary_on: List of headers/params to vary cache on
+        stale_ttl: Seconds an expired response may still be served while it is refreshed
         
     Usage:
         @router.get("/api/v1/jobs")
@@ -375,15 +943,23 @@ def cache_response(
             if request.headers.get(skip_cache_header):
                 return await func(*args, **kwargs)
             
+            user_id = None
+            if user_specific:
+                # Try to extract user_id from kwargs or dependencies
+                user_id = kwargs.get("user_id") or kwargs.get("current_user_id")
+            
+            # Tags the entry is invalidated by
+            tags = [CacheTags.endpoint(request.url.path)]
+            if user_id:
+                tags.append(CacheTags.user(user_id))
+            job_id = request.path_params.get("job_id") or kwargs.get("job_id")
+            if job_id:
+                tags.append(CacheTags.job(job_id))
+            
             # Generate cache key
             if key_generator:
                 cache_key = await key_generator(request, *args, **kwargs)
             else:
-                user_id = None
-                if user_specific:
-                    # Try to extract user_id from kwargs or dependencies
-                    user_id = kwargs.get("user_id") or kwargs.get("current_user_id")
-                
                 vary_params = {}
                 if vary_on:
                     for header in vary_on:
@@ -398,20 +974,10 @@ def cache_response(
                     additional_params=vary_params
                 )
             
-            # Try to get from cache
-            cached_result = await cache_manager.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return cached_result
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            
-            # Cache the result
-            await cache_manager.set(cache_key, result, ttl)
-            logger.debug(f"Cached result for key: {cache_key}")
-            
-            return result
+            # Concurrent misses for the same key share one call to func
+            return await cache_manager.get_or_set(
+                cache_key, lambda: func(*args, **kwargs), ttl, stale_ttl=stale_ttl, tags=tags
+            )
         
         return wrapper
     return decorator
@@ -419,7 +985,8 @@ def cache_response(
 
 def cache_query(
     ttl: int = CacheConfig.DEFAULT_TTL,
-    key_prefix: str = "query"
+    key_prefix: str = "query",
+    stale_ttl: int = 0
 ):
     """
     Decorator for caching database query results.
@@ -427,6 +994,7 @@ def cache_query(
     Args:
         ttl: Time to live in seconds
         key_prefix: Prefix for cache key
+        stale_ttl: Seconds an expired result may still be served while it is refreshed
         
     Usage:
         @cache_query(ttl=600, key_prefix="user_jobs")
@@ -438,25 +1006,19 @@ def cache_query(
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key from function name and parameters
-            cache_key = CacheKeyGenerator.query_key(
-                f"{key_prefix}:{func.__name__}",
-                {**dict(zip(func.__code__.co_varnames, args)), **kwargs}
-            )
+            params = {**dict(zip(func.__code__.co_varnames, args)), **kwargs}
+            cache_key = CacheKeyGenerator.query_key(f"{key_prefix}:{func.__name__}", params)
             
-            # Try to get from cache
-            cached_result = await cache_manager.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Query cache hit for key: {cache_key}")
-                return cached_result
+            tags = []
+            if params.get("user_id"):
+                tags.append(CacheTags.user(params["user_id"]))
+            if params.get("job_id"):
+                tags.append(CacheTags.job(params["job_id"]))
             
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            
-            # Cache the result
-            await cache_manager.set(cache_key, result, ttl)
-            logger.debug(f"Cached query result for key: {cache_key}")
-            
-            return result
+            # Concurrent misses for the same key share one query
+            return await cache_manager.get_or_set(
+                cache_key, lambda: func(*args, **kwargs), ttl, stale_ttl=stale_ttl, tags=tags
+            )
         
         return wrapper
     return decorator
@@ -468,22 +1030,24 @@ class CacheInvalidationManager:
     @staticmethod
     async def invalidate_job_related_cache(job_id: str, user_id: str = None):
         """Invalidate all cache entries related to a specific job."""
-        patterns_to_invalidate = [
-            f"*jobs*{job_id}*",
-            f"*job_status*{job_id}*",
-            f"*videos*{job_id}*"
+        tags = [CacheTags.job(job_id)]
+        # Entries of endpoints whose path names the job but that were not tagged with it
+        tags.extend(await cache_manager.endpoint_tags_matching([job_id]))
+        legacy_patterns = [
+            RedisKeyManager.cache_key("*jobs*", f"*{job_id}*"),
+            RedisKeyManager.cache_key("*job_status*", f"*{job_id}*"),
+            RedisKeyManager.cache_key("*videos*", f"*{job_id}*")
         ]
         
         if user_id:
-            patterns_to_invalidate.extend([
-                f"*user:{user_id}*jobs*",
-                f"*user_jobs*{user_id}*"
+            tags.append(CacheTags.user(user_id))
+            legacy_patterns.extend([
+                RedisKeyManager.cache_key("*", f"*user:{user_id}*jobs*"),
+                RedisKeyManager.cache_key("*", f"*user_jobs*{user_id}*")
             ])
         
-        total_deleted = 0
-        for pattern in patterns_to_invalidate:
-            deleted = await cache_manager.delete_pattern(pattern)
-            total_deleted += deleted
+        total_deleted = await cache_manager.invalidate_tags(tags)
+        total_deleted += await cache_manager.invalidate_legacy_patterns(legacy_patterns)
         
         logger.info(f"Invalidated {total_deleted} cache entries for job {job_id}")
         return total_deleted
@@ -496,17 +1060,17 @@ class CacheInvalidationManager:
     @staticmethod
     async def invalidate_system_cache():
         """Invalidate system-wide cache entries."""
-        patterns = [
-            f"*{CacheConfig.SYSTEM_CACHE}*",
-            "*health*",
-            "*metrics*",
-            "*queue*"
+        tags = [CacheTags.SYSTEM]
+        tags.extend(await cache_manager.endpoint_tags_matching(["health", "metrics", "queue"]))
+        legacy_patterns = [
+            RedisKeyManager.cache_key(CacheConfig.SYSTEM_CACHE, "*"),
+            RedisKeyManager.cache_key("*", "*health*"),
+            RedisKeyManager.cache_key("*", "*metrics*"),
+            RedisKeyManager.cache_key("*", "*queue*")
         ]
         
-        total_deleted = 0
-        for pattern in patterns:
-            deleted = await cache_manager.delete_pattern(pattern)
-            total_deleted += deleted
+        total_deleted = await cache_manager.invalidate_tags(tags)
+        total_deleted += await cache_manager.invalidate_legacy_patterns(legacy_patterns)
         
         logger.info(f"Invalidated {total_deleted} system cache entries")
         return total_deleted
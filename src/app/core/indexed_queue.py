@@ -0,0 +1,200 @@
+"""
+Indexed multi-level priority queue.
+
+Items are served highest priority level first and first-in first-out within
+a level. Every item is indexed by its ID, so removing an item and looking up
+its position are O(log n) instead of a scan of the queue.
+
+Each level keeps its items in insertion slots together with a Fenwick tree
+over slot occupancy: an item's position within its level is the number of
+occupied slots before it (a prefix sum), and its position in the queue adds
+the sizes of the levels ahead of it. Removed slots are skipped lazily when
+popping and compacted away when the slot array fills up.
+"""
+
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence
+
+# Highest first; matches JobPriority
+PRIORITY_LEVELS = ("urgent", "high", "normal", "low")
+
+_EMPTY = object()
+_INITIAL_CAPACITY = 16
+
+
+class _Level:
+    """FIFO of one priority level with O(log n) rank and removal."""
+
+    def __init__(self):
+        self._reset(_INITIAL_CAPACITY)
+
+    def _reset(self, capacity: int) -> None:
+        self._slots: List[Any] = [_EMPTY] * capacity
+        self._tree = [0] * (capacity + 1)
+        self._index: Dict[Hashable, int] = {}
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _add(self, slot: int, delta: int) -> None:
+        i = slot + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_before(self, slot: int) -> int:
+        total = 0
+        i = slot
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _rebuild(self) -> None:
+        """Compact live items to the front, growing the slot array if at least half full."""
+        live = [item for item in self._slots[self._head:self._tail] if item is not _EMPTY]
+        capacity = max(_INITIAL_CAPACITY, 2 * len(live))
+        if capacity < len(self._slots) and len(live) * 4 > len(self._slots):
+            capacity = len(self._slots)
+        self._reset(capacity)
+        self._slots[:len(live)] = live
+        self._index = {item: slot for slot, item in enumerate(live)}
+        self._tail = len(live)
+
+        # Linear-time Fenwick construction
+        tree = self._tree
+        for i in range(1, capacity + 1):
+            if i <= len(live):
+                tree[i] += 1
+            parent = i + (i & -i)
+            if parent <= capacity:
+                tree[parent] += tree[i]
+
+    def append(self, item: Hashable) -> None:
+        if self._tail == len(self._slots):
+            self._rebuild()
+        slot = self._tail
+        self._slots[slot] = item
+        self._index[item] = slot
+        self._add(slot, 1)
+        self._tail += 1
+
+    def remove(self, item: Hashable) -> None:
+        slot = self._index.pop(item)
+        self._slots[slot] = _EMPTY
+        self._add(slot, -1)
+        if not self._index:
+            self._reset(_INITIAL_CAPACITY)
+
+    def peek(self) -> Any:
+        while self._slots[self._head] is _EMPTY:
+            self._head += 1
+        return self._slots[self._head]
+
+    def rank(self, item: Hashable) -> int:
+        return self._count_before(self._index[item])
+
+    def __iter__(self) -> Iterator[Any]:
+        return (item for item in self._slots[self._head:self._tail] if item is not _EMPTY)
+
+
+class IndexedPriorityQueue:
+    """
+    Priority queue of unique hashable items (e.g. job IDs).
+
+    Operations:
+        push, pop, remove, position   O(log n)
+        peek, len, in                 O(1) amortized
+        items                         O(n)
+
+    Not thread-safe; callers serialize access (QueueService holds an
+    asyncio.Lock).
+    """
+
+    def __init__(self, levels: Sequence[str] = PRIORITY_LEVELS, default_level: str = "normal"):
+        """
+        Args:
+            levels: Priority level names, highest first
+            default_level: Level used for unknown priorities
+        """
+        self.levels = tuple(levels)
+        self._level_numbers = {name: number for number, name in enumerate(self.levels)}
+        self._default_level = self._level_numbers[default_level]
+        self._levels = [_Level() for _ in self.levels]
+        self._item_levels: Dict[Hashable, int] = {}
+
+    def _level_number(self, priority: Any) -> int:
+        # Accept str enums such as JobPriority as well as plain names
+        return self._level_numbers.get(getattr(priority, "value", priority), self._default_level)
+
+    def __len__(self) -> int:
+        return len(self._item_levels)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._item_levels
+
+    def push(self, item: Hashable, priority: Any = "normal") -> bool:
+        """
+        Add an item at the back of its priority level.
+
+        An item that is already queued is moved to the back of the new level.
+
+        Returns:
+            True if the item was newly added, False if it was moved
+        """
+        moved = self.remove(item)
+        number = self._level_number(priority)
+        self._levels[number].append(item)
+        self._item_levels[item] = number
+        return not moved
+
+    def peek(self) -> Optional[Hashable]:
+        """Next item without removing it, or None if empty."""
+        for level in self._levels:
+            if len(level):
+                return level.peek()
+        return None
+
+    def pop(self) -> Optional[Hashable]:
+        """Remove and return the next item, or None if empty."""
+        item = self.peek()
+        if item is not None:
+            self.remove(item)
+        return item
+
+    def remove(self, item: Hashable) -> bool:
+        """Remove an item wherever it is; False if it is not queued."""
+        number = self._item_levels.pop(item, None)
+        if number is None:
+            return False
+        self._levels[number].remove(item)
+        return True
+
+    def position(self, item: Hashable) -> Optional[int]:
+        """0-based position of an item in serving order, or None if not queued."""
+        number = self._item_levels.get(item)
+        if number is None:
+            return None
+        ahead = sum(len(level) for level in self._levels[:number])
+        return ahead + self._levels[number].rank(item)
+
+    def priority_of(self, item: Hashable) -> Optional[str]:
+        """Priority level of a queued item."""
+        number = self._item_levels.get(item)
+        return self.levels[number] if number is not None else None
+
+    def level_lengths(self) -> Dict[str, int]:
+        """Number of queued items per priority level."""
+        return {name: len(level) for name, level in zip(self.levels, self._levels)}
+
+    def items(self) -> List[Hashable]:
+        """All items in serving order."""
+        return [item for level in self._levels for item in level]
+
+    def clear(self) -> int:
+        """Remove all items; returns how many were removed."""
+        count = len(self._item_levels)
+        self._levels = [_Level() for _ in self.levels]
+        self._item_levels.clear()
+        return count
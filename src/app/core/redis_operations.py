@@ -2,12 +2,17 @@
 Redis data access patterns for job storage, queue management, and user indexing.
 
 This module implements the specific Redis operations needed for the video
-generation API, including hash operations for job storage, list operations
-for job queues, and set operations for user job indexing.
+generation API, including hash operations for job storage, a leased job
+queue (list, sorted set and stream), and set operations for user job indexing.
 """
 
-import json
+import os
+import math
+import time
+import uuid
+import socket
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Set, Union
 
@@ -15,10 +20,24 @@ from redis.asyncio import Redis
 from redis.exceptions import RedisError
 
 from .redis import RedisKeyManager, RedisErrorHandler, safe_redis_operation
+from . import serialization
 
 logger = logging.getLogger(__name__)
 
 
+def encode_hash_fields(data: Dict[str, Any]) -> Dict[str, str]:
+    """Encode values for a Redis hash; strings are stored as they are."""
+    return {k: v if isinstance(v, str) else serialization.dumps(v) for k, v in data.items()}
+
+
+def decode_hash_field(value: str) -> Any:
+    """Decode a hash field written by encode_hash_fields (or by older JSON writers)."""
+    try:
+        return serialization.loads(value)
+    except (ValueError, TypeError):
+        return value
+
+
 class JobStorage:
     """
     Redis hash operations for job storage and management.
@@ -51,12 +70,8 @@ class JobStorage:
                 "updated_at": datetime.utcnow().isoformat()
             }
             
-            # Convert all values to strings for Redis hash
-            hash_data = {k: json.dumps(v) if not isinstance(v, str) else v 
-                        for k, v in job_data_with_meta.items()}
-            
             result = await safe_redis_operation(
-                self.redis.hset, key, mapping=hash_data
+                self.redis.hset, key, mapping=encode_hash_fields(job_data_with_meta)
             )
             
             logger.info(f"Created job {job_id} in Redis storage")
@@ -83,15 +98,7 @@ class JobStorage:
             if not hash_data:
                 return None
             
-            # Convert JSON strings back to objects
-            job_data = {}
-            for k, v in hash_data.items():
-                try:
-                    job_data[k] = json.loads(v)
-                except (json.JSONDecodeError, TypeError):
-                    job_data[k] = v
-            
-            return job_data
+            return {k: decode_hash_field(v) for k, v in hash_data.items()}
             
         except Exception as e:
             logger.error(f"Failed to get job {job_id}: {e}")
@@ -117,12 +124,8 @@ class JobStorage:
                 "updated_at": datetime.utcnow().isoformat()
             }
             
-            # Convert values to strings for Redis hash
-            hash_updates = {k: json.dumps(v) if not isinstance(v, str) else v 
-                           for k, v in updates_with_meta.items()}
-            
             result = await safe_redis_operation(
-                self.redis.hset, key, mapping=hash_updates
+                self.redis.hset, key, mapping=encode_hash_fields(updates_with_meta)
             )
             
             logger.debug(f"Updated job {job_id} with fields: {list(updates.keys())}")
@@ -190,28 +193,212 @@ class JobStorage:
             if value is None:
                 return None
             
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return decode_hash_field(value)
                 
         except Exception as e:
             logger.error(f"Failed to get job field {job_id}.{field}: {e}")
             raise RedisErrorHandler.handle_redis_error("get_job_field", e)
 
 
+# Lua scripts for the reliable job queue. Each runs atomically on the server,
+# so a job is always in exactly one of: the ready list, the claim hand-off
+# list, the lease set, or the dead-letter stream.
+
+# Pop the next ready job and lease it.
+# KEYS: queue, leases, owners, attempts; ARGV: lease token, lease deadline
+_CLAIM_SCRIPT = """
+local job_id = redis.call('LPOP', KEYS[1])
+if not job_id then return false end
+redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+redis.call('HSET', KEYS[3], job_id, ARGV[1])
+return {job_id, redis.call('HINCRBY', KEYS[4], job_id, 1)}
+"""
+
+# Lease a job that BLMOVE placed on the hand-off list. Fails if the reclaimer
+# already returned it to the queue.
+# KEYS: claiming, leases, owners, attempts, handoff_seen; ARGV: job id, lease token, lease deadline
+_LEASE_SCRIPT = """
+if redis.call('LREM', KEYS[1], -1, ARGV[1]) == 0 then return false end
+redis.call('HDEL', KEYS[5], ARGV[1])
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[2])
+return redis.call('HINCRBY', KEYS[4], ARGV[1], 1)
+"""
+
+# Extend a lease held by the given token.
+# KEYS: leases, owners; ARGV: job id, lease token, new deadline
+_HEARTBEAT_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZADD', KEYS[1], 'XX', ARGV[3], ARGV[1])
+return 1
+"""
+
+# Finish a leased job. ARGV[2] empty skips the ownership check.
+# KEYS: leases, owners, attempts; ARGV: job id, lease token
+_COMPLETE_SCRIPT = """
+if ARGV[2] ~= '' and redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+local removed = redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+return removed
+"""
+
+# Give a leased job back to the queue. A failure counts as an attempt and
+# dead-letters the job once max attempts are used up; a release does not.
+# KEYS: leases, owners, attempts, queue, dead_letter
+# ARGV: job id, lease token, mode (fail|release), max attempts, front (1|0),
+#       error, timestamp, dead-letter max length
+_RETURN_SCRIPT = """
+if ARGV[2] ~= '' and redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return false end
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then return false end
+redis.call('HDEL', KEYS[2], ARGV[1])
+local attempts = tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or '0')
+if ARGV[3] == 'release' then
+    if attempts > 0 then redis.call('HINCRBY', KEYS[3], ARGV[1], -1) end
+elseif attempts >= tonumber(ARGV[4]) then
+    redis.call('HDEL', KEYS[3], ARGV[1])
+    redis.call('XADD', KEYS[5], 'MAXLEN', '~', ARGV[8], '*',
+        'job_id', ARGV[1], 'attempts', attempts, 'error', ARGV[6], 'failed_at', ARGV[7])
+    return 'dead_letter'
+end
+if ARGV[5] == '1' then
+    redis.call('LPUSH', KEYS[4], ARGV[1])
+else
+    redis.call('RPUSH', KEYS[4], ARGV[1])
+end
+return 'requeued'
+"""
+
+# Return jobs whose lease expired to the front of the queue, or dead-letter
+# them once max attempts are used up. Jobs left on the hand-off list by a
+# worker that died between BLMOVE and leasing are returned once they have
+# been seen there for longer than the lease duration.
+# KEYS: leases, owners, attempts, queue, dead_letter, claiming, handoff_seen
+# ARGV: now, max attempts, lease seconds, dead-letter max length, batch size
+_RECLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local requeued, dead = 0, 0
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, tonumber(ARGV[5]))
+for _, job_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], job_id)
+    redis.call('HDEL', KEYS[2], job_id)
+    local attempts = tonumber(redis.call('HGET', KEYS[3], job_id) or '0')
+    if attempts >= tonumber(ARGV[2]) then
+        redis.call('HDEL', KEYS[3], job_id)
+        redis.call('XADD', KEYS[5], 'MAXLEN', '~', ARGV[4], '*',
+            'job_id', job_id, 'attempts', attempts, 'error', 'lease expired', 'failed_at', ARGV[1])
+        dead = dead + 1
+    else
+        redis.call('LPUSH', KEYS[4], job_id)
+        requeued = requeued + 1
+    end
+end
+for _, job_id in ipairs(redis.call('LRANGE', KEYS[6], 0, tonumber(ARGV[5]) - 1)) do
+    local seen = redis.call('HGET', KEYS[7], job_id)
+    if not seen then
+        redis.call('HSET', KEYS[7], job_id, now)
+    elseif now - tonumber(seen) > tonumber(ARGV[3]) then
+        redis.call('LREM', KEYS[6], 1, job_id)
+        redis.call('HDEL', KEYS[7], job_id)
+        redis.call('LPUSH', KEYS[4], job_id)
+        requeued = requeued + 1
+    end
+end
+return {requeued, dead}
+"""
+
+
+@dataclass
+class JobLease:
+    """A claimed job; the token proves ownership for heartbeat, complete and fail."""
+    job_id: str
+    token: str
+    attempts: int
+    expires_at: float
+
+
 class JobQueue:
     """
-    Redis list operations for job queue management.
+    Reliable Redis job queue with leases.
     
-    Implements a FIFO job queue using Redis lists with support for
-    priority queuing and queue monitoring.
+    Ready jobs wait in a list (``job_queue``; priority jobs are pushed to the
+    front). Claiming moves a job atomically into a lease sorted set scored by
+    lease deadline, so a worker that dies never loses the job: once its lease
+    expires the job is returned to the queue, up to ``max_attempts`` times,
+    after which it is appended to a dead-letter stream. Workers extend their
+    lease with ``heartbeat``; completion is a sorted set removal (O(log n))
+    instead of a scan of a processing list.
+    
+    Keys (all prefixed with the queue key):
+        job_queue                ready jobs (list)
+        job_queue:claiming       hand-off list for blocking claims (BLMOVE target)
+        job_queue:leases         leased jobs scored by lease deadline (sorted set)
+        job_queue:lease_owners   lease token per leased job (hash)
+        job_queue:attempts       claim count per job (hash)
+        job_queue:dead_letter    jobs that used up their attempts (stream)
     """
     
-    def __init__(self, redis_client: Redis):
+    def __init__(
+        self,
+        redis_client: Redis,
+        lease_seconds: int = 300,
+        max_attempts: int = 3,
+        reclaim_interval: float = 15.0,
+        reclaim_batch_size: int = 100,
+        dead_letter_maxlen: int = 10000,
+        worker_id: Optional[str] = None,
+        queue_key: str = RedisKeyManager.JOB_QUEUE
+    ):
+        """
+        Args:
+            redis_client: Redis client
+            lease_seconds: Lease duration; workers must heartbeat more often
+            max_attempts: Claims per job before it is dead-lettered
+            reclaim_interval: Minimum seconds between automatic reclaim passes
+                run by this instance before claiming
+            reclaim_batch_size: Maximum expired leases handled per pass
+            dead_letter_maxlen: Approximate cap on the dead-letter stream length
+            worker_id: Identifier included in lease tokens (default host:pid)
+            queue_key: Ready list key; the other keys are derived from it
+        """
         self.redis = redis_client
-        self.queue_key = RedisKeyManager.JOB_QUEUE
+        self.queue_key = queue_key
+        # List used by the previous implementation; see requeue_legacy_processing
         self.processing_key = f"{self.queue_key}:processing"
+        self.claiming_key = f"{self.queue_key}:claiming"
+        self.handoff_seen_key = f"{self.queue_key}:claiming_seen"
+        self.leases_key = f"{self.queue_key}:leases"
+        self.owners_key = f"{self.queue_key}:lease_owners"
+        self.attempts_key = f"{self.queue_key}:attempts"
+        self.dead_letter_key = f"{self.queue_key}:dead_letter"
+        
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.reclaim_interval = reclaim_interval
+        self.reclaim_batch_size = reclaim_batch_size
+        self.dead_letter_maxlen = dead_letter_maxlen
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        
+        self._claim_script = redis_client.register_script(_CLAIM_SCRIPT)
+        self._lease_script = redis_client.register_script(_LEASE_SCRIPT)
+        self._heartbeat_script = redis_client.register_script(_HEARTBEAT_SCRIPT)
+        self._complete_script = redis_client.register_script(_COMPLETE_SCRIPT)
+        self._return_script = redis_client.register_script(_RETURN_SCRIPT)
+        self._reclaim_script = redis_client.register_script(_RECLAIM_SCRIPT)
+        
+        # Leases claimed through dequeue_job, so complete_job(job_id) keeps working
+        self._leases: Dict[str, JobLease] = {}
+        self._last_reclaim = 0.0
+    
+    def _new_token(self) -> str:
+        return f"{self.worker_id}:{uuid.uuid4().hex}"
+    
+    def _token_for(self, job_id: str, lease: Optional[JobLease]) -> str:
+        """Token for ownership checks; empty (unchecked) if this instance holds no lease."""
+        if lease is not None:
+            return lease.token
+        held = self._leases.get(job_id)
+        return held.token if held else ""
     
     async def enqueue_job(self, job_id: str, priority: bool = False) -> int:
         """
@@ -241,61 +428,143 @@ class JobQueue:
             logger.error(f"Failed to enqueue job {job_id}: {e}")
             raise RedisErrorHandler.handle_redis_error("enqueue_job", e)
     
-    async def dequeue_job(self, timeout: int = 0) -> Optional[str]:
+    async def claim_job(self, timeout: int = 0, lease_seconds: Optional[float] = None) -> Optional[JobLease]:
         """
-        Remove and return the next job from the queue.
+        Claim the next job under a lease.
         
         Args:
             timeout: Blocking timeout in seconds (0 for non-blocking)
+            lease_seconds: Lease duration for this claim (default: the queue's
+                ``lease_seconds``); ``math.inf`` for a lease that never expires
             
         Returns:
-            Job ID or None if queue is empty
+            The lease, or None if no job became available
         """
+        if lease_seconds is None:
+            lease_seconds = self.lease_seconds
         try:
-            if timeout > 0:
-                # Blocking pop with timeout
-                result = await safe_redis_operation(
-                    self.redis.blpop, self.queue_key, timeout=timeout
+            await self._maybe_reclaim()
+            
+            token = self._new_token()
+            expires_at = time.time() + lease_seconds
+            result = await safe_redis_operation(
+                self._claim_script,
+                keys=[self.queue_key, self.leases_key, self.owners_key, self.attempts_key],
+                args=[token, expires_at]
+            )
+            if result:
+                job_id, attempts = result
+            elif timeout > 0:
+                # Wait without polling: BLMOVE parks the job on the hand-off
+                # list, where the reclaimer finds it if we die before leasing
+                job_id = await safe_redis_operation(
+                    self.redis.blmove, self.queue_key, self.claiming_key, timeout, "LEFT", "RIGHT"
                 )
-                if result:
-                    _, job_id = result
-                    # Move to processing queue
-                    await safe_redis_operation(
-                        self.redis.lpush, self.processing_key, job_id
-                    )
-                    logger.info(f"Dequeued job {job_id} for processing")
-                    return job_id
+                if not job_id:
+                    return None
+                expires_at = time.time() + lease_seconds
+                attempts = await safe_redis_operation(
+                    self._lease_script,
+                    keys=[self.claiming_key, self.leases_key, self.owners_key,
+                          self.attempts_key, self.handoff_seen_key],
+                    args=[job_id, token, expires_at]
+                )
+                if not attempts:
+                    logger.warning(f"Job {job_id} was reclaimed before it could be leased")
+                    return None
             else:
-                # Non-blocking pop
-                job_id = await safe_redis_operation(self.redis.lpop, self.queue_key)
-                if job_id:
-                    # Move to processing queue
-                    await safe_redis_operation(
-                        self.redis.lpush, self.processing_key, job_id
-                    )
-                    logger.info(f"Dequeued job {job_id} for processing")
-                    return job_id
+                return None
+            
+            lease = JobLease(job_id=job_id, token=token, attempts=int(attempts), expires_at=expires_at)
+            self._leases[job_id] = lease
+            logger.info(f"Claimed job {job_id} (attempt {lease.attempts}/{self.max_attempts})")
+            return lease
+            
+        except Exception as e:
+            logger.error(f"Failed to claim job: {e}")
+            raise RedisErrorHandler.handle_redis_error("claim_job", e)
+    
+    async def dequeue_job(self, timeout: int = 0, lease_seconds: Optional[float] = math.inf) -> Optional[str]:
+        """
+        Claim the next job and return its ID.
+        
+        The lease is remembered by this instance, so ``complete_job``,
+        ``fail_job`` and ``heartbeat`` can be called with the job ID alone.
+        
+        By default the lease never expires, like a job in the previous
+        implementation's processing list: callers written for that queue do
+        not heartbeat, and an expiring lease would hand their long-running
+        jobs to a second worker. Such a job is therefore never reclaimed; if
+        its worker dies it stays leased until ``fail_job`` or ``requeue_job``
+        is called for it. A first ``heartbeat`` turns it into an ordinary
+        lease of ``lease_seconds``. Pass ``lease_seconds=None`` (or use
+        ``claim_job``) to get a reclaimable lease.
+        
+        Args:
+            timeout: Blocking timeout in seconds (0 for non-blocking)
+            lease_seconds: Lease duration (None for the queue's ``lease_seconds``)
+            
+        Returns:
+            Job ID or None if queue is empty
+        """
+        lease = await self.claim_job(timeout=timeout, lease_seconds=lease_seconds)
+        return lease.job_id if lease else None
+    
+    async def heartbeat(self, job_id: str, lease: Optional[JobLease] = None) -> bool:
+        """
+        Extend a job's lease by ``lease_seconds``.
+        
+        Args:
+            job_id: Job identifier
+            lease: Lease from claim_job (default: the one held by this instance)
+            
+        Returns:
+            False if the lease was lost (expired and reclaimed); the worker
+            should stop processing the job
+        """
+        token = self._token_for(job_id, lease)
+        if not token:
+            return False
+        try:
+            expires_at = time.time() + self.lease_seconds
+            extended = await safe_redis_operation(
+                self._heartbeat_script,
+                keys=[self.leases_key, self.owners_key],
+                args=[job_id, token, expires_at]
+            )
+            if extended:
+                held = lease or self._leases.get(job_id)
+                if held:
+                    held.expires_at = expires_at
+                return True
             
-            return None
+            self._leases.pop(job_id, None)
+            logger.warning(f"Lease on job {job_id} was lost")
+            return False
             
         except Exception as e:
-            logger.error(f"Failed to dequeue job: {e}")
-            raise RedisErrorHandler.handle_redis_error("dequeue_job", e)
+            logger.error(f"Failed to extend lease on job {job_id}: {e}")
+            raise RedisErrorHandler.handle_redis_error("heartbeat", e)
     
-    async def complete_job(self, job_id: str) -> bool:
+    async def complete_job(self, job_id: str, lease: Optional[JobLease] = None) -> bool:
         """
-        Mark a job as completed and remove from processing queue.
+        Mark a job as completed and release its lease.
         
         Args:
             job_id: Job identifier
+            lease: Lease from claim_job (default: the one held by this instance;
+                without either the lease is released unconditionally)
             
         Returns:
-            True if job was removed from processing queue
+            True if the job's lease was released
         """
         try:
             result = await safe_redis_operation(
-                self.redis.lrem, self.processing_key, 1, job_id
+                self._complete_script,
+                keys=[self.leases_key, self.owners_key, self.attempts_key],
+                args=[job_id, self._token_for(job_id, lease)]
             )
+            self._leases.pop(job_id, None)
             
             if result:
                 logger.info(f"Completed job {job_id}")
@@ -308,35 +577,129 @@ class JobQueue:
             logger.error(f"Failed to complete job {job_id}: {e}")
             raise RedisErrorHandler.handle_redis_error("complete_job", e)
     
-    async def requeue_job(self, job_id: str, priority: bool = True) -> bool:
+    async def _return_job(
+        self,
+        operation: str,
+        job_id: str,
+        lease: Optional[JobLease],
+        mode: str,
+        priority: bool,
+        error: str = ""
+    ) -> Optional[str]:
+        try:
+            result = await safe_redis_operation(
+                self._return_script,
+                keys=[self.leases_key, self.owners_key, self.attempts_key,
+                      self.queue_key, self.dead_letter_key],
+                args=[job_id, self._token_for(job_id, lease), mode, self.max_attempts,
+                      1 if priority else 0, error, time.time(), self.dead_letter_maxlen]
+            )
+            self._leases.pop(job_id, None)
+            return result
+        except Exception as e:
+            logger.error(f"Failed to {operation.replace('_', ' ')} {job_id}: {e}")
+            raise RedisErrorHandler.handle_redis_error(operation, e)
+    
+    async def fail_job(
+        self,
+        job_id: str,
+        error: str = "",
+        lease: Optional[JobLease] = None,
+        priority: bool = False
+    ) -> Optional[str]:
+        """
+        Record a failed attempt and retry the job, or dead-letter it once
+        ``max_attempts`` claims have failed.
+        
+        Args:
+            job_id: Job identifier
+            error: Error message stored with a dead-lettered job
+            lease: Lease from claim_job (default: the one held by this instance)
+            priority: If True, retry from the front of the queue
+            
+        Returns:
+            "requeued", "dead_letter", or None if the job was not leased
+        """
+        result = await self._return_job("fail_job", job_id, lease, "fail", priority, error)
+        if result == "dead_letter":
+            logger.error(f"Job {job_id} moved to dead letter after {self.max_attempts} attempts: {error}")
+        elif result:
+            logger.warning(f"Job {job_id} failed, requeued for retry: {error}")
+        else:
+            logger.warning(f"Job {job_id} not found in processing queue")
+        return result
+    
+    async def requeue_job(self, job_id: str, priority: bool = True, lease: Optional[JobLease] = None) -> bool:
         """
-        Move a job from processing back to the main queue.
+        Move a job from processing back to the main queue without counting
+        the attempt (e.g. on worker shutdown).
         
         Args:
             job_id: Job identifier
             priority: If True, add to front of queue
+            lease: Lease from claim_job (default: the one held by this instance)
             
         Returns:
             True if job was requeued successfully
         """
+        result = await self._return_job("requeue_job", job_id, lease, "release", priority)
+        if result:
+            logger.info(f"Requeued job {job_id}")
+            return True
+        logger.warning(f"Job {job_id} not found in processing queue")
+        return False
+    
+    async def _maybe_reclaim(self) -> None:
+        if time.monotonic() - self._last_reclaim >= self.reclaim_interval:
+            self._last_reclaim = time.monotonic()
+            await self.reclaim_expired()
+    
+    async def reclaim_expired(self) -> Dict[str, int]:
+        """
+        Return jobs with expired leases to the front of the queue.
+        
+        Runs automatically before claims (at most every ``reclaim_interval``
+        seconds per instance); can also be called from a maintenance task.
+        
+        Returns:
+            Counts of requeued and dead-lettered jobs
+        """
         try:
-            # Remove from processing queue
-            removed = await safe_redis_operation(
-                self.redis.lrem, self.processing_key, 1, job_id
+            requeued, dead = await safe_redis_operation(
+                self._reclaim_script,
+                keys=[self.leases_key, self.owners_key, self.attempts_key, self.queue_key,
+                      self.dead_letter_key, self.claiming_key, self.handoff_seen_key],
+                args=[time.time(), self.max_attempts, self.lease_seconds,
+                      self.dead_letter_maxlen, self.reclaim_batch_size]
             )
-            
-            if removed:
-                # Add back to main queue
-                await self.enqueue_job(job_id, priority=priority)
-                logger.info(f"Requeued job {job_id}")
-                return True
-            else:
-                logger.warning(f"Job {job_id} not found in processing queue")
-                return False
-                
+            if requeued or dead:
+                logger.warning(f"Reclaimed expired leases: {requeued} requeued, {dead} dead-lettered")
+            return {"requeued": int(requeued), "dead_letter": int(dead)}
         except Exception as e:
-            logger.error(f"Failed to requeue job {job_id}: {e}")
-            raise RedisErrorHandler.handle_redis_error("requeue_job", e)
+            logger.error(f"Failed to reclaim expired leases: {e}")
+            raise RedisErrorHandler.handle_redis_error("reclaim_expired", e)
+    
+    async def requeue_legacy_processing(self) -> int:
+        """
+        Move jobs left in the processing list of the previous queue
+        implementation back to the queue. Run once after upgrading, when no
+        worker of the previous version is running.
+        
+        Returns:
+            Number of jobs requeued
+        """
+        try:
+            moved = 0
+            while await safe_redis_operation(
+                self.redis.lmove, self.processing_key, self.queue_key, "RIGHT", "LEFT"
+            ):
+                moved += 1
+            if moved:
+                logger.warning(f"Requeued {moved} jobs from legacy processing list")
+            return moved
+        except Exception as e:
+            logger.error(f"Failed to requeue legacy processing jobs: {e}")
+            raise RedisErrorHandler.handle_redis_error("requeue_legacy_processing", e)
     
     async def get_queue_length(self) -> int:
         """
@@ -359,11 +722,47 @@ class JobQueue:
             Number of jobs in processing
         """
         try:
-            return await safe_redis_operation(self.redis.llen, self.processing_key)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zcard(self.leases_key)
+                pipe.llen(self.claiming_key)
+                leased, claiming = await pipe.execute()
+            return leased + claiming
         except Exception as e:
             logger.error(f"Failed to get processing length: {e}")
             raise RedisErrorHandler.handle_redis_error("get_processing_length", e)
     
+    async def get_dead_letter_length(self) -> int:
+        """
+        Get the number of dead-lettered jobs.
+        
+        Returns:
+            Number of entries in the dead-letter stream
+        """
+        try:
+            return await safe_redis_operation(self.redis.xlen, self.dead_letter_key)
+        except Exception as e:
+            logger.error(f"Failed to get dead letter length: {e}")
+            raise RedisErrorHandler.handle_redis_error("get_dead_letter_length", e)
+    
+    async def get_dead_letters(self, count: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get the most recent dead-lettered jobs.
+        
+        Args:
+            count: Number of entries to return
+            
+        Returns:
+            Entries with job_id, attempts, error, failed_at and the stream entry id
+        """
+        try:
+            entries = await safe_redis_operation(
+                self.redis.xrevrange, self.dead_letter_key, count=count
+            )
+            return [{"entry_id": entry_id, **fields} for entry_id, fields in entries]
+        except Exception as e:
+            logger.error(f"Failed to get dead letters: {e}")
+            raise RedisErrorHandler.handle_redis_error("get_dead_letters", e)
+    
     async def peek_queue(self, count: int = 10) -> List[str]:
         """
         Peek at jobs in the queue without removing them.
@@ -702,9 +1101,7 @@ class RedisOperations:
                     "created_at": datetime.utcnow().isoformat(),
                     "updated_at": datetime.utcnow().isoformat()
                 }
-                hash_data = {k: json.dumps(v) if not isinstance(v, str) else v 
-                            for k, v in job_data_with_meta.items()}
-                pipe.hset(job_key, mapping=hash_data)
+                pipe.hset(job_key, mapping=encode_hash_fields(job_data_with_meta))
                 
                 # Add to queue
                 if priority:
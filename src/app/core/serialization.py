@@ -0,0 +1,255 @@
+"""
+Pluggable serialization for cached and stored payloads.
+
+Every encoded value starts with a short versioned header naming the codec
+that wrote it, so readers always pick the matching decoder and the write
+codec can be changed without flushing Redis or the cache tables. Values
+written before the header existed (plain ``json.dumps`` output) are still
+decoded as JSON.
+
+Codecs:
+    json     Standard library JSON; always available
+    orjson   orjson, several times faster; text output, so it works with
+             clients created with ``decode_responses=True`` and text columns
+    msgpack  MessagePack; binary, so only for binary-safe transports (Redis
+             clients without ``decode_responses``, bytea columns)
+    legacy   Plain ``json.dumps(value, default=str)`` without a header, for
+             writing while older readers are still deployed
+
+datetime, date, time, UUID, Decimal, Enum, sets and Pydantic models are
+encoded natively by every codec. The JSON codecs decode them as strings
+(timestamps in ``isoformat()`` form, which the API already writes); msgpack
+restores datetime, date, time and UUID values.
+"""
+
+import json
+import uuid
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Header: record separator, envelope version, codec tag
+ENVELOPE_MARK = "\x1e"
+ENVELOPE_VERSION = "1"
+_HEADER_LENGTH = 3
+
+
+class SerializationError(ValueError):
+    """Raised when a payload cannot be encoded or decoded."""
+
+
+def _to_builtin(obj: Any) -> Any:
+    """Convert values the JSON encoders do not handle natively."""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (uuid.UUID, Decimal)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    # Same fallback as json.dumps(..., default=str)
+    return str(obj)
+
+
+class Codec:
+    """Encodes values to str (text codecs) or bytes (binary codecs)."""
+
+    name = ""
+    tag = ""
+    binary = False
+
+    def encode_body(self, value: Any) -> Union[str, bytes]:
+        raise NotImplementedError
+
+    def decode_body(self, body: Union[str, bytes]) -> Any:
+        raise NotImplementedError
+
+    def dumps(self, value: Any) -> Union[str, bytes]:
+        """Encode a value with the envelope header."""
+        header = f"{ENVELOPE_MARK}{ENVELOPE_VERSION}{self.tag}"
+        body = self.encode_body(value)
+        return header.encode("ascii") + body if self.binary else header + body
+
+
+class JsonCodec(Codec):
+    name = "json"
+    tag = "j"
+
+    def encode_body(self, value: Any) -> str:
+        return json.dumps(value, default=_to_builtin, separators=(",", ":"))
+
+    def decode_body(self, body: Union[str, bytes]) -> Any:
+        return json.loads(body)
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+    tag = "o"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson package is required for the orjson codec. Install with: pip install orjson")
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def encode_body(self, value: Any) -> str:
+        try:
+            return orjson.dumps(value, default=_to_builtin, option=self._options).decode("utf-8")
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the standard library handles
+            return JsonCodec().encode_body(value)
+
+    def decode_body(self, body: Union[str, bytes]) -> Any:
+        return orjson.loads(body)
+
+
+# msgpack extension types for values restored on decode
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_TIME = 3
+_EXT_UUID = 4
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+    tag = "m"
+    binary = True
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack package is required for the msgpack codec. Install with: pip install msgpack")
+
+    @staticmethod
+    def _default(obj: Any) -> Any:
+        if isinstance(obj, datetime):
+            return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode("ascii"))
+        if isinstance(obj, date):
+            return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode("ascii"))
+        if isinstance(obj, time):
+            return msgpack.ExtType(_EXT_TIME, obj.isoformat().encode("ascii"))
+        if isinstance(obj, uuid.UUID):
+            return msgpack.ExtType(_EXT_UUID, obj.bytes)
+        return _to_builtin(obj)
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == _EXT_DATETIME:
+            return datetime.fromisoformat(data.decode("ascii"))
+        if code == _EXT_DATE:
+            return date.fromisoformat(data.decode("ascii"))
+        if code == _EXT_TIME:
+            return time.fromisoformat(data.decode("ascii"))
+        if code == _EXT_UUID:
+            return uuid.UUID(bytes=data)
+        return msgpack.ExtType(code, data)
+
+    def encode_body(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True, datetime=False)
+
+    def decode_body(self, body: Union[str, bytes]) -> Any:
+        if isinstance(body, str):
+            raise SerializationError("msgpack payload was decoded as text; use a binary-safe client")
+        return msgpack.unpackb(body, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+class LegacyJsonCodec(JsonCodec):
+    """Writes the pre-envelope format; decoding goes through the JSON fallback."""
+
+    name = "legacy"
+
+    def dumps(self, value: Any) -> str:
+        return json.dumps(value, default=str)
+
+
+_CODEC_TYPES = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+    "legacy": LegacyJsonCodec,
+}
+_TAGS = {"j": "json", "o": "orjson", "m": "msgpack"}
+_codecs: Dict[str, Codec] = {}
+_default_codec_name: Optional[str] = None
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    Get a codec by name.
+
+    Args:
+        name: One of json, orjson, msgpack or legacy; None for the default
+            text codec (orjson when installed, otherwise json)
+    """
+    if name is None:
+        name = _default_codec_name or ("orjson" if orjson is not None else "json")
+    codec = _codecs.get(name)
+    if codec is None:
+        if name not in _CODEC_TYPES:
+            raise ValueError(f"Unknown codec: {name}. Available: {', '.join(_CODEC_TYPES)}")
+        codec = _codecs[name] = _CODEC_TYPES[name]()
+    return codec
+
+
+def set_default_codec(name: Optional[str]) -> None:
+    """Set the codec dumps() uses when none is given (must be a text codec)."""
+    global _default_codec_name
+    if name is not None and get_codec(name).binary:
+        raise ValueError(f"The default codec must produce text; {name} is binary")
+    _default_codec_name = name
+
+
+def dumps(value: Any, codec: Optional[str] = None) -> Union[str, bytes]:
+    """Encode a value with the named codec (default text codec if None)."""
+    try:
+        return get_codec(codec).dumps(value)
+    except (TypeError, OverflowError) as e:
+        raise SerializationError(f"Cannot encode value of type {type(value).__name__}: {e}") from e
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    Decode a value written by dumps() or by plain json.dumps().
+
+    Raises:
+        SerializationError: If the payload is not valid for its codec
+    """
+    if isinstance(data, (bytearray, memoryview)):
+        data = bytes(data)
+
+    is_bytes = isinstance(data, bytes)
+    mark = data[:1].decode("latin-1") if is_bytes else data[:1]
+    if mark != ENVELOPE_MARK:
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise SerializationError(f"Invalid legacy JSON payload: {e}") from e
+
+    header = data[:_HEADER_LENGTH]
+    if is_bytes:
+        header = header.decode("latin-1")
+    version, tag = header[1:2], header[2:3]
+    if version != ENVELOPE_VERSION or tag not in _TAGS:
+        raise SerializationError(f"Unsupported payload header {header!r}")
+
+    try:
+        return get_codec(_TAGS[tag]).decode_body(data[_HEADER_LENGTH:])
+    except SerializationError:
+        raise
+    except Exception as e:
+        raise SerializationError(f"Invalid {_TAGS[tag]} payload: {e}") from e
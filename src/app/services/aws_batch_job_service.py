@@ -18,6 +18,7 @@ from ..models.job import (
     BatchJobCreateRequest, BatchJobResponse
 )
 from ..database.connection import RDSConnectionManager
+from ..core import serialization
 from ..database.pydantic_models import JobDB, JobQueueDB
 from ..core.exceptions import JobValidationError, DatabaseError
 
@@ -1360,9 +1361,8 @@ class AWSBatchJobService(AWSJobService):
         
         try:
             cache_key = f"batch_metadata:{batch_id}"
-            import json
             await self.redis_client.setex(
-                cache_key, self._cache_ttl, json.dumps(metadata)
+                cache_key, self._cache_ttl, serialization.dumps(metadata)
             )
         except Exception as e:
             logger.warning(f"Failed to cache batch metadata {batch_id}: {e}")
@@ -1376,8 +1376,7 @@ class AWSBatchJobService(AWSJobService):
             cache_key = f"batch_metadata:{batch_id}"
             cached_data = await self.redis_client.get(cache_key)
             if cached_data:
-                import json
-                return json.loads(cached_data)
+                return serialization.loads(cached_data)
         except Exception as e:
             logger.warning(f"Failed to get cached batch metadata {batch_id}: {e}")
         
@@ -33,6 +33,7 @@ from ..models.job import Job, JobStatus
 from ..database.connection import RDSConnectionManager
 from ..database.pydantic_models import FileMetadataDB
 from src.config.aws_config import AWSConfig
+from src.utils.media_probe import get_media_probe_service
 
 logger = logging.getLogger(__name__)
 
@@ -852,41 +853,20 @@ class AWSVideoService:
             return await loop.run_in_executor(executor, _hash_file)
     
     async def _extract_video_metadata(self, video_path: str) -> Dict[str, Any]:
-        """Extract video metadata using OpenCV."""
-        loop = asyncio.get_event_loop()
-        
-        def _extract_metadata():
-            try:
-                cap = cv2.VideoCapture(video_path)
-                
-                if not cap.isOpened():
-                    logger.warning(f"Could not open video file: {video_path}")
-                    return {}
-                
-                # Get video properties
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                
-                duration_seconds = frame_count / fps if fps > 0 else 0
-                
-                cap.release()
-                
-                return {
-                    'width': width,
-                    'height': height,
-                    'frame_rate': fps,
-                    'frame_count': frame_count,
-                    'duration_seconds': duration_seconds
-                }
-                
-            except Exception as e:
-                logger.error(f"Failed to extract video metadata: {e}")
-                return {}
+        """Extract video metadata using the shared media probe service."""
+        try:
+            probe = await get_media_probe_service().probe_async(video_path)
+        except Exception as e:
+            logger.error(f"Failed to extract video metadata: {e}")
+            return {}
         
-        with ThreadPoolExecutor() as executor:
-            return await loop.run_in_executor(executor, _extract_metadata)
+        return {
+            'width': probe.width,
+            'height': probe.height,
+            'frame_rate': probe.fps,
+            'frame_count': probe.frame_count,
+            'duration_seconds': probe.duration
+        }
     
     async def _extract_video_frame(self, video_path: str, timestamp_seconds: float) -> Optional[str]:
         """Extract a frame from video at specified timestamp."""
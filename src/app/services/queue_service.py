@@ -3,15 +3,17 @@ In-memory queue management service for handling job queues and processing.
 
 This service provides business logic for job queue operations,
 including queue management, job processing coordination, and monitoring.
-Uses in-memory storage for queue operations.
+Uses in-memory storage for queue operations: an indexed priority queue
+(urgent, high, normal, low; FIFO within a level) with O(log n) enqueue,
+dequeue, removal and position lookup.
 """
 
 import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
-from collections import deque
-import threading
+
+from ..core.indexed_queue import IndexedPriorityQueue
 
 logger = logging.getLogger(__name__)
 
@@ -25,8 +27,8 @@ class QueueService:
     """
     
     def __init__(self):
-        self._job_queue = deque()
-        self._queue_lock = threading.Lock()
+        self._job_queue = IndexedPriorityQueue()
+        self._queue_lock = asyncio.Lock()
         self._processing_jobs = set()
         self._completed_today = 0
         self._failed_today = 0
@@ -41,36 +43,21 @@ class QueueService:
         
         Args:
             job_id: Job ID to enqueue
-            priority: Job priority (affects queue position)
-            
+            priority: Job priority (urgent, high, normal or low); jobs are
+                served by priority, first-in first-out within a priority.
+                Enqueuing a queued job moves it to the back of the new priority.
+        
         Returns:
             True if job was enqueued successfully, False otherwise
         """
         try:
-            with self._queue_lock:
-                # Add job to appropriate position based on priority
-                if priority == "urgent":
-                    # Add to front of queue for urgent jobs
-                    self._job_queue.appendleft(job_id)
-                elif priority == "high":
-                    # Add near front for high priority jobs
-                    if len(self._job_queue) <= 3:
-                        self._job_queue.appendleft(job_id)
-                    else:
-                        # Insert at position 3 for high priority
-                        temp_queue = deque()
-                        for _ in range(min(3, len(self._job_queue))):
-                            temp_queue.append(self._job_queue.popleft())
-                        self._job_queue.appendleft(job_id)
-                        while temp_queue:
-                            self._job_queue.appendleft(temp_queue.pop())
+            async with self._queue_lock:
+                if self._job_queue.push(job_id, priority):
+                    self._queue_stats["total_enqueued"] += 1
+                    logger.info(f"Job {job_id} enqueued with priority {priority}")
                 else:
-                    # Normal and low priority jobs go to the end
-                    self._job_queue.append(job_id)
-                
-                self._queue_stats["total_enqueued"] += 1
+                    logger.info(f"Job {job_id} requeued with priority {priority}")
             
-            logger.info(f"Job {job_id} enqueued with priority {priority}")
             return True
             
         except Exception as e:
@@ -85,9 +72,9 @@ class QueueService:
             Job ID if available, None if queue is empty
         """
         try:
-            with self._queue_lock:
-                if self._job_queue:
-                    job_id = self._job_queue.popleft()
+            async with self._queue_lock:
+                job_id = self._job_queue.pop()
+                if job_id is not None:
                     self._processing_jobs.add(job_id)
                     logger.info(f"Dequeued job {job_id}")
                     return job_id
@@ -106,10 +93,8 @@ class QueueService:
             Next job ID if available, None if queue is empty
         """
         try:
-            with self._queue_lock:
-                if self._job_queue:
-                    return self._job_queue[0]
-            return None
+            async with self._queue_lock:
+                return self._job_queue.peek()
             
         except Exception as e:
             logger.error(f"Failed to peek next job: {e}", exc_info=True)
@@ -123,7 +108,7 @@ class QueueService:
             Number of jobs in queue
         """
         try:
-            with self._queue_lock:
+            async with self._queue_lock:
                 return len(self._job_queue)
         except Exception as e:
             logger.error(f"Failed to get queue length: {e}")
@@ -140,13 +125,9 @@ class QueueService:
             Queue position (0-based) or None if not found
         """
         try:
-            with self._queue_lock:
-                try:
-                    position = list(self._job_queue).index(job_id)
-                    return position
-                except ValueError:
-                    return None
-                    
+            async with self._queue_lock:
+                return self._job_queue.position(job_id)
+        
         except Exception as e:
             logger.error(f"Failed to get queue position for job {job_id}: {e}")
             return None
@@ -162,13 +143,8 @@ class QueueService:
             True if job was removed, False otherwise
         """
         try:
-            with self._queue_lock:
-                # Convert to list to find and remove
-                queue_list = list(self._job_queue)
-                if job_id in queue_list:
-                    queue_list.remove(job_id)
-                    self._job_queue.clear()
-                    self._job_queue.extend(queue_list)
+            async with self._queue_lock:
+                if self._job_queue.remove(job_id):
                     logger.info(f"Removed job {job_id} from queue")
                     return True
                 else:
@@ -188,7 +164,7 @@ class QueueService:
             success: Whether the job completed successfully
         """
         try:
-            with self._queue_lock:
+            async with self._queue_lock:
                 self._processing_jobs.discard(job_id)
                 self._queue_stats["total_processed"] += 1
                 
@@ -210,12 +186,13 @@ class QueueService:
             Dictionary containing queue statistics
         """
         try:
-            with self._queue_lock:
+            async with self._queue_lock:
                 queue_length = len(self._job_queue)
                 processing_jobs = len(self._processing_jobs)
                 
                 return {
                     "queue_length": queue_length,
+                    "queue_length_by_priority": self._job_queue.level_lengths(),
                     "processing_jobs": processing_jobs,
                     "completed_today": self._completed_today,
                     "failed_today": self._failed_today,
@@ -246,7 +223,7 @@ class QueueService:
             List of job IDs currently being processed
         """
         try:
-            with self._queue_lock:
+            async with self._queue_lock:
                 return list(self._processing_jobs)
         except Exception as e:
             logger.error(f"Failed to get processing jobs: {e}")
@@ -257,7 +234,7 @@ class QueueService:
         Reset daily statistics (typically called at midnight).
         """
         try:
-            with self._queue_lock:
+            async with self._queue_lock:
                 self._completed_today = 0
                 self._failed_today = 0
             
@@ -274,9 +251,8 @@ class QueueService:
             Number of jobs that were removed
         """
         try:
-            with self._queue_lock:
-                count = len(self._job_queue)
-                self._job_queue.clear()
+            async with self._queue_lock:
+                count = self._job_queue.clear()
                 logger.info(f"Cleared {count} jobs from queue")
                 return count
                 
@@ -288,18 +264,20 @@ class QueueService:
         """
         Get a snapshot of the current queue state (synchronous).
         
+        Runs without the lock: queue updates never await while holding it,
+        so a synchronous caller on the event loop sees a consistent state.
+        
         Returns:
             Dictionary containing queue snapshot
         """
         try:
-            with self._queue_lock:
-                return {
-                    "queue_jobs": list(self._job_queue),
-                    "processing_jobs": list(self._processing_jobs),
-                    "queue_length": len(self._job_queue),
-                    "processing_count": len(self._processing_jobs),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
+            return {
+                "queue_jobs": self._job_queue.items(),
+                "processing_jobs": list(self._processing_jobs),
+                "queue_length": len(self._job_queue),
+                "processing_count": len(self._processing_jobs),
+                "timestamp": datetime.utcnow().isoformat()
+            }
         except Exception as e:
             logger.error(f"Failed to get queue snapshot: {e}")
             return {
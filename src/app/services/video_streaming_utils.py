@@ -17,6 +17,14 @@ from enum import Enum
 import cv2
 from PIL import Image
 
+from src.utils.media_probe import get_media_probe_service
+from src.utils.frame_sampler import (
+    BRIGHTNESS_CONTRAST_SCORER,
+    THUMBNAIL_MODE,
+    get_frame_sampler,
+    luminance,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -106,26 +114,24 @@ class VideoStreamingOptimizer:
         
         def _analyze_video():
             try:
-                cap = cv2.VideoCapture(video_path)
-                
-                if not cap.isOpened():
+                try:
+                    probe = get_media_probe_service().probe(video_path)
+                except Exception as e:
+                    logger.warning(f"Could not probe video file: {e}")
                     return {'error': 'Could not open video file'}
                 
                 # Get video properties
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                duration = frame_count / fps if fps > 0 else 0
+                width = probe.width
+                height = probe.height
+                fps = probe.fps
+                duration = probe.duration
                 
                 # Get file size
-                file_size = os.path.getsize(video_path)
+                file_size = probe.size
                 
                 # Calculate current bitrate
                 current_bitrate_kbps = (file_size * 8) / (duration * 1000) if duration > 0 else 0
                 
-                cap.release()
-                
                 # Determine optimal streaming quality
                 optimal_quality = VideoStreamingOptimizer._determine_optimal_quality(
                     width, height, current_bitrate_kbps
@@ -241,90 +247,43 @@ class ThumbnailGenerator:
         
         def _generate_thumbnails():
             try:
-                cap = cv2.VideoCapture(video_path)
-                
-                if not cap.isOpened():
-                    return []
-                
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                duration = frame_count / fps if fps > 0 else 0
-                
-                thumbnails = []
-                
-                # Generate candidate timestamps
-                candidate_timestamps = []
-                for i in range(count * 3):  # Generate more candidates than needed
-                    timestamp = (duration / (count * 3)) * (i + 1)
-                    candidate_timestamps.append(timestamp)
-                
-                # Analyze frames and select best ones
-                selected_frames = []
-                
-                for timestamp in candidate_timestamps:
-                    frame_number = int(timestamp * fps)
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-                    
-                    ret, frame = cap.read()
-                    if not ret:
-                        continue
-                    
-                    # Calculate frame brightness and contrast
-                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    brightness = cv2.mean(gray)[0]
-                    contrast = gray.std()
-                    
-                    # Skip very dark frames if requested
-                    if avoid_black_frames and brightness < 30:
-                        continue
-                    
-                    # Calculate frame score (higher is better)
-                    score = brightness * 0.3 + contrast * 0.7
-                    
-                    selected_frames.append({
-                        'timestamp': timestamp,
-                        'frame_number': frame_number,
-                        'frame': frame.copy(),
-                        'score': score,
-                        'brightness': brightness,
-                        'contrast': contrast
-                    })
-                
-                # Sort by score and select top frames
-                selected_frames.sort(key=lambda x: x['score'], reverse=True)
-                selected_frames = selected_frames[:count]
+                duration = get_media_probe_service().probe(video_path).duration
+                
+                # Generate more candidates than needed
+                candidate_timestamps = [
+                    (duration / (count * 3)) * (i + 1) for i in range(count * 3)
+                ]
+                
+                # Seek-decode candidates at thumbnail size and score them in one pass
+                sampler = get_frame_sampler()
+                selected_frames = sampler.sample(
+                    video_path,
+                    top_k=count,
+                    mode=THUMBNAIL_MODE,
+                    timestamps=candidate_timestamps,
+                    scorer=BRIGHTNESS_CONTRAST_SCORER,
+                    min_brightness=30 if avoid_black_frames else None
+                )
                 
                 # Sort selected frames by timestamp
-                selected_frames.sort(key=lambda x: x['timestamp'])
+                selected_frames.sort(key=lambda x: x.timestamp)
                 
-                # Save thumbnails
+                thumbnails = []
                 for i, frame_info in enumerate(selected_frames):
-                    thumbnail_path = f"/tmp/thumbnail_{i}_{frame_info['timestamp']:.1f}s.jpg"
-                    
-                    # Resize frame for thumbnail
-                    height, width = frame_info['frame'].shape[:2]
-                    if width > 320:
-                        scale = 320 / width
-                        new_width = 320
-                        new_height = int(height * scale)
-                        resized_frame = cv2.resize(frame_info['frame'], (new_width, new_height))
-                    else:
-                        resized_frame = frame_info['frame']
-                    
-                    # Save thumbnail
-                    cv2.imwrite(thumbnail_path, resized_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+                    thumbnail_path = f"/tmp/thumbnail_{i}_{frame_info.timestamp:.1f}s.jpg"
+                    frame_info.to_pil().save(thumbnail_path, quality=85)
                     
+                    gray = luminance(frame_info.image[None])[0]
                     thumbnails.append({
-                        'timestamp_seconds': frame_info['timestamp'],
+                        'timestamp_seconds': frame_info.timestamp,
                         'file_path': thumbnail_path,
-                        'width': resized_frame.shape[1],
-                        'height': resized_frame.shape[0],
-                        'quality_score': frame_info['score'],
-                        'brightness': frame_info['brightness'],
-                        'contrast': frame_info['contrast']
+                        'width': frame_info.width,
+                        'height': frame_info.height,
+                        'quality_score': frame_info.score,
+                        'brightness': float(gray.mean()),
+                        'contrast': float(gray.std())
                     })
                 
-                cap.release()
                 return thumbnails
                 
             except Exception as e:
@@ -441,20 +400,21 @@ class VideoMetadataExtractor:
         
         def _extract_metadata():
             try:
-                cap = cv2.VideoCapture(video_path)
-                
-                if not cap.isOpened():
+                try:
+                    probe = get_media_probe_service().probe(video_path)
+                except Exception as e:
+                    logger.warning(f"Could not probe video file: {e}")
                     return {'error': 'Could not open video file'}
                 
                 # Basic properties
-                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                duration = frame_count / fps if fps > 0 else 0
+                width = probe.width
+                height = probe.height
+                fps = probe.fps
+                frame_count = probe.frame_count
+                duration = probe.duration
                 
                 # File properties
-                file_size = os.path.getsize(video_path)
+                file_size = probe.size
                 file_name = os.path.basename(video_path)
                 file_ext = os.path.splitext(file_name)[1].lower()
                 
@@ -463,12 +423,24 @@ class VideoMetadataExtractor:
                 bitrate_kbps = bitrate_bps / 1000
                 
                 # Analyze first few frames for color information
-                color_analysis = VideoMetadataExtractor._analyze_color_properties(cap)
-                
-                cap.release()
+                cap = cv2.VideoCapture(video_path)
+                try:
+                    color_analysis = VideoMetadataExtractor._analyze_color_properties(cap) if cap.isOpened() else {}
+                finally:
+                    cap.release()
                 
-                # Determine video codec (basic detection)
+                # Codec information from the probe, extension-based guess as fallback
                 codec_info = VideoMetadataExtractor._detect_codec_info(video_path)
+                if probe.video_codec:
+                    codec_info.update({
+                        'container_format': probe.format_name or codec_info.get('container_format'),
+                        'video_codec': probe.video_codec,
+                        'pixel_format': probe.pix_fmt,
+                        'audio_codec': probe.audio_codec,
+                        'audio_sample_rate': probe.audio_sample_rate,
+                        'audio_channels': probe.audio_channels,
+                        'detection_method': probe.probe_method
+                    })
                 
                 return {
                     'file_info': {
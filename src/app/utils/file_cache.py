@@ -7,7 +7,6 @@ thumbnails, and frequently accessed files using database storage.
 
 import asyncio
 import hashlib
-import json
 import threading
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -17,6 +16,7 @@ import aiofiles
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core import serialization
 from ..core.config import get_settings
 from ..core.logger import get_logger
 
@@ -668,7 +668,7 @@ class FileCacheManager:
             
             await self.db_session.execute(query, {
                 'key': key,
-                'value': json.dumps(value) if not isinstance(value, str) else value,
+                'value': serialization.dumps(value) if not isinstance(value, str) else value,
                 'expires_at': expires_at,
                 'created_at': datetime.utcnow()
             })
@@ -710,8 +710,9 @@ class FileCacheManager:
                 return None
             
             try:
-                value = json.loads(row.cache_value) if row.cache_value.startswith(('{', '[', '"')) else row.cache_value
-            except (json.JSONDecodeError, AttributeError):
+                is_encoded = row.cache_value.startswith(('{', '[', '"', serialization.ENVELOPE_MARK))
+                value = serialization.loads(row.cache_value) if is_encoded else row.cache_value
+            except (ValueError, AttributeError):
                 value = row.cache_value
             
             return {'value': value}
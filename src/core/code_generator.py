@@ -3,14 +3,16 @@ import re
 import json
 import logging
 import glob
+import asyncio
 from pathlib import Path
 from typing import Union, List, Dict, Optional, Tuple, Any
 from PIL import Image
 
 from src.utils.utils import extract_json
-from mllm_tools.utils import _prepare_text_inputs, _extract_code, _prepare_text_image_inputs
+from mllm_tools.utils import _prepare_text_inputs, _extract_code, _prepare_text_image_inputs, acall_model
 from mllm_tools.gemini import GeminiWrapper
 from mllm_tools.vertex_ai import VertexAIWrapper
+from mllm_tools.response_cache import unwrap_model
 from task_generator import (
     get_prompt_code_generation,
     get_prompt_fix_error,
@@ -35,6 +37,13 @@ DEFAULT_RAG_K_VALUE = 2
 CACHE_FILE_ENCODING = 'utf-8'
 CODE_PATTERN = r"```python(.*)```"
 JSON_PATTERN = r'```json(.*)```'
+CODE_FORMAT_RETRY_PROMPT = """
+        Please extract the Python code in the correct format using the pattern: {pattern}. 
+        You MUST NOT include any other text or comments. 
+        You MUST return the exact same code as in the previous response, NO CONTENT EDITING is allowed.
+        Previous response: 
+        {response_text}
+        """
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -126,6 +135,10 @@ class CodeGenerator:
         
         logger.info(f"CodeGenerator initialized with RAG: {use_rag}, Context Learning: {use_context_learning}")
 
+    def _scene_model_accepts_video(self) -> bool:
+        """Whether the scene model takes video input directly (Gemini/Vertex AI), cache wrappers included."""
+        return isinstance(unwrap_model(self.scene_model), (GeminiWrapper, VertexAIWrapper))
+
     def _load_banned_reasonings(self) -> List[str]:
         """Load banned reasonings with error handling."""
         try:
@@ -231,6 +244,88 @@ class CodeGenerator:
             logger.error(f"Response text was: {response[:500]}...")
             return []
 
+    def _rag_queries_request(
+        self,
+        cache_name: str,
+        generation_name: str,
+        build_prompt,
+        scene_trace_id: Optional[str],
+        topic: Optional[str],
+        scene_number: Optional[int],
+        session_id: Optional[str]
+    ) -> Tuple[Optional[List[str]], Optional[Dict[str, Any]]]:
+        """Look up cached RAG queries or prepare the helper model request for new ones.
+
+        Returns:
+            ``(queries, None)`` if the queries are cached or cannot be generated,
+            otherwise ``(None, request)`` with the model messages, metadata and cache file
+        """
+        if not topic or scene_number is None:
+            logger.warning(f"Missing topic or scene_number for {generation_name}")
+            return [], None
+
+        cache_file = self._create_cache_directory(topic, scene_number) / cache_name
+        cached_queries = self._load_cached_queries(cache_file)
+        if cached_queries is not None:
+            logger.info(f"Using cached {generation_name} queries for {topic}_scene{scene_number}")
+            return cached_queries, None
+
+        return None, {
+            "messages": _prepare_text_inputs(build_prompt()),
+            "metadata": {
+                "generation_name": generation_name, 
+                "trace_id": scene_trace_id, 
+                "tags": [topic, f"scene{scene_number}"], 
+                "session_id": session_id
+            },
+            "cache_file": cache_file
+        }
+
+    def _finish_rag_queries(self, response: str, cache_file: Path, error_context: str) -> List[str]:
+        """Parse the helper model's RAG queries and cache them."""
+        logger.debug(f"RAG queries response: {response[:200]}...")
+        queries = self._extract_json_from_response(response, error_context)
+        if queries:
+            self._save_queries_to_cache(queries, cache_file)
+        return queries
+
+    def _rag_queries_code_request(
+        self, 
+        implementation: str, 
+        scene_trace_id: Optional[str], 
+        topic: Optional[str], 
+        scene_number: Optional[int], 
+        session_id: Optional[str], 
+        relevant_plugins: Optional[List[str]]
+    ) -> Tuple[Optional[List[str]], Optional[Dict[str, Any]]]:
+        plugins_text = ", ".join(relevant_plugins) if relevant_plugins else "No plugins are relevant."
+        return self._rag_queries_request(
+            "rag_queries_code.json", "rag_query_generation",
+            lambda: get_prompt_rag_query_generation_code(implementation, plugins_text),
+            scene_trace_id, topic, scene_number, session_id
+        )
+
+    def _rag_queries_error_fix_request(
+        self, 
+        error: str, 
+        code: str, 
+        scene_trace_id: Optional[str], 
+        topic: Optional[str], 
+        scene_number: Optional[int], 
+        session_id: Optional[str], 
+        relevant_plugins: Optional[List[str]]
+    ) -> Tuple[Optional[List[str]], Optional[Dict[str, Any]]]:
+        plugins_text = ", ".join(relevant_plugins) if relevant_plugins else "No plugins are relevant."
+        return self._rag_queries_request(
+            "rag_queries_error_fix.json", "rag-query-generation-fix-error",
+            lambda: get_prompt_rag_query_generation_fix_error(
+                error=error,
+                code=code,
+                relevant_plugins=plugins_text
+            ),
+            scene_trace_id, topic, scene_number, session_id
+        )
+
     def _generate_rag_queries_code(
         self, 
         implementation: str, 
@@ -253,46 +348,39 @@ class CodeGenerator:
         Returns:
             List of generated RAG queries
         """
-        if relevant_plugins is None:
-            relevant_plugins = []
+        try:
+            queries, request = self._rag_queries_code_request(
+                implementation, scene_trace_id, topic, scene_number, session_id, relevant_plugins
+            )
+            if request is None:
+                return queries
+
+            response = self.helper_model(request["messages"], metadata=request["metadata"])
+            return self._finish_rag_queries(response, request["cache_file"], "RAG queries for code generation")
             
-        if not topic or scene_number is None:
-            logger.warning("Missing topic or scene_number for RAG query generation")
+        except Exception as e:
+            logger.error(f"Error generating RAG queries for code: {e}")
             return []
 
-        # Setup cache
-        cache_dir = self._create_cache_directory(topic, scene_number)
-        cache_file = cache_dir / "rag_queries_code.json"
-
-        # Try to load from cache
-        cached_queries = self._load_cached_queries(cache_file)
-        if cached_queries is not None:
-            logger.info(f"Using cached RAG queries for {topic}_scene{scene_number}")
-            return cached_queries
-
-        # Generate new queries
+    async def _agenerate_rag_queries_code(
+        self, 
+        implementation: str, 
+        scene_trace_id: Optional[str] = None, 
+        topic: Optional[str] = None, 
+        scene_number: Optional[int] = None, 
+        session_id: Optional[str] = None, 
+        relevant_plugins: List[str] = None
+    ) -> List[str]:
+        """Async version of _generate_rag_queries_code."""
         try:
-            plugins_text = ", ".join(relevant_plugins) if relevant_plugins else "No plugins are relevant."
-            prompt = get_prompt_rag_query_generation_code(implementation, plugins_text)
-
-            response = self.helper_model(
-                _prepare_text_inputs(prompt),
-                metadata={
-                    "generation_name": "rag_query_generation", 
-                    "trace_id": scene_trace_id, 
-                    "tags": [topic, f"scene{scene_number}"], 
-                    "session_id": session_id
-                }
+            queries, request = self._rag_queries_code_request(
+                implementation, scene_trace_id, topic, scene_number, session_id, relevant_plugins
             )
+            if request is None:
+                return queries
 
-            logger.debug(f"RAG queries response: {response[:200]}...")
-            queries = self._extract_json_from_response(response, "RAG queries for code generation")
-            
-            # Cache the queries
-            if queries:
-                self._save_queries_to_cache(queries, cache_file)
-            
-            return queries
+            response = await acall_model(self.helper_model, request["messages"], metadata=request["metadata"])
+            return self._finish_rag_queries(response, request["cache_file"], "RAG queries for code generation")
             
         except Exception as e:
             logger.error(f"Error generating RAG queries for code: {e}")
@@ -322,49 +410,40 @@ class CodeGenerator:
         Returns:
             List of generated RAG queries for error fixing
         """
-        if relevant_plugins is None:
-            relevant_plugins = []
+        try:
+            queries, request = self._rag_queries_error_fix_request(
+                error, code, scene_trace_id, topic, scene_number, session_id, relevant_plugins
+            )
+            if request is None:
+                return queries
+
+            response = self.helper_model(request["messages"], metadata=request["metadata"])
+            return self._finish_rag_queries(response, request["cache_file"], "RAG queries for error fix")
             
-        if not topic or scene_number is None:
-            logger.warning("Missing topic or scene_number for RAG error fix query generation")
+        except Exception as e:
+            logger.error(f"Error generating RAG queries for error fix: {e}")
             return []
 
-        # Setup cache
-        cache_dir = self._create_cache_directory(topic, scene_number)
-        cache_file = cache_dir / "rag_queries_error_fix.json"
-
-        # Try to load from cache
-        cached_queries = self._load_cached_queries(cache_file)
-        if cached_queries is not None:
-            logger.info(f"Using cached RAG error fix queries for {topic}_scene{scene_number}")
-            return cached_queries
-
-        # Generate new queries for error fix
+    async def _agenerate_rag_queries_error_fix(
+        self, 
+        error: str, 
+        code: str, 
+        scene_trace_id: Optional[str] = None, 
+        topic: Optional[str] = None, 
+        scene_number: Optional[int] = None, 
+        session_id: Optional[str] = None, 
+        relevant_plugins: List[str] = None
+    ) -> List[str]:
+        """Async version of _generate_rag_queries_error_fix."""
         try:
-            plugins_text = ", ".join(relevant_plugins) if relevant_plugins else "No plugins are relevant."
-            prompt = get_prompt_rag_query_generation_fix_error(
-                error=error,
-                code=code,
-                relevant_plugins=plugins_text
+            queries, request = self._rag_queries_error_fix_request(
+                error, code, scene_trace_id, topic, scene_number, session_id, relevant_plugins
             )
+            if request is None:
+                return queries
 
-            response = self.helper_model(
-                _prepare_text_inputs(prompt),
-                metadata={
-                    "generation_name": "rag-query-generation-fix-error", 
-                    "trace_id": scene_trace_id, 
-                    "tags": [topic, f"scene{scene_number}"], 
-                    "session_id": session_id
-                }
-            )
-
-            queries = self._extract_json_from_response(response, "RAG queries for error fix")
-            
-            # Cache the queries
-            if queries:
-                self._save_queries_to_cache(queries, cache_file)
-            
-            return queries
+            response = await acall_model(self.helper_model, request["messages"], metadata=request["metadata"])
+            return self._finish_rag_queries(response, request["cache_file"], "RAG queries for error fix")
             
         except Exception as e:
             logger.error(f"Error generating RAG queries for error fix: {e}")
@@ -395,14 +474,6 @@ class CodeGenerator:
         Raises:
             ValueError: If code extraction fails after max retries
         """
-        retry_prompt_template = """
-        Please extract the Python code in the correct format using the pattern: {pattern}. 
-        You MUST NOT include any other text or comments. 
-        You MUST return the exact same code as in the previous response, NO CONTENT EDITING is allowed.
-        Previous response: 
-        {response_text}
-        """
-
         for attempt in range(max_retries):
             try:
                 code_match = re.search(pattern, response_text, re.DOTALL)
@@ -415,7 +486,7 @@ class CodeGenerator:
                     logger.warning(f"Attempt {attempt + 1}: Failed to extract code pattern. Retrying...")
                     
                     # Regenerate response with a more explicit prompt
-                    retry_prompt = retry_prompt_template.format(
+                    retry_prompt = CODE_FORMAT_RETRY_PROMPT.format(
                         pattern=pattern, 
                         response_text=response_text[:1000]  # Limit response length
                     )
@@ -436,6 +507,49 @@ class CodeGenerator:
         
         raise ValueError(f"Failed to extract code pattern after {max_retries} attempts. Pattern: {pattern}")
 
+    async def _aextract_code_with_retries(
+        self, 
+        response_text: str, 
+        pattern: str = CODE_PATTERN, 
+        generation_name: Optional[str] = None, 
+        trace_id: Optional[str] = None, 
+        session_id: Optional[str] = None, 
+        max_retries: int = DEFAULT_MAX_RETRIES
+    ) -> str:
+        """Async version of _extract_code_with_retries using the model's native async path."""
+        for attempt in range(max_retries):
+            try:
+                code_match = re.search(pattern, response_text, re.DOTALL)
+                if code_match:
+                    extracted_code = code_match.group(1).strip()
+                    logger.debug(f"Successfully extracted code on attempt {attempt + 1}")
+                    return extracted_code
+                
+                if attempt < max_retries - 1:
+                    logger.warning(f"Attempt {attempt + 1}: Failed to extract code pattern. Retrying...")
+                    
+                    retry_prompt = CODE_FORMAT_RETRY_PROMPT.format(
+                        pattern=pattern, 
+                        response_text=response_text[:1000]  # Limit response length
+                    )
+                    
+                    response_text = await acall_model(
+                        self.scene_model,
+                        _prepare_text_inputs(retry_prompt),
+                        metadata={
+                            "generation_name": f"{generation_name}_format_retry_{attempt + 1}",
+                            "trace_id": trace_id,
+                            "session_id": session_id
+                        }
+                    )
+                    
+            except Exception as e:
+                logger.error(f"Error during code extraction attempt {attempt + 1}: {e}")
+                if attempt == max_retries - 1:
+                    break
+        
+        raise ValueError(f"Failed to extract code pattern after {max_retries} attempts. Pattern: {pattern}")
+
     def _prepare_additional_context(self, additional_context: Union[str, List[str], None]) -> List[str]:
         """Prepare additional context for code generation."""
         if additional_context is None:
@@ -467,6 +581,163 @@ class CodeGenerator:
             logger.error(f"Error retrieving RAG context: {e}")
             return None
 
+    def _code_generation_prompt(
+        self,
+        topic: str,
+        description: str,
+        scene_outline: str,
+        scene_implementation: str,
+        scene_number: int,
+        additional_context: Union[str, List[str], None],
+        rag_context: Optional[str]
+    ) -> str:
+        """Build the code generation prompt from the context learning examples and RAG context."""
+        # Prepare additional context
+        context_list = self._prepare_additional_context(additional_context)
+
+        # Add context learning examples if enabled
+        if self.use_context_learning and self.context_examples:
+            context_list.append(self.context_examples)
+
+        if rag_context:
+            context_list.append(rag_context)
+
+        # Generate prompt
+        return get_prompt_code_generation(
+            scene_outline=scene_outline,
+            scene_implementation=scene_implementation,
+            topic=topic,
+            description=description,
+            scene_number=scene_number,
+            additional_context=context_list if context_list else None
+        )
+
+    def _build_code_generation_prompt(
+        self,
+        topic: str,
+        description: str,
+        scene_outline: str,
+        scene_implementation: str,
+        scene_number: int,
+        additional_context: Union[str, List[str], None] = None,
+        scene_trace_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> str:
+        """Build the code generation prompt, including context learning and RAG context."""
+        rag_context = None
+        if self.use_rag:
+            rag_queries = self._generate_rag_queries_code(
+                implementation=scene_implementation,
+                scene_trace_id=scene_trace_id,
+                topic=topic,
+                scene_number=scene_number,
+                session_id=session_id or self.session_id
+            )
+            rag_context = self._retrieve_rag_context(
+                rag_queries, scene_trace_id, topic, scene_number
+            )
+
+        return self._code_generation_prompt(
+            topic, description, scene_outline, scene_implementation,
+            scene_number, additional_context, rag_context
+        )
+
+    async def _abuild_code_generation_prompt(
+        self,
+        topic: str,
+        description: str,
+        scene_outline: str,
+        scene_implementation: str,
+        scene_number: int,
+        additional_context: Union[str, List[str], None] = None,
+        scene_trace_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> str:
+        """Async version of _build_code_generation_prompt; the vector store lookup runs in a worker thread."""
+        rag_context = None
+        if self.use_rag:
+            rag_queries = await self._agenerate_rag_queries_code(
+                implementation=scene_implementation,
+                scene_trace_id=scene_trace_id,
+                topic=topic,
+                scene_number=scene_number,
+                session_id=session_id or self.session_id
+            )
+            rag_context = await asyncio.to_thread(
+                self._retrieve_rag_context, rag_queries, scene_trace_id, topic, scene_number
+            )
+
+        return self._code_generation_prompt(
+            topic, description, scene_outline, scene_implementation,
+            scene_number, additional_context, rag_context
+        )
+
+    def _scene_model_metadata(
+        self, 
+        generation_name: str, 
+        scene_trace_id: Optional[str], 
+        topic: str, 
+        scene_number: int, 
+        session_id: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "generation_name": generation_name, 
+            "trace_id": scene_trace_id, 
+            "tags": [topic, f"scene{scene_number}"], 
+            "session_id": session_id
+        }
+
+    def _generate_code(
+        self, 
+        messages: List[Dict[str, Any]], 
+        generation_name: str, 
+        scene_trace_id: Optional[str], 
+        topic: str, 
+        scene_number: int, 
+        session_id: Optional[str]
+    ) -> Tuple[str, str]:
+        """Call the scene model and extract the code from its response.
+
+        Returns:
+            Tuple of extracted code and response text
+        """
+        response_text = self.scene_model(
+            messages,
+            metadata=self._scene_model_metadata(generation_name, scene_trace_id, topic, scene_number, session_id)
+        )
+        code = self._extract_code_with_retries(
+            response_text,
+            CODE_PATTERN,
+            generation_name=generation_name,
+            trace_id=scene_trace_id,
+            session_id=session_id
+        )
+        return code, response_text
+
+    async def _agenerate_code(
+        self, 
+        messages: List[Dict[str, Any]], 
+        generation_name: str, 
+        scene_trace_id: Optional[str], 
+        topic: str, 
+        scene_number: int, 
+        session_id: Optional[str]
+    ) -> Tuple[str, str]:
+        """Async version of _generate_code using the model's native async path."""
+        response_text = await acall_model(
+            self.scene_model,
+            messages,
+            metadata=self._scene_model_metadata(generation_name, scene_trace_id, topic, scene_number, session_id)
+        )
+        code = await self._aextract_code_with_retries(
+            response_text,
+            CODE_PATTERN,
+            generation_name=generation_name,
+            trace_id=scene_trace_id,
+            session_id=session_id
+        )
+        return code, response_text
+
     def generate_manim_code(
         self,
         topic: str,
@@ -499,58 +770,55 @@ class CodeGenerator:
             ValueError: If code generation fails
         """
         try:
-            # Prepare additional context
-            context_list = self._prepare_additional_context(additional_context)
+            prompt = self._build_code_generation_prompt(
+                topic, description, scene_outline, scene_implementation,
+                scene_number, additional_context, scene_trace_id, session_id
+            )
 
-            # Add context learning examples if enabled
-            if self.use_context_learning and self.context_examples:
-                context_list.append(self.context_examples)
+            code, response_text = self._generate_code(
+                _prepare_text_inputs(prompt), "code_generation",
+                scene_trace_id, topic, scene_number, session_id or self.session_id
+            )
+            
+            logger.info(f"Successfully generated code for {topic} scene {scene_number}")
+            return code, response_text
+            
+        except Exception as e:
+            logger.error(f"Error generating Manim code for {topic} scene {scene_number}: {e}")
+            raise ValueError(f"Code generation failed: {e}") from e
 
-            # Add RAG context if enabled
-            if self.use_rag:
-                rag_queries = self._generate_rag_queries_code(
-                    implementation=scene_implementation,
-                    scene_trace_id=scene_trace_id,
-                    topic=topic,
-                    scene_number=scene_number,
-                    session_id=session_id or self.session_id
-                )
+    async def agenerate_manim_code(
+        self,
+        topic: str,
+        description: str,                            
+        scene_outline: str,
+        scene_implementation: str,
+        scene_number: int,
+        additional_context: Union[str, List[str], None] = None,
+        scene_trace_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Async version of generate_manim_code.
 
-                rag_context = self._retrieve_rag_context(
-                    rag_queries, scene_trace_id, topic, scene_number
-                )
-                
-                if rag_context:
-                    context_list.append(rag_context)
+        Model calls use the wrapper's native async path, so many scenes can be
+        in flight from a single event loop. RAG retrieval still uses the
+        blocking vector store and runs in a worker thread.
 
-            # Generate prompt
-            prompt = get_prompt_code_generation(
-                scene_outline=scene_outline,
-                scene_implementation=scene_implementation,
-                topic=topic,
-                description=description,
-                scene_number=scene_number,
-                additional_context=context_list if context_list else None
-            )
+        Returns:
+            Tuple of generated code and response text
 
-            # Generate code using model
-            response_text = self.scene_model(
-                _prepare_text_inputs(prompt),
-                metadata={
-                    "generation_name": "code_generation", 
-                    "trace_id": scene_trace_id, 
-                    "tags": [topic, f"scene{scene_number}"], 
-                    "session_id": session_id or self.session_id
-                }
+        Raises:
+            ValueError: If code generation fails
+        """
+        try:
+            prompt = await self._abuild_code_generation_prompt(
+                topic, description, scene_outline, scene_implementation,
+                scene_number, additional_context, scene_trace_id, session_id
             )
 
-            # Extract code with retries
-            code = self._extract_code_with_retries(
-                response_text,
-                CODE_PATTERN,
-                generation_name="code_generation",
-                trace_id=scene_trace_id,
-                session_id=session_id or self.session_id
+            code, response_text = await self._agenerate_code(
+                _prepare_text_inputs(prompt), "code_generation",
+                scene_trace_id, topic, scene_number, session_id or self.session_id
             )
             
             logger.info(f"Successfully generated code for {topic} scene {scene_number}")
@@ -560,6 +828,21 @@ class CodeGenerator:
             logger.error(f"Error generating Manim code for {topic} scene {scene_number}: {e}")
             raise ValueError(f"Code generation failed: {e}") from e
 
+    def _fix_error_prompt(self, implementation_plan: str, code: str, error: str, rag_context: Optional[str]) -> str:
+        """Build the error fix prompt (with or without RAG context)."""
+        if rag_context:
+            return get_prompt_fix_error(
+                implementation_plan=implementation_plan, 
+                manim_code=code, 
+                error=error, 
+                additional_context=rag_context
+            )
+        return get_prompt_fix_error(
+            implementation_plan=implementation_plan, 
+            manim_code=code, 
+            error=error
+        )
+
     def fix_code_errors(
         self, 
         implementation_plan: str, 
@@ -590,10 +873,7 @@ class CodeGenerator:
             ValueError: If code fixing fails
         """
         try:
-            # Start with base error fix prompt
-            additional_context = None
-            
-            # Add RAG context if enabled
+            rag_context = None
             if self.use_rag:
                 rag_queries = self._generate_rag_queries_error_fix(
                     error=error,
@@ -603,47 +883,60 @@ class CodeGenerator:
                     scene_number=scene_number,
                     session_id=session_id
                 )
-                
                 rag_context = self._retrieve_rag_context(
                     rag_queries, scene_trace_id, topic, scene_number
                 )
-                
-                if rag_context:
-                    additional_context = rag_context
-
-            # Generate prompt (with or without RAG context)
-            if additional_context:
-                prompt = get_prompt_fix_error(
-                    implementation_plan=implementation_plan, 
-                    manim_code=code, 
-                    error=error, 
-                    additional_context=additional_context
-                )
-            else:
-                prompt = get_prompt_fix_error(
-                    implementation_plan=implementation_plan, 
-                    manim_code=code, 
-                    error=error
-                )
 
-            # Get fixed code from model
-            response_text = self.scene_model(
-                _prepare_text_inputs(prompt),
-                metadata={
-                    "generation_name": "code_fix_error", 
-                    "trace_id": scene_trace_id, 
-                    "tags": [topic, f"scene{scene_number}"], 
-                    "session_id": session_id
-                }
+            prompt = self._fix_error_prompt(implementation_plan, code, error, rag_context)
+            fixed_code, response_text = self._generate_code(
+                _prepare_text_inputs(prompt), "code_fix_error",
+                scene_trace_id, topic, scene_number, session_id
             )
+            
+            logger.info(f"Successfully fixed code errors for {topic} scene {scene_number}")
+            return fixed_code, response_text
+            
+        except Exception as e:
+            logger.error(f"Error fixing code for {topic} scene {scene_number}: {e}")
+            raise ValueError(f"Code error fixing failed: {e}") from e
 
-            # Extract fixed code with retries
-            fixed_code = self._extract_code_with_retries(
-                response_text,
-                CODE_PATTERN,
-                generation_name="code_fix_error",
-                trace_id=scene_trace_id,
-                session_id=session_id
+    async def afix_code_errors(
+        self, 
+        implementation_plan: str, 
+        code: str, 
+        error: str, 
+        scene_trace_id: str, 
+        topic: str, 
+        scene_number: int, 
+        session_id: str
+    ) -> Tuple[str, str]:
+        """Async version of fix_code_errors.
+
+        Returns:
+            Tuple of fixed code and response text
+
+        Raises:
+            ValueError: If code fixing fails
+        """
+        try:
+            rag_context = None
+            if self.use_rag:
+                rag_queries = await self._agenerate_rag_queries_error_fix(
+                    error=error,
+                    code=code,
+                    scene_trace_id=scene_trace_id,
+                    topic=topic,
+                    scene_number=scene_number,
+                    session_id=session_id
+                )
+                rag_context = await asyncio.to_thread(
+                    self._retrieve_rag_context, rag_queries, scene_trace_id, topic, scene_number
+                )
+
+            prompt = self._fix_error_prompt(implementation_plan, code, error, rag_context)
+            fixed_code, response_text = await self._agenerate_code(
+                _prepare_text_inputs(prompt), "code_fix_error",
+                scene_trace_id, topic, scene_number, session_id
             )
             
             logger.info(f"Successfully fixed code errors for {topic} scene {scene_number}")
@@ -653,6 +946,61 @@ class CodeGenerator:
             logger.error(f"Error fixing code for {topic} scene {scene_number}: {e}")
             raise ValueError(f"Code error fixing failed: {e}") from e
 
+    def _visual_self_reflection_messages(
+        self, 
+        code: str, 
+        media_path: Union[str, Image.Image]
+    ) -> List[Dict[str, Any]]:
+        """Build the visual self-reflection model input from the code and a snapshot image or mp4 video.
+
+        Raises:
+            FileNotFoundError: If media file doesn't exist
+        """
+        # Validate media input
+        if isinstance(media_path, str):
+            media_file = Path(media_path)
+            if not media_file.exists():
+                raise FileNotFoundError(f"Media file not found: {media_path}")
+        
+        # Determine if we're dealing with video or image
+        is_video = isinstance(media_path, str) and media_path.lower().endswith('.mp4')
+        
+        # Load prompt template
+        prompt_file = Path('task_generator/prompts_raw/prompt_visual_self_reflection.txt')
+        if not prompt_file.exists():
+            logger.warning(f"Visual self-reflection prompt file not found: {prompt_file}")
+            # Fallback prompt
+            prompt_template = """
+            Analyze the visual output and the provided code. Fix any issues you notice in the code.
+            
+            Code:
+            {code}
+            """
+        else:
+            with prompt_file.open('r', encoding=CACHE_FILE_ENCODING) as f:
+                prompt_template = f.read()
+        
+        # Format prompt
+        prompt = prompt_template.format(code=code)
+        
+        # Prepare input based on media type and model capabilities
+        if is_video and self._scene_model_accepts_video():
+            # For video with Gemini models
+            return [
+                {"type": "text", "content": prompt},
+                {"type": "video", "content": str(media_path)}
+            ]
+
+        # For images or non-Gemini models
+        if isinstance(media_path, str):
+            media = Image.open(media_path)
+        else:
+            media = media_path
+        return [
+            {"type": "text", "content": prompt},
+            {"type": "image", "content": media}
+        ]
+
     def visual_self_reflection(
         self, 
         code: str, 
@@ -680,69 +1028,41 @@ class CodeGenerator:
             FileNotFoundError: If media file doesn't exist
         """
         try:
-            # Validate media input
-            if isinstance(media_path, str):
-                media_file = Path(media_path)
-                if not media_file.exists():
-                    raise FileNotFoundError(f"Media file not found: {media_path}")
-            
-            # Determine if we're dealing with video or image
-            is_video = isinstance(media_path, str) and media_path.lower().endswith('.mp4')
-            
-            # Load prompt template
-            prompt_file = Path('task_generator/prompts_raw/prompt_visual_self_reflection.txt')
-            if not prompt_file.exists():
-                logger.warning(f"Visual self-reflection prompt file not found: {prompt_file}")
-                # Fallback prompt
-                prompt_template = """
-                Analyze the visual output and the provided code. Fix any issues you notice in the code.
-                
-                Code:
-                {code}
-                """
-            else:
-                with prompt_file.open('r', encoding=CACHE_FILE_ENCODING) as f:
-                    prompt_template = f.read()
-            
-            # Format prompt
-            prompt = prompt_template.format(code=code)
-            
-            # Prepare input based on media type and model capabilities
-            if is_video and isinstance(self.scene_model, (GeminiWrapper, VertexAIWrapper)):
-                # For video with Gemini models
-                messages = [
-                    {"type": "text", "content": prompt},
-                    {"type": "video", "content": str(media_path)}
-                ]
-            else:
-                # For images or non-Gemini models
-                if isinstance(media_path, str):
-                    media = Image.open(media_path)
-                else:
-                    media = media_path
-                messages = [
-                    {"type": "text", "content": prompt},
-                    {"type": "image", "content": media}
-                ]
-            
-            # Get model response
-            response_text = self.scene_model(
-                messages,
-                metadata={
-                    "generation_name": "visual_self_reflection",
-                    "trace_id": scene_trace_id,
-                    "tags": [topic, f"scene{scene_number}"],
-                    "session_id": session_id
-                }
+            messages = self._visual_self_reflection_messages(code, media_path)
+            fixed_code, response_text = self._generate_code(
+                messages, "visual_self_reflection",
+                scene_trace_id, topic, scene_number, session_id
             )
             
-            # Extract code with retries
-            fixed_code = self._extract_code_with_retries(
-                response_text,
-                CODE_PATTERN,
-                generation_name="visual_self_reflection",
-                trace_id=scene_trace_id,
-                session_id=session_id
+            logger.info(f"Successfully completed visual self-reflection for {topic} scene {scene_number}")
+            return fixed_code, response_text
+            
+        except Exception as e:
+            logger.error(f"Error in visual self-reflection for {topic} scene {scene_number}: {e}")
+            raise ValueError(f"Visual self-reflection failed: {e}") from e
+
+    async def avisual_self_reflection(
+        self, 
+        code: str, 
+        media_path: Union[str, Image.Image], 
+        scene_trace_id: str, 
+        topic: str, 
+        scene_number: int, 
+        session_id: str
+    ) -> Tuple[str, str]:
+        """Async version of visual_self_reflection.
+
+        Returns:
+            Tuple of fixed code and response text
+
+        Raises:
+            ValueError: If visual self-reflection fails
+        """
+        try:
+            messages = await asyncio.to_thread(self._visual_self_reflection_messages, code, media_path)
+            fixed_code, response_text = await self._agenerate_code(
+                messages, "visual_self_reflection",
+                scene_trace_id, topic, scene_number, session_id
             )
             
             logger.info(f"Successfully completed visual self-reflection for {topic} scene {scene_number}")
@@ -814,7 +1134,7 @@ class CodeGenerator:
             )
             
             # Prepare input based on media type and model capabilities
-            if is_video and isinstance(self.scene_model, (GeminiWrapper, VertexAIWrapper)):
+            if is_video and self._scene_model_accepts_video():
                 # For video with Gemini/Vertex AI models
                 messages = [
                     {"type": "text", "content": prompt},
@@ -995,7 +1315,7 @@ class CodeGenerator:
             # Determine media type and prepare input
             is_video = isinstance(media_path, str) and media_path.lower().endswith('.mp4')
             
-            if is_video and isinstance(self.scene_model, (GeminiWrapper, VertexAIWrapper)):
+            if is_video and self._scene_model_accepts_video():
                 messages = [
                     {"type": "text", "content": analysis_prompt},
                     {"type": "video", "content": str(media_path)}
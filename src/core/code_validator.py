@@ -0,0 +1,466 @@
+"""
+Pre-render validation of generated scene code.
+
+Catches broken scenes in milliseconds instead of after a full ``manim
+render`` subprocess has started:
+
+1. The code is parsed into an AST (syntax errors).
+2. Imports are resolved against the installed packages, and names imported
+   from manim, including ``from manim import *``, against the installed
+   manim API.
+3. Names that are loaded but bound nowhere in the file are reported, as are
+   ``self.<attr>`` lookups in scene classes that neither the class, its
+   bases in the file, nor the manim base classes define.
+4. ``VisualErrorDetector.validate_manim_constraints`` runs as a source of
+   warnings.
+5. Optionally, ``construct()`` is dry-run in a subprocess with manim's
+   ``dry_run`` and animation skipping enabled, recording ``play``/``wait``/
+   ``add`` calls without rasterizing frames.
+
+Errors are formatted so they can be handed to ``CodeGenerator.fix_code_errors``
+like a render error.
+"""
+
+import os
+import ast
+import sys
+import json
+import time
+import builtins
+import inspect
+import textwrap
+import importlib
+import importlib.util
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from src.utils.visual_error_detection import VisualErrorDetector
+
+# Packages whose modules are imported to check names and base class members.
+# Other imports are only checked for being installed, never executed.
+INTROSPECTED_PACKAGES = ('manim', 'manim_voiceover')
+
+
+class SceneValidationError(Exception):
+    """Raised when generated scene code fails pre-render validation."""
+
+
+@dataclass
+class ValidationIssue:
+    """One problem found in the code."""
+    kind: str
+    message: str
+    line: Optional[int] = None
+
+    def __str__(self) -> str:
+        location = f"Line {self.line}: " if self.line else ""
+        return f"{location}{self.kind}: {self.message}"
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating one piece of scene code."""
+    errors: List[ValidationIssue] = field(default_factory=list)
+    warnings: List[ValidationIssue] = field(default_factory=list)
+    dry_run_calls: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def format_error(self) -> str:
+        """Render errors (and constraint warnings) as an error message for the code fixer."""
+        lines = ["Scene code failed validation before rendering:"]
+        lines.extend(str(issue) for issue in self.errors)
+        if self.warnings:
+            lines.append("")
+            lines.append("Layout warnings (fix if related):")
+            lines.extend(str(issue) for issue in self.warnings)
+        return "\n".join(lines)
+
+
+_module_cache: Dict[str, Any] = {}
+_module_cache_lock = threading.Lock()
+_instance_attr_cache: Dict[type, Optional[Set[str]]] = {}
+
+
+def _import_introspected(module_name: str):
+    """Import a manim-family module once per process; None if it cannot be imported."""
+    if module_name.split('.')[0] not in INTROSPECTED_PACKAGES:
+        return None
+    with _module_cache_lock:
+        if module_name not in _module_cache:
+            try:
+                _module_cache[module_name] = importlib.import_module(module_name)
+            except Exception:
+                _module_cache[module_name] = None
+        return _module_cache[module_name]
+
+
+def _module_installed(module_name: str, search_dir: Optional[str] = None) -> bool:
+    """Whether a module can be imported, here or next to the scene file."""
+    if search_dir:
+        top_level = os.path.join(search_dir, module_name.split('.')[0])
+        if os.path.exists(top_level + '.py') or os.path.isdir(top_level):
+            return True
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _public_names(module) -> Set[str]:
+    names = getattr(module, '__all__', None)
+    if names is None:
+        names = [name for name in dir(module) if not name.startswith('_')]
+    return set(names)
+
+
+def _instance_attributes(cls: type) -> Optional[Set[str]]:
+    """Attributes of a class: members plus every ``self.x = ...`` in its MRO's source.
+
+    None if the class resolves attributes dynamically through ``__getattr__``.
+    """
+    if cls in _instance_attr_cache:
+        return _instance_attr_cache[cls]
+
+    if any('__getattr__' in vars(klass) for klass in cls.__mro__):
+        _instance_attr_cache[cls] = None
+        return None
+
+    attrs = set(dir(cls))
+    for klass in cls.__mro__:
+        try:
+            source = textwrap.dedent(inspect.getsource(klass))
+        except (OSError, TypeError):
+            continue
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            continue
+        attrs.update(_self_assignments(tree))
+
+    _instance_attr_cache[cls] = attrs
+    return attrs
+
+
+def _self_assignments(tree: ast.AST) -> Set[str]:
+    names = set()
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Store)
+                and isinstance(node.value, ast.Name) and node.value.id == 'self'):
+            names.add(node.attr)
+    return names
+
+
+class _BindingCollector(ast.NodeVisitor):
+    """Collect every name bound anywhere in the module (flat, scope-insensitive)."""
+
+    def __init__(self):
+        self.bound: Set[str] = set()
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, (ast.Store, ast.Del)):
+            self.bound.add(node.id)
+
+    def visit_arg(self, node):
+        self.bound.add(node.arg)
+
+    def _visit_def(self, node):
+        self.bound.add(node.name)
+        self.generic_visit(node)
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = _visit_def
+
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            self.bound.add(node.name)
+        self.generic_visit(node)
+
+    def visit_Global(self, node):
+        self.bound.update(node.names)
+
+    visit_Nonlocal = visit_Global
+
+    def visit_alias(self, node):
+        if node.name != '*':
+            self.bound.add((node.asname or node.name).split('.')[0])
+
+    def visit_MatchAs(self, node):
+        if node.name:
+            self.bound.add(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node):
+        if node.name:
+            self.bound.add(node.name)
+
+    def visit_MatchMapping(self, node):
+        if node.rest:
+            self.bound.add(node.rest)
+        self.generic_visit(node)
+
+
+class SceneCodeValidator:
+    """Static (and optional dry-run) validation of generated manim scene code."""
+
+    def __init__(self, check_constraints: bool = True, dry_run: bool = False, dry_run_timeout: float = 60):
+        """
+        Args:
+            check_constraints: Report VisualErrorDetector constraint violations as warnings
+            dry_run: Also execute ``construct()`` in a subprocess without rasterizing
+            dry_run_timeout: Timeout in seconds for the dry run
+        """
+        self.check_constraints = check_constraints
+        self.dry_run = dry_run
+        self.dry_run_timeout = dry_run_timeout
+        self.constraint_detector = VisualErrorDetector() if check_constraints else None
+        self.stats = {'validated': 0, 'rejected': 0, 'total_time': 0.0}
+
+    def validate(self, code: str, file_path: Optional[str] = None) -> ValidationResult:
+        """Validate scene code.
+
+        Args:
+            code: Scene source code
+            file_path: Written scene file, required for the dry run
+
+        Returns:
+            ValidationResult; ``ok`` is False if any error was found
+        """
+        start = time.time()
+        result = ValidationResult()
+
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            result.errors.append(ValidationIssue('SyntaxError', e.msg, e.lineno))
+        else:
+            search_dir = os.path.dirname(os.path.abspath(file_path)) if file_path else None
+            known_names = self._check_imports(tree, result, search_dir)
+            if known_names is not None:
+                self._check_names(tree, known_names, result)
+            self._check_self_attributes(tree, result)
+
+            if self.constraint_detector is not None:
+                for kind, violations in self.constraint_detector.validate_manim_constraints(code).items():
+                    for violation in violations:
+                        result.warnings.append(ValidationIssue(kind, violation))
+
+            if self.dry_run and result.ok and file_path:
+                self._dry_run(file_path, result)
+
+        result.elapsed = time.time() - start
+        self.stats['validated'] += 1
+        self.stats['total_time'] += result.elapsed
+        if not result.ok:
+            self.stats['rejected'] += 1
+        return result
+
+    def _check_imports(self, tree: ast.AST, result: ValidationResult,
+                       search_dir: Optional[str] = None) -> Optional[Set[str]]:
+        """Check imports; return names provided by star imports, or None if unknown."""
+        star_names: Set[str] = set()
+        star_unknown = False
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if not _module_installed(alias.name, search_dir):
+                        result.errors.append(ValidationIssue(
+                            'ModuleNotFoundError', f"No module named '{alias.name}'", node.lineno
+                        ))
+            elif isinstance(node, ast.ImportFrom):
+                if node.level or not node.module:
+                    star_unknown = star_unknown or any(a.name == '*' for a in node.names)
+                    continue
+                if not _module_installed(node.module, search_dir):
+                    result.errors.append(ValidationIssue(
+                        'ModuleNotFoundError', f"No module named '{node.module}'", node.lineno
+                    ))
+                    star_unknown = True
+                    continue
+
+                module = _import_introspected(node.module)
+                for alias in node.names:
+                    if alias.name == '*':
+                        if module is None:
+                            star_unknown = True
+                        else:
+                            star_names |= _public_names(module)
+                    elif module is not None and not hasattr(module, alias.name) \
+                            and not _module_installed(f"{node.module}.{alias.name}"):
+                        result.errors.append(ValidationIssue(
+                            'ImportError',
+                            f"cannot import name '{alias.name}' from '{node.module}'",
+                            node.lineno
+                        ))
+
+        return None if star_unknown else star_names
+
+    @staticmethod
+    def _check_names(tree: ast.AST, star_names: Set[str], result: ValidationResult) -> None:
+        collector = _BindingCollector()
+        collector.visit(tree)
+        known = collector.bound | star_names | set(dir(builtins)) | {'__name__', '__file__'}
+
+        reported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) \
+                    and node.id not in known and node.id not in reported:
+                reported.add(node.id)
+                result.errors.append(ValidationIssue('NameError', f"name '{node.id}' is not defined", node.lineno))
+
+    def _resolve_base(self, base: ast.expr, imports: Dict[str, str]):
+        """Resolve a base class expression to a class from an introspected package."""
+        if isinstance(base, ast.Name):
+            if isinstance(getattr(builtins, base.id, None), type) and base.id not in imports:
+                return getattr(builtins, base.id)
+            for module_name in [imports.get(base.id)] + ['manim']:
+                module = _import_introspected(module_name) if module_name else None
+                if module is not None and isinstance(getattr(module, base.id, None), type):
+                    return getattr(module, base.id)
+        return None
+
+    def _check_self_attributes(self, tree: ast.Module, result: ValidationResult) -> None:
+        imports = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                for alias in node.names:
+                    if alias.name != '*':
+                        imports[alias.asname or alias.name] = node.module
+
+        classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+
+        def members(class_node: ast.ClassDef, seen: Set[str]) -> Optional[Set[str]]:
+            """Attributes available on self, or None if a base cannot be resolved."""
+            names = _self_assignments(class_node)
+            for item in class_node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    names.add(item.name)
+                elif isinstance(item, (ast.Assign, ast.AnnAssign)):
+                    targets = item.targets if isinstance(item, ast.Assign) else [item.target]
+                    names.update(t.id for t in targets if isinstance(t, ast.Name))
+            if '__getattr__' in names or '__getattribute__' in names:
+                return None
+            names |= set(dir(object))
+
+            for base in class_node.bases:
+                if isinstance(base, ast.Name) and base.id in classes and base.id not in seen:
+                    base_names = members(classes[base.id], seen | {base.id})
+                else:
+                    cls = self._resolve_base(base, imports)
+                    base_names = _instance_attributes(cls) if cls is not None else None
+                if base_names is None:
+                    return None
+                names |= base_names
+            return names
+
+        for class_node in classes.values():
+            available = members(class_node, {class_node.name})
+            if available is None:
+                continue
+            reported = set()
+            for node in ast.walk(class_node):
+                if (isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Load)
+                        and isinstance(node.value, ast.Name) and node.value.id == 'self'
+                        and node.attr not in available and node.attr not in reported):
+                    reported.add(node.attr)
+                    result.errors.append(ValidationIssue(
+                        'AttributeError',
+                        f"'{class_node.name}' object has no attribute '{node.attr}'",
+                        node.lineno
+                    ))
+
+    def _dry_run(self, file_path: str, result: ValidationResult) -> None:
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = {**os.environ, 'MANIM_VERBOSITY': 'ERROR'}
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [project_root, env.get('PYTHONPATH')]))
+        try:
+            completed = subprocess.run(
+                [sys.executable, '-m', 'src.core.code_validator', '--dry_run', os.path.abspath(file_path)],
+                capture_output=True, text=True, env=env, timeout=self.dry_run_timeout,
+                cwd=os.path.dirname(os.path.abspath(file_path))
+            )
+        except subprocess.TimeoutExpired:
+            result.warnings.append(ValidationIssue('DryRunTimeout', f"dry run exceeded {self.dry_run_timeout}s"))
+            return
+
+        try:
+            report = json.loads(completed.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            result.errors.append(ValidationIssue('DryRunError', completed.stderr[-2000:] or 'dry run produced no report'))
+            return
+
+        result.dry_run_calls = report.get('calls', [])
+        if report.get('error'):
+            result.errors.append(ValidationIssue('DryRunError', report['error']))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get validation statistics."""
+        return dict(self.stats)
+
+
+def _dry_run_main(file_path: str) -> None:
+    """Subprocess entry point: execute each scene's construct() without rendering frames."""
+    import traceback
+    import tempfile
+
+    calls: List[Dict[str, Any]] = []
+    report: Dict[str, Any] = {'calls': calls, 'error': None}
+    try:
+        from manim import Scene, tempconfig
+
+        def recorder(method_name, original):
+            def wrapper(self, *args, **kwargs):
+                calls.append({
+                    'scene': type(self).__name__,
+                    'method': method_name,
+                    'args': [type(arg).__name__ for arg in args],
+                })
+                return original(self, *args, **kwargs)
+            return wrapper
+
+        for method_name in ('play', 'wait', 'add'):
+            setattr(Scene, method_name, recorder(method_name, getattr(Scene, method_name)))
+
+        spec = importlib.util.spec_from_file_location('dry_run_scene', file_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.path.insert(0, os.path.dirname(file_path))
+        spec.loader.exec_module(module)
+
+        scene_classes = [
+            obj for obj in vars(module).values()
+            if isinstance(obj, type) and issubclass(obj, Scene) and obj.__module__ == module.__name__
+        ]
+        with tempfile.TemporaryDirectory() as media_dir:
+            with tempconfig({'dry_run': True, 'disable_caching': True, 'media_dir': media_dir}):
+                for scene_class in scene_classes:
+                    scene = scene_class()
+                    scene.renderer.skip_animations = True
+                    scene.setup()
+                    scene.construct()
+    except Exception:
+        report['error'] = traceback.format_exc(limit=8)
+
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Validate a generated manim scene file')
+    parser.add_argument('file_path', type=str, help='Scene file to validate')
+    parser.add_argument('--dry_run', action='store_true', help='Only run the construct() dry run and print a JSON report')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        _dry_run_main(args.file_path)
+    else:
+        with open(args.file_path, encoding='utf-8') as f:
+            validation = SceneCodeValidator().validate(f.read(), args.file_path)
+        print(validation.format_error() if not validation.ok else f"OK ({validation.elapsed * 1000:.0f} ms)")
+        for warning in validation.warnings:
+            print(f"warning: {warning}")
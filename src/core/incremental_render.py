@@ -0,0 +1,141 @@
+"""
+Incremental re-rendering of scene versions from manim partial movie files.
+
+Manim hashes every ``play``/``wait`` call (animation, mobject state and
+camera config) and, with caching enabled, skips rendering any call whose
+``<hash>.mp4`` already exists in the scene's ``partial_movie_files``
+directory before stitching the segments into the final movie. Each code
+version (``_v1``, ``_v2``, ...) is a separate module, though, so manim looks
+in a fresh directory and re-renders everything after every code fix.
+
+``PartialMovieReuse`` hardlinks the partial movie files of earlier versions
+of a scene into the directory of the version about to be rendered. Segments
+whose hash is unchanged are then reused by manim and only the changed tail
+of the scene is rendered again.
+"""
+
+import os
+import re
+import logging
+import threading
+from typing import Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_MOVIE_DIR = "partial_movie_files"
+PARTIAL_MOVIE_LIST = "partial_movie_file_list.txt"
+
+_SCENE_CLASS_PATTERN = re.compile(r'^class\s+(\w+)\s*\(([^)]*)\)\s*:', re.MULTILINE)
+
+
+def _listdir(path: str) -> List[str]:
+    """List a directory, treating missing or unreadable directories as empty."""
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def find_scene_classes(code: str) -> List[str]:
+    """Return the names of classes in the code that look like manim scenes."""
+    return [name for name, bases in _SCENE_CLASS_PATTERN.findall(code) if 'Scene' in bases]
+
+
+class PartialMovieReuse:
+    """Seeds new scene versions with partial movie files of earlier versions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {
+            'segments_seeded': 0,
+            'segments_reused': 0,
+            'segments_rendered': 0,
+        }
+
+    def _version_dir(self, media_dir: str, file_prefix: str, scene: int, version: int) -> str:
+        return os.path.join(media_dir, "videos", f"{file_prefix}_scene{scene}_v{version}")
+
+    def _previous_versions(self, media_dir: str, file_prefix: str, scene: int, version: int) -> List[int]:
+        """Return earlier rendered versions of the scene, newest first."""
+        videos_dir = os.path.join(media_dir, "videos")
+        pattern = re.compile(rf'{re.escape(file_prefix)}_scene{scene}_v(\d+)')
+        versions = []
+        for name in _listdir(videos_dir):
+            match = pattern.fullmatch(name)
+            if match and int(match.group(1)) < version:
+                versions.append(int(match.group(1)))
+        return sorted(versions, reverse=True)
+
+    def seed(self, media_dir: str, file_prefix: str, scene: int, version: int, code: str) -> Set[str]:
+        """Link earlier versions' partial movie files into this version's directory.
+
+        Returns the set of seeded file names so reuse can be measured after
+        rendering. Seeding is best effort: unreadable directories and files
+        that cannot be linked are skipped.
+        """
+        target_dir = self._version_dir(media_dir, file_prefix, scene, version)
+        target_scenes = find_scene_classes(code)
+        seeded: Set[str] = set()
+
+        for previous in self._previous_versions(media_dir, file_prefix, scene, version):
+            source_dir = self._version_dir(media_dir, file_prefix, scene, previous)
+            for quality_dir in _listdir(source_dir):
+                partial_root = os.path.join(source_dir, quality_dir, PARTIAL_MOVIE_DIR)
+                if not os.path.isdir(partial_root):
+                    continue
+                for scene_name in _listdir(partial_root):
+                    scene_partial_dir = os.path.join(partial_root, scene_name)
+                    if not os.path.isdir(scene_partial_dir):
+                        continue
+                    for target_scene in target_scenes or [scene_name]:
+                        dest_dir = os.path.join(target_dir, quality_dir, PARTIAL_MOVIE_DIR, target_scene)
+                        seeded |= self._link_segments(scene_partial_dir, dest_dir)
+
+        if seeded:
+            with self._lock:
+                self.stats['segments_seeded'] += len(seeded)
+            logger.info(f"Seeded {len(seeded)} partial movie segments for scene {scene} v{version}")
+        return seeded
+
+    def _link_segments(self, source_dir: str, dest_dir: str) -> Set[str]:
+        linked = set()
+        for file_name in _listdir(source_dir):
+            if not file_name.endswith('.mp4'):
+                continue
+            dest_path = os.path.join(dest_dir, file_name)
+            if os.path.exists(dest_path):
+                continue
+            try:
+                os.makedirs(dest_dir, exist_ok=True)
+                os.link(os.path.join(source_dir, file_name), dest_path)
+            except OSError:
+                # Cross-device or unsupported filesystem: reuse is best effort
+                continue
+            linked.add(file_name)
+        return linked
+
+    def record_render(self, media_dir: str, file_prefix: str, scene: int, version: int,
+                      seeded: Set[str]) -> Dict[str, int]:
+        """Count reused and freshly rendered segments of a finished render."""
+        version_dir = self._version_dir(media_dir, file_prefix, scene, version)
+        used: List[str] = []
+
+        for root, _, files in os.walk(version_dir):
+            if PARTIAL_MOVIE_LIST in files:
+                with open(os.path.join(root, PARTIAL_MOVIE_LIST), 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line.startswith('file '):
+                            used.append(os.path.basename(line.rstrip("'")))
+
+        reused = sum(1 for name in used if name in seeded)
+        result = {'segments_reused': reused, 'segments_rendered': len(used) - reused}
+        with self._lock:
+            for key, value in result.items():
+                self.stats[key] += value
+        return result
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get segment reuse statistics."""
+        with self._lock:
+            return dict(self.stats)
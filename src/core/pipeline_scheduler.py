@@ -0,0 +1,187 @@
+"""
+DAG scheduler for the scene generation pipeline.
+
+The staged pipeline waits for every implementation plan before any code is
+generated and for every scene to render before combining. ``PipelineScheduler``
+instead runs a graph of tasks where each task starts as soon as the tasks it
+depends on have finished, so scene 1 can be generating code or rendering
+while scene 5 is still being planned.
+
+Tasks draw on named resource pools (for example ``llm`` for model calls and
+``render`` for CPU-bound manim renders), each with its own concurrency limit,
+and the scheduler records per-stage queue depths and timings.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyFailedError(Exception):
+    """Raised for a task whose upstream dependency failed."""
+
+
+@dataclass
+class StageStats:
+    """Counters and timings for one pipeline stage."""
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    max_queue_depth: int = 0
+    total_wait_time: float = 0.0
+    total_run_time: float = 0.0
+    max_run_time: float = 0.0
+    first_start: Optional[float] = None
+    last_end: Optional[float] = None
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        finished = max(1, self.completed + self.failed)
+        return {
+            'queued': self.queued,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'max_queue_depth': self.max_queue_depth,
+            'avg_wait_time': self.total_wait_time / finished,
+            'avg_run_time': self.total_run_time / finished,
+            'max_run_time': self.max_run_time,
+            'active_window': (
+                (self.first_start - origin, self.last_end - origin)
+                if self.first_start is not None and self.last_end is not None else None
+            ),
+        }
+
+
+@dataclass
+class _TaskSpec:
+    task_id: str
+    stage: str
+    func: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depends_on: List[str] = field(default_factory=list)
+    resource: Optional[str] = None
+
+
+class PipelineScheduler:
+    """Runs a DAG of async tasks under per-resource concurrency limits."""
+
+    def __init__(self, resource_limits: Dict[str, int]):
+        """Initialize the scheduler.
+
+        Args:
+            resource_limits: Maximum concurrent tasks per resource pool name
+        """
+        self.resource_limits = dict(resource_limits)
+        self._semaphores = {name: asyncio.Semaphore(max(1, limit)) for name, limit in resource_limits.items()}
+        self._tasks: Dict[str, _TaskSpec] = {}
+        self.stage_stats: Dict[str, StageStats] = {}
+        self.started_at = time.time()
+
+    def _stats(self, stage: str) -> StageStats:
+        if stage not in self.stage_stats:
+            self.stage_stats[stage] = StageStats()
+        return self.stage_stats[stage]
+
+    async def run(self, stage: str, resource: Optional[str], func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one coroutine as a task of ``stage`` holding a ``resource`` slot."""
+        stats = self._stats(stage)
+        stats.queued += 1
+        stats.max_queue_depth = max(stats.max_queue_depth, stats.queued)
+        queued_at = time.time()
+
+        semaphore = self._semaphores.get(resource) if resource else None
+        try:
+            if semaphore is not None:
+                await semaphore.acquire()
+        finally:
+            # Leave the queue even if cancelled while waiting for a slot
+            stats.queued -= 1
+        try:
+            started_at = time.time()
+            stats.running += 1
+            stats.total_wait_time += started_at - queued_at
+            if stats.first_start is None:
+                stats.first_start = started_at
+
+            try:
+                result = await func()
+            except BaseException:
+                stats.failed += 1
+                raise
+            else:
+                stats.completed += 1
+                return result
+            finally:
+                ended_at = time.time()
+                stats.running -= 1
+                stats.total_run_time += ended_at - started_at
+                stats.max_run_time = max(stats.max_run_time, ended_at - started_at)
+                stats.last_end = ended_at
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    def add_task(self, task_id: str, stage: str, func: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 depends_on: Iterable[str] = (), resource: Optional[str] = None) -> None:
+        """Register a task. ``func`` receives a dict of its dependencies' results."""
+        if task_id in self._tasks:
+            raise ValueError(f"Duplicate pipeline task: {task_id}")
+        self._tasks[task_id] = _TaskSpec(task_id, stage, func, list(depends_on), resource)
+
+    async def execute(self) -> Dict[str, Any]:
+        """Run all registered tasks, each as soon as its dependencies finish.
+
+        Returns a mapping of task id to result, or to the exception the task
+        raised. Tasks downstream of a failure get a ``DependencyFailedError``.
+        """
+        for spec in self._tasks.values():
+            missing = [dep for dep in spec.depends_on if dep not in self._tasks]
+            if missing:
+                raise ValueError(f"Task {spec.task_id} depends on unknown tasks: {missing}")
+
+        futures: Dict[str, asyncio.Task] = {}
+
+        async def run_task(spec: _TaskSpec) -> Any:
+            dep_results = {}
+            for dep in spec.depends_on:
+                try:
+                    dep_results[dep] = await futures[dep]
+                except Exception as e:
+                    self._stats(spec.stage).skipped += 1
+                    raise DependencyFailedError(f"{spec.task_id} skipped: {dep} failed ({e})") from e
+            return await self.run(spec.stage, spec.resource, lambda: spec.func(dep_results))
+
+        # Create every task up front; each one blocks on its own dependencies
+        for spec in self._tasks.values():
+            futures[spec.task_id] = asyncio.ensure_future(run_task(spec))
+
+        results = await asyncio.gather(*futures.values(), return_exceptions=True)
+        self._tasks = {}
+        return dict(zip(futures.keys(), results))
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current number of tasks waiting for a slot, per stage."""
+        return {stage: stats.queued for stage, stats in self.stage_stats.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-stage statistics plus overall wall time."""
+        return {
+            'wall_time': time.time() - self.started_at,
+            'resource_limits': dict(self.resource_limits),
+            'stages': {stage: stats.to_dict(self.started_at) for stage, stats in self.stage_stats.items()},
+        }
+
+    def print_summary(self) -> None:
+        """Print per-stage timings."""
+        stats = self.get_stats()
+        print(f"📊 Pipeline finished in {stats['wall_time']:.2f}s")
+        for stage, stage_stats in stats['stages'].items():
+            print(f"   {stage:<10} done={stage_stats['completed']} failed={stage_stats['failed']} "
+                  f"skipped={stage_stats['skipped']} max_queue={stage_stats['max_queue_depth']} "
+                  f"avg_wait={stage_stats['avg_wait_time']:.2f}s avg_run={stage_stats['avg_run_time']:.2f}s")
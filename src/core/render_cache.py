@@ -0,0 +1,408 @@
+"""
+Content-addressed render cache for Manim scene videos.
+
+Cache keys are built from a normalized form of the scene code (comments,
+blank lines, trailing whitespace and the renderer's injected optimization
+header are ignored) together with the render quality, fps, the installed
+manim version and the versions of the manim plugins the code imports.
+
+Entries are tracked in a JSON manifest so lookups rarely touch the
+filesystem, and the least recently used entries are evicted once the cache
+grows past its byte budget. Several processes may share one cache
+directory: each write merges its own changes into the on-disk manifest
+under an advisory file lock, and access times from cache hits are flushed
+in batches rather than on every hit. Files are copied in and out of the cache
+(reflinked where the filesystem supports it) through a temporary file and a
+rename, so a later re-render that rewrites an output path in place never
+changes a cached entry, and vice versa.
+"""
+
+import io
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import tokenize
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Linux ioctl that clones a file's extents (btrfs, XFS, bcachefs)
+_FICLONE = 0x40049409
+
+# Lines injected by OptimizedVideoRenderer._optimize_code_for_rendering
+OPTIMIZATION_HEADER_LINES = [
+    "",
+    "# Manim rendering optimizations",
+    "from manim import config",
+    "config.frame_rate = 30  # Balanced frame rate",
+    "config.pixel_height = 720  # Optimized resolution",
+    "config.pixel_width = 1280",
+    ""
+]
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_LOCK_FILENAME = "manifest.lock"
+MANIFEST_VERSION = 1
+
+# Seconds between manifest writes that only record cache-hit access times
+ACCESS_FLUSH_INTERVAL = 60.0
+
+_PLUGIN_IMPORT_PATTERN = re.compile(r'^\s*(?:from|import)\s+(manim_[A-Za-z0-9_]+)', re.MULTILINE)
+
+
+def _strip_comments(code: str) -> str:
+    """Remove comments from Python source, keeping line structure."""
+    try:
+        tokens = [
+            tok for tok in tokenize.generate_tokens(io.StringIO(code).readline)
+            if tok.type != tokenize.COMMENT
+        ]
+        return tokenize.untokenize(tokens)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # Unparseable code still gets a stable key, just without comment stripping
+        return re.sub(r'(?m)^\s*#.*$', '', code)
+
+
+def normalize_code(code: str) -> str:
+    """Normalize scene code so cosmetic differences map to the same key."""
+    header = [line.strip() for line in _strip_comments('\n'.join(OPTIMIZATION_HEADER_LINES)).splitlines()]
+    header = [line for line in header if line]
+
+    lines = [line.rstrip() for line in _strip_comments(code).splitlines()]
+    lines = [line for line in lines if line.strip()]
+
+    # Drop the injected header block if the code was read back from disk
+    stripped = [line.strip() for line in lines]
+    for i in range(len(stripped) - len(header) + 1):
+        if stripped[i:i + len(header)] == header:
+            del lines[i:i + len(header)]
+            break
+
+    return '\n'.join(lines)
+
+
+def detect_plugins(code: str) -> List[str]:
+    """Return the sorted set of manim plugins imported by the code."""
+    return sorted(set(_PLUGIN_IMPORT_PATTERN.findall(code)))
+
+
+def _package_version(name: str) -> str:
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:  # pragma: no cover
+        return "unknown"
+    try:
+        return version(name.replace('_', '-'))
+    except PackageNotFoundError:
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return "unknown"
+
+
+def _clone_file(src: str, dst: str) -> bool:
+    """Copy ``src`` to ``dst`` as an independent file, replacing ``dst`` atomically.
+
+    Uses a copy-on-write reflink where the filesystem supports one, else a
+    plain copy. Never a hardlink: the copy must not share an inode with a
+    file manim or ffmpeg may rewrite in place.
+
+    Returns True if the file was reflinked, False if it was copied.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst) or '.', prefix='.tmp-',
+                                    suffix=os.path.splitext(dst)[1])
+    try:
+        with os.fdopen(fd, 'wb') as out, open(src, 'rb') as inp:
+            cloned = False
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(out.fileno(), _FICLONE, inp.fileno())
+                    cloned = True
+                except OSError:
+                    pass
+            if not cloned:
+                shutil.copyfileobj(inp, out, 1024 * 1024)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return cloned
+
+
+class RenderCache:
+    """LRU render cache with a JSON manifest and a byte budget."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 5 * 1024 ** 3):
+        """Initialize the cache and load its manifest.
+
+        Args:
+            cache_dir (str): Directory holding cached videos and the manifest
+            max_bytes (int): Total size budget before LRU eviction kicks in
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILENAME)
+        self.lock_path = os.path.join(cache_dir, MANIFEST_LOCK_FILENAME)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._manim_version = _package_version('manim')
+        self._plugin_versions: Dict[str, str] = {}
+
+        # Local changes not yet merged into the on-disk manifest
+        self._added: Dict[str, Dict] = {}
+        self._removed: Set[str] = set()
+        self._touched: Set[str] = set()
+        self._manifest_mtime: Optional[int] = None
+        self._last_flush = time.monotonic()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'bytes_saved': 0,
+            'reflinked': 0,
+            'copied': 0,
+        }
+
+        os.makedirs(cache_dir, exist_ok=True)
+        with self._lock:
+            self._entries = OrderedDict(sorted(self._read_manifest().items(),
+                                               key=lambda item: item[1].get('last_access', 0)))
+
+    def _read_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self._manifest_mtime = os.fstat(f.fileno()).st_mtime_ns
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable render cache manifest: {e}")
+            return {}
+
+        if data.get('version') != MANIFEST_VERSION:
+            return {}
+        return data.get('entries', {})
+
+    @contextmanager
+    def _manifest_lock(self):
+        """Hold the cross-process lock on the manifest (no-op without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _merge_locked(self, disk_entries: Dict[str, Dict]) -> None:
+        """Rebuild the in-memory view from the on-disk entries plus local changes."""
+        merged = {key: entry for key, entry in disk_entries.items() if key not in self._removed}
+        merged.update(self._added)
+        for key in self._touched:
+            local = self._entries.get(key)
+            if local is not None and key in merged:
+                merged[key] = {**merged[key],
+                               'last_access': max(merged[key].get('last_access', 0), local['last_access'])}
+        self._entries = OrderedDict(sorted(merged.items(), key=lambda item: item[1].get('last_access', 0)))
+
+    def _sync_manifest_locked(self) -> None:
+        """Merge local changes into the on-disk manifest, evict, and write it back.
+
+        Entries other processes added since our last read are kept, so the
+        byte budget covers every file in the cache directory.
+        """
+        with self._manifest_lock():
+            self._merge_locked(self._read_manifest())
+            self._evict_locked()
+
+            tmp_path = f"{self.manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': MANIFEST_VERSION, 'entries': self._entries}, f)
+                os.replace(tmp_path, self.manifest_path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+            self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+
+        self._added.clear()
+        self._removed.clear()
+        self._touched.clear()
+        self._last_flush = time.monotonic()
+
+    def _refresh_locked(self) -> None:
+        """Pick up entries other processes wrote since the manifest was last read."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._manifest_mtime:
+            self._merge_locked(self._read_manifest())
+
+    def flush(self) -> None:
+        """Write pending access times and local changes to the manifest."""
+        with self._lock:
+            if self._added or self._removed or self._touched:
+                self._sync_manifest_locked()
+
+    def _plugin_version(self, plugin: str) -> str:
+        if plugin not in self._plugin_versions:
+            self._plugin_versions[plugin] = _package_version(plugin)
+        return self._plugin_versions[plugin]
+
+    def make_key(self, code: str, quality: str, fps: int) -> str:
+        """Build the cache key for a render of ``code`` at ``quality``/``fps``."""
+        plugins = ','.join(f"{p}=={self._plugin_version(p)}" for p in detect_plugins(code))
+        material = '\0'.join([
+            normalize_code(code), quality, str(fps), self._manim_version, plugins
+        ])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry['size'] for entry in self._entries.values())
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the cached file path for ``key`` from the manifest, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._refresh_locked()
+                entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            entry['last_access'] = time.time()
+            self._touched.add(key)
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += entry['size']
+            return os.path.join(self.cache_dir, entry['file'])
+
+    def materialize(self, key: str, dest_path: str) -> bool:
+        """Copy the cached video for ``key`` to ``dest_path``.
+
+        Returns False (and drops the entry) if the cached file has gone missing.
+        Failing to record the hit in the manifest never fails the restore.
+        """
+        cached_path = self.lookup(key)
+        if cached_path is None:
+            return False
+
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        try:
+            cloned = _clone_file(cached_path, dest_path)
+        except FileNotFoundError:
+            with self._lock:
+                entry = self._entries.pop(key, None)
+                self._added.pop(key, None)
+                self._touched.discard(key)
+                self._removed.add(key)
+                self.stats['hits'] -= 1
+                self.stats['misses'] += 1
+                if entry:
+                    self.stats['bytes_saved'] -= entry['size']
+                self._sync_best_effort_locked()
+            return False
+
+        with self._lock:
+            self.stats['reflinked' if cloned else 'copied'] += 1
+            if time.monotonic() - self._last_flush >= ACCESS_FLUSH_INTERVAL:
+                self._sync_best_effort_locked()
+        return True
+
+    def _sync_best_effort_locked(self) -> None:
+        try:
+            self._sync_manifest_locked()
+        except OSError as e:
+            logger.warning(f"Could not update render cache manifest: {e}")
+
+    def store(self, key: str, video_path: str, quality: str) -> None:
+        """Add a rendered video to the cache and evict down to the budget."""
+        file_name = f"{key}.mp4"
+        cache_path = os.path.join(self.cache_dir, file_name)
+        cloned = _clone_file(video_path, cache_path)
+        size = os.path.getsize(cache_path)
+
+        with self._lock:
+            now = time.time()
+            entry = {
+                'file': file_name,
+                'size': size,
+                'quality': quality,
+                'created_at': now,
+                'last_access': now,
+            }
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._added[key] = entry
+            self._removed.discard(key)
+            self.stats['stores'] += 1
+            self.stats['reflinked' if cloned else 'copied'] += 1
+            self._sync_manifest_locked()
+
+    def _evict_locked(self) -> None:
+        total = self.total_bytes
+        while total > self.max_bytes and len(self._entries) > 1:
+            key, entry = self._entries.popitem(last=False)
+            self._added.pop(key, None)
+            self._touched.discard(key)
+            total -= entry['size']
+            self._remove_file(entry['file'])
+            self.stats['evictions'] += 1
+            logger.debug(f"Evicted render cache entry {key[:8]}")
+
+    def _remove_file(self, file_name: str) -> None:
+        try:
+            os.remove(os.path.join(self.cache_dir, file_name))
+        except FileNotFoundError:
+            pass
+
+    def remove_older_than(self, max_age_seconds: float) -> int:
+        """Drop entries not used within ``max_age_seconds``. Returns the count."""
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry['last_access'] < cutoff]
+            for key in stale:
+                self._remove_file(self._entries.pop(key)['file'])
+                self._added.pop(key, None)
+                self._touched.discard(key)
+                self._removed.add(key)
+            if stale:
+                self._sync_manifest_locked()
+        return len(stale)
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': self.stats['hits'] / max(1, lookups),
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+            }
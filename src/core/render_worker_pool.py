@@ -0,0 +1,355 @@
+"""
+Warm Manim render worker pool.
+
+Launching ``manim render`` as a fresh subprocess re-imports manim, numpy,
+cairo and the plugins on every scene and every retry. This module keeps a
+small pool of long-lived worker processes instead: each worker imports manim
+once at startup and then renders scene files it receives over a pipe.
+
+Each job runs inside ``manim.tempconfig`` and the scene module is removed
+from ``sys.modules`` afterwards, so configuration and module state do not
+leak between jobs. Workers that time out or crash are killed and replaced,
+and every worker is recycled after a configurable number of renders.
+"""
+
+import io
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+import subprocess
+import importlib.util
+import multiprocessing
+from contextlib import redirect_stdout, redirect_stderr
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pixel sizes matching manim's -ql/-qm/-qh/-qp quality flags
+QUALITY_FLAG_SETTINGS = {
+    '-ql': {'pixel_height': 480, 'pixel_width': 854},
+    '-qm': {'pixel_height': 720, 'pixel_width': 1280},
+    '-qh': {'pixel_height': 1080, 'pixel_width': 1920},
+    '-qp': {'pixel_height': 1440, 'pixel_width': 2560},
+}
+
+# Plugins imported once per worker so scenes using them start warm
+DEFAULT_PRELOAD_MODULES = (
+    'manim_voiceover',
+    'manim_physics',
+    'manim_chemistry',
+    'manim_dsa',
+    'manim_circuit',
+    'manim_ml',
+)
+
+
+@dataclass
+class RenderJob:
+    """A single scene file render request sent to a worker."""
+    file_path: str
+    media_dir: str
+    quality_flag: str = '-qm'
+    fps: int = 30
+    disable_caching: bool = False
+    renderer: str = 'cairo'
+    save_last_frame: bool = False
+
+    def to_config(self) -> Dict[str, Any]:
+        """Build the manim config overrides for this job."""
+        overrides = dict(QUALITY_FLAG_SETTINGS.get(self.quality_flag, QUALITY_FLAG_SETTINGS['-qm']))
+        overrides.update({
+            'input_file': self.file_path,
+            'media_dir': self.media_dir,
+            'frame_rate': self.fps,
+            'disable_caching': self.disable_caching,
+            'renderer': self.renderer,
+            'save_last_frame': self.save_last_frame,
+            'write_to_movie': True,
+            'verbosity': 'WARNING',
+        })
+        return overrides
+
+
+def _render_job_in_worker(job: RenderJob) -> Dict[str, Any]:
+    """Render every scene in ``job.file_path`` inside the current worker."""
+    from manim import Scene, config, tempconfig
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    module_name = Path(job.file_path).stem
+    original_cwd = os.getcwd()
+    original_path = list(sys.path)
+    returncode = 0
+
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr), tempconfig({}):
+            for key, value in job.to_config().items():
+                config[key] = value
+
+            spec = importlib.util.spec_from_file_location(module_name, job.file_path)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Cannot load scene module from {job.file_path}")
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            sys.path.insert(0, os.path.dirname(os.path.abspath(job.file_path)))
+            spec.loader.exec_module(module)
+
+            scene_classes = [
+                obj for obj in vars(module).values()
+                if isinstance(obj, type) and issubclass(obj, Scene)
+                and obj.__module__ == module_name
+            ]
+            if not scene_classes:
+                raise ValueError(f"No scenes found in {job.file_path}")
+
+            for scene_class in scene_classes:
+                scene_class().render()
+    except Exception:
+        traceback.print_exc(file=stderr)
+        returncode = 1
+    finally:
+        sys.modules.pop(module_name, None)
+        sys.path[:] = original_path
+        os.chdir(original_cwd)
+
+    return {
+        'returncode': returncode,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue(),
+    }
+
+
+def _worker_main(conn, preload_modules: List[str]) -> None:
+    """Worker process entry point: import manim once, then serve jobs."""
+    os.environ.setdefault('MANIM_VERBOSITY', 'WARNING')
+    os.environ.setdefault('OMP_NUM_THREADS', str(os.cpu_count()))
+
+    import manim  # noqa: F401  (warm import is the point of the pool)
+    for module_name in preload_modules:
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            pass
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        conn.send(_render_job_in_worker(job))
+
+
+@dataclass
+class _RenderWorker:
+    """Parent-side handle for one worker process."""
+    process: Any
+    conn: Any
+    renders: int = 0
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self, kill: bool = False) -> None:
+        """Stop the worker, forcefully if ``kill`` is set."""
+        try:
+            if not kill and self.alive:
+                self.conn.send(None)
+                self.process.join(timeout=5)
+        except (BrokenPipeError, OSError):
+            pass
+        if self.alive:
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ManimRenderWorkerPool:
+    """Thread-safe pool of warm Manim render worker processes.
+
+    ``render`` blocks the calling thread until the job finishes, so it is
+    meant to be called through ``asyncio.to_thread`` like the subprocess
+    backend in ``OptimizedVideoRenderer``.
+    """
+
+    def __init__(self, size: int = 4, max_renders_per_worker: int = 20,
+                 render_timeout: float = 300,
+                 preload_modules: Optional[List[str]] = None):
+        """Initialize the pool. Workers are spawned lazily or by ``start``.
+
+        Args:
+            size (int): Maximum number of worker processes
+            max_renders_per_worker (int): Renders before a worker is recycled
+            render_timeout (float): Default per-job timeout in seconds
+            preload_modules (list): Extra modules each worker imports at startup
+        """
+        self.size = max(1, size)
+        self.max_renders_per_worker = max_renders_per_worker
+        self.render_timeout = render_timeout
+        self.preload_modules = list(
+            DEFAULT_PRELOAD_MODULES if preload_modules is None else preload_modules
+        )
+
+        self._context = multiprocessing.get_context('spawn')
+        self._idle: List[_RenderWorker] = []
+        self._lock = threading.Lock()
+        # Signalled whenever a worker becomes idle, a slot frees up or the pool closes
+        self._available = threading.Condition(self._lock)
+        self._spawned = 0
+        self._closed = False
+
+        self.stats = {
+            'jobs': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'crashes': 0,
+            'workers_started': 0,
+            'workers_recycled': 0,
+        }
+
+    # Worker process entry point; tests substitute a lightweight one
+    _worker_target = staticmethod(_worker_main)
+
+    def _spawn_worker(self) -> _RenderWorker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=self._worker_target,
+            args=(child_conn, self.preload_modules),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        with self._lock:
+            self.stats['workers_started'] += 1
+        logger.debug(f"Started render worker pid={process.pid}")
+        return _RenderWorker(process=process, conn=parent_conn)
+
+    def _spawn_reserved(self) -> _RenderWorker:
+        """Spawn a worker for a slot already counted in ``_spawned``."""
+        try:
+            return self._spawn_worker()
+        except Exception:
+            with self._available:
+                self._spawned -= 1
+                self._available.notify()
+            raise
+
+    def start(self) -> None:
+        """Spawn all workers up front so the first renders start warm."""
+        while True:
+            with self._available:
+                if self._closed or self._spawned >= self.size:
+                    return
+                self._spawned += 1
+            worker = self._spawn_reserved()
+            self._release(worker)
+
+    def _acquire(self) -> _RenderWorker:
+        """Take an idle worker, spawn one into a free slot, or wait for either."""
+        while True:
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Render worker pool is shut down")
+                    if self._idle:
+                        worker = self._idle.pop()
+                        break
+                    if self._spawned < self.size:
+                        self._spawned += 1
+                        worker = None
+                        break
+                    self._available.wait()
+
+            if worker is None:
+                return self._spawn_reserved()
+            if worker.alive:
+                return worker
+            self._retire(worker, kill=True)
+
+    def _retire(self, worker: _RenderWorker, kill: bool = False) -> None:
+        worker.stop(kill=kill)
+        with self._available:
+            self._spawned -= 1
+            self.stats['workers_recycled'] += 1
+            # A waiting render can now spawn a replacement
+            self._available.notify()
+
+    def _release(self, worker: _RenderWorker) -> None:
+        with self._available:
+            keep = not self._closed and worker.alive and worker.renders < self.max_renders_per_worker
+            if keep:
+                self._idle.append(worker)
+                self._available.notify()
+        if not keep:
+            self._retire(worker)
+
+    def render(self, job: RenderJob, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Render a job on a warm worker.
+
+        Returns a ``CompletedProcess`` so callers can treat this backend like
+        ``subprocess.run``. Raises ``subprocess.TimeoutExpired`` when the job
+        exceeds its timeout; the offending worker is killed and replaced.
+        """
+        timeout = timeout or self.render_timeout
+        args = ['manim-worker', job.file_path]
+        worker = self._acquire()
+
+        with self._lock:
+            self.stats['jobs'] += 1
+
+        try:
+            worker.conn.send(job)
+            if not worker.conn.poll(timeout):
+                with self._lock:
+                    self.stats['timeouts'] += 1
+                self._retire(worker, kill=True)
+                raise subprocess.TimeoutExpired(args, timeout)
+            result = worker.conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError, OSError) as e:
+            with self._lock:
+                self.stats['crashes'] += 1
+            self._retire(worker, kill=True)
+            return subprocess.CompletedProcess(
+                args, returncode=1, stdout='', stderr=f"Render worker crashed: {e}"
+            )
+
+        worker.renders += 1
+        if result['returncode'] != 0:
+            with self._lock:
+                self.stats['failures'] += 1
+        self._release(worker)
+
+        return subprocess.CompletedProcess(
+            args, returncode=result['returncode'],
+            stdout=result['stdout'], stderr=result['stderr']
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._lock:
+            return {
+                **self.stats,
+                'size': self.size,
+                'active_workers': self._spawned,
+                'idle_workers': len(self._idle),
+            }
+
+    def shutdown(self) -> None:
+        """Stop all idle workers and refuse new jobs.
+
+        Renders waiting for a worker fail with ``RuntimeError``; renders in
+        progress finish and their workers are stopped on release.
+        """
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for worker in idle:
+            self._retire(worker)
@@ -0,0 +1,138 @@
+"""
+Stream-copy concatenation of scene videos.
+
+The concat demuxer joins MP4 segments without decoding them. That is only
+valid when every segment's video stream was encoded the same way: codec,
+profile, level, resolution, frame rate, pixel format, time base and the
+codec parameter sets (SPS/PPS, compared through ffprobe's extradata hash).
+Mixing anything else can produce a file that plays wrong while ffmpeg
+reports success, so ``concat_stream_copy`` declines non-uniform scenes and
+the caller re-encodes them all.
+
+Audio is normalized per segment with the video stream copied: scenes
+without audio get a silent track and audio in another format is re-encoded
+to the majority format.
+"""
+
+import os
+import shutil
+import asyncio
+import tempfile
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Fields of the scene video info (see VideoRenderer._analyze_video) that must
+# be identical across stream-copied segments
+VIDEO_FORMAT_FIELDS = (
+    'video_codec', 'video_profile', 'video_level', 'width', 'height',
+    'fps', 'pix_fmt', 'video_time_base', 'video_extradata_hash',
+)
+
+DEFAULT_AUDIO_FORMAT = ('aac', 44100, 2)
+
+
+def video_format_key(info: Dict) -> tuple:
+    """Video parameters that must be identical across concatenated segments."""
+    return tuple(
+        round(float(info['fps']), 3) if field == 'fps' else info.get(field)
+        for field in VIDEO_FORMAT_FIELDS
+    )
+
+
+def audio_format_key(info: Dict) -> Tuple:
+    return (info.get('audio_codec'), info.get('audio_sample_rate'), info.get('audio_channels'))
+
+
+async def run_ffmpeg(cmd: List[str], operation_name: str) -> None:
+    """Run an ffmpeg command without blocking the event loop."""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise Exception(f"FFmpeg {operation_name} failed: {stderr.decode('utf-8', errors='replace')[-2000:]}")
+
+
+def _target_audio_format(video_info: Sequence[Dict]) -> Optional[Tuple]:
+    """Audio format every segment is given, or None if no scene has audio."""
+    counts: Dict[Tuple, int] = {}
+    for info in video_info:
+        if info['has_audio']:
+            key = audio_format_key(info)
+            counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return None
+    target = max(counts, key=counts.get)
+    if target[0] != 'aac' or not target[1] or not target[2]:
+        return DEFAULT_AUDIO_FORMAT
+    return target
+
+
+async def concat_stream_copy(scene_videos: Sequence[str], video_info: Sequence[Dict], output_path: str,
+                             run: Callable[[List[str], str], Awaitable[None]] = run_ffmpeg) -> bool:
+    """Concatenate scenes with the concat demuxer and stream copy.
+
+    Args:
+        scene_videos: Scene video paths in order
+        video_info: Probe info per scene (VideoRenderer._analyze_video)
+        output_path: Combined video path
+        run: Coroutine running an ffmpeg command
+
+    Returns:
+        False, without writing anything, if the scenes' video streams are
+        not identical (or unknown); the caller then re-encodes.
+    """
+    formats = {video_format_key(info) for info in video_info}
+    if len(formats) != 1 or any(value is None for value in next(iter(formats))):
+        return False
+
+    audio_target = _target_audio_format(video_info)
+
+    temp_dir = tempfile.mkdtemp(prefix="concat_")
+    try:
+        async def prepare_segment(index: int, video_path: str, info: Dict) -> str:
+            if audio_target is None or (info['has_audio'] and audio_format_key(info) == audio_target):
+                return os.path.abspath(video_path)
+
+            # Video is copied; only the audio track is added or re-encoded
+            segment_path = os.path.join(temp_dir, f"segment_{index:04d}.mp4")
+            cmd = ['ffmpeg', '-v', 'error', '-i', video_path]
+            if not info['has_audio']:
+                layout = 'mono' if audio_target[2] == 1 else 'stereo'
+                cmd += ['-f', 'lavfi', '-t', str(info['duration']),
+                        '-i', f'anullsrc=channel_layout={layout}:sample_rate={audio_target[1]}']
+            cmd += ['-map', '0:v:0', '-map', '0:a:0' if info['has_audio'] else '1:a:0',
+                    '-c:v', 'copy',
+                    '-c:a', 'aac', '-ar', str(audio_target[1]), '-ac', str(audio_target[2])]
+            if not info['has_audio']:
+                cmd += ['-shortest']
+            cmd += ['-y', segment_path]
+            await run(cmd, f"audio normalization for {os.path.basename(video_path)}")
+            return segment_path
+
+        segments = await asyncio.gather(*[
+            prepare_segment(i, video, info)
+            for i, (video, info) in enumerate(zip(scene_videos, video_info))
+        ])
+        prepared = sum(1 for segment in segments if segment.startswith(temp_dir))
+        print(f"⚡ Stream-copy concat: {len(segments) - prepared} scenes copied as-is, "
+              f"{prepared} with normalized audio")
+
+        file_list_path = os.path.join(temp_dir, "file_list.txt")
+        with open(file_list_path, 'w') as f:
+            for segment in segments:
+                escaped = segment.replace('\\', '/').replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        await run([
+            'ffmpeg', '-v', 'error',
+            '-f', 'concat', '-safe', '0', '-i', file_list_path,
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            '-avoid_negative_ts', 'make_zero',
+            '-y', output_path
+        ], "stream-copy concat")
+        return True
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,157 @@
+"""
+Single-pass subtitle merger for combined videos.
+
+Scene subtitles are shifted by the durations of the preceding scenes, which
+the caller already knows from probing the scene videos. Each scene's SRT is
+streamed line by line and every cue is written to the combined SRT and the
+combined WebVTT in the same pass, so memory use does not grow with the
+subtitle size and no scene is probed a second time.
+
+Per-scene offsets (start, end and cue range of each scene on the combined
+timeline) can also be written as a JSON sidecar, which lets HLS packaging
+map scene segments onto subtitle times without re-reading the subtitles.
+"""
+
+import os
+import json
+from dataclasses import dataclass, asdict
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+
+
+@dataclass
+class SceneSubtitleOffset:
+    """Position of one scene on the combined timeline."""
+    scene_index: int
+    subtitle_path: Optional[str]
+    start: float
+    duration: float
+    end: float
+    first_cue: Optional[int] = None
+    last_cue: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def parse_timestamp(time_str: str) -> float:
+    """Parse an SRT (``00:01:02,345``) or WebVTT (``00:01:02.345``) timestamp to seconds."""
+    h, m, s = time_str.strip().replace(',', '.').split(':')
+    return float(h) * 3600 + float(m) * 60 + float(s)
+
+
+def format_timestamp(total_seconds: float, separator: str = ',') -> str:
+    """Format seconds as ``HH:MM:SS,mmm`` (or with ``.`` for WebVTT)."""
+    h = int(total_seconds // 3600)
+    m = int((total_seconds % 3600) // 60)
+    s = f"{total_seconds % 60:06.3f}"
+    if s.startswith('60'):
+        # Rounding pushed the seconds to 60; carry into the minutes
+        total_seconds = round(total_seconds)
+        h = int(total_seconds // 3600)
+        m = int((total_seconds % 3600) // 60)
+        s = f"{total_seconds % 60:06.3f}"
+    return f"{h:02d}:{m:02d}:{s}".replace('.', separator)
+
+
+def iter_srt_cues(lines: Iterator[str]) -> Iterator[Tuple[float, float, List[str]]]:
+    """Stream (start, end, text lines) cues from SRT lines.
+
+    A cue starts at a line holding only its index, followed by the timing
+    line and text lines up to the next blank line. Anything else between
+    cues is skipped. Text lines are yielded as read, newline included.
+    """
+    lines = iter(lines)
+    for line in lines:
+        if not line.strip().isdigit():
+            continue
+        time_line = next(lines, None)
+        if time_line is None or '-->' not in time_line:
+            continue
+        start_time, end_time = time_line.split('-->')
+        start = parse_timestamp(start_time)
+        end = parse_timestamp(end_time.split()[0])
+
+        text = []
+        for text_line in lines:
+            if not text_line.strip():
+                break
+            text.append(text_line)
+        yield start, end, text
+
+
+class SubtitleMerger:
+    """Merge scene SRT files into combined SRT and WebVTT outputs in one pass."""
+
+    def __init__(self, srt_path: str, vtt_path: Optional[str] = None):
+        """
+        Args:
+            srt_path: Combined SRT output
+            vtt_path: Combined WebVTT output, or None to skip it
+        """
+        self.srt_path = srt_path
+        self.vtt_path = vtt_path
+
+    def merge(self, scene_subtitles: Sequence[Optional[str]],
+              scene_durations: Sequence[float]) -> List[SceneSubtitleOffset]:
+        """Merge scene subtitles, shifting each scene by the durations before it.
+
+        Args:
+            scene_subtitles: SRT path per scene, None for scenes without subtitles
+            scene_durations: Duration in seconds of each scene video, in order
+
+        Returns:
+            The offset of every scene on the combined timeline
+        """
+        if len(scene_subtitles) != len(scene_durations):
+            raise ValueError(
+                f"Got {len(scene_subtitles)} subtitle files for {len(scene_durations)} scene durations"
+            )
+
+        offsets = []
+        vtt_file: Optional[TextIO] = None
+        with open(self.srt_path, 'w', encoding='utf-8') as srt_file:
+            if self.vtt_path:
+                vtt_file = open(self.vtt_path, 'w', encoding='utf-8')
+                vtt_file.write("WEBVTT\n\n")
+            try:
+                offset = 0.0
+                cue_index = 1
+                for scene_index, (subtitle_path, duration) in enumerate(zip(scene_subtitles, scene_durations)):
+                    scene = SceneSubtitleOffset(
+                        scene_index=scene_index,
+                        subtitle_path=subtitle_path,
+                        start=offset,
+                        duration=duration,
+                        end=offset + duration
+                    )
+                    if subtitle_path is not None:
+                        with open(subtitle_path, 'r', encoding='utf-8') as infile:
+                            for start, end, text in iter_srt_cues(infile):
+                                self._write_cue(srt_file, vtt_file, cue_index, start + offset, end + offset, text)
+                                if scene.first_cue is None:
+                                    scene.first_cue = cue_index
+                                scene.last_cue = cue_index
+                                cue_index += 1
+                    offsets.append(scene)
+                    offset += duration
+            finally:
+                if vtt_file is not None:
+                    vtt_file.close()
+        return offsets
+
+    @staticmethod
+    def _write_cue(srt_file: TextIO, vtt_file: Optional[TextIO], index: int,
+                   start: float, end: float, text: List[str]) -> None:
+        body = ''.join(text)
+        srt_file.write(f"{index}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{body}\n")
+        if vtt_file is not None:
+            vtt_file.write(
+                f"{index}\n{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{body}\n"
+            )
+
+
+def write_subtitle_offsets(offsets: Sequence[SceneSubtitleOffset], output_path: str) -> None:
+    """Write per-scene offsets as a JSON sidecar for HLS segment alignment."""
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'scenes': [offset.to_dict() for offset in offsets]}, f, indent=2)
@@ -0,0 +1,283 @@
+"""
+Per-topic manifest of generated artifacts.
+
+Every topic directory holds a ``manifest.jsonl`` that the planner, the
+renderer and the pipeline append one event to whenever they produce an
+artifact (outline, implementation plan, code version, rendered scene,
+combined video). Replaying the events gives the topic's state, so status
+checks, resume and combining read one small file per topic instead of
+walking the output tree and re-parsing the scene outline.
+
+Each event is appended with a single ``write`` on an ``O_APPEND`` file
+descriptor, so writers in other threads and processes never interleave
+partial lines. Readers keep their replayed state and only read the bytes
+appended since their last read.
+
+Topics produced before the manifest existed are indexed once from the
+files on disk (``TopicManifest.rebuild_from_disk``).
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from src.utils.utils import extract_xml
+
+MANIFEST_FILENAME = "manifest.jsonl"
+
+# Quality folders manim writes scene videos to, best first
+QUALITY_DIRS = ["1080p60", "720p30", "480p15"]
+
+
+def topic_file_prefix(topic: str) -> str:
+    """File prefix used for a topic's directory and files."""
+    return re.sub(r'[^a-z0-9_]+', '_', topic.lower())
+
+
+def count_outline_scenes(scene_outline: str) -> int:
+    """Number of scenes in a scene outline."""
+    return len(re.findall(r'<SCENE_(\d+)>[^<]', extract_xml(scene_outline)))
+
+
+@dataclass
+class SceneRecord:
+    """Artifacts recorded for one scene."""
+    scene_number: int
+    plan_path: Optional[str] = None
+    code_path: Optional[str] = None
+    code_version: int = 0
+    rendered_version: Optional[int] = None
+    video_path: Optional[str] = None
+    subtitle_path: Optional[str] = None
+
+    @property
+    def has_plan(self) -> bool:
+        return self.plan_path is not None
+
+    @property
+    def has_code(self) -> bool:
+        return self.code_path is not None
+
+    @property
+    def has_render(self) -> bool:
+        return self.video_path is not None
+
+
+@dataclass
+class TopicState:
+    """State of a topic, replayed from its manifest."""
+    outline_path: Optional[str] = None
+    scene_count: int = 0
+    scenes: Dict[int, SceneRecord] = field(default_factory=dict)
+    combined_video_path: Optional[str] = None
+    combined_subtitle_path: Optional[str] = None
+
+    def scene(self, scene_number: int) -> SceneRecord:
+        if scene_number not in self.scenes:
+            self.scenes[scene_number] = SceneRecord(scene_number)
+        return self.scenes[scene_number]
+
+    def apply(self, event: Dict, topic_dir: str) -> None:
+        """Apply one manifest event; paths are stored relative to the topic directory."""
+        def resolve(path):
+            return os.path.join(topic_dir, path) if path is not None else None
+
+        kind = event.get('event')
+        if kind == 'outline':
+            self.outline_path = resolve(event['path'])
+            self.scene_count = event['scene_count']
+        elif kind == 'plan':
+            self.scene(event['scene']).plan_path = resolve(event['path'])
+        elif kind == 'code':
+            scene = self.scene(event['scene'])
+            if event['version'] >= scene.code_version:
+                scene.code_version = event['version']
+                scene.code_path = resolve(event['path'])
+        elif kind == 'render':
+            scene = self.scene(event['scene'])
+            scene.rendered_version = event.get('version')
+            scene.video_path = resolve(event['video_path'])
+            scene.subtitle_path = resolve(event.get('subtitle_path'))
+        elif kind == 'render_invalidated':
+            scene = self.scene(event['scene'])
+            scene.rendered_version = scene.video_path = scene.subtitle_path = None
+        elif kind == 'combined':
+            self.combined_video_path = resolve(event['video_path'])
+            self.combined_subtitle_path = resolve(event.get('subtitle_path'))
+
+
+class TopicManifest:
+    """Append-only event log of one topic's artifacts."""
+
+    def __init__(self, topic_dir: str):
+        """
+        Args:
+            topic_dir: The topic's output directory (``<output_dir>/<file_prefix>``)
+        """
+        self.topic_dir = topic_dir
+        self.path = os.path.join(topic_dir, MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+        self._state = TopicState()
+        self._offset = 0
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _relative(self, path: Optional[str]) -> Optional[str]:
+        if path is None:
+            return None
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.topic_dir))
+
+    def _append(self, event: Dict) -> None:
+        event['ts'] = time.time()
+        line = (json.dumps(event) + "\n").encode('utf-8')
+        os.makedirs(self.topic_dir, exist_ok=True)
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def state(self) -> TopicState:
+        """Current state, reading only events appended since the last call."""
+        with self._lock:
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return self._state
+
+            # A line without its newline is still being written; read it next time
+            complete = data.rfind(b"\n") + 1
+            for line in data[:complete].splitlines():
+                try:
+                    self._state.apply(json.loads(line), self.topic_dir)
+                except (ValueError, KeyError):
+                    continue
+            self._offset += complete
+            return self._state
+
+    def record_outline(self, outline_path: str, scene_count: int) -> None:
+        self._append({'event': 'outline', 'path': self._relative(outline_path), 'scene_count': scene_count})
+
+    def record_plan(self, scene_number: int, plan_path: str) -> None:
+        self._append({'event': 'plan', 'scene': scene_number, 'path': self._relative(plan_path)})
+
+    def record_code(self, scene_number: int, version: int, code_path: str) -> None:
+        self._append({'event': 'code', 'scene': scene_number, 'version': version,
+                      'path': self._relative(code_path)})
+
+    def record_render(self, scene_number: int, version: int, video_path: str,
+                      subtitle_path: Optional[str] = None) -> None:
+        self._append({'event': 'render', 'scene': scene_number, 'version': version,
+                      'video_path': self._relative(video_path),
+                      'subtitle_path': self._relative(subtitle_path)})
+
+    def invalidate_render(self, scene_number: int) -> None:
+        self._append({'event': 'render_invalidated', 'scene': scene_number})
+
+    def invalidate_stale_render(self, scene_number: int, version: int) -> bool:
+        """Invalidate the scene's render if it is of a code version older than ``version``.
+
+        Called when a render of ``version`` starts, so a failed render never
+        leaves the scene marked rendered with the previous version's video.
+        """
+        record = self.state().scenes.get(scene_number)
+        if record is None or record.rendered_version is None or record.rendered_version >= version:
+            return False
+        self.invalidate_render(scene_number)
+        return True
+
+    def record_combined(self, video_path: str, subtitle_path: Optional[str] = None) -> None:
+        self._append({'event': 'combined', 'video_path': self._relative(video_path),
+                      'subtitle_path': self._relative(subtitle_path)})
+
+    def rebuild_from_disk(self, file_prefix: str) -> TopicState:
+        """Index a topic generated before manifests existed by scanning its files once."""
+        outline_path = os.path.join(self.topic_dir, f"{file_prefix}_scene_outline.txt")
+        if not os.path.exists(outline_path):
+            return self.state()
+
+        with open(outline_path) as f:
+            scene_count = count_outline_scenes(f.read())
+        self.record_outline(outline_path, scene_count)
+
+        media_videos = os.path.join(self.topic_dir, "media", "videos")
+        rendered_folders = os.listdir(media_videos) if os.path.isdir(media_videos) else []
+
+        for scene_number in range(1, scene_count + 1):
+            scene_dir = os.path.join(self.topic_dir, f"scene{scene_number}")
+            plan_path = os.path.join(scene_dir, f"{file_prefix}_scene{scene_number}_implementation_plan.txt")
+            if os.path.exists(plan_path):
+                self.record_plan(scene_number, plan_path)
+
+            code_version = self._latest_version(
+                os.listdir(os.path.join(scene_dir, "code")) if os.path.isdir(os.path.join(scene_dir, "code")) else [],
+                file_prefix, scene_number, ".py"
+            )
+            if code_version is not None:
+                self.record_code(scene_number, code_version[0],
+                                 os.path.join(scene_dir, "code", code_version[1]))
+
+            if os.path.exists(os.path.join(scene_dir, "succ_rendered.txt")):
+                rendered = self._latest_version(rendered_folders, file_prefix, scene_number, "")
+                if rendered is not None:
+                    video_path, subtitle_path = find_scene_outputs(os.path.join(media_videos, rendered[1]))
+                    if video_path:
+                        self.record_render(scene_number, rendered[0], video_path, subtitle_path)
+
+        combined_path = os.path.join(self.topic_dir, f"{file_prefix}_combined.mp4")
+        if os.path.exists(combined_path):
+            subtitle_path = os.path.join(self.topic_dir, f"{file_prefix}_combined.srt")
+            self.record_combined(combined_path, subtitle_path if os.path.exists(subtitle_path) else None)
+
+        return self.state()
+
+    @staticmethod
+    def _latest_version(names, file_prefix: str, scene_number: int, suffix: str) -> Optional[Tuple[int, str]]:
+        pattern = re.compile(rf"^{re.escape(file_prefix)}_scene{scene_number}_v(\d+){re.escape(suffix)}$")
+        versions = [(int(m.group(1)), name) for name in names for m in [pattern.match(name)] if m]
+        return max(versions) if versions else None
+
+
+def find_scene_outputs(scene_video_dir: str) -> Tuple[Optional[str], Optional[str]]:
+    """Video and subtitle files in a manim scene output folder (``media/videos/<scene>``)."""
+    for quality_dir in QUALITY_DIRS:
+        quality_path = os.path.join(scene_video_dir, quality_dir)
+        if os.path.isdir(quality_path):
+            video_file = subtitle_file = None
+            for filename in sorted(os.listdir(quality_path)):
+                if filename.endswith('.mp4') and not video_file:
+                    video_file = os.path.join(quality_path, filename)
+                elif filename.endswith('.srt') and not subtitle_file:
+                    subtitle_file = os.path.join(quality_path, filename)
+            return video_file, subtitle_file
+    return None, None
+
+
+_manifests: Dict[str, TopicManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_topic_manifest(output_dir: str, file_prefix: str, rebuild: bool = True) -> TopicManifest:
+    """Get the shared manifest of a topic.
+
+    Args:
+        output_dir: Root output directory
+        file_prefix: The topic's file prefix
+        rebuild: Index the topic from disk if it has files but no manifest yet
+    """
+    topic_dir = os.path.abspath(os.path.join(output_dir, file_prefix))
+    with _manifests_lock:
+        manifest = _manifests.get(topic_dir)
+        if manifest is None:
+            manifest = _manifests[topic_dir] = TopicManifest(topic_dir)
+            if rebuild and not manifest.exists() and os.path.isdir(topic_dir):
+                manifest.rebuild_from_disk(file_prefix)
+    return manifest
@@ -0,0 +1,431 @@
+"""
+Shared queue of topics for running ``generate_video.py`` on many machines.
+
+Topics are enqueued once (keyed by their file prefix, so enqueueing is
+idempotent) and claimed by worker processes under a lease. A worker keeps
+its lease alive with heartbeats while the topic runs; if the worker dies
+the lease expires and another worker picks the topic up. Failed attempts
+are retried with a backoff until ``max_attempts`` is reached.
+
+A retried topic resumes from the artifacts earlier attempts left in the
+shared output directory (outline, plans and rendered scenes are recorded
+in the topic manifest), so only unfinished stages run again. Workers on
+different machines therefore need the same output directory, e.g. on a
+shared file system.
+
+Two backends are available: ``sqlite`` (a database file reachable by every
+worker) and ``redis`` (claims, heartbeats and completions are Lua scripts,
+so each is atomic on the server). The sqlite backend relies on the file
+system's locks, which network file systems often implement poorly; use it
+for workers on one host (or a file system with reliable POSIX locks) and
+the redis backend for workers on several machines.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from src.core.topic_manifest import topic_file_prefix
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class TopicLease:
+    """A topic claimed by one worker until ``lease_expires``."""
+    job_id: str
+    topic: str
+    description: str
+    attempts: int
+    max_attempts: int
+    worker_id: str
+    lease_expires: float
+
+
+class SQLiteTopicQueue:
+    """Topic queue in a SQLite database file shared by all workers."""
+
+    # Errors a caller may retry, e.g. "database is locked" once the busy timeout runs out
+    transient_errors = (sqlite3.OperationalError,)
+
+    def __init__(self, path: str, lease_seconds: float = 300, max_attempts: int = 3,
+                 retry_backoff: float = 30):
+        """
+        Args:
+            path: Database file
+            lease_seconds: How long a claim lasts without a heartbeat
+            max_attempts: Attempts per topic before it is marked failed
+            retry_backoff: Seconds before a failed topic is retried, doubled per attempt
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            # WAL needs shared memory between the processes, i.e. a single host;
+            # the rollback journal only needs file locks
+            self._conn.execute("PRAGMA journal_mode=DELETE")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS topic_jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " topic TEXT NOT NULL,"
+                " description TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " max_attempts INTEGER NOT NULL,"
+                " owner TEXT,"
+                " lease_expires REAL,"
+                " available_at REAL NOT NULL,"
+                " stage TEXT,"
+                " last_error TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_topic_jobs_status ON topic_jobs (status, available_at)"
+            )
+
+    def _transaction(self, func):
+        """Run func(conn) in an immediate (write-locking) transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(self._conn)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # COMMIT itself can fail with "database is locked"; never leave
+                # the connection inside the open transaction
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def enqueue(self, topics: List[Dict[str, str]]) -> int:
+        """Add topics (dicts with 'theorem' and 'description'); already queued topics are kept as they are.
+
+        Returns:
+            Number of topics added
+        """
+        now = time.time()
+        rows = [
+            (topic_file_prefix(t['theorem']), t['theorem'], t.get('description', ''), PENDING,
+             self.max_attempts, now, now)
+            for t in topics
+        ]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO topic_jobs"
+                " (job_id, topic, description, status, max_attempts, available_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            return conn.total_changes - before
+
+        return self._transaction(insert)
+
+    def claim(self, worker_id: str) -> Optional[TopicLease]:
+        """Claim the next available topic, reclaiming topics whose lease expired."""
+        def claim_next(conn):
+            now = time.time()
+            conn.execute(
+                "UPDATE topic_jobs SET status = ?, owner = NULL, last_error = 'lease expired', updated_at = ?"
+                " WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, now, LEASED, now)
+            )
+            row = conn.execute(
+                "SELECT job_id, topic, description, attempts, max_attempts FROM topic_jobs"
+                " WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?)"
+                " ORDER BY available_at LIMIT 1",
+                (PENDING, now, LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, topic, description, attempts, max_attempts = row
+            expires = now + self.lease_seconds
+            conn.execute(
+                "UPDATE topic_jobs SET status = ?, owner = ?, lease_expires = ?, attempts = attempts + 1,"
+                " updated_at = ? WHERE job_id = ?",
+                (LEASED, worker_id, expires, now, job_id)
+            )
+            return TopicLease(job_id, topic, description, attempts + 1, max_attempts, worker_id, expires)
+
+        return self._transaction(claim_next)
+
+    def _update_owned(self, lease: TopicLease, sql: str, params: tuple) -> bool:
+        def update(conn):
+            cursor = conn.execute(
+                f"{sql} WHERE job_id = ? AND owner = ? AND status = ?",
+                params + (lease.job_id, lease.worker_id, LEASED)
+            )
+            return cursor.rowcount == 1
+        return self._transaction(update)
+
+    def heartbeat(self, lease: TopicLease, stage: Optional[str] = None) -> bool:
+        """Extend a lease; False if it was lost (expired and claimed by another worker)."""
+        now = time.time()
+        expires = now + self.lease_seconds
+        if self._update_owned(
+            lease, "UPDATE topic_jobs SET lease_expires = ?, stage = COALESCE(?, stage), updated_at = ?",
+            (expires, stage, now)
+        ):
+            lease.lease_expires = expires
+            return True
+        return False
+
+    def complete(self, lease: TopicLease) -> bool:
+        """Mark a leased topic done."""
+        return self._update_owned(
+            lease, "UPDATE topic_jobs SET status = ?, owner = NULL, stage = ?, last_error = NULL, updated_at = ?",
+            (DONE, DONE, time.time())
+        )
+
+    def fail(self, lease: TopicLease, error: str) -> str:
+        """Record a failed attempt; the topic is retried after a backoff unless out of attempts.
+
+        Returns:
+            The topic's new status, or "lost" if the lease was no longer held
+        """
+        now = time.time()
+        if lease.attempts >= lease.max_attempts:
+            status, available_at = FAILED, now
+        else:
+            status, available_at = PENDING, now + self.retry_backoff * 2 ** (lease.attempts - 1)
+        updated = self._update_owned(
+            lease, "UPDATE topic_jobs SET status = ?, owner = NULL, available_at = ?, last_error = ?, updated_at = ?",
+            (status, available_at, error[-2000:], now)
+        )
+        return status if updated else "lost"
+
+    def release(self, lease: TopicLease) -> bool:
+        """Give a topic back without counting the attempt (e.g. on shutdown)."""
+        now = time.time()
+        return self._update_owned(
+            lease, "UPDATE topic_jobs SET status = ?, owner = NULL, attempts = attempts - 1,"
+            " available_at = ?, updated_at = ?",
+            (PENDING, now, now)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Topic counts by status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM topic_jobs GROUP BY status").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0, **dict(rows)}
+        return {'backend': 'sqlite', 'path': self.path, **counts}
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """All topics with status, attempts, owner, stage and last error."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT job_id, topic, status, attempts, max_attempts, owner, stage, last_error, updated_at"
+                " FROM topic_jobs ORDER BY job_id"
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+_REDIS_CLAIM = """
+local now = tonumber(ARGV[1])
+local prefix = ARGV[4]
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], id)
+    local key = prefix .. ':job:' .. id
+    local status = 'pending'
+    if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(redis.call('HGET', key, 'max_attempts')) then
+        status = 'failed'
+    else
+        redis.call('ZADD', KEYS[1], now, id)
+    end
+    redis.call('HSET', key, 'status', status, 'owner', '', 'last_error', 'lease expired', 'updated_at', now)
+end
+local ready = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, 1)
+if #ready == 0 then
+    return false
+end
+local id = ready[1]
+local key = prefix .. ':job:' .. id
+local expires = now + tonumber(ARGV[3])
+redis.call('ZREM', KEYS[1], id)
+local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('HSET', key, 'status', 'leased', 'owner', ARGV[2], 'lease_expires', expires, 'updated_at', now)
+redis.call('ZADD', KEYS[2], expires, id)
+return {id, redis.call('HGET', key, 'topic'), redis.call('HGET', key, 'description'),
+        attempts, redis.call('HGET', key, 'max_attempts'), tostring(expires)}
+"""
+
+# KEYS: job hash, leases, ready. ARGV: job id, worker, now, action, action arguments
+_REDIS_UPDATE_OWNED = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[2] or redis.call('HGET', KEYS[1], 'status') ~= 'leased' then
+    return false
+end
+local now = tonumber(ARGV[3])
+local action = ARGV[4]
+if action == 'heartbeat' then
+    redis.call('ZADD', KEYS[2], ARGV[5], ARGV[1])
+    redis.call('HSET', KEYS[1], 'lease_expires', ARGV[5], 'updated_at', now)
+    if ARGV[6] ~= '' then
+        redis.call('HSET', KEYS[1], 'stage', ARGV[6])
+    end
+    return 'leased'
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+if action == 'complete' then
+    redis.call('HSET', KEYS[1], 'status', 'done', 'owner', '', 'stage', 'done', 'last_error', '', 'updated_at', now)
+    return 'done'
+elseif action == 'release' then
+    redis.call('HINCRBY', KEYS[1], 'attempts', -1)
+    redis.call('HSET', KEYS[1], 'status', 'pending', 'owner', '', 'updated_at', now)
+    redis.call('ZADD', KEYS[3], now, ARGV[1])
+    return 'pending'
+end
+local status = ARGV[5]
+redis.call('HSET', KEYS[1], 'status', status, 'owner', '', 'last_error', ARGV[7], 'updated_at', now)
+if status == 'pending' then
+    redis.call('ZADD', KEYS[3], ARGV[6], ARGV[1])
+end
+return status
+"""
+
+_REDIS_ENQUEUE = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'topic', ARGV[2], 'description', ARGV[3], 'status', 'pending',
+           'attempts', 0, 'max_attempts', ARGV[4], 'updated_at', ARGV[5])
+redis.call('ZADD', KEYS[2], ARGV[5], ARGV[1])
+redis.call('SADD', KEYS[3], ARGV[1])
+return 1
+"""
+
+
+class RedisTopicQueue:
+    """Topic queue in Redis, for workers on machines without a shared database file."""
+
+    def __init__(self, url: str, lease_seconds: float = 300, max_attempts: int = 3,
+                 retry_backoff: float = 30, prefix: str = "topic_queue"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("The redis package is required for the redis topic queue backend") from e
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.transient_errors = (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+        self.url = url
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.prefix = prefix
+        self._ready_key = f"{prefix}:ready"
+        self._leases_key = f"{prefix}:leases"
+        self._jobs_key = f"{prefix}:jobs"
+        self._claim = self.client.register_script(_REDIS_CLAIM)
+        self._update = self.client.register_script(_REDIS_UPDATE_OWNED)
+        self._enqueue = self.client.register_script(_REDIS_ENQUEUE)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def enqueue(self, topics: List[Dict[str, str]]) -> int:
+        added = 0
+        for t in topics:
+            job_id = topic_file_prefix(t['theorem'])
+            added += self._enqueue(
+                keys=[self._job_key(job_id), self._ready_key, self._jobs_key],
+                args=[job_id, t['theorem'], t.get('description', ''), self.max_attempts, time.time()]
+            )
+        return added
+
+    def claim(self, worker_id: str) -> Optional[TopicLease]:
+        result = self._claim(
+            keys=[self._ready_key, self._leases_key],
+            args=[time.time(), worker_id, self.lease_seconds, self.prefix]
+        )
+        if not result:
+            return None
+        job_id, topic, description, attempts, max_attempts, expires = result
+        return TopicLease(job_id, topic, description, int(attempts), int(max_attempts), worker_id, float(expires))
+
+    def _update_owned(self, lease: TopicLease, action: str, *args) -> Optional[str]:
+        return self._update(
+            keys=[self._job_key(lease.job_id), self._leases_key, self._ready_key],
+            args=[lease.job_id, lease.worker_id, time.time(), action, *args]
+        )
+
+    def heartbeat(self, lease: TopicLease, stage: Optional[str] = None) -> bool:
+        expires = time.time() + self.lease_seconds
+        if self._update_owned(lease, 'heartbeat', expires, stage or ''):
+            lease.lease_expires = expires
+            return True
+        return False
+
+    def complete(self, lease: TopicLease) -> bool:
+        return bool(self._update_owned(lease, 'complete'))
+
+    def fail(self, lease: TopicLease, error: str) -> str:
+        now = time.time()
+        if lease.attempts >= lease.max_attempts:
+            status, available_at = FAILED, now
+        else:
+            status, available_at = PENDING, now + self.retry_backoff * 2 ** (lease.attempts - 1)
+        return self._update_owned(lease, 'fail', status, available_at, error[-2000:]) or "lost"
+
+    def release(self, lease: TopicLease) -> bool:
+        return bool(self._update_owned(lease, 'release'))
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        job_ids = sorted(self.client.smembers(self._jobs_key))
+        pipe = self.client.pipeline()
+        for job_id in job_ids:
+            pipe.hgetall(self._job_key(job_id))
+        return [
+            {'job_id': job_id, 'topic': job.get('topic'), 'status': job.get('status'),
+             'attempts': int(job.get('attempts', 0)), 'max_attempts': int(job.get('max_attempts', 0)),
+             'owner': job.get('owner') or None, 'stage': job.get('stage'),
+             'last_error': job.get('last_error') or None, 'updated_at': float(job.get('updated_at', 0))}
+            for job_id, job in zip(job_ids, pipe.execute())
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for job in self.list_jobs():
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'backend': 'redis', 'url': self.url, **counts}
+
+
+def is_drained(topic_queue) -> bool:
+    """Whether no topic is pending (possibly waiting out a retry backoff) or leased."""
+    stats = topic_queue.get_stats()
+    return stats[PENDING] == 0 and stats[LEASED] == 0
+
+
+def create_topic_queue(backend: str = "sqlite", path: Optional[str] = None, redis_url: Optional[str] = None,
+                       lease_seconds: float = 300, max_attempts: int = 3, retry_backoff: float = 30):
+    """Create a topic queue with the named backend.
+
+    Args:
+        backend: One of "sqlite" or "redis"
+        path: Database file for the sqlite backend
+        redis_url: Connection URL for the redis backend (defaults to TOPIC_QUEUE_REDIS_URL or REDIS_URL)
+        lease_seconds: How long a claim lasts without a heartbeat
+        max_attempts: Attempts per topic before it is marked failed
+        retry_backoff: Seconds before the first retry of a failed topic
+    """
+    if backend == "sqlite":
+        return SQLiteTopicQueue(
+            path or os.path.join("output", ".topic_queue.sqlite3"),
+            lease_seconds=lease_seconds, max_attempts=max_attempts, retry_backoff=retry_backoff
+        )
+    if backend == "redis":
+        url = redis_url or os.getenv("TOPIC_QUEUE_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        return RedisTopicQueue(url, lease_seconds=lease_seconds, max_attempts=max_attempts,
+                               retry_backoff=retry_backoff)
+    raise ValueError(f"Unknown topic queue backend: {backend}")
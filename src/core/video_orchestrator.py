@@ -214,7 +214,7 @@ class VideoGenerationOrchestrator:
                 # Generate scene code
                 scene_trace_id = str(uuid.uuid4())
                 
-                code, response_text = self.code_generator.generate_manim_code(
+                code, response_text = await self.code_generator.agenerate_manim_code(
                     topic=topic,
                     description=description,
                     scene_outline=scene_outline,
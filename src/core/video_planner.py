@@ -10,8 +10,9 @@ from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 import aiofiles
 
-from mllm_tools.utils import _prepare_text_inputs
+from mllm_tools.utils import _prepare_text_inputs, acall_model
 from src.utils.utils import extract_xml
+from src.core.topic_manifest import get_topic_manifest, count_outline_scenes
 from task_generator import (
     get_prompt_scene_plan,
     get_prompt_scene_vision_storyboard,
@@ -195,7 +196,8 @@ class EnhancedVideoPlanner:
             print(f"✅ Detected relevant plugins: {self.relevant_plugins}")
 
         # Generate plan using planner model
-        response_text = self.planner_model(
+        response_text = await acall_model(
+            self.planner_model,
             _prepare_text_inputs(prompt),
             metadata={
                 "generation_name": "scene_outline", 
@@ -214,6 +216,9 @@ class EnhancedVideoPlanner:
         
         file_path = os.path.join(output_dir, f"{file_prefix}_scene_outline.txt")
         await self._async_file_write(file_path, scene_outline)
+        get_topic_manifest(self.output_dir, file_prefix).record_outline(
+            file_path, count_outline_scenes(scene_outline)
+        )
         
         elapsed_time = time.time() - start_time
         print(f"Scene outline generated in {elapsed_time:.2f}s - saved to {file_prefix}_scene_outline.txt")
@@ -269,7 +274,8 @@ class EnhancedVideoPlanner:
                     prompt += f"\n\n{retrieved_docs}"
 
             # Generate content
-            response = self.planner_model(
+            response = await acall_model(
+                self.planner_model,
                 _prepare_text_inputs(prompt),
                 metadata={
                     "generation_name": step_name,
@@ -461,6 +467,7 @@ class EnhancedVideoPlanner:
         
         try:
             await self._async_file_write(combined_plan_path, combined_content)
+            get_topic_manifest(self.output_dir, file_prefix).record_plan(scene_number, combined_plan_path)
             print(f"✅ Saved implementation plan for scene {scene_number} to: {combined_plan_path}")
         except Exception as e:
             print(f"❌ Error saving implementation plan for scene {scene_number}: {e}")
@@ -471,6 +478,29 @@ class EnhancedVideoPlanner:
 
         return implementation_plan
 
+    async def generate_scene_implementation_for_scene(self, topic: str, description: str, 
+                                                      plan: str, scene_number: int, 
+                                                      session_id: str) -> str:
+        """Generate the implementation plan for one scene of the outline."""
+        scene_outline = extract_xml(plan)
+        file_prefix = re.sub(r'[^a-z0-9_]+', '_', topic.lower())
+        
+        scene_regex = r'(<SCENE_{0}>.*?</SCENE_{0}>)'.format(scene_number)
+        scene_match = re.search(
+            scene_regex, 
+            scene_outline, 
+            re.DOTALL
+        )
+        if not scene_match:
+            print(f"❌ Error: Could not find scene {scene_number} in scene outline. Regex pattern: {scene_regex}")
+            raise ValueError(f"Scene {scene_number} not found in scene outline")
+        scene_outline_i = scene_match.group(1)
+        scene_trace_id = str(uuid.uuid4())
+        
+        return await self._generate_scene_implementation_single_enhanced(
+            topic, description, scene_outline_i, scene_number, file_prefix, session_id, scene_trace_id
+        )
+
     async def generate_scene_implementation_concurrently_enhanced(self, topic: str, description: str, 
                                                                 plan: str, session_id: str) -> List[str]:
         """Enhanced concurrent scene implementation with better performance."""
@@ -485,20 +515,8 @@ class EnhancedVideoPlanner:
 
         async def generate_single_scene_implementation(i):
             async with self.scene_semaphore:  # Control scene-level concurrency
-                scene_regex = r'(<SCENE_{0}>.*?</SCENE_{0}>)'.format(i)
-                scene_match = re.search(
-                    scene_regex, 
-                    scene_outline, 
-                    re.DOTALL
-                )
-                if not scene_match:
-                    print(f"❌ Error: Could not find scene {i} in scene outline. Regex pattern: {scene_regex}")
-                    raise ValueError(f"Scene {i} not found in scene outline")
-                scene_outline_i = scene_match.group(1)
-                scene_trace_id = str(uuid.uuid4())
-                
-                return await self._generate_scene_implementation_single_enhanced(
-                    topic, description, scene_outline_i, i, file_prefix, session_id, scene_trace_id
+                return await self.generate_scene_implementation_for_scene(
+                    topic, description, plan, i, session_id
                 )
 
         # Create tasks for all scenes
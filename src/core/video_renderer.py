@@ -9,7 +9,7 @@ import traceback
 import sys
 import time
 import json
-import hashlib
+import contextvars
 from pathlib import Path
 import shutil
 import tempfile
@@ -20,11 +20,30 @@ except ImportError:
     print("Warning: ffmpeg-python not installed. Video combination features will be limited.")
     ffmpeg = None
 
-from src.core.parse_video import (
-    get_images_from_video,
-    image_with_most_non_black_space
-)
 from src.core.storage_manager import StorageManager, VideoUploadResult
+from src.core.render_worker_pool import ManimRenderWorkerPool, RenderJob
+from src.core.render_cache import RenderCache, OPTIMIZATION_HEADER_LINES
+from src.core.incremental_render import PartialMovieReuse
+from src.core.stream_concat import concat_stream_copy
+from src.core.subtitle_merger import SubtitleMerger, write_subtitle_offsets
+from src.core.code_validator import SceneCodeValidator, SceneValidationError
+from src.core.topic_manifest import get_topic_manifest
+from src.utils.media_probe import MediaProbe, get_media_probe_service
+from src.utils.frame_sampler import FULL_MODE, get_frame_sampler
+
+# Set while render_scene drives a render on its own short-lived event loop.
+# Async LLM clients (litellm's httpx clients, grpc.aio) are bound to the main
+# loop, so that path must use the sync CodeGenerator methods instead.
+_on_private_loop = contextvars.ContextVar('on_private_loop', default=False)
+
+
+def _sync_counterpart(func):
+    """The sync method ``x`` for a bound async method ``ax``, if it exists."""
+    owner = getattr(func, '__self__', None)
+    name = getattr(func, '__name__', '')
+    if owner is not None and name.startswith('a'):
+        return getattr(owner, name[1:], None)
+    return None
 
 
 class OptimizedVideoRenderer:
@@ -33,7 +52,10 @@ class OptimizedVideoRenderer:
     def __init__(self, output_dir="output", print_response=False, use_visual_fix_code=False,
                  max_concurrent_renders=4, enable_caching=True, default_quality="medium",
                  use_gpu_acceleration=False, preview_mode=False, storage_manager=None,
-                 enable_s3_upload=False, user_id=None, job_id=None):
+                 enable_s3_upload=False, user_id=None, job_id=None,
+                 render_backend="subprocess", worker_max_renders=20, render_timeout=300,
+                 cache_max_bytes=5 * 1024 ** 3, incremental_render=False,
+                 validate_code=True, validation_dry_run=False):
         """Initialize the enhanced VideoRenderer.
 
         Args:
@@ -49,6 +71,13 @@ class OptimizedVideoRenderer:
             enable_s3_upload (bool): Enable automatic S3 uploads
             user_id (str): User ID for S3 uploads
             job_id (str): Job ID for S3 uploads
+            render_backend (str): How manim is invoked (subprocess/worker_pool)
+            worker_max_renders (int): Renders before a pool worker is recycled
+            render_timeout (int): Per-render timeout in seconds
+            cache_max_bytes (int): Render cache size budget before LRU eviction
+            incremental_render (bool): Reuse unchanged animation segments across code versions
+            validate_code (bool): Statically validate scene code before each render attempt
+            validation_dry_run (bool): Also dry-run construct() without rendering frames
         """
         self.output_dir = output_dir
         self.print_response = print_response
@@ -88,7 +117,8 @@ class OptimizedVideoRenderer:
             'total_renders': 0,
             'cache_hits': 0,
             'total_time': 0,
-            'average_time': 0
+            'average_time': 0,
+            'validation_rejections': 0
         }
         
         # Quality presets for faster rendering
@@ -100,47 +130,65 @@ class OptimizedVideoRenderer:
             'production': {'flag': '-qp', 'fps': 60, 'resolution': '1440p'}
         }
         
-        # Cache directory for rendered scenes
+        # Content-addressed cache for rendered scenes
         self.cache_dir = os.path.join(output_dir, '.render_cache')
-        if enable_caching:
-            os.makedirs(self.cache_dir, exist_ok=True)
+        self.render_cache = RenderCache(self.cache_dir, max_bytes=cache_max_bytes) if enable_caching else None
+        
+        # Incremental mode relies on manim's own per-animation caching
+        self.partial_movie_reuse = PartialMovieReuse() if incremental_render and enable_caching else None
+        
+        # Reject broken scene code before starting a manim process
+        self.code_validator = SceneCodeValidator(dry_run=validation_dry_run) if validate_code else None
         
         # Thread pool for concurrent operations
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent_renders)
+        
+        # Render backend: one `manim render` subprocess per attempt, or a pool
+        # of warm worker processes that import manim once
+        if render_backend not in ('subprocess', 'worker_pool'):
+            raise ValueError(f"Unknown render backend: {render_backend}")
+        self.render_backend = render_backend
+        self.render_timeout = render_timeout
+        self.render_pool = None
+        if render_backend == 'worker_pool':
+            self.render_pool = ManimRenderWorkerPool(
+                size=max_concurrent_renders,
+                max_renders_per_worker=worker_max_renders,
+                render_timeout=render_timeout
+            )
 
-    def _get_code_hash(self, code: str) -> str:
-        """Generate hash for code to enable caching."""
-        return hashlib.md5(code.encode()).hexdigest()
-
-    def _get_cache_path(self, code_hash: str, quality: str) -> str:
-        """Get cache file path for given code hash and quality."""
-        return os.path.join(self.cache_dir, f"{code_hash}_{quality}.mp4")
+    def _get_cache_key(self, code: str, quality: str) -> str:
+        """Generate the render cache key for code at the given quality."""
+        quality_preset = self.quality_presets.get(quality, self.quality_presets['medium'])
+        return self.render_cache.make_key(code, quality, quality_preset['fps'])
 
-    def _is_cached(self, code: str, quality: str) -> Optional[str]:
-        """Check if rendered video exists in cache."""
-        if not self.enable_caching:
-            return None
-        
-        code_hash = self._get_code_hash(code)
-        cache_path = self._get_cache_path(code_hash, quality)
+    def _restore_from_cache(self, code: str, quality: str, dest_path: str) -> bool:
+        """Link a cached render of the code to dest_path if one exists."""
+        if self.render_cache is None:
+            return False
         
-        if os.path.exists(cache_path):
-            print(f"Cache hit for code hash {code_hash[:8]}...")
+        cache_key = self._get_cache_key(code, quality)
+        try:
+            restored = self.render_cache.materialize(cache_key, dest_path)
+        except Exception as e:
+            print(f"Warning: Could not restore render from cache, rendering instead: {e}")
+            return False
+        if restored:
+            print(f"Cache hit for key {cache_key[:8]}...")
             self.render_stats['cache_hits'] += 1
-            return cache_path
-        return None
+            return True
+        return False
 
     def _save_to_cache(self, code: str, quality: str, video_path: str):
         """Save rendered video to cache."""
-        if not self.enable_caching or not os.path.exists(video_path):
+        if self.render_cache is None or not os.path.exists(video_path):
             return
         
-        code_hash = self._get_code_hash(code)
-        cache_path = self._get_cache_path(code_hash, quality)
+        cache_key = self._get_cache_key(code, quality)
         
         try:
-            shutil.copy2(video_path, cache_path)
-            print(f"Cached render for hash {code_hash[:8]}...")
+            self.render_cache.store(cache_key, video_path, quality)
+            print(f"Cached render for key {cache_key[:8]}...")
         except Exception as e:
             print(f"Warning: Could not cache render: {e}")
 
@@ -158,14 +206,10 @@ class OptimizedVideoRenderer:
         quality = quality or self.default_quality
         current_code = code
         
-        # Check cache first
-        cached_video = self._is_cached(current_code, quality)
-        if cached_video:
-            # Copy cached video to expected location
-            expected_path = self._get_expected_video_path(file_prefix, curr_scene, curr_version, media_dir)
-            os.makedirs(os.path.dirname(expected_path), exist_ok=True)
-            shutil.copy2(cached_video, expected_path)
-            
+        # Check cache first, linking the cached video to the expected location
+        expected_path = self._get_expected_video_path(file_prefix, curr_scene, curr_version, media_dir)
+        if self._restore_from_cache(current_code, quality, expected_path):
+            self._record_render(file_prefix, curr_scene, curr_version, expected_path)
             elapsed = time.time() - start_time
             print(f"Scene {curr_scene} rendered from cache in {elapsed:.2f}s")
             return current_code, None
@@ -175,6 +219,10 @@ class OptimizedVideoRenderer:
         
         # Write optimized code file
         await self._write_code_file_async(file_path, current_code)
+        manifest = get_topic_manifest(self.output_dir, file_prefix)
+        manifest.record_code(curr_scene, curr_version, file_path)
+        if manifest.invalidate_stale_render(curr_scene, curr_version):
+            print(f"Scene {curr_scene}: render of an older code version invalidated")
         
         # Build optimized manim command
         manim_cmd = self._build_optimized_command(file_path, media_dir, quality)
@@ -184,11 +232,29 @@ class OptimizedVideoRenderer:
             try:
                 print(f"🎬 Rendering scene {curr_scene} (quality: {quality}, attempt: {retries + 1})")
                 
+                # Validate first; a rejection goes through the same fix path as a render error
+                if self.code_validator is not None:
+                    validation = await asyncio.to_thread(self.code_validator.validate, current_code, file_path)
+                    if not validation.ok:
+                        self.render_stats['validation_rejections'] += 1
+                        raise SceneValidationError(validation.format_error())
+                    print(f"✅ Scene {curr_scene} code validated in {validation.elapsed * 1000:.0f}ms")
+                
+                # Seed unchanged animation segments from earlier versions of this scene
+                seeded_segments = set()
+                if self.partial_movie_reuse is not None and curr_version > 1:
+                    seeded_segments = await asyncio.to_thread(
+                        self.partial_movie_reuse.seed,
+                        media_dir, file_prefix, curr_scene, curr_version, current_code
+                    )
+                
                 # Execute manim with optimizations
                 result = await asyncio.to_thread(
-                    self._run_manim_optimized,
+                    self._execute_render,
                     manim_cmd,
-                    file_path
+                    file_path,
+                    media_dir,
+                    quality
                 )
 
                 if result.returncode != 0:
@@ -197,6 +263,15 @@ class OptimizedVideoRenderer:
                 # Find the rendered video
                 video_path = self._find_rendered_video(file_prefix, curr_scene, curr_version, media_dir)
                 
+                if seeded_segments:
+                    reuse = self.partial_movie_reuse.record_render(
+                        media_dir, file_prefix, curr_scene, curr_version, seeded_segments
+                    )
+                    print(f"♻️ Reused {reuse['segments_reused']} animation segments, "
+                          f"rendered {reuse['segments_rendered']}")
+                
+                self._record_render(file_prefix, curr_scene, curr_version, video_path)
+                
                 # Save to cache
                 self._save_to_cache(current_code, quality, video_path)
                 
@@ -261,7 +336,7 @@ class OptimizedVideoRenderer:
                 if code_generator and scene_implementation and retries < max_retries - 1:
                     print(f"🔧 Attempting to fix code using CodeGenerator (attempt {retries + 1})")
                     try:
-                        fixed_code, fix_log = code_generator.fix_code_errors(
+                        fix_kwargs = dict(
                             implementation_plan=scene_implementation,
                             code=current_code,
                             error=str(e),
@@ -270,6 +345,10 @@ class OptimizedVideoRenderer:
                             scene_number=curr_scene,
                             session_id=session_id
                         )
+                        if _on_private_loop.get():
+                            fixed_code, fix_log = code_generator.fix_code_errors(**fix_kwargs)
+                        else:
+                            fixed_code, fix_log = await code_generator.afix_code_errors(**fix_kwargs)
                         
                         if fixed_code and fixed_code != current_code:
                             print(f"✨ Code fix generated, updating for next attempt")
@@ -279,6 +358,9 @@ class OptimizedVideoRenderer:
                             # Update file path and write fixed code
                             file_path = os.path.join(code_dir, f"{file_prefix}_scene{curr_scene}_v{curr_version}.py")
                             await self._write_code_file_async(file_path, current_code)
+                            get_topic_manifest(self.output_dir, file_prefix).record_code(
+                                curr_scene, curr_version, file_path
+                            )
                             
                             # Update manim command for new file
                             manim_cmd = self._build_optimized_command(file_path, media_dir, quality)
@@ -330,6 +412,26 @@ class OptimizedVideoRenderer:
         
         return cmd
 
+    def _execute_render(self, cmd: List[str], file_path: str, media_dir: str,
+                        quality: str) -> subprocess.CompletedProcess:
+        """Run a render on the configured backend."""
+        if self.render_pool is not None:
+            return self.render_pool.render(self._build_render_job(file_path, media_dir, quality))
+        return self._run_manim_optimized(cmd, file_path)
+
+    def _build_render_job(self, file_path: str, media_dir: str, quality: str) -> RenderJob:
+        """Build a worker pool job equivalent to `_build_optimized_command`."""
+        quality_preset = self.quality_presets.get(quality, self.quality_presets['medium'])
+        return RenderJob(
+            file_path=file_path,
+            media_dir=media_dir,
+            quality_flag=quality_preset['flag'],
+            fps=quality_preset['fps'],
+            disable_caching=not self.enable_caching,
+            renderer='opengl' if self.use_gpu_acceleration else 'cairo',
+            save_last_frame=self.preview_mode or quality == 'preview'
+        )
+
     def _run_manim_optimized(self, cmd: List[str], file_path: str) -> subprocess.CompletedProcess:
         """Run manim command with optimizations."""
         env = os.environ.copy()
@@ -347,7 +449,7 @@ class OptimizedVideoRenderer:
             'MANIM_DISABLE_CACHING': 'false' if self.enable_caching else 'true',
             'MANIM_VERBOSITY': 'WARNING',  # Reduce log verbosity
             'OMP_NUM_THREADS': str(os.cpu_count()),  # Use all CPU cores
-            'MANIM_RENDERER_TIMEOUT': '300'  # 5 minute timeout
+            'MANIM_RENDERER_TIMEOUT': str(self.render_timeout)
         })
         
         return subprocess.run(
@@ -355,7 +457,7 @@ class OptimizedVideoRenderer:
             capture_output=True,
             text=True,
             env=env,
-            timeout=300  # 5 minute timeout
+            timeout=self.render_timeout
         )
 
     async def _write_code_file_async(self, file_path: str, code: str):
@@ -370,15 +472,7 @@ class OptimizedVideoRenderer:
 
     def _optimize_code_for_rendering(self, code: str) -> str:
         """Add optimization hints to Manim code."""
-        optimizations = [
-            "",
-            "# Manim rendering optimizations",
-            "from manim import config",
-            "config.frame_rate = 30  # Balanced frame rate",
-            "config.pixel_height = 720  # Optimized resolution",
-            "config.pixel_width = 1280",
-            ""
-        ]
+        optimizations = list(OPTIMIZATION_HEADER_LINES)
         
         # Find the end of manim imports specifically
         lines = code.split('\n')
@@ -418,6 +512,14 @@ class OptimizedVideoRenderer:
             "1080p60", f"{file_prefix}_scene{scene}_v{version}.mp4"
         )
 
+    def _record_render(self, file_prefix: str, scene: int, version: int, video_path: str) -> None:
+        """Record a rendered scene, with the subtitles manim wrote next to it, in the topic manifest."""
+        video_dir = os.path.dirname(video_path)
+        subtitle_path = next(
+            (os.path.join(video_dir, f) for f in sorted(os.listdir(video_dir)) if f.endswith('.srt')), None
+        )
+        get_topic_manifest(self.output_dir, file_prefix).record_render(scene, version, video_path, subtitle_path)
+
     def _find_rendered_video(self, file_prefix: str, scene: int, version: int, media_dir: str) -> str:
         """Find the rendered video file."""
         video_dir = os.path.join(media_dir, "videos", f"{file_prefix}_scene{scene}_v{version}")
@@ -445,10 +547,15 @@ class OptimizedVideoRenderer:
             # For other models, create optimized snapshot
             media_input = await self._create_optimized_snapshot(topic, scene, version)
                 
-        new_code, log = visual_self_reflection_func(
+        # Accepts CodeGenerator.avisual_self_reflection as well as the sync version;
+        # on render_scene's private loop the sync version is used
+        if _on_private_loop.get() and asyncio.iscoroutinefunction(visual_self_reflection_func):
+            visual_self_reflection_func = _sync_counterpart(visual_self_reflection_func) or visual_self_reflection_func
+        result = visual_self_reflection_func(
             code, media_input, scene_trace_id=scene_trace_id,
             topic=topic, scene_number=scene, session_id=session_id
         )
+        new_code, log = await result if asyncio.iscoroutine(result) else result
 
         # Save visual fix log
         log_path = os.path.join(code_dir, f"{file_prefix}_scene{scene}_v{version}_vfix_log.txt")
@@ -462,6 +569,7 @@ class OptimizedVideoRenderer:
         new_version = version + 1
         new_code_path = os.path.join(code_dir, f"{file_prefix}_scene{scene}_v{new_version}.py")
         await self._write_code_file_async(new_code_path, new_code)
+        get_topic_manifest(self.output_dir, file_prefix).record_code(scene, new_version, new_code_path)
         print(f"Visual fix code saved to scene{scene}/code/{file_prefix}_scene{scene}_v{new_version}.py")
         
         return new_code
@@ -481,6 +589,10 @@ class OptimizedVideoRenderer:
         
         start_time = time.time()
         
+        # Warm up all pool workers together instead of on first use
+        if self.render_pool is not None:
+            await asyncio.to_thread(self.render_pool.start)
+        
         # Execute all renders concurrently
         tasks = [render_single_scene(config) for config in scene_configs]
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -510,16 +622,22 @@ class OptimizedVideoRenderer:
         
         video_path = os.path.join(video_folder_path, video_files[0])
         
-        # Create snapshot asynchronously
-        return await asyncio.to_thread(
-            lambda: image_with_most_non_black_space(
-                get_images_from_video(video_path), 
-                return_type="image"
-            )
+        # Score keyframes at low resolution and decode only the winner at full size
+        frames = await asyncio.to_thread(
+            get_frame_sampler().sample, video_path, 1, FULL_MODE
         )
+        if not frames:
+            raise ValueError(f"No non-black frame found in {video_path}")
+        return frames[0].to_pil()
+
+    async def combine_videos_optimized(self, topic: str, use_hardware_acceleration: bool = False,
+                                       use_stream_copy: bool = True) -> str:
+        """Optimized video combination with hardware acceleration and parallel processing.
 
-    async def combine_videos_optimized(self, topic: str, use_hardware_acceleration: bool = False) -> str:
-        """Optimized video combination with hardware acceleration and parallel processing."""
+        When use_stream_copy is set and every scene's video stream is encoded
+        identically, scenes are concatenated without re-encoding (only audio
+        is normalized); otherwise all scenes are re-encoded.
+        """
         
         start_time = time.time()
         file_prefix = re.sub(r'[^a-z0-9_]+', '_', topic.lower())
@@ -533,8 +651,11 @@ class OptimizedVideoRenderer:
         output_srt_path = os.path.join(video_output_dir, f"{file_prefix}_combined.srt")
         
         # Check if already exists
+        manifest = get_topic_manifest(self.output_dir, file_prefix)
         if os.path.exists(output_video_path):
             print(f"Combined video already exists at {output_video_path}")
+            if manifest.state().combined_video_path is None:
+                manifest.record_combined(output_video_path)
             return output_video_path
         
         # Get scene information
@@ -549,22 +670,35 @@ class OptimizedVideoRenderer:
             if ffmpeg is None:
                 print("⚠️ ffmpeg-python not available, using direct FFmpeg fallback...")
                 fallback_output = await self._fallback_video_combination(scene_videos, output_video_path)
+                manifest.record_combined(fallback_output)
                 print(f"✅ Direct FFmpeg combination successful: {fallback_output}")
                 return fallback_output
             
-            # Analyze videos in parallel
+            # Analyze videos with one batched, cached probe
             print("🔍 Analyzing video properties...")
-            analysis_tasks = [
-                asyncio.to_thread(self._analyze_video, video) 
-                for video in scene_videos
+            probes = await get_media_probe_service().probe_many_async(scene_videos)
+            video_info = [
+                self._analyze_video(video, probe)
+                for video, probe in zip(scene_videos, probes)
             ]
-            video_info = await asyncio.gather(*analysis_tasks)
             
             has_audio = [info['has_audio'] for info in video_info]
             print(f"🎵 Audio tracks found: {sum(has_audio)}/{len(scene_videos)} videos")
             
+            # Fast path: concat demuxer with stream copy
+            combined = False
+            if use_stream_copy:
+                try:
+                    combined = await concat_stream_copy(scene_videos, video_info, output_video_path)
+                except Exception as e:
+                    print(f"⚠️ Stream-copy concat failed, re-encoding instead: {e}")
+                    if os.path.exists(output_video_path):
+                        os.remove(output_video_path)
+            
             # Build optimized ffmpeg command
-            if any(has_audio):
+            if combined:
+                print("✅ Combined scenes with stream copy")
+            elif any(has_audio):
                 print("🎵 Combining videos with audio tracks...")
                 await self._combine_with_audio_optimized(
                     scene_videos, video_info, output_video_path, use_hardware_acceleration
@@ -589,7 +723,13 @@ class OptimizedVideoRenderer:
             # Combine subtitles if available
             if scene_subtitles:
                 print("📝 Combining subtitles...")
-                await self._combine_subtitles_async(scene_subtitles, scene_videos, output_srt_path)
+                await self._combine_subtitles_async(
+                    scene_subtitles, [info['duration'] for info in video_info], output_srt_path
+                )
+            
+            manifest.record_combined(
+                output_video_path, output_srt_path if os.path.exists(output_srt_path) else None
+            )
             
             elapsed = time.time() - start_time
             print(f"🎉 Video combination completed in {elapsed:.2f}s")
@@ -604,6 +744,7 @@ class OptimizedVideoRenderer:
             # Fallback to simple concatenation
             try:
                 fallback_output = await self._fallback_video_combination(scene_videos, output_video_path)
+                manifest.record_combined(fallback_output)
                 print(f"✅ Fallback combination successful: {fallback_output}")
                 return fallback_output
             except Exception as fallback_error:
@@ -612,36 +753,28 @@ class OptimizedVideoRenderer:
                 raise
 
     async def _gather_scene_files_async(self, file_prefix: str) -> tuple:
-        """Asynchronously gather scene video and subtitle files."""
-        search_path = os.path.join(self.output_dir, file_prefix, "media", "videos")
-        
-        # Get scene count
-        scene_outline_path = os.path.join(self.output_dir, file_prefix, f"{file_prefix}_scene_outline.txt")
-        if not os.path.exists(scene_outline_path):
-            print(f"No scene outline file found at: {scene_outline_path}")
-            return ([], [])
-        with open(scene_outline_path) as f:
-            plan = f.read()
-        
-        scene_outline_match = re.search(r'(<SCENE_OUTLINE>.*?</SCENE_OUTLINE>)', plan, re.DOTALL)
-        if not scene_outline_match:
-            print(f"No scene outline found in plan: {plan[:200]}...")
+        """Gather scene video and subtitle files from the topic manifest."""
+        manifest = get_topic_manifest(self.output_dir, file_prefix)
+        state = await asyncio.to_thread(manifest.state)
+        if state.outline_path is None:
+            print(f"No scene outline recorded for: {file_prefix}")
             return ([], [])
-        scene_outline = scene_outline_match.group(1)
-        scene_count = len(re.findall(r'<SCENE_(\d+)>[^<]', scene_outline))
-        
-        # Find scene files in parallel
-        tasks = [
-            asyncio.to_thread(self._find_scene_files, search_path, file_prefix, scene_num)
-            for scene_num in range(1, scene_count + 1)
-        ]
-        
-        results = await asyncio.gather(*tasks)
         
+        search_path = os.path.join(self.output_dir, file_prefix, "media", "videos")
         scene_videos = []
         scene_subtitles = []
         
-        for video, subtitle in results:
+        for scene_num in range(1, state.scene_count + 1):
+            record = state.scenes.get(scene_num)
+            if record is None or not record.has_render:
+                continue
+            video, subtitle = record.video_path, record.subtitle_path
+            if not os.path.exists(video):
+                # Recorded render was moved or deleted; look for it on disk
+                print(f"⚠️ Recorded video for scene {scene_num} is missing, searching {search_path}")
+                video, subtitle = await asyncio.to_thread(
+                    self._find_scene_files, search_path, file_prefix, scene_num
+                )
             if video:
                 scene_videos.append(video)
                 scene_subtitles.append(subtitle)
@@ -653,7 +786,7 @@ class OptimizedVideoRenderer:
         scene_folders = []
         for root, dirs, files in os.walk(search_path):
             for dir in dirs:
-                if dir.startswith(f"{file_prefix}_scene{scene_num}"):
+                if dir.startswith(f"{file_prefix}_scene{scene_num}_v"):
                     scene_folders.append(os.path.join(root, dir))
         
         if not scene_folders:
@@ -679,59 +812,50 @@ class OptimizedVideoRenderer:
         
         return video_file, subtitle_file
 
-    def _analyze_video(self, video_path: str) -> Dict:
+    def _analyze_video(self, video_path: str, probe: Optional[MediaProbe] = None) -> Dict:
         """Analyze video properties for optimization."""
-        if ffmpeg is None:
-            # Fallback analysis using direct FFmpeg probe
-            import subprocess
-            import json
-            
+        if probe is None:
             try:
-                cmd = [
-                    'ffprobe',
-                    '-v', 'quiet',
-                    '-print_format', 'json',
-                    '-show_streams',
-                    video_path
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                probe_data = json.loads(result.stdout)
-                
-                video_stream = next(stream for stream in probe_data['streams'] if stream['codec_type'] == 'video')
-                audio_streams = [stream for stream in probe_data['streams'] if stream['codec_type'] == 'audio']
-                
-                return {
-                    'path': video_path,
-                    'duration': float(video_stream.get('duration', 0)),
-                    'has_audio': len(audio_streams) > 0,
-                    'width': int(video_stream.get('width', 1920)),
-                    'height': int(video_stream.get('height', 1080)),
-                    'fps': eval(video_stream.get('avg_frame_rate', '30/1'))
-                }
+                probe = get_media_probe_service().probe(video_path)
             except Exception as e:
                 print(f"Warning: Could not analyze video {video_path}: {e}")
-                # Return default values
-                return {
-                    'path': video_path,
-                    'duration': 10.0,  # Default duration
-                    'has_audio': False,
-                    'width': 1920,
-                    'height': 1080,
-                    'fps': 30
-                }
         
-        probe = ffmpeg.probe(video_path)
-        video_stream = next(stream for stream in probe['streams'] if stream['codec_type'] == 'video')
-        audio_streams = [stream for stream in probe['streams'] if stream['codec_type'] == 'audio']
+        if probe is None:
+            # Return default values
+            return {
+                'path': video_path,
+                'duration': 10.0,  # Default duration
+                'has_audio': False,
+                'width': 1920,
+                'height': 1080,
+                'fps': 30,
+                'video_codec': None,
+                'video_profile': None,
+                'video_level': None,
+                'video_time_base': None,
+                'video_extradata_hash': None,
+                'pix_fmt': None,
+                'audio_codec': None,
+                'audio_sample_rate': None,
+                'audio_channels': None
+            }
         
         return {
             'path': video_path,
-            'duration': float(video_stream['duration']),
-            'has_audio': len(audio_streams) > 0,
-            'width': int(video_stream['width']),
-            'height': int(video_stream['height']),
-            'fps': eval(video_stream['avg_frame_rate'])
+            'duration': probe.duration,
+            'has_audio': probe.has_audio,
+            'width': probe.width,
+            'height': probe.height,
+            'fps': probe.fps,
+            'video_codec': probe.video_codec,
+            'video_profile': probe.video_profile,
+            'video_level': probe.video_level,
+            'video_time_base': probe.video_time_base,
+            'video_extradata_hash': probe.video_extradata_hash,
+            'pix_fmt': probe.pix_fmt,
+            'audio_codec': probe.audio_codec,
+            'audio_sample_rate': probe.audio_sample_rate,
+            'audio_channels': probe.audio_channels
         }
 
     async def _combine_with_audio_optimized(self, scene_videos: List[str], video_info: List[Dict], 
@@ -883,83 +1007,40 @@ class OptimizedVideoRenderer:
             raise Exception(f"FFmpeg error: {stderr.decode('utf-8')}")
 
     async def _combine_subtitles_async(self, scene_subtitles: List[str], 
-                                     scene_videos: List[str], output_path: str):
-        """Combine subtitles asynchronously."""
-        
-        def combine_subtitles():
-            with open(output_path, 'w', encoding='utf-8') as outfile:
-                current_time_offset = 0
-                subtitle_index = 1
-
-                for srt_file, video_file in zip(scene_subtitles, scene_videos):
-                    if srt_file is None:
-                        continue
-
-                    with open(srt_file, 'r', encoding='utf-8') as infile:
-                        lines = infile.readlines()
-                        i = 0
-                        while i < len(lines):
-                            line = lines[i].strip()
-                            if line.isdigit():
-                                outfile.write(f"{subtitle_index}\n")
-                                subtitle_index += 1
-                                i += 1
-
-                                time_line = lines[i].strip()
-                                start_time, end_time = time_line.split(' --> ')
-
-                                def adjust_time(time_str, offset):
-                                    h, m, s = time_str.replace(',', '.').split(':')
-                                    total_seconds = float(h) * 3600 + float(m) * 60 + float(s) + offset
-                                    h = int(total_seconds // 3600)
-                                    m = int((total_seconds % 3600) // 60)
-                                    s = total_seconds % 60
-                                    return f"{h:02d}:{m:02d}:{s:06.3f}".replace('.', ',')
-
-                                new_start = adjust_time(start_time, current_time_offset)
-                                new_end = adjust_time(end_time, current_time_offset)
-                                outfile.write(f"{new_start} --> {new_end}\n")
-                                i += 1
+                                     scene_durations: List[float], output_path: str):
+        """Combine subtitles asynchronously into SRT, WebVTT and per-scene offsets.
 
-                                while i < len(lines) and lines[i].strip():
-                                    outfile.write(lines[i])
-                                    i += 1
-                                outfile.write('\n')
-                            else:
-                                i += 1
-
-                    # Update time offset
-                    import ffmpeg
-                    probe = ffmpeg.probe(video_file)
-                    duration = float(probe['streams'][0]['duration'])
-                    current_time_offset += duration
-
-        await asyncio.to_thread(combine_subtitles)
-        print(f"Subtitles combined to {output_path}")
+        Uses the scene durations already probed for the video combination.
+        """
+        base_path = os.path.splitext(output_path)[0]
+        merger = SubtitleMerger(output_path, vtt_path=f"{base_path}.vtt")
+        offsets = await asyncio.to_thread(merger.merge, scene_subtitles, scene_durations)
+        await asyncio.to_thread(write_subtitle_offsets, offsets, f"{base_path}_subtitle_offsets.json")
+        print(f"Subtitles combined to {output_path} (+ WebVTT and scene offsets)")
 
     def get_performance_stats(self) -> Dict:
         """Get current performance statistics."""
-        return {
+        stats = {
             **self.render_stats,
             'cache_hit_rate': self.render_stats['cache_hits'] / max(1, self.render_stats['total_renders']),
             'cache_enabled': self.enable_caching,
-            'concurrent_renders': self.max_concurrent_renders
+            'render_cache': self.render_cache.get_stats() if self.render_cache else None,
+            'incremental_render': self.partial_movie_reuse.get_stats() if self.partial_movie_reuse else None,
+            'concurrent_renders': self.max_concurrent_renders,
+            'render_backend': self.render_backend
         }
+        if self.render_pool is not None:
+            stats['worker_pool'] = self.render_pool.get_stats()
+        return stats
 
     def cleanup_cache(self, max_age_days: int = 7):
-        """Clean up old cache files."""
-        if not self.enable_caching:
+        """Remove cache entries that have not been used recently."""
+        if self.render_cache is None:
             return
         
-        import time
-        current_time = time.time()
-        max_age_seconds = max_age_days * 24 * 60 * 60
-        
-        for file in os.listdir(self.cache_dir):
-            file_path = os.path.join(self.cache_dir, file)
-            if os.path.getmtime(file_path) < current_time - max_age_seconds:
-                os.remove(file_path)
-                print(f"Removed old cache file: {file}")
+        removed = self.render_cache.remove_older_than(max_age_days * 24 * 60 * 60)
+        if removed:
+            print(f"Removed {removed} stale render cache entries")
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -967,7 +1048,18 @@ class OptimizedVideoRenderer:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
+        self.close()
+
+    def close(self):
+        """Stop the render threads and the warm worker pool."""
         self.executor.shutdown(wait=True)
+        if self.render_pool is not None:
+            self.render_pool.shutdown()
+        if self.render_cache is not None:
+            try:
+                self.render_cache.flush()
+            except OSError as e:
+                print(f"Warning: Could not flush render cache manifest: {e}")
 
     def render_scene(self, code: str, file_prefix: str, curr_scene: int, 
                     curr_version: int, code_dir: str, media_dir: str, 
@@ -979,6 +1071,7 @@ class OptimizedVideoRenderer:
         # Run the async method synchronously
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        private_loop = _on_private_loop.set(True)
         try:
             result = loop.run_until_complete(
                 self.render_scene_optimized(
@@ -1002,6 +1095,7 @@ class OptimizedVideoRenderer:
             )
             return result
         finally:
+            _on_private_loop.reset(private_loop)
             loop.close()
 
     def combine_videos(self, topic: str) -> str:
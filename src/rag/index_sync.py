@@ -0,0 +1,43 @@
+"""
+Incremental ingestion bookkeeping for the RAG vector stores.
+
+Chunks are stored under content-hash IDs, so splitting unchanged
+documentation again yields the IDs the store already holds. Diffing the
+split chunks against the store's IDs tells ingestion which chunks to embed
+and which to delete.
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, List, NamedTuple
+
+from langchain_core.documents import Document
+
+
+def document_id(doc: Document) -> str:
+    """Content-hash ID so unchanged chunks keep their ID across ingestion runs."""
+    material = json.dumps(
+        {'content': doc.page_content, 'metadata': doc.metadata},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class IndexDiff(NamedTuple):
+    """Changes needed to bring a store in line with freshly split documents."""
+    documents: Dict[str, Document]  # split chunks by ID, duplicates dropped
+    new_ids: List[str]              # chunks the store does not have yet, in split order
+    stale_ids: List[str]            # store IDs no longer produced by the docs
+
+
+def diff_documents(documents: Iterable[Document], existing_ids: Iterable[str]) -> IndexDiff:
+    """Compare split chunks with the IDs already in a store."""
+    # Identical chunks would otherwise collide on ID
+    docs_by_id: Dict[str, Document] = {}
+    for doc in documents:
+        docs_by_id.setdefault(document_id(doc), doc)
+
+    existing = set(existing_ids)
+    new_ids = [doc_id for doc_id in docs_by_id if doc_id not in existing]
+    stale_ids = sorted(doc_id for doc_id in existing if doc_id not in docs_by_id)
+    return IndexDiff(docs_by_id, new_ids, stale_ids)
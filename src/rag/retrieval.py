@@ -0,0 +1,200 @@
+"""
+Batched retrieval for the RAG vector stores.
+
+Query embeddings are kept in an LRU cache, so the queries a scene's code
+generation and error fixes keep asking are embedded once. The queries of a
+retrieval call are searched with one multi-query request per store instead
+of one request per query.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# Query embeddings kept in the in-process LRU cache
+DEFAULT_QUERY_CACHE_SIZE = 2048
+
+# Results below this relevance (before boosting) are dropped
+DEFAULT_SCORE_THRESHOLD = 0.3
+
+CODE_QUERY_KEYWORDS = ["function", "class", "method", "import", "code", "implementation"]
+CODE_RESULT_TYPES = ['function', 'class', 'code_block']
+
+
+def normalize_query(query: str) -> str:
+    return ' '.join(query.lower().split())
+
+
+def is_code_query(query: str) -> bool:
+    """Code queries get code-type results boosted and are served first."""
+    return any(keyword in query.lower() for keyword in CODE_QUERY_KEYWORDS)
+
+
+class QueryEmbeddingCache:
+    """LRU cache of query embeddings keyed on the normalized query text."""
+
+    def __init__(self, embed_documents: Callable[[List[str]], List[List[float]]],
+                 max_size: int = DEFAULT_QUERY_CACHE_SIZE):
+        """
+        Args:
+            embed_documents: Embeds a list of texts in one forward pass
+            max_size: Query embeddings kept
+        """
+        self.embed_documents = embed_documents
+        self.max_size = max_size
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def embed(self, queries: Sequence[str]) -> List[List[float]]:
+        """Embed query texts, serving repeats from the cache.
+
+        All cache misses are embedded together in a single model forward pass.
+        """
+        keys = [normalize_query(query) for query in queries]
+        embeddings: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._embeddings:
+                    self._embeddings.move_to_end(key)
+                    embeddings[key] = self._embeddings[key]
+
+        missing = list(dict.fromkeys(key for key in keys if key not in embeddings))
+        if missing:
+            for key, embedding in zip(missing, self.embed_documents(missing)):
+                embeddings[key] = embedding
+
+        with self._lock:
+            self.stats['hits'] += len(keys) - len(missing)
+            self.stats['misses'] += len(missing)
+            for key in missing:
+                self._embeddings[key] = embeddings[key]
+            while len(self._embeddings) > self.max_size:
+                self._embeddings.popitem(last=False)
+
+        return [embeddings[key] for key in keys]
+
+    def get_stats(self) -> Dict:
+        """Get query embedding cache statistics."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._embeddings),
+            }
+
+
+def _euclidean_relevance(distance: float) -> float:
+    # Chroma's default l2 space over unit-normalized embeddings
+    return 1.0 - distance / math.sqrt(2)
+
+
+def _query_store(store: Any, embeddings: List[List[float]], k: int) -> List[List[Tuple[str, Dict, float]]]:
+    """(content, metadata, distance) of each query's matches, best first.
+
+    LangChain's Chroma store only searches one vector per call. Where the
+    underlying chromadb collection is exposed (langchain_community ~0.3 with
+    chromadb ~0.6, as pinned in requirements.txt) all queries go in one
+    request; otherwise each query uses the public per-vector search.
+    """
+    collection = getattr(store, '_collection', None)
+    if collection is not None and hasattr(collection, 'query'):
+        response = collection.query(
+            query_embeddings=embeddings,
+            n_results=k,
+            include=['documents', 'metadatas', 'distances']
+        )
+        return [
+            list(zip(docs, metadatas, distances))
+            for docs, metadatas, distances in zip(
+                response['documents'], response['metadatas'], response['distances'])
+        ]
+
+    return [
+        [(doc.page_content, doc.metadata, distance)
+         for doc, distance in store.similarity_search_by_vector_with_relevance_scores(embedding, k=k)]
+        for embedding in embeddings
+    ]
+
+
+def _relevance_score_fn(store: Any) -> Callable[[float], float]:
+    """Distance-to-relevance function LangChain would apply for the store's metric."""
+    select = getattr(store, '_select_relevance_score_fn', None)
+    if select is not None:
+        try:
+            return select()
+        except (AttributeError, NotImplementedError):
+            pass
+    return _euclidean_relevance
+
+
+def search_store_batch(store: Any, queries: Sequence[str], embeddings: List[List[float]], k: int,
+                       boost_code: Sequence[bool],
+                       score_threshold: float = DEFAULT_SCORE_THRESHOLD) -> List[List[Dict]]:
+    """Run several queries against one store; returns each query's results, best first."""
+    if not queries:
+        return []
+
+    relevance_fn = _relevance_score_fn(store)
+    results = []
+    for query, boost, matches in zip(queries, boost_code, _query_store(store, embeddings, k)):
+        formatted_results = []
+        for content, metadata, distance in matches:
+            score = relevance_fn(distance)
+            if score < score_threshold:
+                continue
+            metadata = metadata or {}
+            # Boost scores for code-related results if needed
+            if boost and metadata.get('type') in CODE_RESULT_TYPES:
+                score *= 1.2
+
+            formatted_results.append({
+                "query": query,
+                "source": metadata.get('source', 'unknown'),
+                "content": content,
+                "score": score,
+                "type": metadata.get('type', 'unknown'),
+                "metadata": metadata
+            })
+        results.append(formatted_results)
+
+    return results
+
+
+def search_stores(core_store: Any, plugin_stores: Dict[str, Any], queries: Sequence[Dict],
+                  embeddings: List[List[float]], k: int) -> List[Dict]:
+    """Search the core store with every query and each plugin store with the queries targeting it.
+
+    Queries target a plugin store through their ``type`` field. Results come
+    out in the order a one-query-at-a-time search produces them: code
+    queries before concept queries, each query's core results followed by
+    its plugin results.
+    """
+    texts = [query["query"] for query in queries]
+    boost_code = [is_code_query(text) for text in texts]
+    per_query: List[List[Dict]] = [[] for _ in queries]
+
+    for i, results in enumerate(search_store_batch(core_store, texts, embeddings, k, boost_code)):
+        per_query[i].extend(results)
+
+    by_plugin: Dict[str, List[int]] = {}
+    for i, query in enumerate(queries):
+        if query.get("type") in plugin_stores:
+            by_plugin.setdefault(query["type"], []).append(i)
+
+    for plugin_name, indices in by_plugin.items():
+        plugin_results = search_store_batch(
+            plugin_stores[plugin_name],
+            [texts[i] for i in indices],
+            [embeddings[i] for i in indices],
+            k,
+            [boost_code[i] for i in indices]
+        )
+        for i, results in zip(indices, plugin_results):
+            per_query[i].extend(results)
+
+    order = [i for i in range(len(queries)) if boost_code[i]] + [i for i in range(len(queries)) if not boost_code[i]]
+    return [result for i in order for result in per_query[i]]
@@ -1,8 +1,8 @@
 import json
 import os
 import ast
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
-import uuid
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import TextLoader
@@ -10,7 +10,6 @@ from langchain_community.vectorstores import Chroma
 from langchain_text_splitters import Language
 from langchain_core.embeddings import Embeddings
 import statistics
-import tiktoken
 from tqdm import tqdm
 from langfuse import Langfuse
 from langchain_community.embeddings import HuggingFaceEmbeddings
@@ -18,6 +17,8 @@ import re
 
 from mllm_tools.utils import _prepare_text_inputs
 from task_generator import get_prompt_detect_plugins
+from src.rag.index_sync import diff_documents
+from src.rag.retrieval import DEFAULT_QUERY_CACHE_SIZE, QueryEmbeddingCache, search_store_batch, search_stores
 
 class CodeAwareTextSplitter:
     """Enhanced text splitter that understands code structure."""
@@ -196,6 +197,49 @@ Code:
         pattern = r'```\w*\n.*?\n```'
         return re.sub(pattern, '', content, flags=re.DOTALL)
 
+# Files below this count are split in-process; pool startup would dominate
+MIN_FILES_FOR_PROCESS_POOL = 16
+
+# Tokens per embedding forward pass; the encode batch size is derived from
+# the model's max sequence length so long-context models get smaller batches
+EMBEDDING_TOKEN_BUDGET = 32768
+
+# Documents per Chroma add call (capped further by the client's max batch size)
+DEFAULT_INGEST_BATCH_SIZE = 1024
+
+
+def _split_documentation_file(args: Tuple[str, str, int, int]) -> List[Document]:
+    """Split one documentation file into chunks. Runs in a worker process."""
+    file_path, folder_path, chunk_size, chunk_overlap = args
+    splitter = CodeAwareTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    file = os.path.basename(file_path)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        base_metadata = {
+            'source': file_path,
+            'filename': file,
+            'file_type': 'python' if file.endswith('.py') else 'markdown',
+            'relative_path': os.path.relpath(file_path, folder_path)
+        }
+        
+        if file.endswith('.py'):
+            docs = splitter.split_python_file(content, base_metadata)
+        else:  # .md files
+            docs = splitter.split_markdown_file(content, base_metadata)
+        
+        # Add source prefix to content
+        for doc in docs:
+            doc.page_content = f"Source: {file_path}\nType: {doc.metadata.get('type', 'unknown')}\n\n{doc.page_content}"
+        
+        return docs
+        
+    except Exception as e:
+        print(f"Error loading file {file_path}: {e}")
+        return []
+
+
 class EnhancedRAGVectorStore:
     """Enhanced RAG vector store with improved code understanding."""
     
@@ -206,7 +250,20 @@ class EnhancedRAGVectorStore:
                  trace_id: str = None,
                  session_id: str = None,
                  use_langfuse: bool = True,
-                 helper_model = None):
+                 helper_model = None,
+                 refresh_index: bool = False,
+                 max_ingest_workers: Optional[int] = None,
+                 ingest_batch_size: int = DEFAULT_INGEST_BATCH_SIZE,
+                 query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE):
+        """Initialize the vector store, building or loading the core and plugin stores.
+
+        Args:
+            refresh_index: Re-ingest existing stores too. Only new or changed
+                chunks are embedded; chunks whose source changed or disappeared are removed.
+            max_ingest_workers: Processes used to split documentation files
+            ingest_batch_size: Documents per Chroma add call
+            query_cache_size: Query embeddings kept in the LRU cache
+        """
         self.chroma_db_path = chroma_db_path
         self.manim_docs_path = manim_docs_path
         self.embedding_model = embedding_model
@@ -214,57 +271,79 @@ class EnhancedRAGVectorStore:
         self.session_id = session_id
         self.use_langfuse = use_langfuse
         self.helper_model = helper_model
-        self.enc = tiktoken.encoding_for_model("gpt-4")
+        self.refresh_index = refresh_index
+        self.max_ingest_workers = max_ingest_workers or os.cpu_count() or 1
+        self.ingest_batch_size = ingest_batch_size
         self.plugin_stores = {}
         self.code_splitter = CodeAwareTextSplitter()
+        self._embedding_function = None
+        self.query_cache_size = query_cache_size
+        self._query_cache = QueryEmbeddingCache(
+            lambda texts: self._get_embedding_function().embed_documents(texts), query_cache_size
+        )
         self.vector_store = self._load_or_create_vector_store()
 
+    def _open_store(self, collection_name: str) -> Chroma:
+        return Chroma(
+            collection_name=collection_name,
+            persist_directory=os.path.join(self.chroma_db_path, collection_name),
+            embedding_function=self._get_embedding_function()
+        )
+
     def _load_or_create_vector_store(self):
-        """Enhanced vector store creation with better document processing."""
+        """Enhanced vector store creation with better document processing.
+
+        Documentation for every store that needs ingesting is split in one
+        process pool pass, then the core and plugin stores are embedded
+        concurrently.
+        """
         print("Creating enhanced vector store with code-aware processing...")
-        core_path = os.path.join(self.chroma_db_path, "manim_core_enhanced")
-        
-        if os.path.exists(core_path):
-            print("Loading existing enhanced ChromaDB...")
-            self.core_vector_store = Chroma(
-                collection_name="manim_core_enhanced",
-                persist_directory=core_path,
-                embedding_function=self._get_embedding_function()
-            )
-        else:
-            print("Creating new enhanced ChromaDB...")
-            self.core_vector_store = self._create_enhanced_core_store()
         
-        # Process plugins with enhanced splitting
+        # (store name, collection name, docs folder) for every store
+        targets = [("manim_core_enhanced", "manim_core_enhanced", os.path.join(self.manim_docs_path, "manim_core"))]
         plugin_docs_path = os.path.join(self.manim_docs_path, "plugin_docs")
         if os.path.exists(plugin_docs_path):
-            for plugin_name in os.listdir(plugin_docs_path):
-                plugin_store_path = os.path.join(self.chroma_db_path, f"manim_plugin_{plugin_name}_enhanced")
-                if os.path.exists(plugin_store_path):
-                    print(f"Loading existing enhanced plugin store: {plugin_name}")
-                    self.plugin_stores[plugin_name] = Chroma(
-                        collection_name=f"manim_plugin_{plugin_name}_enhanced",
-                        persist_directory=plugin_store_path,
-                        embedding_function=self._get_embedding_function()
-                    )
-                else:
-                    print(f"Creating new enhanced plugin store: {plugin_name}")
-                    plugin_path = os.path.join(plugin_docs_path, plugin_name)
-                    if os.path.isdir(plugin_path):
-                        plugin_store = Chroma(
-                            collection_name=f"manim_plugin_{plugin_name}_enhanced",
-                            embedding_function=self._get_embedding_function(),
-                            persist_directory=plugin_store_path
-                        )
-                        plugin_docs = self._process_documentation_folder_enhanced(plugin_path)
-                        if plugin_docs:
-                            self._add_documents_to_store(plugin_store, plugin_docs, plugin_name)
-                        self.plugin_stores[plugin_name] = plugin_store
-        
+            for plugin_name in sorted(os.listdir(plugin_docs_path)):
+                plugin_path = os.path.join(plugin_docs_path, plugin_name)
+                if os.path.isdir(plugin_path) or os.path.exists(
+                        os.path.join(self.chroma_db_path, f"manim_plugin_{plugin_name}_enhanced")):
+                    targets.append((plugin_name, f"manim_plugin_{plugin_name}_enhanced", plugin_path))
+        
+        to_ingest = {}
+        for store_name, collection_name, docs_path in targets:
+            exists = os.path.exists(os.path.join(self.chroma_db_path, collection_name))
+            if exists and not self.refresh_index:
+                print(f"Loading existing enhanced store: {store_name}")
+            elif os.path.isdir(docs_path):
+                print(f"{'Refreshing' if exists else 'Creating new'} enhanced store: {store_name}")
+                to_ingest[store_name] = docs_path
+        
+        split_docs = self._split_folders(to_ingest) if to_ingest else {}
+        
+        def build(target):
+            store_name, collection_name, _ = target
+            store = self._open_store(collection_name)
+            if store_name in split_docs:
+                self._add_documents_to_store(store, split_docs[store_name], store_name)
+            return store_name, store
+        
+        # Load the embedding model once before the stores share it across threads
+        self._get_embedding_function()
+        with ThreadPoolExecutor(max_workers=max(1, min(len(targets), 4))) as executor:
+            stores = dict(executor.map(build, targets))
+        
+        self.core_vector_store = stores.pop("manim_core_enhanced")
+        self.plugin_stores.update(stores)
         return self.core_vector_store
 
     def _get_embedding_function(self) -> Embeddings:
-        """Enhanced embedding function with better model selection."""
+        """Enhanced embedding function with better model selection.
+
+        The model is loaded once and shared by the core and plugin stores.
+        """
+        if self._embedding_function is not None:
+            return self._embedding_function
+        
         if self.embedding_model.startswith('hf:'):
             model_name = self.embedding_model[3:]
             print(f"Using HuggingFaceEmbeddings with model: {model_name}")
@@ -273,68 +352,61 @@ class EnhancedRAGVectorStore:
             if 'code' not in model_name.lower():
                 print("Consider using a code-specific embedding model like 'microsoft/codebert-base'")
             
-            return HuggingFaceEmbeddings(
+            embeddings = HuggingFaceEmbeddings(
                 model_name=model_name,
                 model_kwargs={'device': 'cpu'},
                 encode_kwargs={'normalize_embeddings': True}
             )
+            
+            # Size forward passes to the model's context length
+            max_seq_length = getattr(getattr(embeddings, 'client', None), 'max_seq_length', None) or 512
+            encode_batch_size = max(16, EMBEDDING_TOKEN_BUDGET // max_seq_length)
+            embeddings.encode_kwargs = {**embeddings.encode_kwargs, 'batch_size': encode_batch_size}
+            print(f"Embedding batch size: {encode_batch_size} (max sequence length {max_seq_length})")
+            
+            self._embedding_function = embeddings
+            return embeddings
         else:
             raise ValueError("Only HuggingFace embeddings are supported in this configuration.")
 
-    def _create_enhanced_core_store(self):
-        """Create enhanced core store with better document processing."""
-        core_vector_store = Chroma(
-            collection_name="manim_core_enhanced",
-            embedding_function=self._get_embedding_function(),
-            persist_directory=os.path.join(self.chroma_db_path, "manim_core_enhanced")
-        )
+    def _split_folders(self, folders: Dict[str, str]) -> Dict[str, List[Document]]:
+        """Split every .md/.py file under each folder, using a process pool for large trees."""
+        jobs = []
+        for store_name, folder_path in folders.items():
+            for root, _, files in os.walk(folder_path):
+                for file in sorted(files):
+                    if file.endswith(('.md', '.py')):
+                        jobs.append((store_name, (
+                            os.path.join(root, file), folder_path,
+                            self.code_splitter.chunk_size, self.code_splitter.chunk_overlap
+                        )))
+        
+        args = [job_args for _, job_args in jobs]
+        if len(jobs) >= MIN_FILES_FOR_PROCESS_POOL and self.max_ingest_workers > 1:
+            with ProcessPoolExecutor(max_workers=self.max_ingest_workers) as executor:
+                chunksize = max(1, len(args) // (self.max_ingest_workers * 4))
+                results = list(executor.map(_split_documentation_file, args, chunksize=chunksize))
+        else:
+            results = [_split_documentation_file(job_args) for job_args in args]
         
-        core_docs = self._process_documentation_folder_enhanced(
-            os.path.join(self.manim_docs_path, "manim_core")
-        )
-        if core_docs:
-            self._add_documents_to_store(core_vector_store, core_docs, "manim_core_enhanced")
+        split_docs = {store_name: [] for store_name in folders}
+        for (store_name, _), docs in zip(jobs, results):
+            split_docs[store_name].extend(docs)
         
-        return core_vector_store
+        for store_name, folder_path in folders.items():
+            print(f"Processed {len(split_docs[store_name])} enhanced document chunks from {folder_path}")
+        return split_docs
 
     def _process_documentation_folder_enhanced(self, folder_path: str) -> List[Document]:
         """Enhanced document processing with code-aware splitting."""
-        all_docs = []
-        
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                if file.endswith(('.md', '.py')):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        base_metadata = {
-                            'source': file_path,
-                            'filename': file,
-                            'file_type': 'python' if file.endswith('.py') else 'markdown',
-                            'relative_path': os.path.relpath(file_path, folder_path)
-                        }
-                        
-                        if file.endswith('.py'):
-                            docs = self.code_splitter.split_python_file(content, base_metadata)
-                        else:  # .md files
-                            docs = self.code_splitter.split_markdown_file(content, base_metadata)
-                        
-                        # Add source prefix to content
-                        for doc in docs:
-                            doc.page_content = f"Source: {file_path}\nType: {doc.metadata.get('type', 'unknown')}\n\n{doc.page_content}"
-                        
-                        all_docs.extend(docs)
-                        
-                    except Exception as e:
-                        print(f"Error loading file {file_path}: {e}")
-        
-        print(f"Processed {len(all_docs)} enhanced document chunks from {folder_path}")
-        return all_docs
+        return self._split_folders({folder_path: folder_path})[folder_path]
 
     def _add_documents_to_store(self, vector_store: Chroma, documents: List[Document], store_name: str):
-        """Enhanced document addition with better batching."""
+        """Add documents under content-hash IDs, embedding only chunks the store does not have yet.
+
+        Chunks already in the store from an earlier run keep their embeddings,
+        and chunks that are no longer produced by the docs are deleted.
+        """
         print(f"Adding {len(documents)} enhanced documents to {store_name} store")
         
         # Group documents by type for better organization
@@ -347,18 +419,29 @@ class EnhancedRAGVectorStore:
         
         print(f"Document types distribution: {dict((k, len(v)) for k, v in doc_types.items())}")
         
-        # Calculate token statistics
-        token_lengths = [len(self.enc.encode(doc.page_content)) for doc in documents]
-        print(f"Token length statistics for {store_name}: "
-              f"Min: {min(token_lengths)}, Max: {max(token_lengths)}, "
-              f"Mean: {sum(token_lengths) / len(token_lengths):.1f}, "
-              f"Median: {statistics.median(token_lengths):.1f}")
+        if documents:
+            # Character lengths are a cheap proxy; tokenizing every chunk just for stats is slow
+            char_lengths = [len(doc.page_content) for doc in documents]
+            print(f"Chunk length statistics for {store_name} (chars): "
+                  f"Min: {min(char_lengths)}, Max: {max(char_lengths)}, "
+                  f"Mean: {sum(char_lengths) / len(char_lengths):.1f}, "
+                  f"Median: {statistics.median(char_lengths):.1f}")
         
-        batch_size = 10
-        for i in tqdm(range(0, len(documents), batch_size), desc=f"Processing {store_name} enhanced batches"):
-            batch_docs = documents[i:i + batch_size]
-            batch_ids = [str(uuid.uuid4()) for _ in batch_docs]
-            vector_store.add_documents(documents=batch_docs, ids=batch_ids)
+        docs_by_id, new_ids, stale_ids = diff_documents(documents, vector_store.get(include=[])['ids'])
+        print(f"{store_name}: {len(new_ids)} new or changed chunks to embed, "
+              f"{len(docs_by_id) - len(new_ids)} unchanged, {len(stale_ids)} stale")
+        
+        batch_size = self.ingest_batch_size
+        max_batch_size = getattr(getattr(vector_store, '_client', None), 'max_batch_size', None)
+        if max_batch_size:
+            batch_size = min(batch_size, max_batch_size)
+        
+        for i in range(0, len(stale_ids), batch_size):
+            vector_store.delete(ids=stale_ids[i:i + batch_size])
+        
+        for i in tqdm(range(0, len(new_ids), batch_size), desc=f"Processing {store_name} enhanced batches"):
+            batch_ids = new_ids[i:i + batch_size]
+            vector_store.add_documents(documents=[docs_by_id[doc_id] for doc_id in batch_ids], ids=batch_ids)
         
         vector_store.persist()
 
@@ -366,33 +449,27 @@ class EnhancedRAGVectorStore:
         """Find relevant documents - compatibility method that calls the enhanced version."""
         return self.find_relevant_docs_enhanced(queries, k, trace_id, topic, scene_number)
 
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed query texts, serving repeats from the LRU cache."""
+        return self._query_cache.embed(queries)
+
+    def get_query_cache_stats(self) -> Dict:
+        """Get query embedding cache statistics."""
+        return self._query_cache.get_stats()
+
+    def search_batch(self, queries: List[Dict], k: int = 5) -> List[Dict]:
+        """Batched multi-query retrieval.
+
+        Embeds every query at once (with caching), then issues one multi-query
+        search against the core store and one against each plugin store that
+        the queries target via their ``type`` field.
+        """
+        embeddings = self.embed_queries([q["query"] for q in queries])
+        return search_stores(self.core_vector_store, self.plugin_stores, queries, embeddings, k)
+
     def find_relevant_docs_enhanced(self, queries: List[Dict], k: int = 5, trace_id: str = None, topic: str = None, scene_number: int = None) -> str:
         """Enhanced document retrieval with type-aware search."""
-        # Separate queries by intent
-        code_queries = [q for q in queries if any(keyword in q["query"].lower() 
-                       for keyword in ["function", "class", "method", "import", "code", "implementation"])]
-        concept_queries = [q for q in queries if q not in code_queries]
-        
-        all_results = []
-        
-        # Search with different strategies for different query types
-        for query in code_queries:
-            results = self._search_with_filters(
-                query["query"], 
-                k=k, 
-                filter_metadata={'type': ['function', 'class', 'code_block']},
-                boost_code=True
-            )
-            all_results.extend(results)
-        
-        for query in concept_queries:
-            results = self._search_with_filters(
-                query["query"], 
-                k=k, 
-                filter_metadata={'type': ['markdown_section', 'module_level']},
-                boost_code=False
-            )
-            all_results.extend(results)
+        all_results = self.search_batch(queries, k=k) if queries else []
         
         # Remove duplicates and format results
         unique_results = self._remove_duplicates(all_results)
@@ -401,27 +478,9 @@ class EnhancedRAGVectorStore:
     def _search_with_filters(self, query: str, k: int, filter_metadata: Dict = None, boost_code: bool = False) -> List[Dict]:
         """Search with metadata filters and result boosting."""
         # This is a simplified version - in practice, you'd implement proper filtering
-        core_results = self.core_vector_store.similarity_search_with_relevance_scores(
-            query=query, k=k, score_threshold=0.3
-        )
-        
-        formatted_results = []
-        for result in core_results:
-            doc, score = result
-            # Boost scores for code-related results if needed
-            if boost_code and doc.metadata.get('type') in ['function', 'class', 'code_block']:
-                score *= 1.2
-            
-            formatted_results.append({
-                "query": query,
-                "source": doc.metadata['source'],
-                "content": doc.page_content,
-                "score": score,
-                "type": doc.metadata.get('type', 'unknown'),
-                "metadata": doc.metadata
-            })
-        
-        return formatted_results
+        return search_store_batch(
+            self.core_vector_store, [query], self.embed_queries([query]), k, [boost_code]
+        )[0]
     
     def _remove_duplicates(self, results: List[Dict]) -> List[Dict]:
         """Remove duplicate results based on content similarity."""
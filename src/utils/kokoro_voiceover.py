@@ -9,10 +9,10 @@ import json
 import numpy as np
 from pathlib import Path
 from manim_voiceover.services.base import SpeechService
-from kokoro_onnx import Kokoro
 from manim_voiceover.helper import remove_bookmarks, wav2mp3
 from scipy.io.wavfile import write as write_wav
 from src.config.config import Config
+from src.utils.tts_engine import get_kokoro_engine, synthesize_speech
 
 
 class KokoroService(SpeechService):
@@ -25,7 +25,9 @@ class KokoroService(SpeechService):
                  speed: float = Config.KOKORO_DEFAULT_SPEED,
                  lang: str = Config.KOKORO_DEFAULT_LANG,
                  **kwargs):
-        self.kokoro = Kokoro(model_path, voices_path)
+        # The model itself is loaded once per process (or served by a TTS worker)
+        self.model_path = model_path
+        self.voices_path = voices_path
         self.voice = voice
         self.speed = speed
         self.lang = lang
@@ -36,6 +38,11 @@ class KokoroService(SpeechService):
         self.engine = engine
         super().__init__(**kwargs)
 
+    @property
+    def kokoro(self):
+        """The process-wide Kokoro model."""
+        return get_kokoro_engine(self.model_path, self.voices_path).kokoro
+
     def get_data_hash(self, input_data: dict) -> str:
         """
         Generates a hash based on the input data dictionary.
@@ -57,9 +64,10 @@ class KokoroService(SpeechService):
         Generates speech from text using Kokoro ONNX and saves the audio file.
         Normalizes the audio to make it audible.
         """
-        # Generate audio samples using Kokoro
-        samples, sample_rate = self.kokoro.create(
-            text, voice=voice_name, speed=speed, lang=lang
+        # Generate audio samples using the shared Kokoro engine, sentence by sentence
+        samples, sample_rate = synthesize_speech(
+            text, voice=voice_name, speed=speed, lang=lang,
+            model_path=self.model_path, voices_path=self.voices_path
         )
 
         # Normalize audio to the range [-1, 1]
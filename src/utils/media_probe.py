@@ -0,0 +1,308 @@
+"""
+Shared media probe service.
+
+Runs a single ``ffprobe`` pass per media file (streams and container format
+together) and caches the structured result keyed by (path, size, mtime) in
+memory and on disk, so the renderer, the streaming utilities and the AWS
+video service never probe the same unchanged file twice. ``probe_many``
+probes a batch of files concurrently with a bounded number of ffprobe
+processes in flight.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from fractions import Fraction
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROBE_CACHE_VERSION = 3
+
+
+def parse_frame_rate(value: Any) -> float:
+    """Parse an ffprobe frame rate such as ``30/1``, ``30000/1001`` or ``29.97``.
+
+    Returns 0.0 for missing or undefined rates (``0/0``) instead of raising.
+    """
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(Fraction(str(value).strip()))
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+@dataclass
+class MediaProbe:
+    """Structured result of probing one media file."""
+    path: str
+    size: int
+    mtime_ns: int
+    duration: float = 0.0
+    # Container (format) duration; the video stream's can differ by a frame or two
+    container_duration: float = 0.0
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    frame_count: int = 0
+    bit_rate: int = 0
+    format_name: Optional[str] = None
+    video_codec: Optional[str] = None
+    video_profile: Optional[str] = None
+    video_level: Optional[int] = None
+    video_time_base: Optional[str] = None
+    # Hash of the codec parameter sets (SPS/PPS for H.264)
+    video_extradata_hash: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    has_video: bool = False
+    has_audio: bool = False
+    audio_codec: Optional[str] = None
+    audio_sample_rate: Optional[int] = None
+    audio_channels: Optional[int] = None
+    probe_method: str = "ffprobe"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MediaProbe":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+def _parse_ffprobe_output(path: str, size: int, mtime_ns: int, data: Dict[str, Any]) -> MediaProbe:
+    streams = data.get('streams', [])
+    fmt = data.get('format', {})
+    video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+
+    duration = float((video or {}).get('duration') or fmt.get('duration') or 0)
+    fps = parse_frame_rate((video or {}).get('avg_frame_rate')) or parse_frame_rate((video or {}).get('r_frame_rate'))
+    frame_count = int((video or {}).get('nb_frames') or 0) or int(round(duration * fps))
+
+    return MediaProbe(
+        path=path,
+        size=size,
+        mtime_ns=mtime_ns,
+        duration=duration,
+        container_duration=float(fmt.get('duration') or 0),
+        width=int((video or {}).get('width') or 0),
+        height=int((video or {}).get('height') or 0),
+        fps=fps,
+        frame_count=frame_count,
+        bit_rate=int(fmt.get('bit_rate') or 0),
+        format_name=fmt.get('format_name'),
+        video_codec=(video or {}).get('codec_name'),
+        video_profile=(video or {}).get('profile'),
+        video_level=(video or {}).get('level'),
+        video_time_base=(video or {}).get('time_base'),
+        video_extradata_hash=(video or {}).get('extradata_hash'),
+        pix_fmt=(video or {}).get('pix_fmt'),
+        has_video=video is not None,
+        has_audio=audio is not None,
+        audio_codec=(audio or {}).get('codec_name'),
+        audio_sample_rate=int(audio['sample_rate']) if audio and audio.get('sample_rate') else None,
+        audio_channels=(audio or {}).get('channels'),
+    )
+
+
+def _probe_with_opencv(path: str, size: int, mtime_ns: int) -> MediaProbe:
+    """Fallback when ffprobe is not installed: video properties only."""
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise ValueError(f"Could not open media file: {path}")
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = frame_count / fps if fps > 0 else 0.0
+        return MediaProbe(
+            path=path,
+            size=size,
+            mtime_ns=mtime_ns,
+            duration=duration,
+            container_duration=duration,
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            fps=fps,
+            frame_count=frame_count,
+            bit_rate=int(size * 8 / duration) if duration > 0 else 0,
+            has_video=True,
+            probe_method="opencv",
+        )
+    finally:
+        cap.release()
+
+
+class MediaProbeService:
+    """Probe media files once and cache results by (path, size, mtime)."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_memory_entries: int = 4096,
+                 max_concurrent_probes: Optional[int] = None, probe_timeout: float = 60):
+        """Initialize the probe service.
+
+        Args:
+            cache_dir: Directory for the on-disk cache, or None for memory only
+            max_memory_entries: Entries kept in the in-memory LRU
+            max_concurrent_probes: Upper bound on ffprobe processes run by batch probes
+            probe_timeout: Timeout in seconds for a single ffprobe call
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_concurrent_probes = max_concurrent_probes or min(8, os.cpu_count() or 1)
+        self.probe_timeout = probe_timeout
+        self._memory: "OrderedDict[str, MediaProbe]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ffprobe = shutil.which('ffprobe')
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'probes': 0, 'errors': 0}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _cache_key(path: str, size: int, mtime_ns: int) -> str:
+        material = f"{PROBE_CACHE_VERSION}\0{path}\0{size}\0{mtime_ns}"
+        return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, result: MediaProbe) -> None:
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[MediaProbe]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json"), 'r', encoding='utf-8') as f:
+                return MediaProbe.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write_disk(self, key: str, result: MediaProbe) -> None:
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result.to_dict(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Could not write probe cache entry: {e}")
+
+    def _run_probe(self, path: str, size: int, mtime_ns: int) -> MediaProbe:
+        if self._ffprobe is None:
+            return _probe_with_opencv(path, size, mtime_ns)
+
+        cmd = [
+            self._ffprobe, '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_streams', '-show_format',
+            '-show_data_hash', 'sha256',
+            path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=self.probe_timeout)
+        return _parse_ffprobe_output(path, size, mtime_ns, json.loads(result.stdout))
+
+    def probe(self, path: str) -> MediaProbe:
+        """Probe a file, serving unchanged files from the cache.
+
+        Raises FileNotFoundError for missing files and the underlying error
+        if the file cannot be probed.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = self._cache_key(path, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return cached
+
+        cached = self._read_disk(key)
+        if cached is not None:
+            with self._lock:
+                self.stats['disk_hits'] += 1
+            self._remember(key, cached)
+            return cached
+
+        try:
+            result = self._run_probe(path, st.st_size, st.st_mtime_ns)
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+
+        with self._lock:
+            self.stats['probes'] += 1
+        self._remember(key, result)
+        self._write_disk(key, result)
+        return result
+
+    def probe_many(self, paths: Iterable[str]) -> List[Optional[MediaProbe]]:
+        """Probe many files concurrently; failed probes come back as None."""
+        paths = list(paths)
+
+        def _safe_probe(path: str) -> Optional[MediaProbe]:
+            try:
+                return self.probe(path)
+            except Exception as e:
+                logger.warning(f"Could not probe {path}: {e}")
+                return None
+
+        if len(paths) <= 1:
+            return [_safe_probe(path) for path in paths]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_probes, len(paths))) as executor:
+            return list(executor.map(_safe_probe, paths))
+
+    async def probe_async(self, path: str) -> MediaProbe:
+        """Async variant of ``probe``."""
+        import asyncio
+        return await asyncio.to_thread(self.probe, path)
+
+    async def probe_many_async(self, paths: Iterable[str]) -> List[Optional[MediaProbe]]:
+        """Async variant of ``probe_many``."""
+        import asyncio
+        return await asyncio.to_thread(self.probe_many, list(paths))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {**self.stats, 'memory_entries': len(self._memory)}
+
+
+_default_service: Optional[MediaProbeService] = None
+_default_service_lock = threading.Lock()
+
+
+def get_media_probe_service() -> MediaProbeService:
+    """Return the process-wide probe service.
+
+    The on-disk cache lives in ``MEDIA_PROBE_CACHE_DIR`` if set, otherwise
+    in a ``media_probe_cache`` directory under the system temp directory.
+    """
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            cache_dir = os.getenv(
+                'MEDIA_PROBE_CACHE_DIR',
+                os.path.join(tempfile.gettempdir(), 'media_probe_cache')
+            )
+            _default_service = MediaProbeService(cache_dir=cache_dir)
+        return _default_service
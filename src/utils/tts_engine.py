@@ -0,0 +1,359 @@
+"""
+Shared Kokoro text-to-speech engine.
+
+Loads the Kokoro ONNX model and voices once per process, with the ONNX
+session's thread counts tuned to the machine, and synthesizes narration
+sentence by sentence on a shared thread pool. Sentence audio is kept in a
+content-addressed cache on disk, so a sentence spoken in one scene or topic
+is never synthesized again in another.
+
+Manim scenes render in separate processes. To avoid loading the model in
+each of them, a TTS worker process can be started once
+(``start_tts_worker``); ``synthesize_speech`` then sends requests to it over
+a local IPC connection and falls back to the in-process engine if the
+worker is unreachable.
+
+Run a worker by hand with::
+
+    python -m src.utils.tts_engine --address /tmp/kokoro.sock
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AUDIO_CACHE_VERSION = 1
+
+TTS_ADDRESS_ENV = 'KOKORO_TTS_ADDRESS'
+TTS_AUTHKEY_ENV = 'KOKORO_TTS_AUTHKEY'
+
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?;:])\s+')
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split narration into sentences, keeping punctuation and dropping empty parts."""
+    return [part.strip() for part in _SENTENCE_END_RE.split(text) if part.strip()]
+
+
+def _file_identity(path: Optional[str]) -> str:
+    if not path:
+        return ''
+    try:
+        st = os.stat(path)
+    except OSError:
+        return os.path.abspath(path)
+    return f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class AudioCache:
+    """Content-addressed on-disk cache of synthesized sentence audio."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.stats = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(sentence: str, voice: str, speed: float, lang: str, model_identity: str) -> str:
+        material = json.dumps(
+            [AUDIO_CACHE_VERSION, model_identity, voice, speed, lang, sentence],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        try:
+            with np.load(self._path(key)) as data:
+                result = data['samples'], int(data['sample_rate'])
+        except (OSError, KeyError, ValueError):
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        with self._lock:
+            self.stats['hits'] += 1
+        return result
+
+    def set(self, key: str, samples: np.ndarray, sample_rate: int) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(tmp_path, samples=samples, sample_rate=sample_rate)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Could not write TTS cache entry: {e}")
+
+
+class KokoroEngine:
+    """Kokoro model loaded once, synthesizing sentences in parallel with caching."""
+
+    def __init__(self, model_path: str, voices_path: str,
+                 sentence_workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None):
+        """Load the model.
+
+        Args:
+            model_path: Path to the Kokoro ONNX model
+            voices_path: Path to the voices file
+            sentence_workers: Sentences synthesized concurrently; ONNX intra-op
+                threads are split evenly between them
+            cache_dir: Sentence audio cache directory, or None to disable caching
+        """
+        cores = os.cpu_count() or 1
+        self.sentence_workers = max(1, sentence_workers or min(4, cores))
+        self.intra_op_threads = max(1, cores // self.sentence_workers)
+        self.model_identity = f"{_file_identity(model_path)}|{_file_identity(voices_path)}"
+        self.kokoro = self._load(model_path, voices_path)
+        self.cache = AudioCache(cache_dir) if cache_dir else None
+        self._executor = ThreadPoolExecutor(max_workers=self.sentence_workers, thread_name_prefix='kokoro')
+
+    def _load(self, model_path: str, voices_path: str):
+        from kokoro_onnx import Kokoro
+
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            ort = None
+
+        if ort is None or not hasattr(Kokoro, 'from_session'):
+            return Kokoro(model_path, voices_path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        return Kokoro.from_session(session, voices_path)
+
+    def _synthesize_sentence(self, sentence: str, voice: str, speed: float, lang: str) -> Tuple[np.ndarray, int]:
+        key = None
+        if self.cache is not None:
+            key = AudioCache.key(sentence, voice, speed, lang, self.model_identity)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        samples, sample_rate = self.kokoro.create(sentence, voice=voice, speed=speed, lang=lang)
+        samples = np.asarray(samples, dtype=np.float32)
+        if key is not None:
+            self.cache.set(key, samples, sample_rate)
+        return samples, sample_rate
+
+    def synthesize(self, text: str, voice: str, speed: float, lang: str) -> Tuple[np.ndarray, int]:
+        """Synthesize text as one waveform; sentences run in parallel and are concatenated in order."""
+        sentences = split_sentences(text) or [text]
+        results = list(self._executor.map(
+            lambda sentence: self._synthesize_sentence(sentence, voice, speed, lang), sentences
+        ))
+        sample_rate = results[0][1]
+        return np.concatenate([samples for samples, _ in results]), sample_rate
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine and cache statistics."""
+        return {
+            'sentence_workers': self.sentence_workers,
+            'intra_op_threads': self.intra_op_threads,
+            **(self.cache.stats if self.cache is not None else {}),
+        }
+
+
+def get_audio_cache_dir() -> str:
+    """Sentence audio cache directory (KOKORO_AUDIO_CACHE_DIR, or under the system temp dir)."""
+    return os.getenv('KOKORO_AUDIO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'kokoro_audio_cache'))
+
+
+_engines: Dict[Tuple[str, str], KokoroEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_kokoro_engine(model_path: str, voices_path: str) -> KokoroEngine:
+    """Return the process-wide engine for a model, loading it on first use."""
+    key = (model_path, voices_path)
+    with _engines_lock:
+        if key not in _engines:
+            workers = os.getenv('KOKORO_SENTENCE_WORKERS')
+            _engines[key] = KokoroEngine(
+                model_path, voices_path,
+                sentence_workers=int(workers) if workers else None,
+                cache_dir=get_audio_cache_dir()
+            )
+        return _engines[key]
+
+
+# ----------------------------------------------------------------------
+# IPC worker
+# ----------------------------------------------------------------------
+
+def _default_address() -> str:
+    if sys.platform == 'win32':
+        return rf"\\.\pipe\kokoro-tts-{uuid.uuid4().hex}"
+    return os.path.join(tempfile.gettempdir(), f"kokoro-tts-{uuid.uuid4().hex}.sock")
+
+
+def _handle_connection(conn) -> None:
+    with conn:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                engine = get_kokoro_engine(request['model_path'], request['voices_path'])
+                samples, sample_rate = engine.synthesize(
+                    request['text'], request['voice'], request['speed'], request['lang']
+                )
+                conn.send({'samples': samples, 'sample_rate': sample_rate})
+            except Exception as e:
+                conn.send({'error': f"{type(e).__name__}: {e}"})
+
+
+def serve(address: str, authkey: bytes, model_path: Optional[str] = None,
+          voices_path: Optional[str] = None) -> None:
+    """Serve synthesis requests until killed, loading the model up front if given."""
+    if model_path and voices_path:
+        get_kokoro_engine(model_path, voices_path)
+    family = 'AF_PIPE' if address.startswith('\\\\') else 'AF_UNIX'
+    with Listener(address, family=family, authkey=authkey) as listener:
+        print(f"Kokoro TTS worker listening on {address}", flush=True)
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_handle_connection, args=(conn,), daemon=True).start()
+
+
+class TTSWorkerProcess:
+    """Handle for a TTS worker started by ``start_tts_worker``."""
+
+    def __init__(self, process: subprocess.Popen, address: str):
+        self.process = process
+        self.address = address
+
+    def stop(self) -> None:
+        """Stop the worker and remove its environment variables."""
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if os.environ.get(TTS_ADDRESS_ENV) == self.address:
+            os.environ.pop(TTS_ADDRESS_ENV, None)
+            os.environ.pop(TTS_AUTHKEY_ENV, None)
+        if not self.address.startswith('\\\\') and os.path.exists(self.address):
+            os.remove(self.address)
+
+
+def _wait_until_listening(process: subprocess.Popen, address: str, authkey: str, timeout: float) -> None:
+    """Block until the worker accepts connections; raise if it exits or times out first."""
+    family = 'AF_PIPE' if address.startswith('\\\\') else 'AF_UNIX'
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            Client(address, family=family, authkey=authkey.encode()).close()
+            return
+        except OSError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError(f"Kokoro TTS worker exited with code {process.returncode}")
+        if time.monotonic() > deadline:
+            process.kill()
+            process.wait()
+            raise RuntimeError(f"Kokoro TTS worker did not start within {timeout}s")
+        time.sleep(0.1)
+
+
+def start_tts_worker(model_path: str, voices_path: str, startup_timeout: float = 120) -> TTSWorkerProcess:
+    """Start a TTS worker process and point this process (and its children) at it.
+
+    The address and auth key are exported as KOKORO_TTS_ADDRESS and
+    KOKORO_TTS_AUTHKEY, which manim subprocesses and render workers inherit.
+    The worker shares this process's stdout and stderr; it is ready once its
+    socket accepts connections, which happens after the model is loaded.
+    """
+    address = _default_address()
+    authkey = uuid.uuid4().hex
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = {**os.environ, TTS_AUTHKEY_ENV: authkey}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [project_root, env.get('PYTHONPATH')]))
+
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'src.utils.tts_engine', '--address', address,
+         '--model_path', model_path, '--voices_path', voices_path],
+        env=env, cwd=project_root
+    )
+    _wait_until_listening(process, address, authkey, startup_timeout)
+
+    os.environ[TTS_ADDRESS_ENV] = address
+    os.environ[TTS_AUTHKEY_ENV] = authkey
+    return TTSWorkerProcess(process, address)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _synthesize_remote(address: str, request: Dict[str, Any]) -> Tuple[np.ndarray, int]:
+    global _client
+    with _client_lock:
+        if _client is None:
+            family = 'AF_PIPE' if address.startswith('\\\\') else 'AF_UNIX'
+            _client = Client(address, family=family, authkey=os.environ.get(TTS_AUTHKEY_ENV, '').encode())
+        try:
+            _client.send(request)
+            response = _client.recv()
+        except (EOFError, OSError):
+            _client = None
+            raise
+    if 'error' in response:
+        raise RuntimeError(response['error'])
+    return response['samples'], response['sample_rate']
+
+
+def synthesize_speech(text: str, voice: str, speed: float, lang: str,
+                      model_path: str, voices_path: str) -> Tuple[np.ndarray, int]:
+    """Synthesize text via the TTS worker if one is configured, else in-process."""
+    address = os.environ.get(TTS_ADDRESS_ENV)
+    if address:
+        request = {
+            'text': text, 'voice': voice, 'speed': speed, 'lang': lang,
+            'model_path': model_path, 'voices_path': voices_path,
+        }
+        try:
+            return _synthesize_remote(address, request)
+        except (OSError, EOFError, RuntimeError) as e:
+            logger.warning(f"Kokoro TTS worker unavailable ({e}); synthesizing in-process")
+    return get_kokoro_engine(model_path, voices_path).synthesize(text, voice, speed, lang)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Kokoro TTS worker process')
+    parser.add_argument('--address', type=str, default=None, help='Unix socket path or Windows pipe name')
+    parser.add_argument('--model_path', type=str, default=None, help='Preload this Kokoro ONNX model')
+    parser.add_argument('--voices_path', type=str, default=None, help='Preload these voices')
+    args = parser.parse_args()
+
+    serve(
+        args.address or _default_address(),
+        os.environ.get(TTS_AUTHKEY_ENV, '').encode(),
+        args.model_path,
+        args.voices_path
+    )
@@ -0,0 +1,54 @@
+"""
+Tests for CodeGenerator's choice of visual self-reflection input.
+"""
+
+import asyncio
+
+import pytest
+
+code_generator = pytest.importorskip("src.core.code_generator", exc_type=ImportError)
+
+from mllm_tools.gemini import GeminiWrapper
+from mllm_tools.response_cache import CachedModel, create_response_cache, unwrap_model
+
+RESPONSE = "```python\nfrom manim import *\n```"
+
+
+class RecordingGemini(GeminiWrapper):
+    """A Gemini wrapper that records its inputs instead of calling the API."""
+
+    def __init__(self):
+        self.model_name = "gemini/gemini-2.5-flash"
+        self.temperature = 0.7
+        self.messages = []
+
+    def __call__(self, messages, metadata=None):
+        self.messages.append(messages)
+        return RESPONSE
+
+    async def acall(self, messages, metadata=None):
+        return self(messages, metadata=metadata)
+
+
+def _generator(tmp_path, scene_model):
+    return code_generator.CodeGenerator(
+        scene_model=scene_model, helper_model=scene_model,
+        output_dir=str(tmp_path / "output"), use_langfuse=False
+    )
+
+
+def test_cached_gemini_model_still_gets_video_input(tmp_path):
+    gemini = RecordingGemini()
+    cached = CachedModel(gemini, create_response_cache("memory", deterministic_only=False))
+    assert unwrap_model(cached) is gemini and cached.wrapped is gemini
+
+    video = tmp_path / "scene1.mp4"
+    video.write_bytes(b"not really a video")
+    generator = _generator(tmp_path, cached)
+
+    generator.visual_self_reflection("code", str(video), None, "topic", 1, "session")
+    asyncio.run(generator.avisual_self_reflection("other code", str(video), None, "topic", 1, "session"))
+
+    assert len(gemini.messages) == 2
+    for messages in gemini.messages:
+        assert {"type": "video", "content": str(video)} in messages
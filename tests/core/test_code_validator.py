@@ -0,0 +1,220 @@
+"""
+Tests for pre-render scene code validation.
+
+Most scenes here import from the standard library only, so the checks run
+without manim installed; the manim-specific cases skip without it.
+"""
+
+import pytest
+
+from src.core.code_validator import SceneCodeValidator
+
+
+def validate(code):
+    return SceneCodeValidator(check_constraints=False).validate(code)
+
+
+def test_valid_code_passes():
+    code = (
+        "import os\n"
+        "from json import loads\n"
+        "\n"
+        "class Demo:\n"
+        "    size = 2\n"
+        "\n"
+        "    def setup(self, *args, **kwargs):\n"
+        "        self.items = [loads(str(i)) for i in range(self.size)]\n"
+        "\n"
+        "    def construct(self):\n"
+        "        try:\n"
+        "            total = sum(self.items)\n"
+        "        except TypeError as e:\n"
+        "            total = str(e)\n"
+        "        return (n := len(os.sep)) + n, total, self.__class__\n"
+    )
+    result = validate(code)
+    assert result.ok, result.format_error()
+
+
+def test_syntax_error_reports_line():
+    result = validate("x = 1\ndef broken(:\n    pass\n")
+    assert not result.ok
+    assert result.errors[0].kind == 'SyntaxError'
+    assert result.errors[0].line == 2
+
+
+def test_missing_module_and_name():
+    result = validate("import not_a_real_module_xyz\nfrom json import not_a_real_name\n")
+    kinds = {issue.kind for issue in result.errors}
+    assert kinds == {'ModuleNotFoundError'}
+
+    result = validate("print(undefined_thing)\n")
+    assert [issue.kind for issue in result.errors] == ['NameError']
+    assert result.errors[0].line == 1
+
+
+def test_star_import_from_unknown_module_disables_name_check():
+    result = validate("from not_a_real_module_xyz import *\nprint(Circle)\n")
+    assert [issue.kind for issue in result.errors] == ['ModuleNotFoundError']
+
+
+def test_unknown_self_attribute():
+    code = (
+        "class Base:\n"
+        "    def __init__(self):\n"
+        "        self.ready = True\n"
+        "\n"
+        "class Scene1(Base):\n"
+        "    def construct(self):\n"
+        "        return self.ready, self.missing\n"
+    )
+    result = validate(code)
+    assert [str(issue) for issue in result.errors] == [
+        "Line 7: AttributeError: 'Scene1' object has no attribute 'missing'"
+    ]
+
+
+def test_unresolved_base_skips_attribute_check():
+    code = (
+        "from collections import OrderedDict\n"
+        "\n"
+        "class Scene1(OrderedDict):\n"
+        "    def construct(self):\n"
+        "        return self.anything\n"
+    )
+    assert validate(code).ok
+
+
+def test_error_message_feeds_code_fixer():
+    result = validate("print(undefined_thing)\n")
+    message = result.format_error()
+    assert message.startswith("Scene code failed validation before rendering:")
+    assert "Line 1: NameError: name 'undefined_thing' is not defined" in message
+
+
+VOICEOVER_SCENE = '''from manim import *
+from manim import config as global_config
+from manim_voiceover import VoiceoverScene
+from src.utils.kokoro_voiceover import KokoroService
+
+
+class Scene1_Helper:
+    def __init__(self, scene):
+        self.scene = scene
+
+    def create_formula_tex(self, formula_str, color):
+        if hasattr(self.scene, 'tex_template'):
+            return MathTex(formula_str, color=color, tex_template=self.scene.tex_template)
+        return MathTex(formula_str, color=color)
+
+
+class Scene1(VoiceoverScene, MovingCameraScene):
+    def construct(self):
+        self.set_speech_service(KokoroService())
+        helper = Scene1_Helper(self)
+
+        my_template = TexTemplate()
+        my_template.add_to_preamble(r"\\usepackage{amsmath}")
+        self.tex_template = my_template
+
+        with self.voiceover(text="The area of a circle.") as tracker:
+            formula = helper.create_formula_tex(r"A = \\pi r^2", BLUE_C)
+            formula.to_corner(UL)
+            circle = Circle(radius=global_config.frame_height / 4).move_to(ORIGIN)
+            self.play(Write(formula), Create(circle), run_time=tracker.duration)
+            self.play(self.camera.frame.animate.scale(0.8).move_to(circle))
+            self.wait(0.5)
+
+        self.clear()
+        self.wait(1)
+'''
+
+
+def test_generated_voiceover_scene_passes():
+    pytest.importorskip("manim")
+    pytest.importorskip("manim_voiceover")
+
+    result = validate(VOICEOVER_SCENE)
+    assert result.ok, result.format_error()
+
+
+def test_star_import_from_manim_resolves_names():
+    pytest.importorskip("manim")
+
+    result = validate(
+        "from manim import *\n"
+        "group = VGroup(Circle(), Square()).arrange(RIGHT, buff=MED_SMALL_BUFF)\n"
+        "shape = Circel()\n"
+        "from manim import NotAManimName\n"
+    )
+    assert sorted(str(issue) for issue in result.errors) == [
+        "Line 3: NameError: name 'Circel' is not defined",
+        "Line 4: ImportError: cannot import name 'NotAManimName' from 'manim'",
+    ]
+
+
+def test_wrong_self_attribute_on_manim_scene_is_reported():
+    pytest.importorskip("manim")
+    pytest.importorskip("manim_voiceover")
+
+    code = VOICEOVER_SCENE.replace("self.set_speech_service(", "self.set_speech_servce(")
+    result = validate(code)
+    assert [issue.kind for issue in result.errors] == ['AttributeError']
+    assert "'Scene1' object has no attribute 'set_speech_servce'" in result.errors[0].message
+
+    # Moving camera scenes reach the frame through the camera, not the scene
+    code = (
+        "from manim import *\n"
+        "\n"
+        "class Scene2(MovingCameraScene):\n"
+        "    def construct(self):\n"
+        "        self.play(self.camera.frame.animate.scale(0.5))\n"
+        "        self.play(self.moving_frame.animate.scale(2))\n"
+    )
+    assert [str(issue) for issue in validate(code).errors] == [
+        "Line 6: AttributeError: 'Scene2' object has no attribute 'moving_frame'"
+    ]
+
+
+def _dry_run(tmp_path, construct_body):
+    code = (
+        "from manim import *\n"
+        "\n"
+        "class DryRunScene(Scene):\n"
+        "    def construct(self):\n"
+        + construct_body
+    )
+    file_path = tmp_path / "scene.py"
+    file_path.write_text(code)
+    validator = SceneCodeValidator(check_constraints=False, dry_run=True, dry_run_timeout=120)
+    return validator.validate(code, str(file_path))
+
+
+def test_dry_run_records_scene_calls(tmp_path):
+    pytest.importorskip("manim")
+
+    result = _dry_run(tmp_path, (
+        "        self.add(Dot())\n"
+        "        self.play(Create(Circle()))\n"
+        "        self.wait(0.5)\n"
+    ))
+    assert result.ok, result.format_error()
+
+    methods = [call['method'] for call in result.dry_run_calls]
+    assert {call['scene'] for call in result.dry_run_calls} == {'DryRunScene'}
+    first_play = methods.index('play')
+    assert 'add' in methods[:first_play]
+    assert result.dry_run_calls[first_play]['args'] == ['Create']
+    assert 'wait' in methods[first_play + 1:]
+
+
+def test_dry_run_reports_runtime_error(tmp_path):
+    pytest.importorskip("manim")
+
+    result = _dry_run(tmp_path, (
+        "        self.play(Create(Circle()))\n"
+        "        ValueTracker(1).get_value() / 0\n"
+    ))
+    assert [issue.kind for issue in result.errors] == ['DryRunError']
+    assert 'ZeroDivisionError' in result.errors[0].message
+    assert 'play' in [call['method'] for call in result.dry_run_calls]
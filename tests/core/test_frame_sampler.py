@@ -0,0 +1,172 @@
+"""
+Tests for the vectorized frame scorer and the frame sampler.
+"""
+
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from src.utils.frame_sampler import (
+    BRIGHTNESS_CONTRAST_SCORER,
+    NON_BLACK_SCORER,
+    FrameSampler,
+    luminance,
+    score_frames,
+)
+
+requires_ffmpeg = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="ffmpeg and ffprobe are required"
+)
+
+
+def _gray_frames(*levels, size=(4, 4)):
+    """Stack of uniform gray RGB frames."""
+    return np.stack([np.full((*size, 3), level, dtype=np.uint8) for level in levels])
+
+
+def test_empty_stack_scores_empty():
+    assert score_frames(np.empty((0, 4, 4, 3), dtype=np.uint8)).shape == (0,)
+
+
+def test_non_black_is_fraction_of_bright_pixels():
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    frame[:2] = 255  # top half white
+    frames = np.stack([frame, _gray_frames(200)[0]])
+
+    scores = score_frames(frames, NON_BLACK_SCORER)
+
+    assert scores.tolist() == [0.5, 1.0]
+
+
+def test_non_black_threshold_is_exclusive_and_black_frames_are_ineligible():
+    scores = score_frames(_gray_frames(0, 10, 11), NON_BLACK_SCORER, black_threshold=10)
+
+    assert scores[0] == -np.inf
+    assert scores[1] == -np.inf  # luma equal to the threshold still counts as black
+    assert scores[2] == 1.0
+
+
+def test_brightness_contrast_weights_mean_and_std():
+    frame = np.zeros((2, 2, 3), dtype=np.uint8)
+    frame[0] = 200
+    frames = np.stack([frame, _gray_frames(100, size=(2, 2))[0]])
+
+    scores = score_frames(frames, BRIGHTNESS_CONTRAST_SCORER)
+
+    # Means 100 and 100; standard deviations 100 and 0
+    assert scores.tolist() == pytest.approx([100 * 0.3 + 100 * 0.7, 100 * 0.3])
+
+
+def test_brightness_contrast_min_brightness():
+    scores = score_frames(_gray_frames(20, 120), BRIGHTNESS_CONTRAST_SCORER, min_brightness=50)
+
+    assert scores[0] == -np.inf
+    assert scores[1] == pytest.approx(120 * 0.3)
+
+
+def test_scores_use_luma_not_channel_mean():
+    # Pure blue has luma 29: bright by channel mean, dark by luma
+    blue = np.zeros((1, 2, 2, 3), dtype=np.uint8)
+    blue[..., 2] = 255
+
+    assert luminance(blue).max() == 29
+    assert score_frames(blue, NON_BLACK_SCORER, black_threshold=30)[0] == -np.inf
+
+
+def test_unknown_scorer():
+    with pytest.raises(ValueError):
+        score_frames(_gray_frames(1), "sharpness")
+
+
+@requires_ffmpeg
+def test_sample_ranks_candidates_and_keeps_video_order_on_ties(tmp_path):
+    # 1s black, 1s white, 1s black, 1s white
+    video = str(tmp_path / "blinks.mp4")
+    subprocess.run([
+        'ffmpeg', '-v', 'error',
+        '-f', 'lavfi', '-i', 'color=c=black:size=64x48:rate=10:duration=4',
+        '-vf', "drawbox=c=white:t=fill:enable='between(mod(t,2),1,1.99)'",
+        '-pix_fmt', 'yuv420p', '-c:v', 'libx264', '-g', '10', '-y', video
+    ], check=True)
+    sampler = FrameSampler(thumbnail_width=32)
+
+    frames = sampler.sample(video, top_k=3, timestamps=[0.5, 1.5, 2.5, 3.5])
+
+    # Black frames are ineligible; the two white frames tie and keep video order
+    assert [round(frame.timestamp, 1) for frame in frames] == [1.5, 3.5]
+    assert all(frame.width == 32 and frame.score == 1.0 for frame in frames)
+
+
+def test_luminance_matches_pil_grayscale():
+    Image = pytest.importorskip("PIL.Image")
+
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(3, 32, 48, 3), dtype=np.uint8)
+    # Include the extremes and the pure primaries
+    frames[0, 0, :4] = [[0, 0, 0], [255, 255, 255], [255, 0, 0], [0, 0, 255]]
+
+    expected = np.stack([np.asarray(Image.fromarray(frame).convert('L')) for frame in frames])
+
+    np.testing.assert_array_equal(luminance(frames), expected)
+
+
+def test_clip_duration_uses_rounded_container_duration():
+    from src.utils.frame_sampler import clip_duration
+    from src.utils.media_probe import MediaProbe
+
+    def probe(**kwargs):
+        return MediaProbe(path="v.mp4", size=1, mtime_ns=1, **kwargs)
+
+    assert clip_duration(probe(duration=9.5, container_duration=10.5)) == 10.5
+    # ffmpeg prints Duration rounded to centiseconds
+    assert clip_duration(probe(duration=9.99, container_duration=9.996)) == 10.0
+    assert clip_duration(probe(duration=9.99, container_duration=9.994)) == 9.99
+    assert clip_duration(probe(duration=4.0)) == 4.0
+
+
+@requires_ffmpeg
+def test_best_per_chunk_matches_moviepy_selection(tmp_path):
+    """Same frames as the previous moviepy + image_with_most_non_black_space implementation."""
+    moviepy = pytest.importorskip("moviepy")
+    parse_video = pytest.importorskip("src.core.parse_video", exc_type=ImportError)
+
+    # Non-black area changes every frame; the audio track outlasts the video
+    # by a second, so the container and video stream durations differ
+    video = str(tmp_path / "bars.mp4")
+    subprocess.run([
+        'ffmpeg', '-v', 'error',
+        '-f', 'lavfi', '-i', 'color=c=black:size=96x64:rate=30:duration=9.5',
+        '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=44100:duration=10.5',
+        '-vf', "geq=lum='if(lt(X,W*mod(N*7,31)/31),220,16)':cb=128:cr=128",
+        '-pix_fmt', 'yuv420p', '-c:v', 'libx264', '-preset', 'veryfast', '-c:a', 'aac',
+        '-y', video
+    ], check=True)
+    num_chunks = 4
+
+    # Reference: the moviepy implementation extract_key_frames used before
+    clip = moviepy.VideoFileClip(video)
+    try:
+        reference_frames = list(clip.iter_frames(fps=1))
+    finally:
+        clip.close()
+    total = len(reference_frames)
+    per_chunk = total // num_chunks
+    expected = []
+    for i in range(min(num_chunks, (total + per_chunk - 1) // per_chunk)):
+        chunk = reference_frames[i * per_chunk:(i + 1) * per_chunk]
+        best = parse_video.image_with_most_non_black_space(chunk, str(tmp_path / f"ref_{i}.png"), return_type="image")
+        if best is not None:
+            best = np.asarray(best)
+            expected.append(i * per_chunk + next(j for j, frame in enumerate(chunk) if np.array_equal(frame, best)))
+
+    stats = {}
+    chunks = list(FrameSampler().iter_best_per_chunk(video, num_chunks, fps=1, stats=stats))
+
+    assert stats['total_frames'] == total
+    assert [round(frame.timestamp) for _, frame in chunks] == expected
+    for (_, frame), index in zip(chunks, expected):
+        assert frame.image.shape == reference_frames[index].shape
+        # Same decoded frame; allow for rounding differences between ffmpeg builds
+        assert np.abs(frame.image.astype(int) - reference_frames[index].astype(int)).max() <= 2
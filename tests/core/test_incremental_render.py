@@ -0,0 +1,71 @@
+"""
+Tests for seeding new scene versions with earlier partial movie files.
+"""
+
+import os
+
+from src.core.incremental_render import PARTIAL_MOVIE_DIR, PARTIAL_MOVIE_LIST, PartialMovieReuse
+
+CODE = '''from manim import *
+
+class PythagorasScene(Scene):
+    def construct(self):
+        pass
+'''
+
+
+def _partial_dir(media_dir, version, scene_class="PythagorasScene"):
+    return os.path.join(media_dir, "videos", f"topic_scene1_v{version}", "720p30", PARTIAL_MOVIE_DIR, scene_class)
+
+
+def _make_segments(directory, names):
+    os.makedirs(directory, exist_ok=True)
+    for name in names:
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(name.encode())
+
+
+def test_seed_links_earlier_segments_into_new_version(tmp_path):
+    media_dir = str(tmp_path)
+    _make_segments(_partial_dir(media_dir, 1), ["a.mp4", "b.mp4", "notes.txt"])
+    # Scene class renamed between versions: segments go to the new class name
+    _make_segments(_partial_dir(media_dir, 2, "OldName"), ["c.mp4"])
+
+    reuse = PartialMovieReuse()
+    seeded = reuse.seed(media_dir, "topic", 1, 3, CODE)
+
+    assert seeded == {"a.mp4", "b.mp4", "c.mp4"}
+    target = _partial_dir(media_dir, 3)
+    assert sorted(os.listdir(target)) == ["a.mp4", "b.mp4", "c.mp4"]
+    assert os.path.samefile(os.path.join(target, "a.mp4"), os.path.join(_partial_dir(media_dir, 1), "a.mp4"))
+    assert reuse.get_stats()['segments_seeded'] == 3
+
+    # Later versions are never used as a source
+    assert reuse.seed(media_dir, "topic", 1, 1, CODE) == set()
+
+
+def test_seed_skips_unreadable_source_directories(tmp_path):
+    media_dir = str(tmp_path)
+    videos_dir = os.path.join(media_dir, "videos")
+    os.makedirs(videos_dir)
+    # A version "directory" that is a file, and one whose quality dir is a file
+    open(os.path.join(videos_dir, "topic_scene1_v1"), 'w').close()
+    os.makedirs(os.path.join(videos_dir, "topic_scene1_v2"))
+    open(os.path.join(videos_dir, "topic_scene1_v2", "720p30"), 'w').close()
+
+    assert PartialMovieReuse().seed(media_dir, "topic", 1, 3, CODE) == set()
+    assert PartialMovieReuse().seed(str(tmp_path / "missing"), "topic", 1, 2, CODE) == set()
+
+
+def test_record_render_counts_reused_segments(tmp_path):
+    media_dir = str(tmp_path)
+    target = _partial_dir(media_dir, 2)
+    _make_segments(target, ["a.mp4", "new.mp4"])
+    with open(os.path.join(target, PARTIAL_MOVIE_LIST), 'w') as f:
+        f.write("# this file is used internally\n")
+        f.write(f"file 'file:{os.path.join(target, 'a.mp4')}'\n")
+        f.write(f"file 'file:{os.path.join(target, 'new.mp4')}'\n")
+
+    reuse = PartialMovieReuse()
+    assert reuse.record_render(media_dir, "topic", 1, 2, {"a.mp4"}) == {
+        'segments_reused': 1, 'segments_rendered': 1}
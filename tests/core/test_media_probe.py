@@ -0,0 +1,85 @@
+"""
+Tests for the shared media probe service.
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from src.utils.media_probe import MediaProbe, MediaProbeService, parse_frame_rate
+
+requires_ffmpeg = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="ffmpeg and ffprobe are required"
+)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("30/1", 30.0),
+    ("30000/1001", 30000 / 1001),
+    ("29.97", 29.97),
+    (" 25/1 ", 25.0),
+    (24, 24.0),
+    ("0/0", 0.0),
+    ("N/A", 0.0),
+    ("", 0.0),
+    (None, 0.0),
+])
+def test_parse_frame_rate(value, expected):
+    assert parse_frame_rate(value) == pytest.approx(expected)
+
+
+def test_cache_key_changes_with_path_size_and_mtime():
+    key = MediaProbeService._cache_key("/videos/a.mp4", 100, 1)
+    assert MediaProbeService._cache_key("/videos/a.mp4", 100, 1) == key
+    assert MediaProbeService._cache_key("/videos/b.mp4", 100, 1) != key
+    assert MediaProbeService._cache_key("/videos/a.mp4", 101, 1) != key
+    assert MediaProbeService._cache_key("/videos/a.mp4", 100, 2) != key
+
+
+def test_unchanged_files_are_served_from_memory_then_disk(tmp_path, monkeypatch):
+    video = tmp_path / "scene.mp4"
+    video.write_bytes(b"not really a video")
+    calls = []
+
+    def fake_probe(self, path, size, mtime_ns):
+        calls.append(path)
+        return MediaProbe(path=path, size=size, mtime_ns=mtime_ns, duration=1.5, has_video=True)
+
+    monkeypatch.setattr(MediaProbeService, "_run_probe", fake_probe)
+    service = MediaProbeService(cache_dir=str(tmp_path / "cache"))
+
+    assert service.probe(str(video)).duration == 1.5
+    assert service.probe(str(video)).duration == 1.5
+    assert MediaProbeService(cache_dir=str(tmp_path / "cache")).probe(str(video)).duration == 1.5
+    assert len(calls) == 1
+
+    # A rewritten file is probed again
+    video.write_bytes(b"a different, longer payload")
+    os.utime(video, ns=(1, 1))
+    service.probe(str(video))
+    assert len(calls) == 2
+    assert service.get_stats()['memory_hits'] == 1
+
+
+def test_probe_many_returns_none_for_failures(tmp_path):
+    service = MediaProbeService()
+    assert service.probe_many([str(tmp_path / "missing1.mp4"), str(tmp_path / "missing2.mp4")]) == [None, None]
+    assert service.get_stats()['probes'] == 0
+
+
+@requires_ffmpeg
+def test_probe_reads_streams_and_codec_parameters(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    subprocess.run([
+        'ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=320x240:rate=30000/1001:duration=1',
+        '-pix_fmt', 'yuv420p', '-c:v', 'libx264', '-y', path
+    ], check=True)
+
+    probe = MediaProbeService().probe(path)
+    assert (probe.width, probe.height, probe.video_codec, probe.pix_fmt) == (320, 240, 'h264', 'yuv420p')
+    assert probe.fps == pytest.approx(29.97, abs=0.01)
+    assert probe.has_video and not probe.has_audio
+    assert probe.video_profile and probe.video_level and probe.video_time_base
+    assert probe.video_extradata_hash.startswith('SHA256:')
@@ -0,0 +1,126 @@
+"""
+Tests for the DAG pipeline scheduler.
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.pipeline_scheduler import DependencyFailedError, PipelineScheduler
+
+
+def test_failure_is_propagated_to_every_downstream_task():
+    scheduler = PipelineScheduler({'llm': 2})
+    ran = []
+
+    async def ok(name):
+        ran.append(name)
+        return name
+
+    async def fail(deps):
+        raise RuntimeError("planning failed")
+
+    scheduler.add_task('plan1', 'plan', fail, resource='llm')
+    scheduler.add_task('code1', 'code', lambda deps: ok('code1'), depends_on=['plan1'], resource='llm')
+    scheduler.add_task('render1', 'render', lambda deps: ok('render1'), depends_on=['code1'])
+    scheduler.add_task('plan2', 'plan', lambda deps: ok('plan2'), resource='llm')
+    scheduler.add_task('code2', 'code', lambda deps: ok(f"code2<-{deps['plan2']}"), depends_on=['plan2'])
+
+    results = asyncio.run(scheduler.execute())
+
+    assert isinstance(results['plan1'], RuntimeError)
+    assert isinstance(results['code1'], DependencyFailedError)
+    assert isinstance(results['render1'], DependencyFailedError)
+    assert 'plan1 failed' in str(results['code1'])
+    assert results['code2'] == 'code2<-plan2'
+    assert sorted(ran) == ['code2<-plan2', 'plan2']
+
+    stages = scheduler.get_stats()['stages']
+    assert (stages['plan']['failed'], stages['plan']['completed']) == (1, 1)
+    assert (stages['code']['skipped'], stages['render']['skipped']) == (1, 1)
+
+
+def test_resource_limits_bound_concurrency_per_pool():
+    scheduler = PipelineScheduler({'render': 2, 'llm': 3})
+    running = {'render': 0, 'llm': 0}
+    peak = {'render': 0, 'llm': 0}
+
+    def work(resource):
+        async def run(deps):
+            running[resource] += 1
+            peak[resource] = max(peak[resource], running[resource])
+            await asyncio.sleep(0.01)
+            running[resource] -= 1
+        return run
+
+    for i in range(8):
+        scheduler.add_task(f'code{i}', 'code', work('llm'), resource='llm')
+        scheduler.add_task(f'render{i}', 'render', work('render'), depends_on=[f'code{i}'], resource='render')
+
+    results = asyncio.run(scheduler.execute())
+
+    assert all(result is None for result in results.values())
+    assert peak == {'render': 2, 'llm': 3}
+    assert scheduler.get_stats()['stages']['render']['max_queue_depth'] >= 1
+
+
+def test_task_cancelled_while_waiting_for_a_slot_leaves_the_queue():
+    scheduler = PipelineScheduler({'render': 1})
+
+    async def main():
+        release = asyncio.Event()
+
+        async def hold():
+            await release.wait()
+            return 'held'
+
+        holder = asyncio.ensure_future(scheduler.run('render', 'render', hold))
+        waiter = asyncio.ensure_future(scheduler.run('render', 'render', hold))
+        await asyncio.sleep(0)
+        assert scheduler.queue_depths() == {'render': 1}
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        release.set()
+        assert await holder == 'held'
+        # The slot is still usable after the cancelled waiter
+        assert await scheduler.run('render', 'render', hold) == 'held'
+
+    asyncio.run(main())
+
+    stats = scheduler.get_stats()['stages']['render']
+    assert (stats['queued'], stats['running'], stats['completed']) == (0, 0, 2)
+
+
+def test_dependencies_finish_before_dependents_start():
+    scheduler = PipelineScheduler({})
+    events = []
+
+    def step(name, delay):
+        async def run(deps):
+            events.append(f'start {name}')
+            await asyncio.sleep(delay)
+            events.append(f'end {name}')
+        return run
+
+    scheduler.add_task('outline', 'outline', step('outline', 0.02))
+    scheduler.add_task('plan', 'plan', step('plan', 0), depends_on=['outline'])
+    asyncio.run(scheduler.execute())
+
+    assert events == ['start outline', 'end outline', 'start plan', 'end plan']
+
+
+def test_invalid_graphs_are_rejected():
+    scheduler = PipelineScheduler({})
+
+    async def noop(deps):
+        return None
+
+    scheduler.add_task('a', 'plan', noop)
+    with pytest.raises(ValueError):
+        scheduler.add_task('a', 'plan', noop)
+
+    scheduler.add_task('b', 'code', noop, depends_on=['missing'])
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.execute())
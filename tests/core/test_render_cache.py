@@ -0,0 +1,147 @@
+"""
+Tests for the content-addressed render cache.
+"""
+
+import os
+
+from src.core.render_cache import OPTIMIZATION_HEADER_LINES, RenderCache, detect_plugins, normalize_code
+
+SCENE = '''from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        self.play(Create(Circle()))
+'''
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_normalize_code_ignores_comments_blank_lines_and_injected_header():
+    cosmetic = '''# generated scene
+from manim import *   
+
+class Demo(Scene):  # main scene
+
+    def construct(self):
+        # draw
+        self.play(Create(Circle()))
+'''
+    with_header = '\n'.join(OPTIMIZATION_HEADER_LINES) + '\n' + SCENE
+
+    assert normalize_code(cosmetic) == normalize_code(SCENE)
+    assert normalize_code(with_header) == normalize_code(SCENE)
+    assert normalize_code(SCENE.replace('Circle', 'Square')) != normalize_code(SCENE)
+    # Hash characters inside strings are code, not comments
+    assert normalize_code('x = "#1"\n') != normalize_code('x = "#2"\n')
+
+
+def test_make_key_depends_on_code_quality_fps_and_plugins(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    key = cache.make_key(SCENE, '-qm', 30)
+
+    assert cache.make_key('# comment\n' + SCENE, '-qm', 30) == key
+    assert cache.make_key(SCENE, '-qh', 30) != key
+    assert cache.make_key(SCENE, '-qm', 60) != key
+    assert cache.make_key(SCENE.replace('Circle', 'Square'), '-qm', 30) != key
+    assert detect_plugins('import manim_physics\nfrom manim_ml import x\n') == ['manim_ml', 'manim_physics']
+    assert cache.make_key('from manim_physics import *\n' + SCENE, '-qm', 30) != key
+
+
+def test_lru_eviction_keeps_cache_within_byte_budget(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), max_bytes=250)
+    for name in ('a', 'b'):
+        cache.store(name, _write(tmp_path / f"{name}.mp4", name.encode() * 100), '-qm')
+
+    assert cache.lookup('a') is not None  # b is now least recently used
+    cache.store('c', _write(tmp_path / "c.mp4", b'c' * 100), '-qm')
+
+    assert cache.lookup('b') is None
+    assert cache.lookup('a') is not None and cache.lookup('c') is not None
+    assert cache.get_stats()['total_bytes'] == 200
+    assert not os.path.exists(tmp_path / "cache" / "b.mp4")
+
+    # The manifest keeps entries and recency across instances
+    reopened = RenderCache(str(tmp_path / "cache"), max_bytes=250)
+    assert list(reopened._entries) == list(cache._entries)
+
+
+def test_entries_do_not_share_data_with_render_outputs(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    output = _write(tmp_path / "scene.mp4", b'original')
+    cache.store('key', output, '-qm')
+
+    # A re-render truncating and rewriting the output path in place
+    with open(output, 'r+b') as f:
+        f.truncate(0)
+        f.write(b'rerender')
+    assert _read(cache.lookup('key')) == b'original'
+
+    restored = str(tmp_path / "restored" / "scene.mp4")
+    assert cache.materialize('key', restored)
+    with open(restored, 'r+b') as f:
+        f.write(b'CHANGED!')
+    assert _read(cache.lookup('key')) == b'original'
+    assert [name for name in os.listdir(tmp_path / "cache") if name.startswith('.tmp-')] == []
+
+
+def test_missing_cached_file_is_dropped_on_materialize(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    cache.store('key', _write(tmp_path / "scene.mp4", b'video'), '-qm')
+    os.remove(cache.lookup('key'))
+
+    assert not cache.materialize('key', str(tmp_path / "out.mp4"))
+    assert cache.lookup('key') is None
+
+
+def test_processes_sharing_a_cache_keep_each_others_entries(tmp_path):
+    first = RenderCache(str(tmp_path / "cache"), max_bytes=250)
+    second = RenderCache(str(tmp_path / "cache"), max_bytes=250)
+    first.store('a', _write(tmp_path / "a.mp4", b'a' * 100), '-qm')
+    second.store('b', _write(tmp_path / "b.mp4", b'b' * 100), '-qm')
+
+    # Neither save dropped the other's entry, and a miss picks up new entries
+    assert set(RenderCache(str(tmp_path / "cache"))._entries) == {'a', 'b'}
+    assert first.lookup('b') is not None
+
+    # The budget covers entries written by both instances
+    first.store('c', _write(tmp_path / "c.mp4", b'c' * 100), '-qm')
+    assert set(RenderCache(str(tmp_path / "cache"))._entries) == {'b', 'c'}
+    assert not os.path.exists(tmp_path / "cache" / "a.mp4")
+    assert [name for name in os.listdir(tmp_path / "cache") if name.endswith('.tmp')] == []
+
+
+def test_cache_hits_do_not_rewrite_the_manifest(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    cache.store('key', _write(tmp_path / "scene.mp4", b'video'), '-qm')
+    mtime = os.stat(cache.manifest_path).st_mtime_ns
+
+    assert cache.materialize('key', str(tmp_path / "out" / "scene.mp4"))
+    assert os.stat(cache.manifest_path).st_mtime_ns == mtime
+
+    cache.flush()
+    assert RenderCache(str(tmp_path / "cache"))._entries['key']['last_access'] == cache._entries['key']['last_access']
+
+
+def test_manifest_write_failure_on_hit_does_not_fail_the_restore(tmp_path, monkeypatch):
+    import src.core.render_cache as render_cache
+
+    cache = RenderCache(str(tmp_path / "cache"))
+    cache.store('key', _write(tmp_path / "scene.mp4", b'video'), '-qm')
+    monkeypatch.setattr(render_cache, 'ACCESS_FLUSH_INTERVAL', 0.0)
+
+    def fail_sync():
+        raise FileNotFoundError("manifest.json.tmp")
+
+    monkeypatch.setattr(cache, '_sync_manifest_locked', fail_sync)
+    restored = str(tmp_path / "out" / "scene.mp4")
+    assert cache.materialize('key', restored)
+    assert _read(restored) == b'video'
@@ -0,0 +1,121 @@
+"""
+Tests for the warm render worker pool with more render threads than workers.
+
+Workers run ``_fake_worker_main`` instead of manim: a job's file name says
+whether it renders, hangs or crashes the worker.
+"""
+
+import os
+import time
+import threading
+import subprocess
+
+import pytest
+
+from src.core.render_worker_pool import ManimRenderWorkerPool, RenderJob
+
+
+def _fake_worker_main(conn, preload_modules):
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        name = os.path.basename(job.file_path)
+        if name.startswith('hang'):
+            time.sleep(60)
+        if name.startswith('crash'):
+            os._exit(1)
+        conn.send({'returncode': 0, 'stdout': name, 'stderr': ''})
+
+
+class FakeWorkerPool(ManimRenderWorkerPool):
+    _worker_target = staticmethod(_fake_worker_main)
+
+
+def _run_concurrently(pool, file_names, timeout=None):
+    """Render each file on its own thread; returns results or exceptions by name."""
+    results = {}
+
+    def render(name):
+        try:
+            results[name] = pool.render(RenderJob(file_path=name, media_dir='media'), timeout=timeout)
+        except Exception as e:
+            results[name] = e
+
+    threads = [threading.Thread(target=render, args=(name,), daemon=True) for name in file_names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert not any(thread.is_alive() for thread in threads), "render threads hung"
+    return results
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**kwargs):
+        pool = FakeWorkerPool(preload_modules=[], **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_recycled_workers_are_replaced_for_waiting_renders(make_pool):
+    pool = make_pool(size=2, max_renders_per_worker=1)
+    names = [f"scene{i}.py" for i in range(6)]
+
+    results = _run_concurrently(pool, names)
+
+    assert all(isinstance(results[name], subprocess.CompletedProcess) for name in names)
+    assert [results[name].stdout for name in names] == names
+    stats = pool.get_stats()
+    assert stats['workers_recycled'] == 6
+    assert stats['active_workers'] == 0
+
+
+def test_timeouts_and_crashes_do_not_strand_waiting_renders(make_pool):
+    pool = make_pool(size=1)
+
+    results = _run_concurrently(pool, ['hang1.py', 'crash1.py', 'hang2.py', 'scene1.py'], timeout=0.5)
+
+    assert isinstance(results['hang1.py'], subprocess.TimeoutExpired)
+    assert isinstance(results['hang2.py'], subprocess.TimeoutExpired)
+    assert results['crash1.py'].returncode == 1
+    assert results['scene1.py'].returncode == 0
+    stats = pool.get_stats()
+    assert (stats['timeouts'], stats['crashes']) == (2, 1)
+
+
+def test_shutdown_wakes_renders_waiting_for_a_worker(make_pool):
+    pool = make_pool(size=1)
+    busy = threading.Thread(
+        target=lambda: pytest.raises(subprocess.TimeoutExpired, pool.render,
+                                     RenderJob(file_path='hang.py', media_dir='media'), timeout=5),
+        daemon=True,
+    )
+    busy.start()
+    while pool.get_stats()['jobs'] == 0:
+        time.sleep(0.01)
+
+    waiting = {}
+    waiter = threading.Thread(
+        target=lambda: waiting.update(error=pytest.raises(
+            RuntimeError, pool.render, RenderJob(file_path='scene.py', media_dir='media'))),
+        daemon=True,
+    )
+    waiter.start()
+    time.sleep(0.2)
+    pool.shutdown()
+
+    waiter.join(timeout=2)
+    assert not waiter.is_alive()
+    assert 'shut down' in str(waiting['error'].value)
+    busy.join(timeout=10)
@@ -0,0 +1,96 @@
+"""
+Tests for stream-copy concatenation of scene videos with ffmpeg testsrc clips.
+"""
+
+import json
+import shutil
+import asyncio
+import subprocess
+
+import pytest
+
+from src.core.stream_concat import concat_stream_copy, video_format_key
+from src.utils.media_probe import MediaProbeService
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="ffmpeg and ffprobe are required"
+)
+
+
+def _clip(path, size='320x240', rate=30, duration=1, audio=True, x264_args=()):
+    cmd = ['ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', f'testsrc=size={size}:rate={rate}:duration={duration}']
+    if audio:
+        cmd += ['-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=44100:duration={duration}', '-ac', '2']
+    cmd += ['-pix_fmt', 'yuv420p', '-c:v', 'libx264', '-preset', 'veryfast', *x264_args]
+    if audio:
+        cmd += ['-c:a', 'aac']
+    subprocess.run(cmd + ['-y', str(path)], check=True)
+    return str(path)
+
+
+def _info(path):
+    """Scene info in the shape of VideoRenderer._analyze_video."""
+    probe = MediaProbeService().probe(path)
+    return {
+        'path': path, 'duration': probe.duration, 'has_audio': probe.has_audio,
+        'width': probe.width, 'height': probe.height, 'fps': probe.fps,
+        'video_codec': probe.video_codec, 'video_profile': probe.video_profile,
+        'video_level': probe.video_level, 'video_time_base': probe.video_time_base,
+        'video_extradata_hash': probe.video_extradata_hash, 'pix_fmt': probe.pix_fmt,
+        'audio_codec': probe.audio_codec, 'audio_sample_rate': probe.audio_sample_rate,
+        'audio_channels': probe.audio_channels,
+    }
+
+
+def _ffprobe(path):
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-count_frames', '-print_format', 'json', '-show_streams', '-show_format', path],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def _concat(clips, output):
+    return asyncio.run(concat_stream_copy(clips, [_info(clip) for clip in clips], output))
+
+
+def test_uniform_scenes_are_stream_copied_and_silent_audio_added(tmp_path):
+    clips = [_clip(tmp_path / "s1.mp4"), _clip(tmp_path / "s2.mp4", audio=False), _clip(tmp_path / "s3.mp4")]
+    output = str(tmp_path / "combined.mp4")
+
+    assert _concat(clips, output)
+
+    probe = _ffprobe(output)
+    video = [s for s in probe['streams'] if s['codec_type'] == 'video']
+    audio = [s for s in probe['streams'] if s['codec_type'] == 'audio']
+    assert len(video) == 1 and len(audio) == 1
+    assert (video[0]['width'], video[0]['height']) == (320, 240)
+    assert int(video[0]['nb_read_frames']) == 90
+    assert float(probe['format']['duration']) == pytest.approx(3.0, abs=0.1)
+    # Decodes cleanly end to end
+    decode = subprocess.run(['ffmpeg', '-v', 'error', '-i', output, '-f', 'null', '-'],
+                            capture_output=True, text=True)
+    assert decode.returncode == 0 and decode.stderr == ''
+
+
+@pytest.mark.parametrize("odd_clip", [
+    {'size': '640x480'},
+    {'rate': 25},
+    {'x264_args': ('-profile:v', 'baseline')},
+    {'x264_args': ('-x264-params', 'ref=4:bframes=0')},
+])
+def test_scenes_encoded_differently_are_not_stream_copied(tmp_path, odd_clip):
+    clips = [_clip(tmp_path / "s1.mp4"), _clip(tmp_path / "s2.mp4", **odd_clip)]
+    output = tmp_path / "combined.mp4"
+
+    infos = [_info(clip) for clip in clips]
+    assert video_format_key(infos[0]) != video_format_key(infos[1])
+    assert not _concat(clips, str(output))
+    assert not output.exists()
+
+
+def test_unknown_video_format_is_not_stream_copied(tmp_path):
+    clip = _clip(tmp_path / "s1.mp4")
+    info = _info(clip)
+    info['video_extradata_hash'] = None
+    assert not asyncio.run(concat_stream_copy([clip], [info], str(tmp_path / "combined.mp4")))
@@ -0,0 +1,104 @@
+"""
+Tests for the per-topic artifact manifest.
+"""
+
+import os
+
+from src.core.topic_manifest import TopicManifest, get_topic_manifest
+
+
+OUTLINE = "<SCENE_OUTLINE>\n<SCENE_1>\nIntro\n</SCENE_1>\n<SCENE_2>\nProof\n</SCENE_2>\n</SCENE_OUTLINE>"
+
+
+def write(path, content=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def test_events_replay_to_state(tmp_path):
+    topic_dir = tmp_path / "topic"
+    manifest = TopicManifest(str(topic_dir))
+    manifest.record_outline(str(topic_dir / "topic_scene_outline.txt"), 2)
+    manifest.record_plan(1, str(topic_dir / "scene1" / "plan.txt"))
+    manifest.record_code(1, 2, str(topic_dir / "scene1" / "code" / "topic_scene1_v2.py"))
+    manifest.record_code(1, 1, str(topic_dir / "scene1" / "code" / "topic_scene1_v1.py"))
+    manifest.record_render(1, 2, str(topic_dir / "media" / "a.mp4"), str(topic_dir / "media" / "a.srt"))
+
+    state = manifest.state()
+    assert state.scene_count == 2
+    scene = state.scenes[1]
+    assert scene.has_plan and scene.has_code and scene.has_render
+    assert scene.code_version == 2
+    assert scene.code_path.endswith("topic_scene1_v2.py")
+    assert scene.subtitle_path == str(topic_dir / "media" / "a.srt")
+    assert 2 not in state.scenes
+
+    manifest.invalidate_render(1)
+    manifest.record_combined(str(topic_dir / "topic_combined.mp4"))
+    state = manifest.state()
+    assert not state.scenes[1].has_render
+    assert state.combined_video_path == str(topic_dir / "topic_combined.mp4")
+
+
+def test_starting_a_newer_render_invalidates_the_old_one(tmp_path):
+    manifest = TopicManifest(str(tmp_path))
+    # Nothing rendered yet
+    assert not manifest.invalidate_stale_render(1, 1)
+
+    manifest.record_render(1, 1, str(tmp_path / "v1.mp4"))
+    # Re-rendering the same version keeps the render until it is replaced
+    assert not manifest.invalidate_stale_render(1, 1)
+    assert manifest.state().scenes[1].rendered_version == 1
+
+    assert manifest.invalidate_stale_render(1, 2)
+    scene = TopicManifest(str(tmp_path)).state().scenes[1]
+    assert not scene.has_render and scene.rendered_version is None
+
+    manifest.record_render(1, 2, str(tmp_path / "v2.mp4"))
+    assert manifest.state().scenes[1].rendered_version == 2
+
+
+def test_readers_see_appends_from_other_writers(tmp_path):
+    writer = TopicManifest(str(tmp_path))
+    reader = TopicManifest(str(tmp_path))
+    assert reader.state().scene_count == 0
+
+    writer.record_outline(str(tmp_path / "outline.txt"), 3)
+    assert reader.state().scene_count == 3
+
+    # A partially written line is skipped until it is complete
+    with open(writer.path, "ab") as f:
+        f.write(b'{"event": "plan", "scene": 1, "path": "p.txt"')
+    assert not reader.state().scenes
+    with open(writer.path, "ab") as f:
+        f.write(b"}\n")
+    assert reader.state().scenes[1].has_plan
+
+
+def test_rebuild_from_existing_output(tmp_path):
+    topic_dir = tmp_path / "topic"
+    write(str(topic_dir / "topic_scene_outline.txt"), OUTLINE)
+    write(str(topic_dir / "scene1" / "topic_scene1_implementation_plan.txt"), "plan")
+    write(str(topic_dir / "scene1" / "code" / "topic_scene1_v1.py"))
+    write(str(topic_dir / "scene1" / "code" / "topic_scene1_v3.py"))
+    write(str(topic_dir / "scene1" / "succ_rendered.txt"))
+    write(str(topic_dir / "media" / "videos" / "topic_scene1_v1" / "720p30" / "topic_scene1_v1.mp4"))
+    video = write(str(topic_dir / "media" / "videos" / "topic_scene1_v3" / "720p30" / "topic_scene1_v3.mp4"))
+    subtitle = write(str(topic_dir / "media" / "videos" / "topic_scene1_v3" / "720p30" / "Scene1.srt"))
+    write(str(topic_dir / "media" / "videos" / "topic_scene10_v9" / "720p30" / "topic_scene10_v9.mp4"))
+
+    manifest = get_topic_manifest(str(tmp_path), "topic")
+    assert manifest.exists()
+    state = manifest.state()
+    assert state.scene_count == 2
+    assert state.scenes[1].code_version == 3
+    assert state.scenes[1].video_path == video
+    assert state.scenes[1].subtitle_path == subtitle
+    assert state.scenes[1].rendered_version == 3
+    assert 2 not in state.scenes
+    assert state.combined_video_path is None
+
+    # Later lookups replay the manifest instead of scanning again
+    assert get_topic_manifest(str(tmp_path), "topic") is manifest
@@ -0,0 +1,108 @@
+"""
+Tests for the SQLite topic queue used by distributed workers.
+"""
+
+import time
+import sqlite3
+
+from src.core.topic_queue import SQLiteTopicQueue, is_drained
+
+TOPICS = [
+    {'theorem': 'Pythagorean Theorem', 'description': 'a^2 + b^2 = c^2'},
+    {'theorem': 'Euler Formula', 'description': 'e^(i*pi) + 1 = 0'},
+]
+
+
+def test_enqueue_is_idempotent_and_claims_are_exclusive(tmp_path):
+    queue = SQLiteTopicQueue(str(tmp_path / "queue.sqlite3"))
+    assert queue.enqueue(TOPICS) == 2
+    assert queue.enqueue(TOPICS) == 0
+
+    first = queue.claim("worker-a")
+    second = queue.claim("worker-b")
+    assert {first.topic, second.topic} == {'Pythagorean Theorem', 'Euler Formula'}
+    assert queue.claim("worker-c") is None
+
+    assert queue.heartbeat(first, stage="render")
+    assert queue.complete(first)
+    assert not queue.heartbeat(first)
+    stats = queue.get_stats()
+    assert (stats['done'], stats['leased'], stats['pending']) == (1, 1, 0)
+
+
+def test_failed_topic_retries_after_backoff_then_fails(tmp_path):
+    queue = SQLiteTopicQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2, retry_backoff=0.05)
+    queue.enqueue(TOPICS[:1])
+
+    lease = queue.claim("worker-a")
+    assert queue.fail(lease, "render error") == "pending"
+    assert queue.claim("worker-a") is None
+
+    time.sleep(0.1)
+    lease = queue.claim("worker-b")
+    assert lease.attempts == 2
+    assert queue.fail(lease, "render error") == "failed"
+    assert queue.list_jobs()[0]['last_error'] == "render error"
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_loses_it(tmp_path):
+    queue = SQLiteTopicQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=0.05)
+    queue.enqueue(TOPICS[:1])
+
+    stale = queue.claim("worker-a")
+    time.sleep(0.1)
+    lease = queue.claim("worker-b")
+    assert lease is not None and lease.job_id == stale.job_id
+    assert not queue.heartbeat(stale)
+    assert queue.fail(stale, "too late") == "lost"
+
+    assert queue.release(lease)
+    assert queue.claim("worker-c").attempts == lease.attempts
+
+
+def test_queue_is_drained_only_without_pending_or_leased_topics(tmp_path):
+    queue = SQLiteTopicQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2, retry_backoff=60)
+    assert is_drained(queue)
+    queue.enqueue(TOPICS[:1])
+    assert not is_drained(queue)
+
+    lease = queue.claim("worker-a")
+    assert not is_drained(queue)
+    # Waiting out the retry backoff: nothing to claim, but not drained
+    assert queue.fail(lease, "render error") == "pending"
+    assert queue.claim("worker-a") is None
+    assert not is_drained(queue)
+
+
+def test_database_uses_rollback_journal(tmp_path):
+    path = str(tmp_path / "queue.sqlite3")
+    SQLiteTopicQueue(path)
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    finally:
+        conn.close()
+
+
+def test_locked_commit_rolls_back_and_leaves_queue_usable(tmp_path):
+    path = str(tmp_path / "queue.sqlite3")
+    queue = SQLiteTopicQueue(path)
+    queue.enqueue(TOPICS[:1])
+    lease = queue.claim("worker-a")
+    queue._conn.execute("PRAGMA busy_timeout = 0")
+
+    # A reader holding a shared lock makes the heartbeat's COMMIT fail
+    reader = sqlite3.connect(path, isolation_level=None)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM topic_jobs").fetchone()
+    try:
+        queue.heartbeat(lease, stage="render")
+        raised = None
+    except SQLiteTopicQueue.transient_errors as e:
+        raised = e
+    reader.execute("COMMIT")
+    reader.close()
+
+    assert raised is not None
+    assert not queue._conn.in_transaction
+    assert queue.heartbeat(lease, stage="render")
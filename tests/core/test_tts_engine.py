@@ -0,0 +1,109 @@
+"""
+Tests for the shared Kokoro TTS engine: sentence splitting, the sentence
+audio cache and the worker start-up handshake.
+"""
+
+import os
+import sys
+import uuid
+import subprocess
+
+import numpy as np
+import pytest
+
+from src.utils import tts_engine
+from src.utils.tts_engine import AudioCache, split_sentences
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Hello world.", ["Hello world."]),
+    ("First.  Second!\nThird? Fourth; fifth: sixth",
+     ["First.", "Second!", "Third?", "Fourth;", "fifth:", "sixth"]),
+    # Punctuation not followed by whitespace does not split
+    ("Pi is 3.14159, e is 2.718.", ["Pi is 3.14159, e is 2.718."]),
+    ("  Trailing space.   ", ["Trailing space."]),
+    ("", []),
+    ("   ", []),
+])
+def test_split_sentences(text, expected):
+    assert split_sentences(text) == expected
+
+
+def test_audio_cache_round_trip(tmp_path):
+    cache = AudioCache(str(tmp_path / "audio"))
+    key = AudioCache.key("Hello.", "af_heart", 1.0, "en-us", "model:1:2")
+    samples = np.linspace(-1, 1, 2400, dtype=np.float32)
+
+    assert cache.get(key) is None
+    cache.set(key, samples, 24000)
+    cached, sample_rate = cache.get(key)
+
+    np.testing.assert_array_equal(cached, samples)
+    assert cached.dtype == np.float32
+    assert sample_rate == 24000
+    assert cache.stats == {'hits': 1, 'misses': 1}
+    # No temporary files are left behind
+    assert [name for _, _, files in os.walk(cache.cache_dir) for name in files] == [f"{key}.npz"]
+
+
+def test_audio_cache_key_covers_every_input():
+    args = ("Hello.", "af_heart", 1.0, "en-us", "model:1:2")
+    key = AudioCache.key(*args)
+    assert AudioCache.key(*args) == key
+    for i, other in enumerate(("Hello!", "am_adam", 1.1, "en-gb", "model:1:3")):
+        changed = list(args)
+        changed[i] = other
+        assert AudioCache.key(*changed) != key
+
+
+def test_audio_cache_treats_corrupt_entries_as_misses(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    key = AudioCache.key("Hello.", "af_heart", 1.0, "en-us", "")
+    os.makedirs(os.path.dirname(cache._path(key)))
+    with open(cache._path(key), 'wb') as f:
+        f.write(b"not an npz file")
+
+    assert cache.get(key) is None
+    assert cache.stats['misses'] == 1
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="uses a Unix socket address")
+def test_worker_handshake_and_request_round_trip(tmp_path, monkeypatch):
+    address = str(tmp_path / "tts.sock")
+    authkey = uuid.uuid4().hex
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = {**os.environ, tts_engine.TTS_AUTHKEY_ENV: authkey,
+           'PYTHONPATH': os.pathsep.join(filter(None, [project_root, os.environ.get('PYTHONPATH')]))}
+    # No model preloaded; requests for a missing model come back as errors
+    process = subprocess.Popen([sys.executable, '-m', 'src.utils.tts_engine', '--address', address],
+                               env=env, cwd=project_root)
+    try:
+        tts_engine._wait_until_listening(process, address, authkey, timeout=30)
+
+        monkeypatch.setenv(tts_engine.TTS_AUTHKEY_ENV, authkey)
+        monkeypatch.setattr(tts_engine, '_client', None)
+        request = {'text': "Hi.", 'voice': "af_heart", 'speed': 1.0, 'lang': "en-us",
+                   'model_path': str(tmp_path / "missing.onnx"), 'voices_path': str(tmp_path / "missing.bin")}
+        with pytest.raises(RuntimeError):
+            tts_engine._synthesize_remote(address, request)
+        # The connection stays usable after an error response
+        with pytest.raises(RuntimeError):
+            tts_engine._synthesize_remote(address, request)
+    finally:
+        if tts_engine._client is not None:
+            tts_engine._client.close()
+        process.kill()
+        process.wait()
+
+
+def test_wait_until_listening_reports_worker_exit(tmp_path):
+    process = subprocess.Popen([sys.executable, '-c', 'raise SystemExit(3)'])
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        tts_engine._wait_until_listening(process, str(tmp_path / "none.sock"), "key", timeout=30)
+
+
+def test_wait_until_listening_times_out(tmp_path):
+    process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    with pytest.raises(RuntimeError, match="did not start"):
+        tts_engine._wait_until_listening(process, str(tmp_path / "none.sock"), "key", timeout=0.3)
+    assert process.poll() is not None
@@ -0,0 +1,112 @@
+"""
+Tests for the resumable evaluation checkpoint and runner.
+"""
+
+import json
+import threading
+
+from eval_suite.runner import EvaluationCheckpoint, EvaluationRunner
+
+COMPONENTS = ["text", "video", "image"]
+CONFIG = {"text": "model-a", "video": "model-a", "image": "model-a"}
+
+
+class Evaluator:
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def evaluate(self, theorem, component):
+        with self._lock:
+            self.calls.append((theorem, component))
+        return {"score": len(theorem) + len(component)}
+
+    @staticmethod
+    def merge(theorem, results):
+        return {"theorem": theorem, "components": dict(results)}
+
+
+def _runner(checkpoint, evaluator, **kwargs):
+    return EvaluationRunner(evaluator.evaluate, evaluator.merge, checkpoint,
+                            max_workers=2, component_config=CONFIG, **kwargs)
+
+
+def _theorems(*names):
+    return {f"theorems/{name}": (name, COMPONENTS) for name in names}
+
+
+def test_load_ignores_and_cuts_truncated_last_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    checkpoint = EvaluationCheckpoint(str(path))
+    checkpoint.append({"kind": "component", "theorem": "t1", "component": "text", "result": 1})
+    complete = path.read_bytes()
+    with open(path, "a") as f:
+        f.write('{"kind": "component", "theorem": "t1", "compo')
+
+    components, theorems = checkpoint.load()
+
+    assert list(components) == [("t1", "text")]
+    assert theorems == {}
+    assert path.read_bytes() == complete
+
+    # The next record lands on its own line and survives a reload
+    checkpoint.append({"kind": "component", "theorem": "t1", "component": "video", "result": 2})
+    components, _ = checkpoint.load()
+    assert set(components) == {("t1", "text"), ("t1", "video")}
+
+
+def test_load_skips_corrupt_complete_lines(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('not json\n{"kind": "theorem", "theorem": "t1", "components": [], "result": null}\n')
+
+    components, theorems = EvaluationCheckpoint(str(path)).load()
+
+    assert components == {}
+    assert list(theorems) == ["t1"]
+    assert path.read_text().startswith("not json\n")
+
+
+def test_resume_after_interrupted_write(tmp_path):
+    path = tmp_path / "results.jsonl"
+    first = Evaluator()
+    results = _runner(EvaluationCheckpoint(str(path)), first).run(_theorems("alpha", "beta"))
+    assert set(results) == {"alpha", "beta"}
+
+    # Simulate a crash: keep beta's text component, cut its video record mid-line
+    lines = path.read_text().splitlines(keepends=True)
+    beta_text = next(i for i, line in enumerate(lines)
+                     if '"theorems/beta"' in line and '"component": "text"' in line)
+    kept = [line for i, line in enumerate(lines)
+            if '"theorems/beta"' not in line or i == beta_text]
+    beta_video = next(line for line in lines
+                      if '"theorems/beta"' in line and '"component": "video"' in line)
+    path.write_text("".join(kept) + beta_video[:len(beta_video) // 2])
+
+    second = Evaluator()
+    results = _runner(EvaluationCheckpoint(str(path)), second).run(_theorems("alpha", "beta", "gamma"))
+
+    assert set(results) == {"alpha", "beta", "gamma"}
+    assert results["beta"] == first.merge("theorems/beta", {
+        component: first.evaluate("theorems/beta", component) for component in COMPONENTS
+    })
+    # alpha is finished and beta's text result is reused
+    assert sorted(second.calls) == sorted(
+        [("theorems/beta", "video"), ("theorems/beta", "image")]
+        + [("theorems/gamma", component) for component in COMPONENTS]
+    )
+    for line in path.read_text().splitlines():
+        json.loads(line)
+
+
+def test_changed_component_config_is_reevaluated(tmp_path):
+    path = tmp_path / "results.jsonl"
+    evaluator = Evaluator()
+    checkpoint = EvaluationCheckpoint(str(path))
+    checkpoint.append({"kind": "component", "theorem": "theorems/alpha", "component": "text",
+                       "config": "model-a", "result": {"score": 1}})
+    checkpoint.append({"kind": "component", "theorem": "theorems/alpha", "component": "video",
+                       "config": "old-model", "result": {"score": 1}})
+
+    _runner(checkpoint, evaluator).run(_theorems("alpha"))
+
+    assert sorted(evaluator.calls) == [("theorems/alpha", "image"), ("theorems/alpha", "video")]
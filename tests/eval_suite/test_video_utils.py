@@ -0,0 +1,164 @@
+"""
+Tests for the evaluation video frame rate reduction and its cache.
+"""
+
+import os
+import json
+import shutil
+import subprocess
+
+import pytest
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+video_utils = pytest.importorskip("eval_suite.video_utils", exc_type=ImportError)
+
+requires_ffmpeg = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="ffmpeg and ffprobe are required"
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setenv("EVAL_VIDEO_CACHE_DIR", str(path))
+    monkeypatch.delenv("EVAL_VIDEO_CACHE_MAX_BYTES", raising=False)
+    return path
+
+
+@pytest.fixture
+def fake_reducers(monkeypatch):
+    """Record reductions instead of running ffmpeg / OpenCV; the output holds the call."""
+    calls = []
+
+    def reducer(backend, ext):
+        def reduce(*args):
+            if backend == 'ffmpeg':
+                args = args[1:]
+            input_path, target_fps, output_path, max_dimension = args
+            output_path = os.path.splitext(output_path)[0] + ext
+            calls.append((backend, input_path, target_fps, max_dimension))
+            with open(output_path, 'w') as f:
+                json.dump([backend, target_fps, max_dimension], f)
+            return output_path
+        return reduce
+
+    monkeypatch.setattr(video_utils, '_reduce_video_framerate_ffmpeg', reducer('ffmpeg', '.mp4'))
+    monkeypatch.setattr(video_utils, '_reduce_video_framerate_cv2', reducer('cv2', '.avi'))
+    return calls
+
+
+def _source(tmp_path, name, content=b"video"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_cache_key_depends_on_content_fps_and_size(tmp_path):
+    a = _source(tmp_path, "a.mp4")
+    key = video_utils._reduced_video_cache_key(a, 1, 768)
+
+    # Same content under another name shares the key
+    assert video_utils._reduced_video_cache_key(_source(tmp_path, "copy.mp4"), 1, 768) == key
+    assert video_utils._reduced_video_cache_key(a, 2, 768) != key
+    assert video_utils._reduced_video_cache_key(a, 1, 512) != key
+    assert video_utils._reduced_video_cache_key(a, 1, None) != key
+
+    # Rewriting the file (new size and mtime) rehashes it
+    with open(a, 'wb') as f:
+        f.write(b"other video")
+    assert video_utils._reduced_video_cache_key(a, 1, 768) != key
+
+
+def test_reduced_videos_are_reused_across_calls(tmp_path, cache_dir, fake_reducers, monkeypatch):
+    monkeypatch.setattr(video_utils.shutil, 'which', lambda name: '/usr/bin/ffmpeg')
+    source = _source(tmp_path, "a.mp4")
+
+    first = video_utils.reduce_video_framerate(source, target_fps=1)
+    second = video_utils.reduce_video_framerate(_source(tmp_path, "same.mp4"), target_fps=1)
+    assert first == second
+    assert video_utils.is_cached_reduced_video(first)
+    assert len(fake_reducers) == 1
+
+    # Copies out of the cache when an output path is given
+    output = str(tmp_path / "out" / "reduced.mp4")
+    assert video_utils.reduce_video_framerate(source, target_fps=1, output_path=output) == output
+    assert not video_utils.is_cached_reduced_video(output)
+    assert len(fake_reducers) == 1
+
+    video_utils.reduce_video_framerate(source, target_fps=1, max_dimension=512)
+    video_utils.reduce_video_framerate(source, target_fps=1, use_cache=False)
+    assert [call[3] for call in fake_reducers] == [768, 512, 768]
+
+
+def test_cv2_fallback_without_ffmpeg(tmp_path, cache_dir, fake_reducers, monkeypatch):
+    monkeypatch.setattr(video_utils.shutil, 'which', lambda name: None)
+    source = _source(tmp_path, "a.mp4")
+
+    cached = video_utils.reduce_video_framerate(source, target_fps=2)
+    assert cached.endswith(".avi")
+    assert fake_reducers == [('cv2', source, 2, 768)]
+
+    # The .avi entry is found again and the output path takes its extension
+    output = video_utils.reduce_video_framerate(source, target_fps=2, output_path=str(tmp_path / "out.mp4"))
+    assert output == str(tmp_path / "out.avi")
+    assert len(fake_reducers) == 1
+
+
+def test_cv2_fallback_requires_opencv(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_utils, 'cv2', None)
+    with pytest.raises(RuntimeError, match="ffmpeg or OpenCV"):
+        video_utils._reduce_video_framerate_cv2(_source(tmp_path, "a.mp4"), 1, str(tmp_path / "out.mp4"))
+
+
+def test_cache_evicts_least_recently_used(tmp_path, cache_dir, fake_reducers, monkeypatch):
+    monkeypatch.setattr(video_utils.shutil, 'which', lambda name: '/usr/bin/ffmpeg')
+    sources = [_source(tmp_path, f"{i}.mp4", f"video {i}".encode()) for i in range(3)]
+    paths = [video_utils.reduce_video_framerate(source, target_fps=1) for source in sources]
+    for age, path in zip((300, 200, 100), paths):
+        os.utime(path, (os.path.getmtime(path) - age,) * 2)
+    entry_size = os.path.getsize(paths[0])
+    monkeypatch.setenv("EVAL_VIDEO_CACHE_MAX_BYTES", str(3 * entry_size))
+
+    # A hit makes the oldest entry the most recently used
+    assert video_utils.reduce_video_framerate(sources[0], target_fps=1) == paths[0]
+    # An in-progress reduction is never touched
+    (cache_dir / "partial.mp4.1.2.tmp.mp4").write_bytes(b"x" * 10 * entry_size)
+
+    new = video_utils.reduce_video_framerate(_source(tmp_path, "3.mp4", b"video 3"), target_fps=1)
+
+    assert os.path.exists(new)
+    assert os.path.exists(paths[0])
+    assert not os.path.exists(paths[1])
+    assert os.path.exists(paths[2])
+    assert (cache_dir / "partial.mp4.1.2.tmp.mp4").exists()
+
+
+def test_prune_keeps_the_new_entry_over_budget(tmp_path):
+    big = tmp_path / "big.mp4"
+    big.write_bytes(b"x" * 100)
+    old = tmp_path / "old.mp4"
+    old.write_bytes(b"x" * 10)
+    os.utime(old, (1, 1))
+    os.utime(big, (2, 2))
+
+    assert video_utils._prune_reduced_video_cache(str(tmp_path), 50, keep=str(big)) == 1
+    assert big.exists() and not old.exists()
+
+
+@requires_ffmpeg
+def test_ffmpeg_reduction_output(tmp_path, cache_dir):
+    source = str(tmp_path / "source.mp4")
+    subprocess.run([
+        'ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=1280x720:rate=30:duration=3',
+        '-pix_fmt', 'yuv420p', '-c:v', 'libx264', '-preset', 'ultrafast', '-y', source
+    ], check=True)
+
+    reduced = video_utils.reduce_video_framerate(source, target_fps=2, max_dimension=320)
+
+    probe = json.loads(subprocess.run([
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0', '-count_frames',
+        '-show_entries', 'stream=width,height,avg_frame_rate,nb_read_frames', '-of', 'json', reduced
+    ], capture_output=True, text=True, check=True).stdout)['streams'][0]
+    assert (probe['width'], probe['height']) == (320, 180)
+    assert probe['avg_frame_rate'] == '2/1'
+    assert int(probe['nb_read_frames']) == 6
@@ -0,0 +1,150 @@
+"""
+Tests for the LiteLLM wrapper's native async path (litellm.acompletion mocked).
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# Use the bundled model cost map instead of fetching it on import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+pytest.importorskip("litellm")
+
+from mllm_tools import litellm as litellm_module
+from mllm_tools.litellm import LiteLLMWrapper
+
+
+def _response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def wrapper():
+    return LiteLLMWrapper(model_name="openai/gpt-4o", temperature=0.2, use_langfuse=False)
+
+
+def test_acall_uses_acompletion(wrapper, monkeypatch):
+    calls = []
+
+    async def fake_acompletion(**params):
+        calls.append(params)
+        return _response("print('hi')")
+
+    def fail_completion(**params):
+        raise AssertionError("acall must not use the blocking completion")
+
+    monkeypatch.setattr(litellm_module, "acompletion", fake_acompletion)
+    monkeypatch.setattr(litellm_module, "completion", fail_completion)
+
+    result = asyncio.run(wrapper.acall(
+        [{"type": "text", "content": "hello"}],
+        metadata={"generation_name": "code_generation"}
+    ))
+
+    assert result == "print('hi')"
+    assert len(calls) == 1
+    params = calls[0]
+    assert params["model"] == "openai/gpt-4o"
+    assert params["temperature"] == 0.2
+    assert params["messages"] == [{"role": "user", "content": [{"type": "text", "text": "hello"}]}]
+    assert params["metadata"]["generation_name"] == "code_generation"
+    assert params["metadata"]["trace_name"] == "litellm-completion-openai/gpt-4o"
+
+
+def test_acall_matches_sync_call_params(wrapper, monkeypatch):
+    sync_params, async_params = [], []
+
+    def fake_completion(**params):
+        sync_params.append(params)
+        return _response("sync")
+
+    async def fake_acompletion(**params):
+        async_params.append(params)
+        return _response("async")
+
+    monkeypatch.setattr(litellm_module, "completion", fake_completion)
+    monkeypatch.setattr(litellm_module, "acompletion", fake_acompletion)
+
+    messages = [{"type": "text", "content": "same prompt"}]
+    assert wrapper(messages, metadata={"trace_id": "t"}) == "sync"
+    assert asyncio.run(wrapper.acall(messages, metadata={"trace_id": "t"})) == "async"
+    assert sync_params == async_params
+
+
+def test_concurrent_acalls_overlap(wrapper, monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_acompletion(**params):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return _response(params["messages"][0]["content"][0]["text"])
+
+    monkeypatch.setattr(litellm_module, "acompletion", fake_acompletion)
+
+    async def run():
+        return await asyncio.gather(*[
+            wrapper.acall([{"type": "text", "content": f"prompt {i}"}], metadata={})
+            for i in range(5)
+        ])
+
+    results = asyncio.run(run())
+
+    assert results == [f"prompt {i}" for i in range(5)]
+    assert peak == 5
+
+
+def test_acall_model_prefers_native_async(wrapper, monkeypatch):
+    utils = pytest.importorskip("mllm_tools.utils", exc_type=ImportError)
+
+    async def fake_acompletion(**params):
+        return _response("native")
+
+    def fail_completion(**params):
+        raise AssertionError("acall_model must use the wrapper's acall")
+
+    monkeypatch.setattr(litellm_module, "acompletion", fake_acompletion)
+    monkeypatch.setattr(litellm_module, "completion", fail_completion)
+
+    assert asyncio.run(utils.acall_model(wrapper, [{"type": "text", "content": "x"}], metadata={})) == "native"
+
+
+def test_acall_model_runs_plain_callables_in_thread():
+    utils = pytest.importorskip("mllm_tools.utils", exc_type=ImportError)
+    import threading
+
+    loop_thread = threading.get_ident()
+    seen = {}
+
+    def model(messages, metadata=None):
+        seen["thread"] = threading.get_ident()
+        return "sync"
+
+    assert asyncio.run(utils.acall_model(model, [], metadata={})) == "sync"
+    assert seen["thread"] != loop_thread
+
+
+def test_failed_completion_is_flagged_as_error(wrapper, monkeypatch):
+    from mllm_tools.errors import is_error_response
+
+    async def failing_acompletion(**params):
+        raise ConnectionError("connection reset")
+
+    def failing_completion(**params):
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(litellm_module, "acompletion", failing_acompletion)
+    monkeypatch.setattr(litellm_module, "completion", failing_completion)
+
+    sync_result = wrapper([{"type": "text", "content": "x"}], metadata={})
+    async_result = asyncio.run(wrapper.acall([{"type": "text", "content": "x"}], metadata={}))
+
+    for result in (sync_result, async_result):
+        assert result == "connection reset"
+        assert is_error_response(result)
+        assert isinstance(result.error, ConnectionError)
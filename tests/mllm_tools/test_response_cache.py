@@ -0,0 +1,260 @@
+"""
+Tests for the LLM response cache: key derivation, backends and CachedModel.
+"""
+
+import asyncio
+import time
+
+import pytest
+from PIL import Image
+
+from mllm_tools.errors import ModelErrorResponse
+from mllm_tools.response_cache import (
+    CachedModel,
+    LLMResponseCache,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+    cache_bypass_warning,
+    create_response_cache,
+    is_cacheable_response,
+    make_cache_key,
+)
+
+
+def _text(content):
+    return [{"type": "text", "content": content}]
+
+
+class CountingModel:
+    def __init__(self, model_name="test-model", temperature=0, response="```python\nx = 1\n```"):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.response = response
+        self.calls = 0
+
+    def __call__(self, messages, metadata=None):
+        self.calls += 1
+        return self.response
+
+
+# Key derivation
+
+def test_key_depends_on_model_temperature_and_messages():
+    base = make_cache_key("m", 0, _text("hello"))
+    assert make_cache_key("m", 0, _text("hello")) == base
+    assert make_cache_key("other", 0, _text("hello")) != base
+    assert make_cache_key("m", 0.7, _text("hello")) != base
+    assert make_cache_key("m", 0, _text("hello!")) != base
+
+
+def test_key_hashes_images_by_content():
+    red = Image.new("RGB", (8, 8), "red")
+    blue = Image.new("RGB", (8, 8), "blue")
+
+    def key(image):
+        return make_cache_key("m", 0, _text("describe") + [{"type": "image", "content": image}])
+
+    assert key(red) == key(Image.new("RGB", (8, 8), "red"))
+    assert key(red) != key(blue)
+
+
+def test_key_hashes_media_files_by_content_not_path(tmp_path):
+    first = tmp_path / "a.mp4"
+    second = tmp_path / "b.mp4"
+    first.write_bytes(b"same video")
+    second.write_bytes(b"same video")
+
+    def key(path):
+        return make_cache_key("m", 0, [{"type": "video", "content": str(path)}])
+
+    assert key(first) == key(second)
+    second.write_bytes(b"edited video")
+    assert key(first) != key(second)
+
+
+def test_text_that_looks_like_a_path_is_not_hashed_as_media(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("one")
+    before = make_cache_key("m", 0, _text(str(path)))
+    path.write_text("two")
+    assert make_cache_key("m", 0, _text(str(path))) == before
+
+
+# Cacheable responses
+
+def test_error_responses_are_not_cacheable():
+    assert is_cacheable_response("```python\nx = 1\n```")
+    # Flagged explicitly by the wrapper, whatever the wording
+    assert not is_cacheable_response(ModelErrorResponse("block_reason: SAFETY"))
+    assert not is_cacheable_response(ModelErrorResponse("Connection reset by peer", ConnectionError()))
+    assert not is_cacheable_response("   ")
+    assert not is_cacheable_response(None)
+
+
+def test_error_response_is_still_text():
+    error = ValueError("boom")
+    response = ModelErrorResponse("boom", error)
+    assert response == "boom"
+    assert response.error is error
+
+
+# Backends
+
+def _check_backend_round_trip(backend):
+    assert backend.get("k1") is None
+    backend.set("k1", "value one", ttl=None)
+    assert backend.get("k1") == "value one"
+    backend.set("k1", "value two", ttl=None)
+    assert backend.get("k1") == "value two"
+    assert backend.get_stats()["entries"] == 1
+    backend.clear()
+    assert backend.get("k1") is None
+    assert backend.get_stats()["entries"] == 0
+
+
+def _check_backend_lru_eviction(backend):
+    # Budget of 25 bytes holds two 10-byte values
+    backend.set("a", "a" * 10, ttl=None)
+    time.sleep(0.01)
+    backend.set("b", "b" * 10, ttl=None)
+    time.sleep(0.01)
+    assert backend.get("a") == "a" * 10  # a is now the most recently used
+    time.sleep(0.01)
+    backend.set("c", "c" * 10, ttl=None)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == "a" * 10
+    assert backend.get("c") == "c" * 10
+    stats = backend.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["total_bytes"] == 20
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make_backend(request, tmp_path, monkeypatch):
+    def make(max_bytes=1024 ** 2):
+        if request.param == "memory":
+            return MemoryCacheBackend(max_bytes=max_bytes)
+        if request.param == "sqlite":
+            return SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_bytes=max_bytes)
+        fakeredis = pytest.importorskip("fakeredis")
+        redis = pytest.importorskip("redis")
+        server = make.server
+        monkeypatch.setattr(redis.Redis, "from_url", classmethod(lambda cls, url: fakeredis.FakeRedis(server=server)))
+        return RedisCacheBackend("redis://fake", max_bytes=max_bytes, prefix="test_llm_cache")
+
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        make.server = fakeredis.FakeServer()
+    make.name = request.param
+    return make
+
+
+def test_backend_round_trip(make_backend):
+    _check_backend_round_trip(make_backend())
+
+
+def test_backend_lru_eviction(make_backend):
+    _check_backend_lru_eviction(make_backend(max_bytes=25))
+
+
+def test_backend_ttl_expiry(make_backend, monkeypatch):
+    backend = make_backend()
+    if make_backend.name == "redis":
+        backend.set("k", "v", ttl=1)
+        assert backend.client.ttl(backend._entry_key("k")) == 1
+        return
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    backend.set("k", "v", ttl=10)
+    assert backend.get("k") == "v"
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert backend.get("k") is None
+
+
+def test_shared_backends_see_each_others_entries(make_backend):
+    if make_backend.name == "memory":
+        pytest.skip("memory backend is per process")
+    writer, reader = make_backend(), make_backend()
+    writer.set("k", "shared", ttl=None)
+    assert reader.get("k") == "shared"
+
+
+# Front-end and CachedModel
+
+def test_deterministic_only_is_the_default():
+    assert LLMResponseCache(MemoryCacheBackend()).deterministic_only
+    assert create_response_cache("memory").deterministic_only
+
+
+def test_cached_model_replays_deterministic_calls():
+    cache = create_response_cache("memory")
+    model = CountingModel(temperature=0)
+    cached = CachedModel(model, cache)
+
+    first = cached(_text("prompt"), metadata={"trace_id": "run-1"})
+    second = cached(_text("prompt"), metadata={"trace_id": "run-2"})
+
+    assert first == second
+    assert model.calls == 1
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+
+def test_cached_model_bypasses_sampled_calls_by_default():
+    cache = create_response_cache("memory")
+    model = CountingModel(temperature=0.7)
+    cached = CachedModel(model, cache)
+
+    cached(_text("prompt"))
+    cached(_text("prompt"))
+
+    assert model.calls == 2
+    assert cache.get_stats()["bypassed"] == 2
+
+    all_calls = CachedModel(model, create_response_cache("memory", deterministic_only=False))
+    all_calls(_text("prompt"))
+    all_calls(_text("prompt"))
+    assert model.calls == 3
+
+
+def test_warns_when_deterministic_cache_wraps_only_sampled_models():
+    cache = create_response_cache("memory")
+    sampled = [CachedModel(CountingModel(temperature=0.7), cache) for _ in range(3)]
+
+    warning = cache_bypass_warning(sampled)
+    assert warning is not None and "--no-llm_cache_deterministic" in warning and "0.7" in warning
+
+    assert cache_bypass_warning(sampled + [CachedModel(CountingModel(temperature=0), cache)]) is None
+    all_calls = create_response_cache("memory", deterministic_only=False)
+    assert cache_bypass_warning([CachedModel(CountingModel(temperature=0.7), all_calls)]) is None
+    assert cache_bypass_warning([CountingModel(temperature=0.7)]) is None
+
+
+def test_cached_model_does_not_store_errors():
+    cache = create_response_cache("memory")
+    model = CountingModel(response=ModelErrorResponse("prompt_feedback { block_reason: OTHER }"))
+    cached = CachedModel(model, cache)
+
+    cached(_text("prompt"))
+    cached(_text("prompt"))
+
+    assert model.calls == 2
+    assert cache.get_stats()["uncacheable"] == 2
+
+
+def test_cached_model_acall_falls_back_to_thread_and_caches():
+    cache = create_response_cache("memory")
+    model = CountingModel()
+    cached = CachedModel(model, cache)
+
+    async def run():
+        first = await cached.acall(_text("prompt"))
+        second = await cached.acall(_text("prompt"))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == model.response
+    assert model.calls == 1
@@ -0,0 +1,71 @@
+"""
+Tests for content-hash chunk IDs and the new/stale diff used by RAG ingestion.
+"""
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.documents import Document
+
+from src.rag.index_sync import diff_documents, document_id
+
+
+def _doc(content, **metadata):
+    return Document(page_content=content, metadata={"source": "docs/a.md", **metadata})
+
+
+def test_document_id_is_stable_and_content_addressed():
+    doc = _doc("Circle(radius=1)", type="code_block")
+
+    assert document_id(doc) == document_id(_doc("Circle(radius=1)", type="code_block"))
+    assert document_id(doc) != document_id(_doc("Circle(radius=2)", type="code_block"))
+    assert document_id(doc) != document_id(_doc("Circle(radius=1)", type="function"))
+
+
+def test_document_id_ignores_metadata_key_order():
+    first = Document(page_content="x", metadata={"a": 1, "b": 2})
+    second = Document(page_content="x", metadata={"b": 2, "a": 1})
+    assert document_id(first) == document_id(second)
+
+
+def test_first_ingestion_embeds_everything():
+    docs = [_doc("one"), _doc("two"), _doc("three")]
+
+    diff = diff_documents(docs, existing_ids=[])
+
+    assert diff.new_ids == [document_id(doc) for doc in docs]
+    assert diff.stale_ids == []
+    assert [diff.documents[doc_id] for doc_id in diff.new_ids] == docs
+
+
+def test_unchanged_docs_need_no_work():
+    docs = [_doc("one"), _doc("two")]
+    existing = [document_id(doc) for doc in docs]
+
+    diff = diff_documents(docs, existing)
+
+    assert diff.new_ids == []
+    assert diff.stale_ids == []
+    assert set(diff.documents) == set(existing)
+
+
+def test_changed_and_removed_chunks():
+    old = [_doc("keep"), _doc("edit me"), _doc("remove me")]
+    new = [_doc("keep"), _doc("edited"), _doc("added")]
+    existing = [document_id(doc) for doc in old]
+
+    diff = diff_documents(new, existing)
+
+    assert diff.new_ids == [document_id(_doc("edited")), document_id(_doc("added"))]
+    assert diff.stale_ids == sorted([document_id(_doc("edit me")), document_id(_doc("remove me"))])
+
+
+def test_duplicate_chunks_are_added_once():
+    docs = [_doc("same"), _doc("same"), _doc("other")]
+
+    diff = diff_documents(docs, existing_ids=[])
+
+    assert len(diff.new_ids) == 2
+    assert len(diff.documents) == 2
+    assert diff.documents[diff.new_ids[0]] is docs[0]
@@ -0,0 +1,192 @@
+"""
+Tests for the query embedding LRU cache and batched multi-store search.
+"""
+
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from src.rag.retrieval import QueryEmbeddingCache, search_store_batch, search_stores
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] for text in texts]
+
+
+def test_query_cache_normalizes_and_batches_misses():
+    embedder = CountingEmbedder()
+    cache = QueryEmbeddingCache(embedder, max_size=10)
+
+    first = cache.embed(["Create a Circle", "  create   a circle ", "Animate text"])
+
+    assert embedder.calls == [["create a circle", "animate text"]]
+    assert first[0] == first[1]
+
+    second = cache.embed(["animate TEXT", "new query"])
+
+    assert embedder.calls[1] == ["new query"]
+    assert second[0] == first[2]
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 3, 3)
+    assert stats["hit_rate"] == pytest.approx(2 / 5)
+
+
+def test_query_cache_evicts_least_recently_used():
+    embedder = CountingEmbedder()
+    cache = QueryEmbeddingCache(embedder, max_size=2)
+
+    cache.embed(["a"])
+    cache.embed(["b"])
+    cache.embed(["a"])  # b is now least recently used
+    cache.embed(["c"])
+    embedder.calls.clear()
+
+    cache.embed(["a", "c"])
+    assert embedder.calls == []
+    cache.embed(["b"])
+    assert embedder.calls == [["b"]]
+
+
+# Fake Chroma stores over a handful of 2-d unit vectors
+
+def _unit(angle):
+    return [math.cos(angle), math.sin(angle)]
+
+
+DOCS = [
+    ("circle docs", {"source": "circle.md", "type": "markdown_section"}, _unit(0.0)),
+    ("def circle():", {"source": "circle.py", "type": "function"}, _unit(0.1)),
+    ("square docs", {"source": "square.md", "type": "markdown_section"}, _unit(1.5)),
+]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = 0
+
+    def query(self, query_embeddings, n_results, include):
+        self.calls += 1
+        response = {"documents": [], "metadatas": [], "distances": []}
+        for embedding in query_embeddings:
+            ranked = sorted(self.docs, key=lambda doc: math.dist(doc[2], embedding))[:n_results]
+            response["documents"].append([doc[0] for doc in ranked])
+            response["metadatas"].append([doc[1] for doc in ranked])
+            response["distances"].append([math.dist(doc[2], embedding) for doc in ranked])
+        return response
+
+
+class FakeChromaStore:
+    def __init__(self, docs=DOCS):
+        self._collection = FakeCollection(docs)
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance / math.sqrt(2)
+
+
+class PublicOnlyStore:
+    """A store exposing only LangChain's public per-vector search."""
+
+    def __init__(self, docs=DOCS):
+        self.collection = FakeCollection(docs)
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k):
+        response = self.collection.query([embedding], k, None)
+        return [
+            (SimpleNamespace(page_content=content, metadata=metadata), distance)
+            for content, metadata, distance in zip(
+                response["documents"][0], response["metadatas"][0], response["distances"][0])
+        ]
+
+
+def test_search_store_batch_scores_thresholds_and_boosts():
+    store = FakeChromaStore()
+
+    plain, boosted = search_store_batch(
+        store, ["circle", "circle function"], [_unit(0.0), _unit(0.0)], k=3, boost_code=[False, True]
+    )
+
+    assert store._collection.calls == 1
+    # square docs is far enough away to fall under the relevance threshold
+    assert [r["content"] for r in plain] == ["circle docs", "def circle():"]
+    assert plain[0]["score"] == pytest.approx(1.0)
+    assert boosted[1]["score"] == pytest.approx(plain[1]["score"] * 1.2)
+    assert boosted[0]["score"] == pytest.approx(plain[0]["score"])
+    assert all(r["query"] == "circle function" for r in boosted)
+
+
+def test_public_api_fallback_matches_batched_search():
+    queries = ["circle", "square class"]
+    embeddings = [_unit(0.05), _unit(1.4)]
+
+    batched = search_store_batch(FakeChromaStore(), queries, embeddings, k=2, boost_code=[False, True])
+    public = search_store_batch(PublicOnlyStore(), queries, embeddings, k=2, boost_code=[False, True])
+
+    assert public == batched
+
+
+def test_search_stores_keeps_sequential_order():
+    core = FakeChromaStore()
+    plugin = FakeChromaStore([("plugin circle", {"source": "plugin.md", "type": "markdown_section"}, _unit(0.0))])
+    queries = [
+        {"query": "what is a circle"},
+        {"query": "circle function signature"},
+        {"query": "plugin circle usage", "type": "plugin"},
+        {"query": "plugin class api", "type": "plugin"},
+        {"query": "ignored plugin", "type": "missing_plugin"},
+    ]
+    embeddings = [_unit(0.0)] * len(queries)
+
+    results = search_stores(core, {"plugin": plugin}, queries, embeddings, k=1)
+
+    # One request per store, whatever the number of queries
+    assert core._collection.calls == 1
+    assert plugin._collection.calls == 1
+    # Code queries first, then concept queries; core results before plugin results
+    assert [(r["query"], r["source"]) for r in results] == [
+        ("circle function signature", "circle.md"),
+        ("plugin class api", "circle.md"),
+        ("plugin class api", "plugin.md"),
+        ("what is a circle", "circle.md"),
+        ("plugin circle usage", "circle.md"),
+        ("plugin circle usage", "plugin.md"),
+        ("ignored plugin", "circle.md"),
+    ]
+
+
+def test_batched_search_matches_langchain_chroma():
+    chroma = pytest.importorskip("langchain_community.vectorstores.chroma", exc_type=ImportError)
+    pytest.importorskip("chromadb")
+
+    class Embeddings:
+        def embed_documents(self, texts):
+            return [self.embed_query(text) for text in texts]
+
+        def embed_query(self, text):
+            return _unit((sum(map(ord, text)) % 157) / 100)
+
+    texts = ["circle docs", "def circle():", "square docs", "class Square:"]
+    metadatas = [{"source": t, "type": "function" if t.startswith(("def", "class")) else "markdown_section"}
+                 for t in texts]
+    store = chroma.Chroma.from_texts(texts, Embeddings(), metadatas=metadatas,
+                                     collection_name="retrieval_test", ids=texts)
+    try:
+        queries = ["circle", "square"]
+        embeddings = Embeddings().embed_documents(queries)
+
+        batched = search_store_batch(store, queries, embeddings, k=3, boost_code=[False, False],
+                                     score_threshold=-math.inf)
+
+        relevance = store._select_relevance_score_fn()
+        for results, embedding in zip(batched, embeddings):
+            expected = store.similarity_search_by_vector_with_relevance_scores(embedding, k=3)
+            assert [r["content"] for r in results] == [doc.page_content for doc, _ in expected]
+            assert [r["score"] for r in results] == pytest.approx([relevance(d) for _, d in expected])
+    finally:
+        store.delete_collection()
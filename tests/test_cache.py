@@ -0,0 +1,307 @@
+"""
+Tests for the two-tier (in-process L1, Redis L2) cache manager.
+
+Redis is fakeredis; every manager created in a test shares one fake server,
+so managers stand in for separate API instances.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+cache = pytest.importorskip("src.app.core.cache", exc_type=ImportError)
+
+from src.app.core import serialization
+from src.app.core.cache import CacheConfig, CacheKeyGenerator, CacheManager, CacheTags
+from src.app.core.redis import redis_manager
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_manager, "_redis", client)
+    monkeypatch.setattr(redis_manager, "_is_connected", True)
+    return client
+
+
+async def subscribed(*managers):
+    """Start the managers' invalidation listeners and wait until L1 is enabled."""
+    for manager in managers:
+        manager._ensure_listener()
+    for _ in range(200):
+        if all(manager._subscribed for manager in managers):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("invalidation listener did not subscribe")
+
+
+async def settle():
+    """Let pub/sub messages reach the listeners."""
+    for _ in range(20):
+        await asyncio.sleep(0.005)
+
+
+def test_single_flight_shares_one_loader_call(redis_client):
+    async def scenario():
+        manager = CacheManager()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"value": 42}
+
+        results = await asyncio.gather(*[manager.get_or_set("cache:k", loader) for _ in range(5)])
+        assert results == [{"value": 42}] * 5
+        assert len(calls) == 1
+        assert manager.get_stats()["single_flight_waits"] == 4
+        assert await manager.get("cache:k") == {"value": 42}
+
+    asyncio.run(scenario())
+
+
+def test_failed_load_is_not_cached(redis_client):
+    async def scenario():
+        manager = CacheManager()
+
+        async def failing():
+            raise RuntimeError("database down")
+
+        async def loader():
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await manager.get_or_set("cache:k", failing)
+        assert not manager._inflight
+        assert await manager.get_or_set("cache:k", loader) == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_stale_value_is_served_while_refreshing(redis_client):
+    async def scenario():
+        manager = CacheManager()
+        payload = {CacheConfig.STALE_MARKER: time.time() - 1, "value": "old"}
+        await redis_client.setex("cache:k", 60, serialization.dumps(payload))
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return "new"
+
+        assert await manager.get_or_set("cache:k", loader, ttl=60, stale_ttl=60) == "old"
+        # A second stale read does not start another refresh
+        assert await manager.get_or_set("cache:k", loader, ttl=60, stale_ttl=60) == "old"
+        await asyncio.gather(*manager._inflight.values())
+
+        assert calls == [1]
+        assert await manager.get_or_set("cache:k", loader, ttl=60, stale_ttl=60) == "new"
+        stats = manager.get_stats()
+        assert (stats["stale_served"], stats["background_refreshes"]) == (2, 1)
+        # Plain get treats a stale value as a miss
+        await redis_client.setex("cache:other", 60, serialization.dumps(payload))
+        assert await manager.get("cache:other", default="miss") == "miss"
+
+    asyncio.run(scenario())
+
+
+def test_writes_and_deletes_invalidate_other_instances_l1(redis_client):
+    async def scenario():
+        writer, reader = CacheManager(), CacheManager()
+        await subscribed(writer, reader)
+
+        await writer.set("cache:a", "v1")
+        await writer.set("cache:b", "v1")
+        assert await reader.get("cache:a") == "v1"
+        assert await reader.get("cache:b") == "v1"
+        assert reader._local.get("cache:a")[0] == "v1"
+
+        await writer.set("cache:a", "v2")
+        await settle()
+        assert reader._local.get("cache:a") == (None, None)
+        assert await reader.get("cache:a") == "v2"
+
+        await writer.delete("cache:a")
+        await settle()
+        assert await reader.get("cache:a") is None
+
+        assert await writer.delete_pattern("cache:*") == 1
+        await settle()
+        assert reader._local.get("cache:b") == (None, None)
+        assert await reader.get("cache:b") is None
+        assert reader.get_stats()["invalidations_received"] == 5
+
+    asyncio.run(scenario())
+
+
+def test_delete_pattern_publishes_after_unlinking(redis_client, monkeypatch):
+    async def scenario():
+        manager = CacheManager()
+        for i in range(3):
+            await redis_client.set(f"cache:p:{i}", i)
+        calls = []
+        unlink, publish = redis_client.unlink, redis_client.publish
+
+        async def recording_unlink(*keys):
+            calls.append("unlink")
+            return await unlink(*keys)
+
+        async def recording_publish(channel, message):
+            calls.append("publish")
+            return await publish(channel, message)
+
+        monkeypatch.setattr(redis_client, "unlink", recording_unlink)
+        monkeypatch.setattr(redis_client, "publish", recording_publish)
+        monkeypatch.setattr(CacheConfig, "INVALIDATION_BATCH_SIZE", 2)
+
+        assert await manager.delete_pattern("cache:p:*") == 3
+        assert calls == ["unlink", "unlink", "publish"]
+
+    asyncio.run(scenario())
+
+
+def test_local_changes_bump_invalidation_sequence(redis_client):
+    async def scenario():
+        manager = CacheManager()
+        seqs = [manager._invalidation_seq]
+        await manager.set("cache:k", "v")
+        seqs.append(manager._invalidation_seq)
+        await manager.delete("cache:k")
+        seqs.append(manager._invalidation_seq)
+        await manager.delete_pattern("cache:*")
+        seqs.append(manager._invalidation_seq)
+        assert seqs == sorted(set(seqs))
+
+    asyncio.run(scenario())
+
+
+def test_read_racing_a_local_write_does_not_fill_l1_with_old_value(redis_client, monkeypatch):
+    async def scenario():
+        manager = CacheManager()
+        await subscribed(manager)
+        await redis_client.set("cache:k", serialization.dumps("old"))
+
+        # The first pipeline (the read) gets its reply, then stalls until released
+        gate = asyncio.Event()
+        read_done = asyncio.Event()
+        pipeline = redis_client.pipeline
+        stalled = []
+
+        def gated_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            if stalled:
+                return pipe
+            stalled.append(pipe)
+            execute = pipe.execute
+
+            async def gated_execute(*a, **kw):
+                result = await execute(*a, **kw)
+                read_done.set()
+                await gate.wait()
+                return result
+
+            pipe.execute = gated_execute
+            return pipe
+
+        monkeypatch.setattr(redis_client, "pipeline", gated_pipeline)
+        read = asyncio.create_task(manager.get("cache:k"))
+        await read_done.wait()
+
+        await manager.set("cache:k", "new")
+        gate.set()
+        assert await read == "old"
+
+        assert manager._local.get("cache:k")[0] == "new"
+        assert await manager.get("cache:k") == "new"
+
+    asyncio.run(scenario())
+
+
+def test_tag_invalidation_deletes_tagged_keys_everywhere(redis_client, monkeypatch):
+    async def scenario():
+        writer, reader = CacheManager(), CacheManager()
+        await subscribed(writer, reader)
+        monkeypatch.setattr(CacheConfig, "INVALIDATION_BATCH_SIZE", 2)
+
+        user_keys = [f"cache:query_cache:u1:{i}" for i in range(3)]
+        for key in user_keys:
+            await writer.set(key, "v", tags=[CacheTags.user("u1")])
+        await writer.set("cache:query_cache:u2", "v", tags=[CacheTags.user("u2")])
+        for key in user_keys:
+            assert await reader.get(key) == "v"
+            assert await writer.get(key) == "v"
+        seq = writer._invalidation_seq
+
+        assert await writer.invalidate_tags([CacheTags.user("u1")]) == 3
+        await settle()
+
+        assert writer._invalidation_seq > seq
+        for key in user_keys:
+            assert await redis_client.exists(key) == 0
+            assert writer._local.get(key) == (None, None)
+            assert reader._local.get(key) == (None, None)
+        assert await reader.get("cache:query_cache:u2") == "v"
+        assert await redis_client.zcard(CacheManager._tag_key(CacheTags.user("u1"))) == 0
+        stats = writer.get_stats()["invalidation"]
+        assert (stats["tag_invalidations"], stats["keys_invalidated"], stats["max_fanout"]) == (1, 3, 3)
+
+    asyncio.run(scenario())
+
+
+def test_user_keys_are_tagged_by_default(redis_client):
+    async def scenario():
+        manager = CacheManager()
+        key = CacheKeyGenerator.user_key("u1", "jobs")
+        await manager.set(key, ["job"])
+
+        assert await manager.invalidate_user_cache("u1") == 1
+        assert await manager.get(key) is None
+
+    asyncio.run(scenario())
+
+
+def test_endpoint_invalidation_matches_registered_tags(redis_client):
+    async def scenario():
+        manager = CacheManager()
+        await manager.set("cache:endpoint_cache:a", "v", tags=[CacheTags.endpoint("/api/v1/jobs/1")])
+        await manager.set("cache:endpoint_cache:b", "v", tags=[CacheTags.endpoint("/api/v1/videos/1")])
+
+        assert await manager.endpoint_tags_matching(["/jobs"]) == [CacheTags.endpoint("/api/v1/jobs/1")]
+        assert await manager.invalidate_endpoint_cache("/jobs") == 1
+        assert await manager.get("cache:endpoint_cache:a") is None
+        assert await manager.get("cache:endpoint_cache:b") == "v"
+
+    asyncio.run(scenario())
+
+
+def test_legacy_pattern_scans_stop_a_day_after_the_first_tagged_write(redis_client):
+    async def scenario():
+        manager = CacheManager()
+        legacy_key = "cache:user_cache:u1:legacy"
+        await redis_client.set(legacy_key, serialization.dumps("v"))
+
+        # Nothing tagged yet: untagged keys are found by SCAN
+        assert manager.get_stats()["legacy_scans_active"]
+        assert await manager.invalidate_user_cache("u1") == 1
+        assert manager.get_stats()["invalidation"]["scan_invalidations"] == 1
+
+        await manager.set(CacheKeyGenerator.user_key("u2", "jobs"), "v")
+        since = float(await redis_client.get(CacheManager._tag_registry_key("since")))
+        await manager.invalidate_user_cache("u1")
+        stats = manager.get_stats()
+        assert stats["legacy_scans_active"]
+        assert stats["invalidation"]["scan_invalidations"] == 2
+        assert stats["legacy_scans_until"] == datetime.utcfromtimestamp(
+            since + CacheConfig.TAG_INDEX_TTL
+        ).isoformat()
+
+        await redis_client.set(CacheManager._tag_registry_key("since"), since - CacheConfig.TAG_INDEX_TTL - 1)
+        await manager.invalidate_user_cache("u1")
+        stats = manager.get_stats()
+        assert not stats["legacy_scans_active"]
+        assert stats["invalidation"]["scan_invalidations"] == 2
+
+    asyncio.run(scenario())
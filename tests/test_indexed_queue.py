@@ -0,0 +1,69 @@
+"""
+Tests for the indexed multi-level priority queue.
+
+Operations are checked against a plain list model of the queue.
+"""
+
+import random
+
+from src.app.core.indexed_queue import IndexedPriorityQueue, PRIORITY_LEVELS
+
+
+def test_levels_are_served_in_order_and_fifo_within_a_level():
+    queue = IndexedPriorityQueue()
+    for item, priority in [("n1", "normal"), ("l1", "low"), ("h1", "high"), ("u1", "urgent"),
+                           ("n2", "normal"), ("h2", "high"), ("x1", "unknown")]:
+        queue.push(item, priority)
+
+    assert queue.items() == ["u1", "h1", "h2", "n1", "n2", "x1", "l1"]
+    assert [queue.position(item) for item in queue.items()] == list(range(7))
+    assert queue.level_lengths() == {"urgent": 1, "high": 2, "normal": 3, "low": 1}
+    assert [queue.pop() for _ in range(8)] == ["u1", "h1", "h2", "n1", "n2", "x1", "l1", None]
+
+
+def test_push_of_queued_item_moves_it():
+    queue = IndexedPriorityQueue()
+    queue.push("a")
+    queue.push("b")
+    assert queue.push("a", "high") is False
+    assert queue.items() == ["a", "b"]
+    assert queue.priority_of("a") == "high"
+    assert len(queue) == 2
+
+
+def test_matches_list_model_under_random_operations():
+    rng = random.Random(7)
+    queue = IndexedPriorityQueue()
+    model = []  # (level, sequence, item) sorted in serving order
+    sequence = 0
+
+    for step in range(20000):
+        operation = rng.random()
+        if operation < 0.45:
+            item = f"job-{rng.randrange(3000)}"
+            priority = rng.choice(PRIORITY_LEVELS)
+            model = [entry for entry in model if entry[2] != item]
+            sequence += 1
+            model.append((PRIORITY_LEVELS.index(priority), sequence, item))
+            model.sort()
+            queue.push(item, priority)
+        elif operation < 0.65:
+            expected = model.pop(0)[2] if model else None
+            assert queue.pop() == expected
+        elif operation < 0.85:
+            item = f"job-{rng.randrange(3000)}"
+            present = any(entry[2] == item for entry in model)
+            model = [entry for entry in model if entry[2] != item]
+            assert queue.remove(item) is present
+        else:
+            item = f"job-{rng.randrange(3000)}"
+            positions = [i for i, entry in enumerate(model) if entry[2] == item]
+            assert queue.position(item) == (positions[0] if positions else None)
+
+        if step % 1000 == 0:
+            assert queue.items() == [entry[2] for entry in model]
+            assert queue.peek() == (model[0][2] if model else None)
+
+    assert len(queue) == len(model)
+    assert queue.clear() == len(model)
+    assert queue.pop() is None
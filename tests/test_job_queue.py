@@ -0,0 +1,227 @@
+"""
+Tests for the leased Redis job queue.
+
+The queue's Lua scripts run in fakeredis, which needs lupa for EVAL.
+"""
+
+import asyncio
+import math
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+redis_operations = pytest.importorskip("src.app.core.redis_operations", exc_type=ImportError)
+
+from src.app.core.redis_operations import JobQueue
+
+
+def make_queue(client, **kwargs):
+    kwargs.setdefault("reclaim_interval", 3600)
+    return JobQueue(client, queue_key="test:job_queue", **kwargs)
+
+
+def run(scenario):
+    async def main():
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        try:
+            await scenario(client)
+        finally:
+            await client.aclose()
+    asyncio.run(main())
+
+
+def test_claim_leases_jobs_in_order():
+    async def scenario(client):
+        queue = make_queue(client)
+        await queue.enqueue_job("a")
+        await queue.enqueue_job("b")
+        await queue.enqueue_job("urgent", priority=True)
+
+        lease = await queue.claim_job()
+        assert (lease.job_id, lease.attempts) == ("urgent", 1)
+        assert lease.expires_at == pytest.approx(time.time() + queue.lease_seconds, abs=5)
+        assert lease.token.startswith(queue.worker_id)
+        assert [(await queue.claim_job()).job_id for _ in range(2)] == ["a", "b"]
+        assert await queue.claim_job() is None
+
+        assert await queue.get_queue_length() == 0
+        assert await queue.get_processing_length() == 3
+        assert await queue.complete_job("urgent", lease)
+        assert not await queue.complete_job("urgent", lease)
+        assert await queue.get_processing_length() == 2
+
+    run(scenario)
+
+
+def test_heartbeat_extends_only_the_owners_lease():
+    async def scenario(client):
+        queue = make_queue(client, lease_seconds=60)
+        other = make_queue(client, lease_seconds=60, worker_id="other")
+        await queue.enqueue_job("a")
+        lease = await queue.claim_job()
+        lease.expires_at -= 30
+        before = await client.zscore(queue.leases_key, "a")
+
+        assert await queue.heartbeat("a", lease)
+        assert lease.expires_at > before
+        assert await client.zscore(queue.leases_key, "a") == pytest.approx(lease.expires_at)
+        # Another instance holds no lease on the job
+        assert not await other.heartbeat("a")
+
+    run(scenario)
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_loses_it():
+    async def scenario(client):
+        queue = make_queue(client, lease_seconds=0.05)
+        await queue.enqueue_job("a")
+        await queue.enqueue_job("b")
+        stale = await queue.claim_job()
+        await asyncio.sleep(0.1)
+
+        assert await queue.reclaim_expired() == {"requeued": 1, "dead_letter": 0}
+        # Returned to the front of the queue
+        assert await queue.peek_queue() == ["a", "b"]
+        assert not await queue.heartbeat("a", stale)
+
+        lease = await queue.claim_job()
+        assert (lease.job_id, lease.attempts) == ("a", 2)
+        assert not await queue.complete_job("a", stale)
+        assert await queue.fail_job("a", lease=stale) is None
+        assert await queue.complete_job("a", lease)
+
+    run(scenario)
+
+
+def test_blocking_claim_hands_off_through_claiming_list():
+    async def scenario(client):
+        queue = make_queue(client)
+        await queue.enqueue_job("a")
+
+        # Skip the non-blocking pop, as if the queue was empty until BLMOVE
+        # (fakeredis does not wake blocked commands on writes from other connections)
+        async def empty_queue(**kwargs):
+            return None
+        queue._claim_script = empty_queue
+
+        lease = await queue.claim_job(timeout=1)
+        assert (lease.job_id, lease.attempts) == ("a", 1)
+        assert await client.llen(queue.claiming_key) == 0
+        assert await client.zscore(queue.leases_key, "a") == pytest.approx(lease.expires_at)
+
+    run(scenario)
+
+
+def test_job_stranded_on_handoff_list_is_reclaimed():
+    async def scenario(client):
+        queue = make_queue(client, lease_seconds=0.05)
+        # A worker died between BLMOVE and leasing the job
+        await client.rpush(queue.claiming_key, "a")
+
+        # First seen: left alone in case the worker is about to lease it
+        assert await queue.reclaim_expired() == {"requeued": 0, "dead_letter": 0}
+        await asyncio.sleep(0.1)
+        assert await queue.reclaim_expired() == {"requeued": 1, "dead_letter": 0}
+        assert await queue.peek_queue() == ["a"]
+        assert await client.llen(queue.claiming_key) == 0
+        assert not await client.hexists(queue.handoff_seen_key, "a")
+
+        # A worker whose hand-off was reclaimed does not lease the job
+        await client.rpush(queue.claiming_key, "b")
+        assert not await queue._lease_script(
+            keys=[queue.claiming_key + ":other", queue.leases_key, queue.owners_key,
+                  queue.attempts_key, queue.handoff_seen_key],
+            args=["b", "token", time.time() + 60]
+        )
+
+    run(scenario)
+
+
+def test_job_is_dead_lettered_after_max_attempts():
+    async def scenario(client):
+        queue = make_queue(client, max_attempts=2)
+        await queue.enqueue_job("a")
+
+        await queue.claim_job()
+        assert await queue.fail_job("a", error="boom") == "requeued"
+        lease = await queue.claim_job()
+        assert lease.attempts == 2
+        assert await queue.fail_job("a", error="boom again") == "dead_letter"
+
+        assert await queue.get_queue_length() == 0
+        assert await queue.get_processing_length() == 0
+        assert await queue.get_dead_letter_length() == 1
+        entry = (await queue.get_dead_letters())[0]
+        assert (entry["job_id"], entry["attempts"], entry["error"]) == ("a", "2", "boom again")
+        assert not await client.hexists(queue.attempts_key, "a")
+
+    run(scenario)
+
+
+def test_expired_lease_on_last_attempt_is_dead_lettered():
+    async def scenario(client):
+        queue = make_queue(client, lease_seconds=0.05, max_attempts=1)
+        await queue.enqueue_job("a")
+        await queue.claim_job()
+        await asyncio.sleep(0.1)
+
+        assert await queue.reclaim_expired() == {"requeued": 0, "dead_letter": 1}
+        assert (await queue.get_dead_letters())[0]["error"] == "lease expired"
+
+    run(scenario)
+
+
+def test_requeue_does_not_count_an_attempt():
+    async def scenario(client):
+        queue = make_queue(client, max_attempts=1)
+        await queue.enqueue_job("a")
+        await queue.enqueue_job("b")
+        await queue.claim_job()
+
+        assert await queue.requeue_job("a")
+        assert await queue.peek_queue() == ["a", "b"]
+        lease = await queue.claim_job()
+        assert lease.attempts == 1
+        assert await queue.fail_job("a", lease=lease) == "dead_letter"
+
+    run(scenario)
+
+
+def test_requeue_legacy_processing_moves_jobs_to_the_front():
+    async def scenario(client):
+        queue = make_queue(client)
+        await queue.enqueue_job("new")
+        # The previous implementation LPUSHed claimed jobs onto the processing list
+        for job_id in ("old-1", "old-2"):
+            await client.lpush(queue.processing_key, job_id)
+
+        assert await queue.requeue_legacy_processing() == 2
+        assert await queue.requeue_legacy_processing() == 0
+        assert await queue.peek_queue() == ["old-2", "old-1", "new"]
+        assert not await client.exists(queue.processing_key)
+
+    run(scenario)
+
+
+def test_dequeue_job_lease_never_expires_until_heartbeat():
+    async def scenario(client):
+        queue = make_queue(client, lease_seconds=0.05)
+        await queue.enqueue_job("a")
+
+        assert await queue.dequeue_job() == "a"
+        assert queue._leases["a"].expires_at == math.inf
+        await asyncio.sleep(0.1)
+        assert await queue.reclaim_expired() == {"requeued": 0, "dead_letter": 0}
+
+        # A heartbeat turns it into an ordinary, expiring lease
+        assert await queue.heartbeat("a")
+        await asyncio.sleep(0.1)
+        assert await queue.reclaim_expired() == {"requeued": 1, "dead_letter": 0}
+
+        await queue.enqueue_job("b")
+        assert await queue.dequeue_job(lease_seconds=None) == "a"
+        assert queue._leases["a"].expires_at < math.inf
+
+    run(scenario)
@@ -0,0 +1,68 @@
+"""
+Tests for the versioned payload codecs.
+"""
+
+import json
+import uuid
+from datetime import datetime
+from enum import Enum
+
+import pytest
+
+from src.app.core import serialization
+
+
+class Status(str, Enum):
+    COMPLETED = "completed"
+
+
+PAYLOAD = {
+    "id": uuid.UUID(int=7),
+    "status": Status.COMPLETED,
+    "created_at": datetime(2025, 1, 15, 12, 30, 45, 123456),
+    "stages": {"outline"},
+    "progress": 42.5,
+    "metrics": {"llm_calls": 37},
+}
+
+EXPECTED = {
+    "id": str(uuid.UUID(int=7)),
+    "status": "completed",
+    "created_at": "2025-01-15T12:30:45.123456",
+    "stages": ["outline"],
+    "progress": 42.5,
+    "metrics": {"llm_calls": 37},
+}
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_text_codecs_round_trip_like_legacy_json(codec):
+    pytest.importorskip(codec)
+    encoded = serialization.dumps(PAYLOAD, codec=codec)
+    assert isinstance(encoded, str)
+    assert encoded.startswith(serialization.ENVELOPE_MARK + serialization.ENVELOPE_VERSION)
+    assert serialization.loads(encoded) == EXPECTED
+    assert serialization.loads(encoded.encode("utf-8")) == EXPECTED
+
+
+def test_msgpack_restores_native_types():
+    pytest.importorskip("msgpack")
+    decoded = serialization.loads(serialization.dumps(PAYLOAD, codec="msgpack"))
+    assert decoded["id"] == PAYLOAD["id"]
+    assert decoded["created_at"] == PAYLOAD["created_at"]
+    assert decoded["status"] == "completed"
+
+
+def test_legacy_payloads_still_decode():
+    legacy = json.dumps(PAYLOAD, default=str)
+    assert serialization.loads(legacy) == json.loads(legacy)
+    assert serialization.loads(serialization.dumps(PAYLOAD, codec="legacy")) == json.loads(legacy)
+
+
+def test_unknown_header_and_invalid_payloads_raise():
+    with pytest.raises(serialization.SerializationError):
+        serialization.loads(serialization.ENVELOPE_MARK + "9o{}")
+    with pytest.raises(ValueError):
+        serialization.loads("not json")
+    with pytest.raises(ValueError):
+        serialization.get_codec("nope")